@@ -37,6 +37,15 @@ __all__ = [
     "misc",
     "getB",
     "getH",
+    "iter_B",
+    "iter_H",
+    "getB_batch",
+    "getH_batch",
+    "getGradB",
+    "getGradH",
+    "tabulate",
+    "FieldMap",
+    "load_field",
     "Sensor",
     "Collection",
     "show",
@@ -53,7 +62,14 @@ __all__ = [
 from magpylib._src.defaults.defaults_utility import SUPPORTED_PLOTTING_BACKENDS
 from magpylib import magnet, current, misc, core, graphics
 from magpylib._src.defaults.defaults_classes import default_settings as defaults
-from magpylib._src.fields import getB, getH
+from magpylib._src.fields import getB, getH, iter_B, iter_H
+from magpylib._src.fields import getB_batch, getH_batch
+from magpylib._src.fields import getGradB, getGradH
+
+# `compile` is intentionally not part of `__all__`, so that a star-import does not
+# shadow the Python builtin of the same name.
+from magpylib._src.fields import compile  # pylint: disable=redefined-builtin
+from magpylib._src.fields import tabulate, FieldMap, load_field
 from magpylib._src.obj_classes.class_Sensor import Sensor
 from magpylib._src.obj_classes.class_Collection import Collection
 from magpylib._src.display.display import show, show_context
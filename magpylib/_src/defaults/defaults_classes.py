@@ -13,15 +13,21 @@ class DefaultConfig(MagicProperties):
     ----------
     display: dict or Display
         `Display` class containing display settings. `('backend', 'animation', 'colorsequence' ...)`
+
+    compute: dict or Compute
+        `Compute` class containing field computation settings. `('workers', 'dtype',
+        'approximation', 'tolerance', 'symmetry', 'backend', 'cache')`
     """
 
     def __init__(
         self,
         display=None,
+        compute=None,
         **kwargs,
     ):
         super().__init__(
             display=display,
+            compute=compute,
             **kwargs,
         )
         self.reset()
@@ -41,6 +47,237 @@ class DefaultConfig(MagicProperties):
     def display(self, val):
         self._display = validate_property_class(val, "display", Display, self)
 
+    @property
+    def compute(self):
+        """`Compute` class containing field computation settings. `('workers', 'dtype',
+        'approximation', 'tolerance', 'symmetry', 'backend', 'cache')`"""
+        return self._compute
+
+    @compute.setter
+    def compute(self, val):
+        self._compute = validate_property_class(val, "compute", Compute, self)
+
+
+class Compute(MagicProperties):
+    """
+    Defines the properties for the field computation.
+
+    Properties
+    ----------
+    workers: int, default=1
+        Number of threads among which the vectorized field computation of `getB` and
+        `getH` is split. With `-1` all available CPU cores are used.
+
+    dtype: str, default='float64'
+        Floating point precision of the field computation, one of `('float64',
+        'float32')`. With `'float32'` the field kernels of `Sphere`, `Dipole` and `Line`
+        sources run in single precision (relative accuracy of about 1e-5), which reduces
+        memory traffic. All other sources, in particular those relying on elliptic
+        integrals, are always computed in double precision. Outputs are always of type
+        float64.
+
+    approximation: str, default='exact'
+        Field computation mode of the magnet sources, one of `('exact', 'multipole',
+        'tree')`. With `'multipole'` the field of `Cuboid`, `Cylinder`,
+        `CylinderSegment`, `Tetrahedron` and `TriangularMesh` magnets is computed from a
+        precomputed multipole expansion at observers that are far enough from the magnet
+        for the relative error to stay below `tolerance`. The exact solution is used
+        everywhere else. With `'tree'` the summed field of many `Cuboid`, `Sphere`,
+        `Tetrahedron`, `TriangularMesh`, `Triangle` and `Dipole` sources (`sumup=True`
+        or sources in a `Collection`) is computed with a treecode that clusters the
+        sources in an octree and evaluates the multipole expansions of well separated
+        clusters. Close sources are computed exactly.
+
+    tolerance: float, default=1e-4
+        Maximal relative error of the field with `approximation='multipole'`, and of the
+        field of each source cluster with `approximation='tree'`.
+
+    symmetry: bool, default=False
+        If `True`, the rotational symmetry of `Cylinder` and `CylinderSegment` magnets
+        about their axis is used: instances that only differ by a rotation about the
+        axis (e.g. identical segments of a ring at different rotor positions) are
+        identified, and their field is computed only once and rotated back.
+
+    backend: str, default='numpy'
+        Implementation of the field kernels, one of `('numpy', 'numba')`. With
+        `'numba'` the fields of `Cuboid`, `Line` and `Triangle` sources are computed by
+        compiled element-wise loops without temporary arrays, which requires the
+        optional numba package. The kernels are compiled on first use, and the NumPy
+        kernels are used if numba is not installed.
+
+    cache: dict or Cache
+        `Cache` class containing the settings of the field result cache.
+    """
+
+    @property
+    def workers(self):
+        """Number of threads among which the vectorized field computation is split.
+        With `-1` all available CPU cores are used."""
+        return self._workers
+
+    @workers.setter
+    def workers(self, val):
+        assert val is None or (
+            isinstance(val, int)
+            and not isinstance(val, bool)
+            and (val > 0 or val == -1)
+        ), (
+            f"The `workers` property of {type(self).__name__} must be a strictly positive"
+            f" integer or -1 but received {repr(val)} instead."
+        )
+        self._workers = val
+
+    @property
+    def dtype(self):
+        """Floating point precision of the field computation, one of
+        `('float64', 'float32')`."""
+        return self._dtype
+
+    @dtype.setter
+    def dtype(self, val):
+        assert val is None or val in ("float64", "float32"), (
+            f"The `dtype` property of {type(self).__name__} must be one of"
+            f" ('float64', 'float32') but received {repr(val)} instead."
+        )
+        self._dtype = val
+
+    @property
+    def approximation(self):
+        """Field computation mode of the magnet sources, one of
+        `('exact', 'multipole', 'tree')`."""
+        return self._approximation
+
+    @approximation.setter
+    def approximation(self, val):
+        assert val is None or val in ("exact", "multipole", "tree"), (
+            f"The `approximation` property of {type(self).__name__} must be one of"
+            f" ('exact', 'multipole', 'tree') but received {repr(val)} instead."
+        )
+        self._approximation = val
+
+    @property
+    def tolerance(self):
+        """Maximal relative error of the field with `approximation='multipole'` or
+        `'tree'`."""
+        return self._tolerance
+
+    @tolerance.setter
+    def tolerance(self, val):
+        assert val is None or (
+            isinstance(val, (int, float)) and not isinstance(val, bool) and 0 < val < 1
+        ), (
+            f"The `tolerance` property of {type(self).__name__} must be a number"
+            f" between 0 and 1 but received {repr(val)} instead."
+        )
+        self._tolerance = val
+
+    @property
+    def symmetry(self):
+        """If `True`, the field of `Cylinder` and `CylinderSegment` instances that only
+        differ by a rotation about their axis is computed only once."""
+        return self._symmetry
+
+    @symmetry.setter
+    def symmetry(self, val):
+        assert val is None or isinstance(val, bool), (
+            f"The `symmetry` property of {type(self).__name__} must be either True or"
+            f" False but received {repr(val)} instead."
+        )
+        self._symmetry = val
+
+    @property
+    def backend(self):
+        """Implementation of the field kernels, one of `('numpy', 'numba')`."""
+        return self._backend
+
+    @backend.setter
+    def backend(self, val):
+        assert val is None or val in ("numpy", "numba"), (
+            f"The `backend` property of {type(self).__name__} must be one of"
+            f" ('numpy', 'numba') but received {repr(val)} instead."
+        )
+        self._backend = val
+
+    @property
+    def cache(self):
+        """`Cache` class containing the settings of the field result cache."""
+        return self._cache
+
+    @cache.setter
+    def cache(self, val):
+        self._cache = validate_property_class(val, "cache", Cache, self)
+
+
+class Cache(MagicProperties):
+    """
+    Defines the properties of the field result cache. When enabled, results of the
+    object oriented `getB` and `getH` computations are stored and returned again for
+    repeated calls with unchanged sources and observers. Objects are compared by an
+    internal state version that changes with every modification of the object
+    through its setters or through `move` and `rotate` (e.g. a new `magnetization`).
+    In-place modifications of the returned arrays (e.g. `src.magnetization[0] = 1`)
+    are not tracked and require `clear()`.
+
+    Properties
+    ----------
+    enabled: bool, default=False
+        If `True`, field computation results are cached.
+
+    maxsize: float, default=100
+        Maximal memory of all stored results in units of MB. The least recently used
+        results are dropped first.
+    """
+
+    @property
+    def enabled(self):
+        """If `True`, field computation results are cached."""
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, val):
+        assert val is None or isinstance(val, bool), (
+            f"The `enabled` property of {type(self).__name__} must be either True or False"
+            f" but received {repr(val)} instead."
+        )
+        self._enabled = val
+
+    @property
+    def maxsize(self):
+        """Maximal memory of all stored results in units of MB."""
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, val):
+        assert val is None or (
+            isinstance(val, (int, float)) and not isinstance(val, bool) and val > 0
+        ), (
+            f"The `maxsize` property of {type(self).__name__} must be a strictly positive"
+            f" number but received {repr(val)} instead."
+        )
+        self._maxsize = val
+
+    def info(self):
+        """Return the cache statistics as named tuple `(hits, misses, maxsize, currsize)`,
+        with `maxsize` and `currsize` in units of bytes."""
+        # pylint: disable=import-outside-toplevel
+        from magpylib._src.fields.field_cache import CacheInfo
+        from magpylib._src.fields.field_cache import RESULT_CACHE
+
+        return CacheInfo(
+            RESULT_CACHE.hits,
+            RESULT_CACHE.misses,
+            None if self.maxsize is None else int(self.maxsize * 1e6),
+            RESULT_CACHE.currsize,
+        )
+
+    @staticmethod
+    def clear():
+        """Drop all cached results and reset the cache statistics."""
+        # pylint: disable=import-outside-toplevel
+        from magpylib._src.fields.field_cache import RESULT_CACHE
+
+        RESULT_CACHE.clear()
+
 
 class Display(MagicProperties):
     """
@@ -174,4 +174,13 @@ DEFAULTS = {
             "markers": {"marker": {"size": 2, "color": "grey", "symbol": "x"}},
         },
     },
+    "compute": {
+        "workers": 1,
+        "dtype": "float64",
+        "approximation": "exact",
+        "tolerance": 1e-4,
+        "symmetry": False,
+        "backend": "numpy",
+        "cache": {"enabled": False, "maxsize": 100},
+    },
 }
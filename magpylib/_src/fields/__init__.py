@@ -1,6 +1,27 @@
 """_src.fields"""
 
-__all__ = ["getB", "getH"]
+__all__ = [
+    "getB",
+    "getH",
+    "iter_B",
+    "iter_H",
+    "compile",
+    "tabulate",
+    "FieldMap",
+    "load_field",
+    "getB_batch",
+    "getH_batch",
+    "getGradB",
+    "getGradH",
+]
 
 # create interface to outside of package
 from magpylib._src.fields.field_wrap_BH import getB, getH
+from magpylib._src.fields.field_iter import iter_B, iter_H
+
+# `compile` is the public name of `magpylib.compile`, the builtin is not used here
+from magpylib._src.fields.field_compile import compile  # pylint: disable=redefined-builtin
+from magpylib._src.fields.field_map import tabulate, FieldMap
+from magpylib._src.fields.field_output import load_field
+from magpylib._src.fields.field_batch import getB_batch, getH_batch
+from magpylib._src.fields.field_gradient import getGradB, getGradH
@@ -4,11 +4,19 @@ magnetized Cuboids. Computation details in function docstrings.
 """
 import numpy as np
 
+from magpylib._src.fields.field_BH_numba import get_numba_kernel
 from magpylib._src.input_checks import check_field_input
+from magpylib._src.input_checks import check_field_output
+from magpylib._src.utility import store_field_output
+from magpylib._src.utility import zeros_field_output
 
 
 def magnet_cuboid_field(
-    field: str, observers: np.ndarray, magnetization: np.ndarray, dimension: np.ndarray
+    field: str,
+    observers: np.ndarray,
+    magnetization: np.ndarray,
+    dimension: np.ndarray,
+    out: np.ndarray = None,
 ) -> np.ndarray:
     """Magnetic field of a homogeneously magnetized cuboid.
 
@@ -30,6 +38,11 @@ def magnet_cuboid_field(
     dimension: ndarray, shape (n,3)
         Cuboid side lengths in units of mm.
 
+    out: ndarray, shape (n,3), default=`None`
+        Preallocated float array into which the result is written and which is then
+        returned. Allows repeated calls with similar input shapes to reuse the same
+        output array. Must not share memory with the inputs.
+
     Returns
     -------
     B-field or H-field: ndarray, shape (n,3)
@@ -77,6 +90,15 @@ def magnet_cuboid_field(
     # pylint: disable=too-many-statements
 
     bh = check_field_input(field, "magnet_cuboid_field()")
+    check_field_output(
+        out, "magnet_cuboid_field()", observers, magnetization, dimension
+    )
+
+    kernel = get_numba_kernel("cuboid")
+    if kernel is not None:
+        B = zeros_field_output(out, (len(observers), 3))
+        kernel(observers, magnetization, dimension, bh, B)
+        return B
 
     magx, magy, magz = magnetization.T
     a, b, c = np.abs(dimension.T) / 2
@@ -88,7 +110,7 @@ def magnet_cuboid_field(
     # dealing with special cases -----------------------------------
 
     # allocate B with zeros
-    B_all = np.zeros((len(magx), 3))
+    B_all = zeros_field_output(out, (len(magx), 3))
 
     # SPECIAL CASE 1: mag = (0,0,0)
     mask1 = (magx == 0) * (magy == 0) * (magz == 0)  # 2x faster than np.all()
@@ -241,14 +263,14 @@ def magnet_cuboid_field(
         # combine with special edge/corner cases
         B_all[mask_gen] = B
 
-    B = B_all / (4 * np.pi)
+    B = np.divide(B_all, 4 * np.pi, out=B_all)
 
     # return B or compute and return H -------------
     if bh:
-        return B
+        return store_field_output(B, out)
 
     # if inside magnet subtract magnetization vector
     mask_inside = mx2 & my2 & mz2
     B[mask_inside] -= magnetization[mask_inside]
     H = B * 10 / 4 / np.pi  # mT -> kA/m
-    return H
+    return store_field_output(H, out)
@@ -9,8 +9,10 @@ from scipy.special import ellipk
 
 from magpylib._src.fields.special_cel import cel
 from magpylib._src.input_checks import check_field_input
+from magpylib._src.input_checks import check_field_output
 from magpylib._src.utility import cart_to_cyl_coordinates
 from magpylib._src.utility import cyl_field_to_cart
+from magpylib._src.utility import store_field_output
 
 
 def fieldB_cylinder_axial(z0: np.ndarray, r: np.ndarray, z: np.ndarray) -> list:
@@ -253,6 +255,7 @@ def magnet_cylinder_field(
     observers: np.ndarray,
     magnetization: np.ndarray,
     dimension: np.ndarray,
+    out: np.ndarray = None,
 ) -> np.ndarray:
     """Magnetic field of a homogeneously magnetized cylinder.
 
@@ -281,6 +284,11 @@ def magnet_cylinder_field(
         If `field='B'` return B-field in units of mT, if `field='H'` return H-field
         in units of kA/m.
 
+    out: ndarray, shape (n,3), default=`None`
+        Preallocated float array into which the result is written and which is then
+        returned. Allows repeated calls with similar input shapes to reuse the same
+        output array. Must not share memory with the inputs.
+
     Returns
     -------
     B-field or H-field: ndarray, shape (n,3)
@@ -315,6 +323,9 @@ def magnet_cylinder_field(
     """
 
     bh = check_field_input(field, "magnet_cylinder_field()")
+    check_field_output(
+        out, "magnet_cylinder_field()", observers, magnetization, dimension
+    )
 
     # transform to Cy CS --------------------------------------------
     r, phi, z = cart_to_cyl_coordinates(observers)
@@ -383,11 +394,13 @@ def magnet_cylinder_field(
         if any(mask_tv):  # tv computes H-field
             Bx[mask_tv * mask_inside] += magx[mask_tv * mask_inside]
             By[mask_tv * mask_inside] += magy[mask_tv * mask_inside]
-        return np.concatenate(((Bx,), (By,), (Bz,)), axis=0).T
+        return store_field_output(np.concatenate(((Bx,), (By,), (Bz,)), axis=0).T, out)
 
     if any(mask_ax):  # ax computes B-field
         Bz[mask_tv * mask_inside] -= magz[mask_tv * mask_inside]
-    return np.concatenate(((Bx,), (By,), (Bz,)), axis=0).T * 10 / 4 / np.pi
+    return store_field_output(
+        np.concatenate(((Bx,), (By,), (Bz,)), axis=0).T * 10 / 4 / np.pi, out
+    )
 
 
 # old iterative solution by Furlani
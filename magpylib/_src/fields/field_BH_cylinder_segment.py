@@ -4,12 +4,16 @@
 # pylint: disable=no-name-in-module
 # pylint: disable=too-many-statements
 import numpy as np
-from scipy.special import ellipeinc
-from scipy.special import ellipkinc
 
 from magpylib._src.fields.field_BH_cylinder import magnet_cylinder_field
-from magpylib._src.fields.special_el3 import el3_angle
+from magpylib._src.fields.special_elliptic import el3_angle
+from magpylib._src.fields.special_elliptic import ellipeinc
+from magpylib._src.fields.special_elliptic import ellipkinc
+from magpylib._src.fields.special_elliptic import elliptic_integrals
 from magpylib._src.input_checks import check_field_input
+from magpylib._src.input_checks import check_field_output
+from magpylib._src.utility import store_field_output
+from magpylib._src.utility import zeros_field_output
 
 
 def arctan_k_tan_2(k, phi):
@@ -35,11 +39,12 @@ def arctan_k_tan_2(k, phi):
 
 def close(arg1: np.ndarray, arg2: np.ndarray) -> np.ndarray:
     """
-    determine if arg1 and arg2 lie close to each other
+    determine if arg1 and arg2 lie close to each other, like
+    `np.isclose(arg1, arg2, rtol=1e-12, atol=1e-12)` for finite inputs
     input: ndarray, shape (n,) or numpy-interpretable scalar
     output: ndarray, dtype=bool
     """
-    return np.isclose(arg1, arg2, rtol=1e-12, atol=1e-12)
+    return np.abs(arg1 - arg2) <= 1e-12 + 1e-12 * np.abs(arg2)
 
 
 def determine_cases(r, phi, z, r1, phi1, z1):
@@ -57,37 +62,26 @@ def determine_cases(r, phi, z, r1, phi1, z1):
       2nd digit: 1:phi-phi1= 2n*pi,  2:phi-phi1=(2n+1)*pi,  3:general
       3rd digit: 1:r=r1=0,  2:r=0,  3:r1=0,  4:r=r1>0,  5:general
     """
-    n = len(r)  # input length
-
-    # allocate result
-    result = np.ones((3, n))
-
     # identify z-case
-    mask_z = close(z, z1)
-    result[0] = 200
-    result[0, mask_z] = 100
+    result = np.where(close(z, z1), 100, 200)
 
     # identify phi-case
     mod_2pi = np.abs(phi - phi1) % (2 * np.pi)
-    mask_phi1 = np.logical_or(close(mod_2pi, 0), close(mod_2pi, 2 * np.pi))
+    mask_phi1 = close(mod_2pi, 0) | close(mod_2pi, 2 * np.pi)
     mod_pi = np.abs(phi - phi1) % np.pi
-    mask_phi2 = np.logical_or(close(mod_pi, 0), close(mod_pi, np.pi))
-    result[1] = 30
-    result[1, mask_phi2] = 20
-    result[1, mask_phi1] = 10
+    mask_phi2 = close(mod_pi, 0) | close(mod_pi, np.pi)
+    result += np.where(mask_phi1, 10, np.where(mask_phi2, 20, 30))
 
     # identify r-case
     mask_r2 = close(r, 0)
     mask_r3 = close(r1, 0)
-    mask_r4 = close(r, r1)
-    mask_r1 = mask_r2 * mask_r3
-    result[2] = 5
-    result[2, mask_r4] = 4
-    result[2, mask_r3] = 3
-    result[2, mask_r2] = 2
-    result[2, mask_r1] = 1
+    r_case = np.where(close(r, r1), 4, 5)
+    r_case[mask_r3] = 3
+    r_case[mask_r2] = 2
+    r_case[mask_r2 & mask_r3] = 1
+    result += r_case
 
-    return np.array(np.sum(result, axis=0), dtype=int)
+    return result
 
 
 # Implementation of all non-zero field components in every special case
@@ -2131,6 +2125,104 @@ def case235(r, r_i, r_bar_i, phi_bar_j, phi_bar_M, phi_bar_Mj, theta_M, z_bar_k)
     return results
 
 
+# list of all possible cases - excluding the nan-cases 111, 114, 121, 131
+CASE_IDS = np.array(
+    [
+        112,
+        113,
+        115,
+        122,
+        123,
+        124,
+        125,
+        132,
+        133,
+        134,
+        135,
+        211,
+        212,
+        213,
+        214,
+        215,
+        221,
+        222,
+        223,
+        224,
+        225,
+        231,
+        232,
+        233,
+        234,
+        235,
+    ]
+)
+
+# corresponding case evaluation functions
+CASE_FUNCS = [
+    case112,
+    case113,
+    case115,
+    case122,
+    case123,
+    case124,
+    case125,
+    case132,
+    case133,
+    case134,
+    case135,
+    case211,
+    case212,
+    case213,
+    case214,
+    case215,
+    case221,
+    case222,
+    case223,
+    case224,
+    case225,
+    case231,
+    case232,
+    case233,
+    case234,
+    case235,
+]
+
+# required case function arguments, indices of the argument list of
+# magnet_cylinder_segment_core
+CASE_ARGS = [
+    (1, 4, 6),
+    (0, 4, 6),
+    (0, 1, 2, 3, 4, 6),
+    (1, 4, 6),
+    (0, 4, 6),
+    (0, 4, 6),
+    (0, 1, 2, 3, 4, 6),
+    (0, 1, 3, 5, 6),
+    (0, 3, 5, 6),
+    (0, 3, 4, 5, 6),
+    (0, 1, 2, 3, 4, 5, 6),
+    (8, 4, 6, 7),
+    (1, 8, 4, 6, 7),
+    (0, 3, 4, 6, 7),
+    (0, 8, 3, 4, 6, 7),
+    (0, 1, 2, 3, 4, 6, 7),
+    (8, 4, 6, 7),
+    (1, 8, 4, 6, 7),
+    (0, 3, 4, 6, 7),
+    (0, 3, 4, 6, 7),
+    (0, 1, 2, 3, 4, 6, 7),
+    (8, 3, 5, 6, 7),
+    (1, 8, 3, 4, 5, 6, 7),
+    (0, 3, 5, 6, 7),
+    (0, 3, 4, 5, 6, 7),
+    (0, 1, 2, 3, 4, 5, 6, 7),
+]
+
+# sort index of each case number, 0 for the nan-cases
+CASE_INDEX = np.zeros(CASE_IDS.max() + 1, dtype=np.intp)
+CASE_INDEX[CASE_IDS] = np.arange(1, len(CASE_IDS) + 1)
+
+
 def magnet_cylinder_segment_core(
     mag: np.ndarray, dim: np.ndarray, obs_pos: np.ndarray
 ) -> np.ndarray:
@@ -2164,75 +2256,9 @@ def magnet_cylinder_segment_core(
     z_k = np.ravel(np.tile(dim[:, 4:6], 4))
     _, phi_M, theta_M = np.repeat(mag, 8, axis=0).T
 
-    # initialize results array with nan
-    result = np.empty((len(r), 3, 3))
-    result[:] = np.nan
-
     # cases to evaluate
     cases = determine_cases(r, phi, z, r_i, phi_j, z_k)
 
-    # list of all possible cases - excluding the nan-cases 111, 114, 121, 131
-    case_id = np.array(
-        [
-            112,
-            113,
-            115,
-            122,
-            123,
-            124,
-            125,
-            132,
-            133,
-            134,
-            135,
-            211,
-            212,
-            213,
-            214,
-            215,
-            221,
-            222,
-            223,
-            224,
-            225,
-            231,
-            232,
-            233,
-            234,
-            235,
-        ]
-    )
-
-    # corresponding case evaluation functions
-    case_fkt = [
-        case112,
-        case113,
-        case115,
-        case122,
-        case123,
-        case124,
-        case125,
-        case132,
-        case133,
-        case134,
-        case135,
-        case211,
-        case212,
-        case213,
-        case214,
-        case215,
-        case221,
-        case222,
-        case223,
-        case224,
-        case225,
-        case231,
-        case232,
-        case233,
-        case234,
-        case235,
-    ]
-
     # required case function arguments
     r_bar_i = r - r_i
     phi_bar_j = phi - phi_j
@@ -2251,40 +2277,30 @@ def magnet_cylinder_segment_core(
         z_bar_k,
         phi_j,
     ]
-    case_args = [
-        (1, 4, 6),
-        (0, 4, 6),
-        (0, 1, 2, 3, 4, 6),
-        (1, 4, 6),
-        (0, 4, 6),
-        (0, 4, 6),
-        (0, 1, 2, 3, 4, 6),
-        (0, 1, 3, 5, 6),
-        (0, 3, 5, 6),
-        (0, 3, 4, 5, 6),
-        (0, 1, 2, 3, 4, 5, 6),
-        (8, 4, 6, 7),
-        (1, 8, 4, 6, 7),
-        (0, 3, 4, 6, 7),
-        (0, 8, 3, 4, 6, 7),
-        (0, 1, 2, 3, 4, 6, 7),
-        (8, 4, 6, 7),
-        (1, 8, 4, 6, 7),
-        (0, 3, 4, 6, 7),
-        (0, 3, 4, 6, 7),
-        (0, 1, 2, 3, 4, 6, 7),
-        (8, 3, 5, 6, 7),
-        (1, 8, 3, 4, 5, 6, 7),
-        (0, 3, 5, 6, 7),
-        (0, 3, 4, 5, 6, 7),
-        (0, 1, 2, 3, 4, 5, 6, 7),
-    ]
 
-    # calling case functions with respective masked arguments
-    for cid, cfkt, cargs in zip(case_id, case_fkt, case_args):
-        mask = cases == cid
-        if any(mask):
-            result[mask] = cfkt(*[allargs[aid][mask] for aid in cargs])
+    # group the samples by case once (nan-cases first), evaluate each case on
+    # contiguous slices of the sorted arguments and scatter the results back once
+    case_inds = CASE_INDEX[cases]
+    counts = np.bincount(case_inds, minlength=len(CASE_IDS) + 1)
+    bounds = np.cumsum(counts)
+    order = None
+    if counts.max() < len(case_inds):  # more than one case
+        order = np.argsort(case_inds, kind="stable")
+        needed = {aid for i in np.flatnonzero(counts[1:]) for aid in CASE_ARGS[i]}
+        allargs = [arg[order] if i in needed else arg for i, arg in enumerate(allargs)]
+
+    # the case functions share their elliptic integrals, each distinct parameter set
+    # is computed only once
+    result = np.empty((len(r), 3, 3))
+    result[: bounds[0]] = np.nan
+    with elliptic_integrals():
+        for i, (cfkt, cargs) in enumerate(zip(CASE_FUNCS, CASE_ARGS)):
+            start, stop = bounds[i], bounds[i + 1]
+            if stop > start:
+                result[start:stop] = cfkt(*[allargs[aid][start:stop] for aid in cargs])
+    if order is not None:
+        result_sorted, result = result, np.empty_like(result)
+        result[order] = result_sorted
 
     # sum up contributions from different boundary cases (ax1) and different face types (ax3)
     result = np.reshape(result, (-1, 8, 3, 3))
@@ -2351,6 +2367,7 @@ def magnet_cylinder_segment_field(
     observers: np.ndarray,
     magnetization: np.ndarray,
     dimension: np.ndarray,
+    out: np.ndarray = None,
 ) -> np.ndarray:
     """Magnetic field of a homogeneously magnetized cylinder segment.
 
@@ -2373,6 +2390,11 @@ def magnet_cylinder_segment_field(
         Cylinder segment dimensions (r1,r2,h,phi1,phi2) with inner radius r1, outer radius r2,
         height h in units of mm and the two segment angles phi1 and phi2 in units of deg.
 
+    out: ndarray, shape (n,3), default=`None`
+        Preallocated float array into which the result is written and which is then
+        returned. Allows repeated calls with similar input shapes to reuse the same
+        output array. Must not share memory with the inputs.
+
     Returns
     -------
     B-field or H-field: ndarray, shape (n,3)
@@ -2399,8 +2421,11 @@ def magnet_cylinder_segment_field(
     Slanovc: Journal of Magnetism and Magnetic Materials, 2022 (in review)
     """
     bh = check_field_input(field, "magnet_cylinder_segment_field()")
+    check_field_output(
+        out, "magnet_cylinder_segment_field()", observers, magnetization, dimension
+    )
 
-    BHfinal = np.zeros((len(magnetization), 3))
+    BHfinal = zeros_field_output(out, (len(magnetization), 3))
 
     r1, r2, h, phi1, phi2 = dimension.T
     r1 = abs(r1)
@@ -2449,7 +2474,7 @@ def magnet_cylinder_segment_field(
 
     # return 0 when all points are on surface --------------------------------
     if np.all(mask_on_surface):
-        return BHfinal
+        return store_field_output(BHfinal, out)
 
     # redefine input if there are some surface-points -------------------------
     magg = magnetization[mask_not_on_surf]
@@ -2473,10 +2498,10 @@ def magnet_cylinder_segment_field(
     # return B or H --------------------------------------------------------
     if not bh:
         BHfinal[mask_not_on_surf] = H
-        return BHfinal
+        return store_field_output(BHfinal, out)
 
     B = H / (10 / 4 / np.pi)  # kA/m -> mT
     BHfinal[mask_not_on_surf] = B
     maskX = mask_inside * mask_not_on_surf
     BHfinal[maskX] += magnetization[maskX]
-    return BHfinal
+    return store_field_output(BHfinal, out)
@@ -4,6 +4,8 @@ Dipole implementation
 import numpy as np
 
 from magpylib._src.input_checks import check_field_input
+from magpylib._src.input_checks import check_field_output
+from magpylib._src.utility import store_field_output
 
 
 # CORE
@@ -11,6 +13,7 @@ def dipole_field(
     field: str,
     observers: np.ndarray,
     moment: np.ndarray,
+    out: np.ndarray = None,
 ) -> np.ndarray:
     """Magnetic field of a dipole moment.
 
@@ -28,6 +31,11 @@ def dipole_field(
     moment: ndarray, shape (n,3)
         Dipole moment vector in units of mT*mm^3.
 
+    out: ndarray, shape (n,3), default=`None`
+        Preallocated float array into which the result is written and which is then
+        returned. Allows repeated calls with similar input shapes to reuse the same
+        output array. Must not share memory with the inputs.
+
     Returns
     -------
     B-field or H-field: ndarray, shape (n,3)
@@ -51,6 +59,7 @@ def dipole_field(
     The field is similar to the outside-field of a spherical magnet with Volume = 1 mm^3.
     """
     bh = check_field_input(field, "dipole_field()")
+    check_field_output(out, "dipole_field()", observers, moment)
 
     x, y, z = observers.T
     r = np.sqrt(x**2 + y**2 + z**2)  # faster than np.linalg.norm
@@ -75,7 +84,7 @@ def dipole_field(
 
     # return B or H
     if bh:
-        return B
+        return store_field_output(B, out)
 
     H = B * 10 / 4 / np.pi
-    return H
+    return store_field_output(H, out)
@@ -0,0 +1,489 @@
+"""
+Analytical expressions for the gradient (Jacobian) of the magnetic field of sources
+with closed-form field expressions. Computation details in function docstrings.
+
+All functions return the gradient tensor G of shape (n,3,3) with
+G[:, i, j] = dB_i/dx_j in units of mT/mm (field='B') or dH_i/dx_j in units of
+kA/m/mm (field='H') in the local source coordinates. For magnets the magnetization
+is homogeneous, so that the B- and H-field gradients only differ by the factor
+10/4pi (also inside the magnets).
+"""
+import itertools
+
+import numpy as np
+
+from magpylib._src.fields.special_cel import cel
+from magpylib._src.input_checks import check_field_input
+
+# observers with a distance from the loop axis of less than LOOP_AXIS_RTOL times
+# their distance from the loop are computed from the on-axis series expansion
+LOOP_AXIS_RTOL = 1e-3
+
+
+def scale_gradient(bh: bool, grad: np.ndarray) -> np.ndarray:
+    """return the B-field gradient `grad` as B-gradient (bh=True) or H-gradient"""
+    if bh:
+        return grad
+    return grad * 10 / 4 / np.pi
+
+
+def dipole_gradient(observers: np.ndarray, moment: np.ndarray) -> np.ndarray:
+    """B-field gradient of dipole moments in the origin, shape (n,3,3). Observers in
+    the origin return nan."""
+    r2 = np.einsum("ni,ni->n", observers, observers)
+    mr = np.einsum("ni,ni->n", moment, observers)
+    eye = np.eye(3)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        grad = (
+            np.einsum("ni,nj->nij", moment, observers)
+            + np.einsum("ni,nj->nij", observers, moment)
+            + mr[:, np.newaxis, np.newaxis] * eye
+            - 5
+            * (mr / r2)[:, np.newaxis, np.newaxis]
+            * np.einsum("ni,nj->nij", observers, observers)
+        ) * (3 / 4 / np.pi / r2**2.5)[:, np.newaxis, np.newaxis]
+    grad[r2 == 0] = np.nan
+    return grad
+
+
+def dipole_field_gradient(
+    field: str,
+    observers: np.ndarray,
+    moment: np.ndarray,
+) -> np.ndarray:
+    """Gradient of the magnetic field of a dipole moment in the origin.
+
+    Parameters
+    ----------
+    field: str, default=`'B'`
+        If `field='B'` return the B-field gradient in units of mT/mm, if `field='H'`
+        return the H-field gradient in units of kA/m/mm.
+
+    observers: ndarray, shape (n,3)
+        Observer positions (x,y,z) in Cartesian coordinates in units of mm.
+
+    moment: ndarray, shape (n,3)
+        Dipole moment vector in units of mT*mm^3.
+
+    Returns
+    -------
+    B-field or H-field gradient: ndarray, shape (n,3,3)
+        Gradient tensor G[:, i, j] = dB_i/dx_j (dH_i/dx_j).
+
+    Notes
+    -----
+    dB_i/dx_j = 3/(4 pi r^5) (m_i r_j + m_j r_i + (m.r) delta_ij - 5 (m.r) r_i r_j/r^2).
+    Observers in the origin return nan.
+    """
+    bh = check_field_input(field, "dipole_field_gradient()")
+    return scale_gradient(bh, dipole_gradient(observers, moment))
+
+
+def magnet_sphere_field_gradient(
+    field: str,
+    observers: np.ndarray,
+    magnetization: np.ndarray,
+    diameter: np.ndarray,
+) -> np.ndarray:
+    """Gradient of the magnetic field of a homogeneously magnetized sphere in the
+    origin.
+
+    Parameters
+    ----------
+    field: str, default=`'B'`
+        If `field='B'` return the B-field gradient in units of mT/mm, if `field='H'`
+        return the H-field gradient in units of kA/m/mm.
+
+    observers: ndarray, shape (n,3)
+        Observer positions (x,y,z) in Cartesian coordinates in units of mm.
+
+    magnetization: ndarray, shape (n,3)
+        Homogeneous magnetization vector in units of mT.
+
+    diameter: ndarray, shape (n,)
+        Sphere diameter in units of mm.
+
+    Returns
+    -------
+    B-field or H-field gradient: ndarray, shape (n,3,3)
+        Gradient tensor G[:, i, j] = dB_i/dx_j (dH_i/dx_j).
+
+    Notes
+    -----
+    The field is the field of a dipole with moment magnetization*volume outside and
+    homogeneous inside the sphere, where the gradient vanishes.
+    """
+    bh = check_field_input(field, "magnet_sphere_field_gradient()")
+
+    r0 = np.abs(diameter) / 2
+    r = np.linalg.norm(observers, axis=1)
+    grad = np.zeros((len(observers), 3, 3))
+    mask_out = r >= r0
+    if np.any(mask_out):
+        moment = magnetization[mask_out] * (4 / 3 * np.pi * r0[mask_out] ** 3)[:, None]
+        grad[mask_out] = dipole_gradient(observers[mask_out], moment)
+        grad[mask_out & (r0 == 0)] = 0
+    return scale_gradient(bh, grad)
+
+
+def magnet_cuboid_field_gradient(
+    field: str,
+    observers: np.ndarray,
+    magnetization: np.ndarray,
+    dimension: np.ndarray,
+) -> np.ndarray:
+    """Gradient of the magnetic field of a homogeneously magnetized cuboid.
+
+    The cuboid sides are parallel to the coordinate axes and the center lies in the
+    origin.
+
+    Parameters
+    ----------
+    field: str, default=`'B'`
+        If `field='B'` return the B-field gradient in units of mT/mm, if `field='H'`
+        return the H-field gradient in units of kA/m/mm.
+
+    observers: ndarray, shape (n,3)
+        Observer positions (x,y,z) in Cartesian coordinates in units of mm.
+
+    magnetization: ndarray, shape (n,3)
+        Homogeneous magnetization vector in units of mT.
+
+    dimension: ndarray, shape (n,3)
+        Cuboid side lengths in units of mm.
+
+    Returns
+    -------
+    B-field or H-field gradient: ndarray, shape (n,3,3)
+        Gradient tensor G[:, i, j] = dB_i/dx_j (dH_i/dx_j).
+
+    Notes
+    -----
+    With the Newtonian potential N = int 1/|x-x'| dV' of the cuboid, the B-field is
+    grad(J.grad(N))/4pi plus J inside, so that dB_i/dx_k = J_j d_ijk N/4pi. N is
+    the signed sum of an antiderivative F over the eight corners, with d_xyz F = 1/r
+    and d_aac F = u_a/(r(r+u_b)) (b the missing index), where r+u_b is evaluated in
+    the form without cancellation. Observers on edges and corners return zero, like
+    the field.
+    """
+    bh = check_field_input(field, "magnet_cuboid_field_gradient()")
+
+    d = np.abs(dimension) / 2
+    grad = np.zeros((len(observers), 3, 3))
+
+    # special cases: zero magnetization, zero dimension, observer on edge/corner
+    on_surf = np.abs(np.abs(observers) - d) < 1e-15 * d
+    within = (np.abs(observers) - d) < 1e-15 * d
+    on_edge = np.zeros(len(observers), dtype=bool)
+    for i, j, k in ((0, 1, 2), (1, 2, 0), (2, 0, 1)):
+        on_edge |= on_surf[:, i] & on_surf[:, j] & within[:, k]
+    mask_gen = np.any(magnetization != 0, axis=1) & np.all(d > 0, axis=1) & ~on_edge
+    if not np.any(mask_gen):
+        return grad
+
+    x, J, d = observers[mask_gen].T, magnetization[mask_gen].T, d[mask_gen].T
+    corners = np.array(list(itertools.product((-1, 1), repeat=3)))
+    signs = np.prod(-corners, axis=1)[:, np.newaxis]
+    sigma = np.where(x >= 0, 1.0, -1.0)[:, np.newaxis]
+
+    # all corners at once, component first, shape (3,8,n)
+    u = x[:, np.newaxis] - corners.T[..., np.newaxis] * d[:, np.newaxis]
+    u2 = u**2
+    r = np.sqrt(u2[0] + u2[1] + u2[2])
+    su = sigma * u
+    rho2 = u2[[1, 2, 0]] + u2[[2, 0, 1]]  # u_a^2 + u_c^2 of b
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # L[b] = sigma_b/(r (r + sigma_b u_b)), d_aac F = u_a L_b
+        w = np.where(su >= 0, r + su, rho2 / (r - su))
+        L = sigma / (r * w)
+        S_xyz = np.sum(signs / r, axis=0)
+    # signed corner sums M[a,b] of u_a L_b, i.e. of d_aac F with b the missing index
+    M = np.einsum("acn,bcn->abn", signs * u, L)
+
+    # dB_i/dx_k = J_j S_ijk/4pi with the symmetric corner sums S_ijk of d_ijk F
+    G = np.empty((3, 3, len(x[0])))
+    for i, j, k in ((0, 1, 2), (1, 2, 0), (2, 0, 1)):
+        G[i, i] = -(M[j, k] + M[k, j]) * J[i] + M[i, k] * J[j] + M[i, j] * J[k]
+        G[i, j] = G[j, i] = M[i, k] * J[i] + M[j, k] * J[j] + S_xyz * J[k]
+    grad[mask_gen] = G.transpose(2, 0, 1) / 4 / np.pi
+    return scale_gradient(bh, grad)
+
+
+def current_line_field_gradient(
+    field: str,
+    observers: np.ndarray,
+    current: np.ndarray,
+    segment_start: np.ndarray,
+    segment_end: np.ndarray,
+) -> np.ndarray:
+    """Gradient of the magnetic field of line current segments.
+
+    Parameters
+    ----------
+    field: str, default=`'B'`
+        If `field='B'` return the B-field gradient in units of mT/mm, if `field='H'`
+        return the H-field gradient in units of kA/m/mm.
+
+    observers: ndarray, shape (n,3)
+        Observer positions (x,y,z) in Cartesian coordinates in units of mm.
+
+    current: ndarray, shape (n,)
+        Electrical current in units of A.
+
+    segment_start: ndarray, shape (n,3)
+        Line start positions (x,y,z) in Cartesian coordinates in units of mm.
+
+    segment_end: ndarray, shape (n,3)
+        Line end positions (x,y,z) in Cartesian coordinates in units of mm.
+
+    Returns
+    -------
+    B-field or H-field gradient: ndarray, shape (n,3,3)
+        Gradient tensor G[:, i, j] = dB_i/dx_j (dH_i/dx_j).
+
+    Notes
+    -----
+    With r1 = x - start, r2 = x - end, u = r1 x r2 and P = |r1||r2| + r1.r2, the field
+    is B = I/10 g u with g = (|r1|+|r2|)/(|r1||r2|P). The gradient follows from
+    du_i/dx_k = eps_ijk d_j (d = end - start) and the gradient of ln(g). Zero-length
+    and discontinuous segments and observers on the line return zero, like the field.
+    """
+    bh = check_field_input(field, "current_line_field_gradient()")
+
+    grad = np.zeros((len(observers), 3, 3))
+    dvec = segment_end - segment_start
+    len2 = np.sum(dvec**2, axis=1)
+    mask = np.isfinite(len2) & (len2 > 0)
+    if not np.any(mask):
+        return scale_gradient(bh, grad)
+    r1 = observers[mask] - segment_start[mask]
+    r2 = observers[mask] - segment_end[mask]
+    dvec, len2, cur = dvec[mask], len2[mask], current[mask]
+
+    u = np.cross(r1, r2)
+    u2 = np.sum(u**2, axis=1)
+    # observers on the line, distance |u|/|d| relative to |d|
+    on_line = u2 < (np.finfo(float).resolution * len2) ** 2
+    mask[mask] = ~on_line
+    r1, r2, dvec, u, u2, cur = (v[~on_line] for v in (r1, r2, dvec, u, u2, cur))
+
+    R1 = np.linalg.norm(r1, axis=1)
+    R2 = np.linalg.norm(r2, axis=1)
+    R12 = R1 * R2
+    dot = np.sum(r1 * r2, axis=1)
+    # P = R1 R2 + r1.r2 without cancellation for observers close to the segment
+    P = np.where(dot >= 0, R12 + dot, u2 / (R12 - dot))
+    Rs = R1 + R2
+    g = Rs / (R12 * P)
+
+    s = r1 / R1[:, None] + r2 / R2[:, None]
+    dlng = (
+        s * (1 / Rs - Rs / P)[:, None]
+        - r1 / (R1**2)[:, None]
+        - r2 / (R2**2)[:, None]
+    )
+    # du_i/dx_k = eps_ijk d_j
+    du = np.zeros((len(u), 3, 3))
+    dx, dy, dz = dvec.T
+    du[:, 0, 1], du[:, 0, 2] = -dz, dy
+    du[:, 1, 0], du[:, 1, 2] = dz, -dx
+    du[:, 2, 0], du[:, 2, 1] = -dy, dx
+    grad[mask] = (du + np.einsum("ni,nk->nik", u, dlng)) * (cur * g / 10)[:, None, None]
+    return scale_gradient(bh, grad)
+
+
+def current_vertices_field_gradient(
+    field: str,
+    observers: np.ndarray,
+    current: np.ndarray,
+    vertices: np.ndarray = None,
+    segment_start=None,
+    segment_end=None,
+) -> np.ndarray:
+    """Gradient of the magnetic field of n (mi,3) shaped vertex-sets, computed with
+    `current_line_field_gradient` and summed for each vertex-set (see
+    `current_vertices_field`).
+
+    Returns
+    -------
+    B-field or H-field gradient: ndarray, shape (n,3,3)
+    """
+    if vertices is None:
+        return current_line_field_gradient(
+            field, observers, current, segment_start, segment_end
+        )
+    nvs = np.array([v.shape[0] for v in vertices])
+    grad = current_line_field_gradient(
+        field,
+        np.repeat(observers, nvs - 1, axis=0),
+        np.repeat(current, nvs - 1, axis=0),
+        np.concatenate([vert[:-1] for vert in vertices]),
+        np.concatenate([vert[1:] for vert in vertices]),
+    )
+    return np.add.reduceat(grad, np.cumsum(nvs - 1) - (nvs - 1), axis=0)
+
+
+def current_loop_field_gradient(
+    field: str,
+    observers: np.ndarray,
+    current: np.ndarray,
+    diameter: np.ndarray,
+) -> np.ndarray:
+    """Gradient of the magnetic field of a circular current loop in the xy-plane with
+    center in the origin.
+
+    Parameters
+    ----------
+    field: str, default=`'B'`
+        If `field='B'` return the B-field gradient in units of mT/mm, if `field='H'`
+        return the H-field gradient in units of kA/m/mm.
+
+    observers: ndarray, shape (n,3)
+        Observer positions (x,y,z) in Cartesian coordinates in units of mm.
+
+    current: ndarray, shape (n,)
+        Electrical current in units of A.
+
+    diameter: ndarray, shape (n,)
+        Diameter of loop in units of mm.
+
+    Returns
+    -------
+    B-field or H-field gradient: ndarray, shape (n,3,3)
+        Gradient tensor G[:, i, j] = dB_i/dx_j (dH_i/dx_j).
+
+    Notes
+    -----
+    In coordinates normalized by the loop radius, with P = (1+r)^2+z^2,
+    Q = (1-r)^2+z^2 and m = 4r/P, the field is B_r = C z F1/sqrt(P) and
+    B_z = C F2/sqrt(P), where F1 = 2E/Q - 4D/P, F2 = mD + 2(1-r)E/Q and D = (K-E)/m.
+    The complete elliptic integrals K, E and D are computed with `cel` and their
+    derivatives with respect to m are expressed by K, E and D. Close to the axis the
+    on-axis series expansion of the field is used. Loops with zero diameter and
+    observers on the loop return zero, like the field.
+    """
+    # pylint: disable=too-many-locals
+    # pylint: disable=too-many-statements
+    bh = check_field_input(field, "current_loop_field_gradient()")
+
+    a = np.abs(diameter) / 2
+    grad = np.zeros((len(observers), 3, 3))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x, y, z = observers.T / a
+        r = np.hypot(x, y)
+    mask = (a != 0) & ~((np.abs(r - 1) < 1e-15) & (z == 0))
+    if not np.any(mask):
+        return grad
+    x, y, z, r, a, cur = (v[mask] for v in (x, y, z, r, a, current))
+    C = 0.2 * cur / a
+
+    P = (1 + r) ** 2 + z**2
+    Q = (1 - r) ** 2 + z**2
+    dBr_dr, Br_r, dBz_dr, dBz_dz = np.empty((4, len(r)))
+
+    # on-axis series with the on-axis field b(z) = pi C/(1+z^2)^(3/2) and its
+    # derivatives b1...b5: B_z = b - r^2 b2/4 + r^4 b4/64 and
+    # B_r = -r b1/2 + r^3 b3/16 - r^5 b5/384
+    axis = r < LOOP_AXIS_RTOL * np.sqrt(P)
+    if np.any(axis):
+        za, ra2, Ca = z[axis], r[axis] ** 2, np.pi * C[axis]
+        za2 = za**2
+        w = 1 + za2
+        b1 = -3 * Ca * za / w**2.5
+        b2 = 3 * Ca * (4 * za2 - 1) / w**3.5
+        b3 = -15 * Ca * za * (4 * za2 - 3) / w**4.5
+        b4 = 45 * Ca * (8 * za2**2 - 12 * za2 + 1) / w**5.5
+        b5 = -315 * Ca * za * (8 * za2**2 - 20 * za2 + 5) / w**6.5
+        dBr_dr[axis] = -b1 / 2 + 3 * ra2 * b3 / 16 - 5 * ra2**2 * b5 / 384
+        Br_r[axis] = -b1 / 2 + ra2 * b3 / 16 - ra2**2 * b5 / 384
+        dBz_dr[axis] = r[axis] * (-b2 / 2 + ra2 * b4 / 16)
+        dBz_dz[axis] = b1 - ra2 * b3 / 4 + ra2**2 * b5 / 64
+
+    gen = ~axis
+    if np.any(gen):
+        r, z, P, Q, C = (v[gen] for v in (r, z, P, Q, C))
+        m = 4 * r / P
+        kc2 = Q / P
+        kc = np.sqrt(kc2)
+        one = np.ones_like(kc)
+        K = cel(kc, one, one, one)
+        E = cel(kc, one, one, kc2)
+        D = cel(kc, one, 0 * one, one)
+        # derivatives with respect to m
+        E_m = -D / 2
+        D_m = (K - (1 + kc2) * D) / (2 * m * kc2)
+        # derivatives of m, P, Q with respect to r and z
+        m_r = 4 / P - 8 * r * (1 + r) / P**2
+        m_z = -8 * r * z / P**2
+        P_r, Q_r, PQ_z = 2 * (1 + r), -2 * (1 - r), 2 * z
+
+        F1 = 2 * E / Q - 4 * D / P
+        F2 = m * D + 2 * (1 - r) * E / Q
+        F1_r = (
+            2 * E_m * m_r / Q
+            - 2 * E * Q_r / Q**2
+            - 4 * D_m * m_r / P
+            + 4 * D * P_r / P**2
+        )
+        F2_r = (
+            m_r * D
+            + m * D_m * m_r
+            + (2 * (1 - r) * E_m * m_r - 2 * E) / Q
+            - 2 * (1 - r) * E * Q_r / Q**2
+        )
+        F2_z = (
+            m_z * D
+            + m * D_m * m_z
+            + 2 * (1 - r) * E_m * m_z / Q
+            - 2 * (1 - r) * E * PQ_z / Q**2
+        )
+        s = np.sqrt(P)
+        dBr_dr[gen] = C * z * (F1_r - F1 * P_r / (2 * P)) / s
+        Br_r[gen] = C * z * F1 / (s * r)
+        dBz_dr[gen] = C * (F2_r - F2 * P_r / (2 * P)) / s
+        dBz_dz[gen] = C * (F2_z - F2 * PQ_z / (2 * P)) / s
+
+    # cylindrical -> Cartesian, dB_r/dz = dB_z/dr (curl-free)
+    phi = np.arctan2(y, x)
+    co, si = np.cos(phi), np.sin(phi)
+    g = np.empty((len(co), 3, 3))
+    g[:, 0, 0] = dBr_dr * co**2 + Br_r * si**2
+    g[:, 1, 1] = dBr_dr * si**2 + Br_r * co**2
+    g[:, 0, 1] = g[:, 1, 0] = (dBr_dr - Br_r) * si * co
+    g[:, 0, 2] = g[:, 2, 0] = dBz_dr * co
+    g[:, 1, 2] = g[:, 2, 1] = dBz_dr * si
+    g[:, 2, 2] = dBz_dz
+    grad[mask] = g / a[:, None, None]
+    return scale_gradient(bh, grad)
+
+
+def field_gradient_stencil(
+    field_func,
+    field: str,
+    observers: np.ndarray,
+    **kwargs,
+) -> np.ndarray:
+    """
+    Gradient of the field of `field_func` from central differences, for sources
+    without analytical gradient expression. The six shifted observer positions of all
+    instances are evaluated in a single call of `field_func`. The step is 1e-5 times
+    the observer distance from the source origin (at least 1e-8 mm), so that the
+    result is approximate, in particular close to the source surfaces.
+
+    Returns
+    -------
+    B-field or H-field gradient: ndarray, shape (n,3,3)
+    """
+    n = len(observers)
+    h = 1e-5 * np.maximum(np.linalg.norm(observers, axis=1), 1e-3)
+    shifts = np.concatenate([np.eye(3), -np.eye(3)])  # (6,3)
+    obs = observers + shifts[:, None, :] * h[None, :, None]  # (6,n,3)
+    kw = {
+        key: np.concatenate([val] * 6) if isinstance(val, np.ndarray) else val
+        for key, val in kwargs.items()
+    }
+    BH = field_func(field, obs.reshape(-1, 3), **kw)
+    if BH is None:
+        return None
+    BH = BH.reshape(6, n, 3)
+    return ((BH[:3] - BH[3:]) / (2 * h)[None, :, None]).transpose(1, 2, 0)
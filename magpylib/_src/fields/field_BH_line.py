@@ -4,7 +4,11 @@ Implementations of analytical expressions of line current segments
 import numpy as np
 from numpy.linalg import norm
 
+from magpylib._src.fields.field_BH_numba import get_numba_kernel
 from magpylib._src.input_checks import check_field_input
+from magpylib._src.input_checks import check_field_output
+from magpylib._src.utility import store_field_output
+from magpylib._src.utility import zeros_field_output
 
 
 def current_vertices_field(
@@ -65,6 +69,7 @@ def current_line_field(
     current: np.ndarray,
     segment_start: np.ndarray,
     segment_end: np.ndarray,
+    out: np.ndarray = None,
 ) -> np.ndarray:
     """Magnetic field of line current segments.
 
@@ -89,6 +94,11 @@ def current_line_field(
     end: ndarray, shape (n,3)
         Line end positions (x,y,z) in Cartesian coordinates in units of mm.
 
+    out: ndarray, shape (n,3), default=`None`
+        Preallocated float array into which the result is written and which is then
+        returned. Allows repeated calls with similar input shapes to reuse the same
+        output array. Must not share memory with the inputs.
+
     Returns
     -------
     B-field or H-field: ndarray, shape (n,3)
@@ -117,10 +127,22 @@ def current_line_field(
     """
     # pylint: disable=too-many-statements
     bh = check_field_input(field, "current_line_field()")
+    check_field_output(
+        out, "current_line_field()", observers, current, segment_start, segment_end
+    )
 
     # allocate for special case treatment
     ntot = len(current)
-    field_all = np.zeros((ntot, 3))
+    dtype = np.result_type(observers, segment_start, segment_end, current, 1.0)
+    field_all = zeros_field_output(out, (ntot, 3), dtype=dtype)
+
+    kernel = get_numba_kernel("line")
+    if kernel is not None:
+        resolution = np.finfo(dtype).resolution
+        kernel(
+            observers, current, segment_start, segment_end, bh, resolution, field_all
+        )
+        return field_all
 
     # Check for zero-length segments (or discontinuous)
     mask_nan_start = np.isnan(segment_start).all(axis=1)
@@ -129,7 +151,7 @@ def current_line_field(
     mask0 = mask_equal | mask_nan_start | mask_nan_end
 
     if np.all(mask0):
-        return field_all
+        return store_field_output(field_all, out)
 
     # continue only with non-zero segments
     if np.any(mask0):
@@ -157,9 +179,10 @@ def current_line_field(
     norm_o4 = norm(po - p4, axis=1)
 
     # separate on-line cases (-> B=0)
-    mask1 = norm_o4 < 1e-15  # account for numerical issues
+    # account for numerical issues (1e-15, or 1e-6 in single precision)
+    mask1 = norm_o4 < np.finfo(dtype).resolution
     if np.all(mask1):
-        return field_all
+        return store_field_output(field_all, out)
 
     # continue only with general off-line cases
     if np.any(mask1):
@@ -186,17 +209,24 @@ def current_line_field(
     norm_42 = norm(p4 - p2, axis=1)
     sinTh1 = norm_41 / norm_o1
     sinTh2 = norm_42 / norm_o2
-    deltaSin = np.empty((len(po),))
+    deltaSin = np.empty((len(po),), dtype=dtype)
 
     # determine how p1,p2,p4 are sorted on the line (to get sinTH signs)
-    # both points below
-    mask2 = (norm_41 > 1) * (norm_41 > norm_42)
-    deltaSin[mask2] = abs(sinTh1[mask2] - sinTh2[mask2])
-    # both points above
-    mask3 = (norm_42 > 1) * (norm_42 > norm_41)
-    deltaSin[mask3] = abs(sinTh2[mask3] - sinTh1[mask3])
+    # both points below or both points above: sinTh1 and sinTh2 are of similar size
+    # for observers close to the line extension. To avoid the cancellation of their
+    # difference, use |norm_41 - norm_42| = 1 and norm_oi**2 = norm_4i**2 + norm_o4**2
+    # -> |sinTh1 - sinTh2| = norm_o4**2 * (norm_41 + norm_42)
+    #                        / (norm_o1 * norm_o2 * (norm_41 * norm_o2 + norm_42 * norm_o1))
+    mask23 = ((norm_41 > 1) * (norm_41 > norm_42)) | (
+        (norm_42 > 1) * (norm_42 > norm_41)
+    )
+    n41, n42 = norm_41[mask23], norm_42[mask23]
+    no1, no2 = norm_o1[mask23], norm_o2[mask23]
+    deltaSin[mask23] = (
+        norm_o4[mask23] ** 2 * (n41 + n42) / (no1 * no2 * (n41 * no2 + n42 * no1))
+    )
     # one above one below or one equals p4
-    mask4 = ~mask2 * ~mask3
+    mask4 = ~mask23
     deltaSin[mask4] = abs(sinTh1[mask4] + sinTh2[mask4])
 
     field = (deltaSin / norm_o4 * eB.T / norm_12 * current / 10).T  # m->mm, T->mT
@@ -207,7 +237,7 @@ def current_line_field(
 
     # return B or H
     if bh:
-        return field_all
+        return store_field_output(field_all, out)
 
     # H: mT -> kA/m
-    return field_all * 10 / 4 / np.pi
+    return store_field_output(field_all * 10 / 4 / np.pi, out)
@@ -0,0 +1,335 @@
+"""
+Far-field multipole approximation of the field of homogeneously magnetized bodies.
+Computation details in function docstrings.
+"""
+import numpy as np
+
+from magpylib._src.fields.field_BH_triangularmesh import get_mesh_groups
+
+# Relative error of the truncated expansion is bounded by C*(a/r)**p, with a the
+# radius of the body around its centroid and r the observer distance from the
+# centroid. p=4 for centrosymmetric bodies (vanishing third volume moments), p=3
+# otherwise. C was determined numerically with elongated and flat bodies, including
+# a safety factor of about 3.
+MULTIPOLE_ERROR_CONST = 10.0
+
+
+def multipole_field(
+    field: str,
+    observers: np.ndarray,
+    magnetization: np.ndarray,
+    volume: np.ndarray,
+    moment2: np.ndarray,
+) -> np.ndarray:
+    """
+    Far-field of a homogeneously magnetized body from the multipole expansion of its
+    volume up to second order: the dipole field plus the correction from the second
+    volume moments (octupole order).
+
+    Parameters
+    ----------
+    field: str, default=`'B'`
+        If `field='B'` return B-field in units of mT, if `field='H'` return H-field
+        in units of kA/m.
+
+    observers: ndarray, shape (n,3)
+        Observer positions (x,y,z) relative to the body centroid in units of mm.
+
+    magnetization: ndarray, shape (n,3)
+        Homogeneous magnetization vector in units of mT.
+
+    volume: ndarray, shape (n,)
+        Body volume in units of mm^3.
+
+    moment2: ndarray, shape (n,3,3)
+        Second volume moments S_ij = int x_i x_j dV about the centroid in units of mm^5.
+
+    Returns
+    -------
+    B-field or H-field: ndarray, shape (n,3)
+        B/H-field in Cartesian coordinates (Bx, By, Bz) in units of mT/(kA/m).
+
+    Notes
+    -----
+    The B-field outside of the body is B = grad(J.grad(N))/4pi, where
+    N(r) = int 1/|r-x| dV is expanded about the centroid,
+    N = V/r + S_ij d_i d_j (1/r) / 2 + ...
+    """
+    R = observers
+    J = magnetization
+    r2 = np.einsum("ni,ni->n", R, R)
+    JR = np.einsum("ni,ni->n", J, R)
+    SR = np.einsum("nij,nj->ni", moment2, R)
+    SJ = np.einsum("nij,nj->ni", moment2, J)
+    RSR = np.einsum("ni,ni->n", R, SR)
+    JSR = np.einsum("ni,ni->n", J, SR)
+    trS = np.einsum("nii->n", moment2)
+
+    # dipole term and second moment term (contraction of the 4th derivatives of 1/r
+    # with S and J), with common factors 1/r^5 and 1/(4pi)
+    r2_inv = 1 / r2
+    cR = (3 * volume + (52.5 * RSR * r2_inv - 7.5 * trS) * r2_inv) * JR
+    cR -= 15 * JSR * r2_inv
+    cJ = (1.5 * trS - 7.5 * RSR * r2_inv) - volume * r2
+    cSR = -15 * JR * r2_inv
+    B = cR[:, np.newaxis] * R
+    B += cJ[:, np.newaxis] * J
+    B += cSR[:, np.newaxis] * SR
+    B += 3 * SJ
+    B *= (r2_inv**2 * np.sqrt(r2_inv) / (4 * np.pi))[:, np.newaxis]
+
+    if field == "B":
+        return B
+    return B * 10 / 4 / np.pi  # mT -> kA/m
+
+
+def get_multipole_far_mask(
+    observers: np.ndarray, moments: dict, tolerance: float
+) -> np.ndarray:
+    """
+    Return True for observers that are far enough from the body, so that the relative
+    error of the multipole approximation is below `tolerance`.
+
+    Parameters
+    ----------
+    observers: ndarray, shape (n,3)
+        Observer positions in the body coordinates.
+
+    moments: dict
+        Output of one of the `*_moments` functions.
+
+    tolerance: float
+        Maximal relative error.
+
+    Returns
+    -------
+    ndarray, shape (n,), dtype bool
+    """
+    obs_rel = observers - moments["centroid"]
+    dist2 = np.einsum("ni,ni->n", obs_rel, obs_rel)
+    order = np.where(moments["centrosymmetric"], 4.0, 3.0)
+    dist_min = moments["radius"] * (MULTIPOLE_ERROR_CONST / tolerance) ** (1 / order)
+    return dist2 > dist_min**2
+
+
+def moments_from_second(volume, centroid, moment2_origin, radius, centrosymmetric):
+    """return volume moments dict, with second moments shifted to the centroid"""
+    moment2 = moment2_origin - volume[:, np.newaxis, np.newaxis] * (
+        centroid[:, :, np.newaxis] * centroid[:, np.newaxis, :]
+    )
+    return {
+        "volume": volume,
+        "centroid": centroid,
+        "moment2": moment2,
+        "radius": radius,
+        "centrosymmetric": centrosymmetric,
+    }
+
+
+def cuboid_moments(dimension: np.ndarray, **_) -> dict:
+    """
+    Volume moments of cuboids.
+
+    Parameters
+    ----------
+    dimension: ndarray, shape (n,3)
+        Cuboid side lengths (a,b,c) in units of mm.
+
+    Returns
+    -------
+    dict with volume (n,), centroid (n,3), second moments about the centroid (n,3,3),
+    radius around the centroid (n,) and centrosymmetric flags (n,).
+    """
+    n = len(dimension)
+    volume = np.prod(dimension, axis=1)
+    moment2 = np.zeros((n, 3, 3))
+    moment2[:, [0, 1, 2], [0, 1, 2]] = volume[:, np.newaxis] * dimension**2 / 12
+    return {
+        "volume": volume,
+        "centroid": np.zeros((n, 3)),
+        "moment2": moment2,
+        "radius": np.linalg.norm(dimension, axis=1) / 2,
+        "centrosymmetric": np.ones(n, dtype=bool),
+    }
+
+
+def cylinder_moments(dimension: np.ndarray, **_) -> dict:
+    """
+    Volume moments of cylinders.
+
+    Parameters
+    ----------
+    dimension: ndarray, shape (n,2)
+        Cylinder diameter d and height h in units of mm.
+
+    Returns
+    -------
+    dict with volume (n,), centroid (n,3), second moments about the centroid (n,3,3),
+    radius around the centroid (n,) and centrosymmetric flags (n,).
+    """
+    n = len(dimension)
+    r, h = dimension[:, 0] / 2, dimension[:, 1]
+    volume = np.pi * r**2 * h
+    moment2 = np.zeros((n, 3, 3))
+    moment2[:, 0, 0] = moment2[:, 1, 1] = volume * r**2 / 4
+    moment2[:, 2, 2] = volume * h**2 / 12
+    return {
+        "volume": volume,
+        "centroid": np.zeros((n, 3)),
+        "moment2": moment2,
+        "radius": np.sqrt(r**2 + h**2 / 4),
+        "centrosymmetric": np.ones(n, dtype=bool),
+    }
+
+
+def cylinder_segment_moments(dimension: np.ndarray, **_) -> dict:
+    """
+    Volume moments of cylinder segments.
+
+    Parameters
+    ----------
+    dimension: ndarray, shape (n,5)
+        Inner radius r1, outer radius r2, height h in units of mm and section angles
+        phi1 < phi2 in units of deg.
+
+    Returns
+    -------
+    dict with volume (n,), centroid (n,3), second moments about the centroid (n,3,3),
+    radius around the centroid (n,) and centrosymmetric flags (n,).
+    """
+    r1, r2, h, phi1, phi2 = dimension.T
+    phi1, phi2 = np.deg2rad(phi1), np.deg2rad(phi2)
+    dphi = phi2 - phi1
+    rr2, rr3, rr4 = r2**2 - r1**2, r2**3 - r1**3, r2**4 - r1**4
+
+    volume = rr2 / 2 * dphi * h
+    centroid = np.zeros((len(dimension), 3))
+    centroid[:, 0] = rr3 / 3 * (np.sin(phi2) - np.sin(phi1)) * h
+    centroid[:, 1] = rr3 / 3 * (np.cos(phi1) - np.cos(phi2)) * h
+    centroid /= volume[:, np.newaxis]
+
+    moment2 = np.zeros((len(dimension), 3, 3))
+    sin2 = (np.sin(2 * phi2) - np.sin(2 * phi1)) / 4
+    moment2[:, 0, 0] = rr4 / 4 * (dphi / 2 + sin2) * h
+    moment2[:, 1, 1] = rr4 / 4 * (dphi / 2 - sin2) * h
+    moment2[:, 0, 1] = moment2[:, 1, 0] = (
+        rr4 / 8 * (np.sin(phi2) ** 2 - np.sin(phi1) ** 2) * h
+    )
+    moment2[:, 2, 2] = volume * h**2 / 12
+
+    # the farthest point from the centroid, which lies on the symmetry axis of the
+    # section, is a corner of the section (or on the outer circle of full cylinders)
+    corners = np.array(
+        [[r * np.cos(phi), r * np.sin(phi)] for r in (r1, r2) for phi in (phi1, phi2)]
+    )  # shape (4,2,n)
+    dist = np.max(np.linalg.norm(corners - centroid[:, :2].T, axis=1), axis=0)
+    return moments_from_second(
+        volume,
+        centroid,
+        moment2,
+        np.sqrt(dist**2 + h**2 / 4),
+        np.isclose(dphi, 2 * np.pi),
+    )
+
+
+def tetrahedra_moments(vertices: np.ndarray) -> tuple:
+    """
+    Signed volumes, first and second volume moments about the origin of tetrahedra.
+
+    Parameters
+    ----------
+    vertices: ndarray, shape (...,4,3)
+
+    Returns
+    -------
+    volume (...), first moments (...,3), second moments (...,3,3)
+    """
+    v0 = vertices[..., 0, :]
+    edges = vertices[..., 1:, :] - v0[..., np.newaxis, :]
+    volume = np.linalg.det(edges) / 6
+    vsum = np.sum(vertices, axis=-2)
+    moment1 = volume[..., np.newaxis] * vsum / 4
+    moment2 = np.einsum("...pi,...pj->...ij", vertices, vertices)
+    moment2 += vsum[..., :, np.newaxis] * vsum[..., np.newaxis, :]
+    moment2 *= (volume / 20)[..., np.newaxis, np.newaxis]
+    return volume, moment1, moment2
+
+
+def body_moments(volume, moment1, moment2, points) -> dict:
+    """return volume moments dict of a body from its moments about the origin and
+    points (...,m,3) that enclose it"""
+    volume = np.abs(volume)
+    centroid = moment1 / volume[:, np.newaxis]
+    radius = np.max(np.linalg.norm(points - centroid[:, np.newaxis], axis=-1), axis=1)
+    return moments_from_second(
+        volume,
+        centroid,
+        moment2 * np.sign(volume)[:, np.newaxis, np.newaxis],
+        radius,
+        np.zeros(len(volume), dtype=bool),
+    )
+
+
+def tetrahedron_moments(vertices: np.ndarray, **_) -> dict:
+    """
+    Volume moments of tetrahedra.
+
+    Parameters
+    ----------
+    vertices: ndarray, shape (n,4,3)
+        Vertices of the tetrahedra in units of mm.
+
+    Returns
+    -------
+    dict with volume (n,), centroid (n,3), second moments about the centroid (n,3,3),
+    radius around the centroid (n,) and centrosymmetric flags (n,).
+    """
+    volume, moment1, moment2 = tetrahedra_moments(vertices)
+    return body_moments(volume, moment1, moment2, vertices)
+
+
+def trimesh_moments(mesh: np.ndarray, mesh_id=None, **_) -> dict:
+    """
+    Volume moments of closed triangular meshes, computed from the tetrahedra spanned
+    by each facet and the origin. The moments are computed once for each group of
+    similar meshes. Open meshes get an infinite radius, so that they are always
+    computed exactly.
+
+    Parameters
+    ----------
+    mesh: ndarray, shape (n,n1,3,3) or ragged sequence
+        Triangular meshes in units of mm.
+
+    mesh_id: ndarray, shape (n,), default=`None`
+        Integer identifiers of the meshes, see `get_mesh_groups`.
+
+    Returns
+    -------
+    dict with volume (n,), centroid (n,3), second moments about the centroid (n,3,3),
+    radius around the centroid (n,) and centrosymmetric flags (n,).
+    """
+    n = len(mesh)
+    moments = {
+        "volume": np.zeros(n),
+        "centroid": np.zeros((n, 3)),
+        "moment2": np.zeros((n, 3, 3)),
+        "radius": np.zeros(n),
+        "centrosymmetric": np.zeros(n, dtype=bool),
+    }
+    for mesh_ind, inds in get_mesh_groups(mesh, mesh_id):
+        facets = np.asarray(mesh[mesh_ind], dtype=float)
+        tetra = np.concatenate([np.zeros((len(facets), 1, 3)), facets], axis=1)
+        volume, moment1, moment2 = tetrahedra_moments(tetra[np.newaxis])
+        moments_mesh = body_moments(
+            volume.sum(axis=1),
+            moment1.sum(axis=1),
+            moment2.sum(axis=1),
+            facets.reshape((1, -1, 3)),
+        )
+        # the vector area of a closed mesh vanishes
+        areas = np.cross(facets[:, 1] - facets[:, 0], facets[:, 2] - facets[:, 0])
+        if np.linalg.norm(areas.sum(axis=0)) > 1e-9 * np.abs(areas).sum():
+            moments_mesh["radius"][:] = np.inf
+        for k, v in moments_mesh.items():
+            moments[k][inds] = v[0]
+    return moments
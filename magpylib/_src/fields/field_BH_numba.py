@@ -0,0 +1,295 @@
+"""
+Optional numba backend of the field kernels (`magpylib.defaults.compute.backend`).
+
+The functions of this module are element-wise loop versions of the NumPy kernels
+`magnet_cuboid_field`, `current_line_field` and `triangle_field`, that evaluate the
+same expressions and special cases without temporary arrays and masks. They are
+compiled with numba on first use and fall back to the NumPy kernels when numba is
+not installed.
+"""
+# pylint: disable=import-outside-toplevel
+# pylint: disable=too-many-locals
+# pylint: disable=too-many-statements
+import math
+import warnings
+
+import numpy as np
+
+from magpylib._src.defaults.defaults_classes import default_settings
+
+# compiled kernels, by name of the loop function
+NUMBA_KERNELS = {}
+
+
+def cuboid_loop(observers, magnetization, dimension, bh, out):
+    """loop version of `magnet_cuboid_field`, writes the field into `out`"""
+    for i in range(len(out)):
+        magx, magy, magz = magnetization[i, 0], magnetization[i, 1], magnetization[i, 2]
+        x, y, z = observers[i, 0], observers[i, 1], observers[i, 2]
+        a = abs(dimension[i, 0]) / 2
+        b = abs(dimension[i, 1]) / 2
+        c = abs(dimension[i, 2]) / 2
+
+        # special cases: no magnetization, 0 in dimension, observer on edge/corner
+        mx1 = abs(abs(x) - a) < 1e-15 * a
+        my1 = abs(abs(y) - b) < 1e-15 * b
+        mz1 = abs(abs(z) - c) < 1e-15 * c
+        mx2 = (abs(x) - a) < 1e-15 * a
+        my2 = (abs(y) - b) < 1e-15 * b
+        mz2 = (abs(z) - c) < 1e-15 * c
+        edge = (my1 and mz1 and mx2) or (mx1 and mz1 and my2) or (mx1 and my1 and mz2)
+        mag0 = magx == 0 and magy == 0 and magz == 0
+        Bx, By, Bz = 0.0, 0.0, 0.0
+
+        if not mag0 and a * b * c != 0 and not edge:
+            a = dimension[i, 0] / 2
+            b = dimension[i, 1] / 2
+            c = dimension[i, 2] / 2
+
+            # bottQ4 counterpart and sign flips of the field contributions
+            q00 = q01 = q02 = q10 = q11 = q12 = q20 = q21 = q22 = 1.0
+            if x < 0:
+                x = -x
+                q01, q02, q10, q20 = -q01, -q02, -q10, -q20
+            if y > 0:
+                y = -y
+                q01, q10, q12, q21 = -q01, -q10, -q12, -q21
+            if z > 0:
+                z = -z
+                q02, q12, q20, q21 = -q02, -q12, -q20, -q21
+
+            xma, xpa = x - a, x + a
+            ymb, ypb = y - b, y + b
+            zmc, zpc = z - c, z + c
+            xma2, xpa2 = xma**2, xpa**2
+            ymb2, ypb2 = ymb**2, ypb**2
+            zmc2, zpc2 = zmc**2, zpc**2
+
+            mmm = math.sqrt(xma2 + ymb2 + zmc2)
+            pmp = math.sqrt(xpa2 + ymb2 + zpc2)
+            pmm = math.sqrt(xpa2 + ymb2 + zmc2)
+            mmp = math.sqrt(xma2 + ymb2 + zpc2)
+            mpm = math.sqrt(xma2 + ypb2 + zmc2)
+            ppp = math.sqrt(xpa2 + ypb2 + zpc2)
+            ppm = math.sqrt(xpa2 + ypb2 + zmc2)
+            mpp = math.sqrt(xma2 + ypb2 + zpc2)
+
+            ff2x = np.log(
+                (xma + mmm) * (xpa + ppm) * (xpa + pmp) * (xma + mpp)
+            ) - np.log((xpa + pmm) * (xma + mpm) * (xma + mmp) * (xpa + ppp))
+            ff2y = np.log(
+                (-ymb + mmm) * (-ypb + ppm) * (-ymb + pmp) * (-ypb + mpp)
+            ) - np.log((-ymb + pmm) * (-ypb + mpm) * (ymb - mmp) * (ypb - ppp))
+            ff2z = np.log(
+                (-zmc + mmm) * (-zmc + ppm) * (-zpc + pmp) * (-zpc + mpp)
+            ) - np.log((-zmc + pmm) * (zmc - mpm) * (-zpc + mmp) * (zpc - ppp))
+
+            ff1x = (
+                np.arctan2((ymb * zmc), (xma * mmm))
+                - np.arctan2((ymb * zmc), (xpa * pmm))
+                - np.arctan2((ypb * zmc), (xma * mpm))
+                + np.arctan2((ypb * zmc), (xpa * ppm))
+                - np.arctan2((ymb * zpc), (xma * mmp))
+                + np.arctan2((ymb * zpc), (xpa * pmp))
+                + np.arctan2((ypb * zpc), (xma * mpp))
+                - np.arctan2((ypb * zpc), (xpa * ppp))
+            )
+            ff1y = (
+                np.arctan2((xma * zmc), (ymb * mmm))
+                - np.arctan2((xpa * zmc), (ymb * pmm))
+                - np.arctan2((xma * zmc), (ypb * mpm))
+                + np.arctan2((xpa * zmc), (ypb * ppm))
+                - np.arctan2((xma * zpc), (ymb * mmp))
+                + np.arctan2((xpa * zpc), (ymb * pmp))
+                + np.arctan2((xma * zpc), (ypb * mpp))
+                - np.arctan2((xpa * zpc), (ypb * ppp))
+            )
+            ff1z = (
+                np.arctan2((xma * ymb), (zmc * mmm))
+                - np.arctan2((xpa * ymb), (zmc * pmm))
+                - np.arctan2((xma * ypb), (zmc * mpm))
+                + np.arctan2((xpa * ypb), (zmc * ppm))
+                - np.arctan2((xma * ymb), (zpc * mmp))
+                + np.arctan2((xpa * ymb), (zpc * pmp))
+                + np.arctan2((xma * ypb), (zpc * mpp))
+                - np.arctan2((xpa * ypb), (zpc * ppp))
+            )
+
+            Bx = magx * ff1x * q00 + magy * ff2z * q10 + magz * ff2y * q20
+            By = magx * ff2z * q01 + magy * ff1y * q11 + -magz * ff2x * q21
+            Bz = magx * ff2y * q02 + -magy * ff2x * q12 + magz * ff1z * q22
+
+        Bx, By, Bz = Bx / (4 * np.pi), By / (4 * np.pi), Bz / (4 * np.pi)
+        if not bh:
+            if mx2 and my2 and mz2:  # inside magnet
+                Bx, By, Bz = Bx - magx, By - magy, Bz - magz
+            Bx, By, Bz = Bx * 10 / 4 / np.pi, By * 10 / 4 / np.pi, Bz * 10 / 4 / np.pi
+        out[i, 0], out[i, 1], out[i, 2] = Bx, By, Bz
+
+
+def line_loop(observers, current, segment_start, segment_end, bh, resolution, out):
+    """loop version of `current_line_field`, writes the field into `out`"""
+    for i in range(len(out)):
+        out[i, 0], out[i, 1], out[i, 2] = 0.0, 0.0, 0.0
+        p1x, p1y, p1z = segment_start[i, 0], segment_start[i, 1], segment_start[i, 2]
+        p2x, p2y, p2z = segment_end[i, 0], segment_end[i, 1], segment_end[i, 2]
+
+        # zero-length segments (or discontinuous)
+        start_nan = np.isnan(p1x) and np.isnan(p1y) and np.isnan(p1z)
+        end_nan = np.isnan(p2x) and np.isnan(p2y) and np.isnan(p2z)
+        zero_length = p1x == p2x and p1y == p2y and p1z == p2z
+        if start_nan or end_nan or zero_length:
+            continue
+
+        # dimensionless with the segment length as characteristic length scale
+        norm_12 = math.sqrt((p1x - p2x) ** 2 + (p1y - p2y) ** 2 + (p1z - p2z) ** 2)
+        p1x, p1y, p1z = p1x / norm_12, p1y / norm_12, p1z / norm_12
+        p2x, p2y, p2z = p2x / norm_12, p2y / norm_12, p2z / norm_12
+        pox = observers[i, 0] / norm_12
+        poy = observers[i, 1] / norm_12
+        poz = observers[i, 2] / norm_12
+
+        # p4 = projection of pos_obs onto line p1-p2
+        dx, dy, dz = p1x - p2x, p1y - p2y, p1z - p2z
+        t = (pox - p1x) * dx + (poy - p1y) * dy + (poz - p1z) * dz
+        p4x, p4y, p4z = p1x + t * dx, p1y + t * dy, p1z + t * dz
+
+        # on-line cases (-> B=0)
+        o4x, o4y, o4z = pox - p4x, poy - p4y, poz - p4z
+        norm_o4 = math.sqrt(o4x**2 + o4y**2 + o4z**2)
+        if norm_o4 < resolution:
+            continue
+
+        # field direction
+        cx = -dy * o4z - -dz * o4y
+        cy = -dz * o4x - -dx * o4z
+        cz = -dx * o4y - -dy * o4x
+        norm_cros = math.sqrt(cx**2 + cy**2 + cz**2)
+
+        # angles
+        norm_o1 = math.sqrt((pox - p1x) ** 2 + (poy - p1y) ** 2 + (poz - p1z) ** 2)
+        norm_o2 = math.sqrt((pox - p2x) ** 2 + (poy - p2y) ** 2 + (poz - p2z) ** 2)
+        norm_41 = math.sqrt((p4x - p1x) ** 2 + (p4y - p1y) ** 2 + (p4z - p1z) ** 2)
+        norm_42 = math.sqrt((p4x - p2x) ** 2 + (p4y - p2y) ** 2 + (p4z - p2z) ** 2)
+        if (norm_41 > 1 and norm_41 > norm_42) or (norm_42 > 1 and norm_42 > norm_41):
+            deltaSin = (
+                norm_o4**2
+                * (norm_41 + norm_42)
+                / (norm_o1 * norm_o2 * (norm_41 * norm_o2 + norm_42 * norm_o1))
+            )
+        else:
+            deltaSin = abs(norm_41 / norm_o1 + norm_42 / norm_o2)
+
+        fac = deltaSin / norm_o4
+        Bx = fac * (cx / norm_cros) / norm_12 * current[i] / 10
+        By = fac * (cy / norm_cros) / norm_12 * current[i] / 10
+        Bz = fac * (cz / norm_cros) / norm_12 * current[i] / 10
+        if not bh:
+            Bx, By, Bz = Bx * 10 / 4 / np.pi, By * 10 / 4 / np.pi, Bz * 10 / 4 / np.pi
+        out[i, 0], out[i, 1], out[i, 2] = Bx, By, Bz
+
+
+def triangle_loop(observers, magnetization, vertices, bh, out):
+    """loop version of `triangle_field`, writes the field into `out`"""
+    R = np.empty((3, 3))
+    L = np.empty((3, 3))
+    r = np.empty(3)
+    for i in range(len(out)):
+        # normal vector and surface charge
+        ax = vertices[i, 1, 0] - vertices[i, 0, 0]
+        ay = vertices[i, 1, 1] - vertices[i, 0, 1]
+        az = vertices[i, 1, 2] - vertices[i, 0, 2]
+        bx = vertices[i, 2, 0] - vertices[i, 0, 0]
+        by = vertices[i, 2, 1] - vertices[i, 0, 1]
+        bz = vertices[i, 2, 2] - vertices[i, 0, 2]
+        nx, ny, nz = ay * bz - az * by, az * bx - ax * bz, ax * by - ay * bx
+        n_norm = math.sqrt(nx**2 + ny**2 + nz**2)
+        nx, ny, nz = nx / n_norm, ny / n_norm, nz / n_norm
+        sigma = (
+            nx * magnetization[i, 0]
+            + ny * magnetization[i, 1]
+            + nz * magnetization[i, 2]
+        )
+
+        # vertex <-> observer, vertex <-> vertex
+        PQRx, PQRy, PQRz = 0.0, 0.0, 0.0
+        for k in range(3):
+            k1 = (k + 1) % 3
+            for j in range(3):
+                R[k, j] = vertices[i, k, j] - observers[i, j]
+                L[k, j] = vertices[i, k1, j] - vertices[i, k, j]
+            r2 = R[k, 0] ** 2 + R[k, 1] ** 2 + R[k, 2] ** 2
+            r[k] = math.sqrt(r2)
+            l2 = L[k, 0] ** 2 + L[k, 1] ** 2 + L[k, 2] ** 2
+            l = math.sqrt(l2)
+            b = R[k, 0] * L[k, 0] + R[k, 1] * L[k, 1] + R[k, 2] * L[k, 2]
+            bl = b / l
+            ind = abs(r[k] + bl)  # closeness measure to corner and edge
+            if ind > 1.0e-12:
+                I = 1.0 / l * np.log((math.sqrt(l2 + 2 * b + r2) + l + bl) / ind)
+            else:
+                I = -(1.0 / l) * np.log(abs(l - r[k]) / r[k])
+            PQRx += I * L[k, 0]
+            PQRy += I * L[k, 1]
+            PQRz += I * L[k, 2]
+
+        # solid angle
+        cx = R[1, 1] * R[0, 2] - R[1, 2] * R[0, 1]
+        cy = R[1, 2] * R[0, 0] - R[1, 0] * R[0, 2]
+        cz = R[1, 0] * R[0, 1] - R[1, 1] * R[0, 0]
+        N = R[2, 0] * cx + R[2, 1] * cy + R[2, 2] * cz
+        D = (
+            r[0] * r[1] * r[2]
+            + (R[2, 0] * R[1, 0] + R[2, 1] * R[1, 1] + R[2, 2] * R[1, 2]) * r[0]
+            + (R[2, 0] * R[0, 0] + R[2, 1] * R[0, 1] + R[2, 2] * R[0, 2]) * r[1]
+            + (R[1, 0] * R[0, 0] + R[1, 1] * R[0, 1] + R[1, 2] * R[0, 2]) * r[2]
+        )
+        omega = 2.0 * np.arctan2(N, D)
+        if abs(omega) > 6.2831853:
+            omega = 0.0
+
+        Bx = sigma * (nx * omega - (ny * PQRz - nz * PQRy))
+        By = sigma * (ny * omega - (nz * PQRx - nx * PQRz))
+        Bz = sigma * (nz * omega - (nx * PQRy - ny * PQRx))
+        if bh:
+            Bx, By, Bz = Bx / np.pi / 4.0, By / np.pi / 4.0, Bz / np.pi / 4.0
+        else:
+            Bx, By, Bz = (
+                Bx / 1.6 / np.pi**2,
+                By / 1.6 / np.pi**2,
+                Bz / 1.6 / np.pi**2,
+            )
+        out[i, 0], out[i, 1], out[i, 2] = Bx, By, Bz
+
+
+LOOP_FUNCS = {
+    "cuboid": cuboid_loop,
+    "line": line_loop,
+    "triangle": triangle_loop,
+}
+
+
+def get_numba_kernel(name: str):
+    """
+    Return the compiled loop kernel `name` if `magpylib.defaults.compute.backend` is
+    `'numba'`, and None otherwise or if numba is not installed (with a warning), so
+    that the NumPy kernel is used.
+    """
+    if default_settings.compute.backend != "numba":
+        return None
+    if name not in NUMBA_KERNELS:
+        try:
+            import numba
+        except ImportError:
+            warnings.warn(
+                "The numba backend of the field computation requires numba, which is "
+                "not installed. Falling back to the NumPy kernels. Install numba with "
+                "`pip install numba` or set `magpy.defaults.compute.backend='numpy'`.",
+                stacklevel=2,
+            )
+            return None
+        # nogil: the threads of the `workers` argument compute in parallel, numpy error
+        # model: division by zero gives inf or nan instead of raising
+        kernel = numba.njit(cache=True, nogil=True, error_model="numpy")
+        NUMBA_KERNELS[name] = kernel(LOOP_FUNCS[name])
+    return NUMBA_KERNELS[name]
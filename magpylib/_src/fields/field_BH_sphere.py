@@ -5,6 +5,8 @@ magnetized Spheres. Computation details in function docstrings.
 import numpy as np
 
 from magpylib._src.input_checks import check_field_input
+from magpylib._src.input_checks import check_field_output
+from magpylib._src.utility import store_field_output
 
 
 # CORE
@@ -13,6 +15,7 @@ def magnet_sphere_field(
     observers: np.ndarray,
     magnetization: np.ndarray,
     diameter: np.ndarray,
+    out: np.ndarray = None,
 ) -> np.ndarray:
     """Magnetic field of a homogeneously magnetized sphere.
 
@@ -33,6 +36,11 @@ def magnet_sphere_field(
     diameter: ndarray, shape (n,3)
         Sphere diameter in units of mm.
 
+    out: ndarray, shape (n,3), default=`None`
+        Preallocated float array into which the result is written and which is then
+        returned. Allows repeated calls with similar input shapes to reuse the same
+        output array. Must not share memory with the inputs.
+
     Returns
     -------
     B-field or H-field: ndarray, shape (n,3)
@@ -60,6 +68,7 @@ def magnet_sphere_field(
     """
 
     bh = check_field_input(field, "magnet_sphere_field()")
+    check_field_output(out, "magnet_sphere_field()", observers, magnetization, diameter)
 
     # all special cases r0=0 and mag=0 automatically covered
 
@@ -86,9 +95,9 @@ def magnet_sphere_field(
     B[mask_out] = field_out.T
 
     if bh:
-        return B
+        return store_field_output(B, out)
 
     # adjust and return H
     B[~mask_out] = -magnetization[~mask_out] / 3
     H = B * 10 / 4 / np.pi
-    return H
+    return store_field_output(H, out)
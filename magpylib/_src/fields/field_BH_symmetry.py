@@ -0,0 +1,102 @@
+"""
+Reuse of the field of rotationally symmetric sources.
+
+The field of `Cylinder` and `CylinderSegment` magnets rotates with the observer
+position and magnetization about the cylinder axis (and, for segments, with the
+section angles). Each instance is mapped onto a canonical configuration, instances
+with the same canonical configuration are identified, and the field is only computed
+once for each of them and rotated back. Typical examples are rotor-position sweeps of
+rings of identical segments, where the field of segment i at rotor angle a equals
+the field of segment 0 at rotor angle a + i*da.
+"""
+import numpy as np
+
+from magpylib._src.utility import hash_rows
+from magpylib._src.utility import unique_hashes
+
+# relative resolution of the canonical configurations, configurations that differ
+# by less (e.g. by rounding errors of the rotation angles) are identified
+SYMMETRY_RTOL = 1e-10
+
+
+def rotate_z(vectors: np.ndarray, angle: np.ndarray) -> np.ndarray:
+    """rotate the vectors of shape (n,3) about the z-axis by the angles (n,) in rad"""
+    cos, sin = np.cos(angle), np.sin(angle)
+    x, y, z = vectors.T
+    return np.column_stack([cos * x - sin * y, sin * x + cos * y, z])
+
+
+def quantize(values: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """round `values` to integer multiples of `SYMMETRY_RTOL*scale`, returns
+    float64 (without negative zeros) so that the keys are compared by their bits"""
+    quantum = SYMMETRY_RTOL * np.where(scale > 0, scale, 1.0)
+    return np.round(values / quantum) + 0.0
+
+
+def get_magnetization_scale(magnetization: np.ndarray) -> float:
+    """common quantization scale of the magnetization keys of all instances. The field
+    is linear in the magnetization, so that its magnitude must be part of the key and
+    cannot be normalized row by row."""
+    return np.linalg.norm(magnetization, axis=1).max(initial=0.0)
+
+
+def cylinder_symmetry(
+    observers: np.ndarray, magnetization: np.ndarray, dimension: np.ndarray, **_
+) -> tuple:
+    """
+    Canonical configuration of `Cylinder` instances: observer in the xz-half-plane
+    with x>=0, magnetization rotated accordingly.
+
+    Returns
+    -------
+    observers, kwargs, angle, keys: canonical observers (n,3) and field function
+    kwargs, angles (n,) in rad by which the canonical field is rotated back, and list
+    of float64 key columns (n,) that identify equal canonical configurations.
+    """
+    x, y, z = observers.T
+    angle = np.arctan2(y, x)
+    r = np.hypot(x, y)
+    obs = np.column_stack([r, np.zeros_like(r), z])
+    mag = rotate_z(magnetization, -angle)
+    scale = np.max(dimension, axis=1)
+    mag_scale = get_magnetization_scale(mag)
+    keys = [quantize(v, scale) for v in (r, z, *dimension.T)]
+    keys.extend(quantize(v, mag_scale) for v in mag.T)
+    return obs, {"magnetization": mag, "dimension": dimension}, angle, keys
+
+
+def cylinder_segment_symmetry(
+    observers: np.ndarray, magnetization: np.ndarray, dimension: np.ndarray, **_
+) -> tuple:
+    """
+    Canonical configuration of `CylinderSegment` instances: section starting at
+    phi1=0, observer and magnetization rotated accordingly. See `cylinder_symmetry`
+    for the returned values.
+    """
+    r1, r2, h, phi1, phi2 = dimension.T
+    angle = np.deg2rad(phi1)
+    obs = rotate_z(observers, -angle)
+    mag = rotate_z(magnetization, -angle)
+    dim = np.column_stack([r1, r2, h, np.zeros_like(phi1), phi2 - phi1])
+    scale = np.maximum(r2, h)
+    mag_scale = get_magnetization_scale(mag)
+    keys = [quantize(v, scale) for v in (*obs.T, r1, r2, h)]
+    keys.append(quantize(phi2 - phi1, 360.0))
+    keys.extend(quantize(v, mag_scale) for v in mag.T)
+    return obs, {"magnetization": mag, "dimension": dim}, angle, keys
+
+
+def get_symmetry_groups(keys: list) -> tuple:
+    """
+    Identify equal rows of the key columns `keys`.
+
+    Returns
+    -------
+    first, inverse: indices of one instance of each group, and group index of each
+    instance.
+    """
+    bits = [k.view(np.uint64) for k in keys]
+    _, first, inverse = unique_hashes(hash_rows(bits))
+    if any(np.any(b[first][inverse] != b) for b in bits):  # hash collision
+        first = inverse = np.arange(len(keys[0]))
+    return first, inverse
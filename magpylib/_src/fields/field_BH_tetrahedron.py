@@ -6,6 +6,8 @@ import numpy as np
 
 from magpylib._src.fields.field_BH_triangle import triangle_field
 from magpylib._src.input_checks import check_field_input
+from magpylib._src.input_checks import check_field_output
+from magpylib._src.utility import store_field_output
 
 
 def check_chirality(points: np.ndarray) -> np.ndarray:
@@ -62,6 +64,7 @@ def magnet_tetrahedron_field(
     observers: np.ndarray,
     magnetization: np.ndarray,
     vertices: np.ndarray,
+    out: np.ndarray = None,
 ) -> np.ndarray:
     """
     Magnetic field generated by a homogeneously magnetized tetrahedron.
@@ -82,6 +85,11 @@ def magnet_tetrahedron_field(
         Vertices of the individual tetrahedrons [(pos1a, pos1b, pos1c, pos1d),
         (pos2a, pos2b, pos2c, pos2d), ...].
 
+    out: ndarray, shape (n,3), default=`None`
+        Preallocated float array into which the result is written and which is then
+        returned. Allows repeated calls with similar input shapes to reuse the same
+        output array. Must not share memory with the inputs.
+
     Returns
     -------
     B-field or H-field: ndarray, shape (n,3)
@@ -110,6 +118,9 @@ def magnet_tetrahedron_field(
     """
 
     bh = check_field_input(field, "magnet_tetrahedron_field()")
+    check_field_output(
+        out, "magnet_tetrahedron_field()", observers, magnetization, vertices
+    )
 
     n = len(observers)
 
@@ -137,9 +148,9 @@ def magnet_tetrahedron_field(
     )
 
     if not bh:
-        return tetra_field
+        return store_field_output(tetra_field, out)
 
     # if B, and inside magnet add magnetization vector
     mask_inside = point_inside(observers, vertices)
     tetra_field[mask_inside] += magnetization[mask_inside]
-    return tetra_field
+    return store_field_output(tetra_field, out)
@@ -5,7 +5,11 @@ Computation details in function docstrings.
 # pylance: disable=Code is unreachable
 import numpy as np
 
+from magpylib._src.fields.field_BH_numba import get_numba_kernel
 from magpylib._src.input_checks import check_field_input
+from magpylib._src.input_checks import check_field_output
+from magpylib._src.utility import store_field_output
+from magpylib._src.utility import zeros_field_output
 
 
 def vcross3(a: np.ndarray, b: np.ndarray) -> np.ndarray:
@@ -76,6 +80,7 @@ def triangle_field(
     observers: np.ndarray,
     magnetization: np.ndarray,
     vertices: np.ndarray,
+    out: np.ndarray = None,
 ) -> np.ndarray:
     """Magnetic field generated by homogeneous (magnetic) charges on triangular surfaces.
 
@@ -102,6 +107,11 @@ def triangle_field(
         [(pos1a, pos1b, pos1c), (pos2a, pos2b, pos2c), ...].
         The vertex order defines the normal vector orientation of the face (right-hand-rule).
 
+    out: ndarray, shape (n,3), default=`None`
+        Preallocated float array into which the result is written and which is then
+        returned. Allows repeated calls with similar input shapes to reuse the same
+        output array. Must not share memory with the inputs.
+
     Returns
     -------
     B-field or H-field: ndarray, shape (n,3)
@@ -131,6 +141,13 @@ def triangle_field(
     """
     # pylint: disable=too-many-statements
     bh = check_field_input(field, "triangle_field()")
+    check_field_output(out, "triangle_field()", observers, magnetization, vertices)
+
+    kernel = get_numba_kernel("triangle")
+    if kernel is not None:
+        B = zeros_field_output(out, (len(observers), 3))
+        kernel(observers, magnetization, vertices, bh, B)
+        return B
 
     n = norm_vector(vertices)
     sigma = np.einsum("ij, ij->i", n, magnetization)  # vectorized inner product
@@ -180,7 +197,7 @@ def triangle_field(
 
     # return B or compute and return H -------------
     if bh:
-        return B.T / np.pi / 4.0
+        return store_field_output(B.T / np.pi / 4.0, out)
 
     H = B.T / 1.6 / np.pi**2  # mT -> kA/m
-    return H
+    return store_field_output(H, out)
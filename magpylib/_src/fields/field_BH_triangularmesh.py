@@ -4,6 +4,11 @@ Computation details in function docstrings.
 """
 # pylint: disable=too-many-nested-blocks
 # pylance: disable=Code is unreachable
+from collections import OrderedDict
+from hashlib import blake2b
+from threading import Lock
+from typing import Tuple
+
 import numpy as np
 import scipy.spatial
 
@@ -65,13 +70,14 @@ def v_cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
     """
     a x b
     """
-    result = np.array(
+    result = np.stack(
         (
-            a[:, 1] * b[:, 2] - a[:, 2] * b[:, 1],
-            a[:, 2] * b[:, 0] - a[:, 0] * b[:, 2],
-            a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0],
-        )
-    ).T
+            a[..., 1] * b[..., 2] - a[..., 2] * b[..., 1],
+            a[..., 2] * b[..., 0] - a[..., 0] * b[..., 2],
+            a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0],
+        ),
+        axis=-1,
+    )
     return result
 
 
@@ -232,27 +238,31 @@ def get_inwards_mask(
     return mask
 
 
-def lines_end_in_trimesh(lines: np.ndarray, faces: np.ndarray) -> np.ndarray:
+def lines_cross_facets(
+    l0: np.ndarray, l1: np.ndarray, faces: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
     """
     Check if 2-point lines, where the first point lies distinctly outside of a closed
-    triangular mesh (no touch), ends on the inside of that mesh
+    triangular mesh (no touch), cross or end on triangular facets. All inputs are
+    broadcast against each other.
 
-    If line ends close to a triangle surface it counts as inside (touch).
+    If line ends close to a triangle surface it counts as touch.
     If line passes through triangle edge/corners it counts as intersection.
 
     Parameters
     ----------
-    lines: ndarray shape (n,2,3)
-        n line segements defined through respectively 2 (first index) positions with
-        coordinates (x,y,z) (last index). The first point must lie outside of the mesh.
+    l0: ndarray, shape (...,3)
+        Line start points, must lie outside of the mesh.
 
-    faces: ndarray, shape (m,3,3)
-        m faces defined through respectively 3 (first index) positions with coordinates
-        (x,y,z) (last index). The faces must define a closed mesh.
+    l1: ndarray, shape (...,3)
+        Line end points (test-points).
+
+    faces: ndarray, shape (...,3,3)
+        Facets defined through respectively 3 positions with coordinates (x,y,z).
 
     Returns
     -------
-        np.ndarray shape (n,)
+    cross, touch: ndarray, dtype bool
 
     Note
     ----
@@ -265,25 +275,17 @@ def lines_end_in_trimesh(lines: np.ndarray, faces: np.ndarray) -> np.ndarray:
     https://www.iue.tuwien.ac.at/phd/ertl/node114.html
     to check if the extended line would pass through the triangular facet
     """
+    f0, f1, f2 = faces[..., 0, :], faces[..., 1, :], faces[..., 2, :]
 
     # Part 1 ---------------------------
-    normals = v_cross(faces[:, 0] - faces[:, 2], faces[:, 1] - faces[:, 2])
-    normals = np.tile(normals, (len(lines), 1, 1))
-
-    l0 = lines[:, 0][:, np.newaxis]  # outside points
-    l1 = lines[:, 1][:, np.newaxis]  # possible inside test-points
+    normals = v_cross(f0 - f2, f1 - f2)
 
     # test-point might coincide with chosen in-plane reference point (chosen faces[:,2] here).
     # this then leads to bad projection computation
     # --> choose other reference points (faces[:,1]) in those specific cases
-    ref_pts = np.tile(faces[:, 2], (len(lines), 1, 1))
     eps = 1e-16  # note: norm square !
-    coincide = v_norm2(l1 - ref_pts) < eps
-    if np.any(coincide):
-        ref_pts2 = np.tile(
-            faces[:, 1], (len(lines), 1, 1)
-        )  # <--inefficient tile !!! only small part needed
-        ref_pts[coincide] = ref_pts2[coincide]
+    coincide = v_norm2(l1 - f2) < eps
+    ref_pts = np.where(coincide[..., np.newaxis], f1, f2)
 
     proj0 = v_norm_proj(l0 - ref_pts, normals)
     proj1 = v_norm_proj(l1 - ref_pts, normals)
@@ -291,18 +293,13 @@ def lines_end_in_trimesh(lines: np.ndarray, faces: np.ndarray) -> np.ndarray:
     eps = 1e-7
     # no need to check proj0 for touch because line init pts are outside
     plane_touch = np.abs(proj1) < eps
-    # print('plane_touch:')
-    # print(plane_touch)
-
     plane_cross = np.sign(proj0) != np.sign(proj1)
-    # print('plane_cross:')
-    # print(plane_cross)
 
     # Part 2 ---------------------------
     # signed areas (no 0-problem because ss0 is the outside point)
-    a = faces[:, 0] - l0
-    b = faces[:, 1] - l0
-    c = faces[:, 2] - l0
+    a = f0 - l0
+    b = f1 - l0
+    c = f2 - l0
     d = l1 - l0
     area1 = v_dot_cross3d(a, b, d)
     area2 = v_dot_cross3d(b, c, d)
@@ -312,21 +309,46 @@ def lines_end_in_trimesh(lines: np.ndarray, faces: np.ndarray) -> np.ndarray:
     pass_through_boundary = (
         (np.abs(area1) < eps) | (np.abs(area2) < eps) | (np.abs(area3) < eps)
     )
-    # print('pass_through_boundary:')
-    # print(pass_through_boundary)
 
     area1 = np.sign(area1)
     area2 = np.sign(area2)
     area3 = np.sign(area3)
     pass_through_inside = (area1 == area2) * (area2 == area3)
-    # print('pass_through_inside:')
-    # print(pass_through_inside)
 
     pass_through = pass_through_boundary | pass_through_inside
 
-    # Part 3 ---------------------------
-    result_cross = pass_through * plane_cross
-    result_touch = pass_through * plane_touch
+    return pass_through & plane_cross, pass_through & plane_touch
+
+
+def lines_end_in_trimesh(lines: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    """
+    Check if 2-point lines, where the first point lies distinctly outside of a closed
+    triangular mesh (no touch), ends on the inside of that mesh
+
+    If line ends close to a triangle surface it counts as inside (touch).
+    If line passes through triangle edge/corners it counts as intersection.
+
+    Parameters
+    ----------
+    lines: ndarray shape (n,2,3)
+        n line segements defined through respectively 2 (first index) positions with
+        coordinates (x,y,z) (last index). The first point must lie outside of the mesh.
+
+    faces: ndarray, shape (m,3,3)
+        m faces defined through respectively 3 (first index) positions with coordinates
+        (x,y,z) (last index). The faces must define a closed mesh.
+
+    Returns
+    -------
+        np.ndarray shape (n,)
+
+    Note
+    ----
+    Every line is tested against every facet, see `lines_cross_facets`.
+    """
+    l0 = lines[:, 0][:, np.newaxis]  # outside points
+    l1 = lines[:, 1][:, np.newaxis]  # possible inside test-points
+    result_cross, result_touch = lines_cross_facets(l0, l1, faces)
 
     inside1 = np.sum(result_cross, axis=1) % 2 != 0
     inside2 = np.any(result_touch, axis=1)
@@ -454,7 +476,159 @@ def mask_inside_enclosing_box(points: np.ndarray, vertices: np.ndarray) -> np.nd
     return mx & my & mz
 
 
-def mask_inside_trimesh(points: np.ndarray, faces: np.ndarray) -> np.ndarray:
+# direction of the test rays, chosen to avoid passing through edges of regular meshes
+RAY_DIRECTION = np.array([12.0012345, 5.9923456, 6.9932109])
+RAY_DIRECTION /= np.linalg.norm(RAY_DIRECTION)
+
+# acceleration structures of the most recently used meshes, shared by the threads
+# of the `workers` option
+TRIMESH_GRIDS = OrderedDict()
+TRIMESH_GRIDS_MAXSIZE = 8
+TRIMESH_GRIDS_LOCK = Lock()
+
+# below this number of point-facet pairs, all pairs are tested without grid
+TRIMESH_GRID_MIN_PAIRS = 10_000
+
+
+class TrimeshGrid:
+    """
+    Uniform grid acceleration structure for the inside-outside test of points with a
+    closed triangular mesh.
+
+    All test rays are parallel (direction `RAY_DIRECTION`), so that only facets whose
+    projection along the ray direction covers the projection of a test-point can be
+    intersected. The projected facet bounding boxes are binned once into a uniform 2D
+    grid with about one cell per facet, and each test-point is only tested against the
+    facets of its grid cell.
+
+    Parameters
+    ----------
+    faces: ndarray, shape (m,3,3)
+        m faces defined through respectively 3 (first index) positions with coordinates
+        (x,y,z) (last index). The faces must define a closed mesh.
+    """
+
+    max_pairs = 2**20  # maximal number of point-facet pairs tested in one step
+
+    def __init__(self, faces: np.ndarray):
+        self.faces = faces
+        vertices = faces.reshape((-1, 3))
+        self.ray_length = np.linalg.norm(np.ptp(vertices, axis=0)) + 1.0
+
+        # orthonormal basis (u,v) of the plane perpendicular to the rays
+        u = np.cross(RAY_DIRECTION, (0, 0, 1))
+        u /= np.linalg.norm(u)
+        v = np.cross(RAY_DIRECTION, u)
+        uv = np.array([u, v]).T
+        fuv = faces @ uv  # (m,3,2)
+        fmin, fmax = fuv.min(axis=1), fuv.max(axis=1)
+
+        # grid with about one cell per facet, covering the projected mesh
+        origin = fmin.min(axis=0)
+        extent = fmax.max(axis=0) - origin
+        tol = 1e-9 * max(extent.max(), 1.0)
+        extent = np.maximum(extent, tol)
+        ratio = extent[0] / extent[1]
+        n_faces = len(faces)
+        self.shape = np.clip(
+            np.ceil(np.sqrt([n_faces * ratio, n_faces / ratio])), 1, n_faces
+        ).astype(int)
+
+        # projections are stored in units of the cell size, so that the cell indices
+        # of a point are the integer parts of its projected coordinates
+        cell_size = extent / self.shape
+        self.uv = uv / cell_size
+        self.origin = origin / cell_size
+
+        # bin facets into all cells covered by their (slightly enlarged) bounding box
+        i0 = self.get_cell_indices((fmin - tol) / cell_size)
+        i1 = self.get_cell_indices((fmax + tol) / cell_size)
+        n_cells = i1 - i0 + 1
+        counts = n_cells[:, 0] * n_cells[:, 1]
+        face_inds = np.repeat(np.arange(n_faces), counts)
+        local = np.arange(len(face_inds)) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        nu = n_cells[face_inds, 0]
+        cells = (i0[face_inds, 0] + local % nu) * self.shape[1]
+        cells += i0[face_inds, 1] + local // nu
+        order = np.argsort(cells, kind="stable")
+        self.cell_faces = face_inds[order]
+        self.cell_starts = np.concatenate(
+            [[0], np.cumsum(np.bincount(cells, minlength=np.prod(self.shape)))]
+        )
+
+    def get_cell_indices(self, puv: np.ndarray) -> np.ndarray:
+        """return the grid indices of projected points of shape (n,2) in units of the
+        cell size, clipped to the grid"""
+        inds = np.floor(puv - self.origin).astype(int)
+        return np.clip(inds, 0, self.shape - 1)
+
+    def mask_inside(self, points: np.ndarray) -> np.ndarray:
+        """
+        Check which points lie inside of the closed mesh.
+
+        Parameters
+        ----------
+        points, ndarray, shape (n,3)
+
+        Returns
+        -------
+        ndarray, shape (n,)
+        """
+        puv = points @ self.uv
+        inds = self.get_cell_indices(puv)
+        cells = inds[:, 0] * self.shape[1] + inds[:, 1]
+        starts = self.cell_starts[cells]
+        counts = self.cell_starts[cells + 1] - starts
+        # points outside of the grid are not covered by any facet
+        outside = (puv < self.origin) | (puv > self.origin + self.shape)
+        counts[np.any(outside, axis=1)] = 0
+
+        # test point-facet pairs in blocks of at most `max_pairs`
+        n_cross = np.zeros(len(points), dtype=int)
+        touch = np.zeros(len(points), dtype=bool)
+        cum_counts = np.cumsum(counts)
+        splits = np.searchsorted(
+            cum_counts, np.arange(self.max_pairs, cum_counts[-1], self.max_pairs)
+        )
+        for pts_inds in np.split(np.arange(len(points)), splits):
+            cnt = counts[pts_inds]
+            pair_pts = np.repeat(pts_inds, cnt)
+            local = np.arange(len(pair_pts)) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+            pair_faces = self.cell_faces[np.repeat(starts[pts_inds], cnt) + local]
+            l1 = points[pair_pts]
+            l0 = l1 - self.ray_length * RAY_DIRECTION
+            cross, tch = lines_cross_facets(l0, l1, self.faces[pair_faces])
+            n_cross += np.bincount(pair_pts[cross], minlength=len(points))
+            touch[pair_pts[tch]] = True
+        return (n_cross % 2 != 0) | touch
+
+
+def get_trimesh_grid(faces: np.ndarray, mesh_id=None) -> TrimeshGrid:
+    """Return the acceleration structure of a mesh, build it only when the mesh was not
+    used in one of the latest calls. The mesh is identified by its content hash
+    `mesh_id` (see `get_mesh_id`) when given, else the faces are hashed."""
+    faces = np.ascontiguousarray(faces, dtype=float)
+    key = mesh_id
+    if key is None:
+        key = (faces.shape, blake2b(faces.tobytes()).digest())
+    # the lock is held while building, so that threads that need the same grid wait
+    # for it instead of building it again
+    with TRIMESH_GRIDS_LOCK:
+        grid = TRIMESH_GRIDS.get(key, None)
+        if grid is None:
+            grid = TrimeshGrid(faces)
+            TRIMESH_GRIDS[key] = grid
+            if len(TRIMESH_GRIDS) > TRIMESH_GRIDS_MAXSIZE:
+                TRIMESH_GRIDS.popitem(last=False)
+        TRIMESH_GRIDS.move_to_end(key)
+    return grid
+
+
+def mask_inside_trimesh(
+    points: np.ndarray, faces: np.ndarray, mesh_id=None
+) -> np.ndarray:
     """
     Check which points lie inside of a closed triangular mesh (defined by faces).
 
@@ -462,6 +636,8 @@ def mask_inside_trimesh(points: np.ndarray, faces: np.ndarray) -> np.ndarray:
     ----------
     points, ndarray, shape (n,3)
     faces, ndarray, shape (m,3,3)
+    mesh_id, bytes, default=`None`
+        Content hash of the mesh, see `get_mesh_id`. Identifies the cached grid.
 
     Returns
     -------
@@ -469,7 +645,8 @@ def mask_inside_trimesh(points: np.ndarray, faces: np.ndarray) -> np.ndarray:
 
     Note
     ----
-    Method: ray-tracing.
+    Method: ray-tracing with parallel rays. For large problems, the rays are only
+    tested against the facets in their cell of a cached uniform grid (`TrimeshGrid`).
     Faces must form a closed mesh for this to work.
     """
     vertices = faces.reshape((-1, 3))
@@ -478,11 +655,15 @@ def mask_inside_trimesh(points: np.ndarray, faces: np.ndarray) -> np.ndarray:
     mask_inside = mask_inside_enclosing_box(points, vertices)
     pts_in_box = points[mask_inside]
 
+    if len(pts_in_box) * len(faces) >= TRIMESH_GRID_MIN_PAIRS:
+        grid = get_trimesh_grid(faces, mesh_id)
+        mask_inside[mask_inside] = grid.mask_inside(pts_in_box)
+        return mask_inside
+
     # create test-lines from outside to test-points
-    start_point_outside = np.min(vertices, axis=0) - np.array(
-        [12.0012345, 5.9923456, 6.9932109]
-    )
-    test_lines = np.tile(start_point_outside, (len(pts_in_box), 2, 1))
+    ray_length = np.linalg.norm(np.ptp(vertices, axis=0)) + 1.0
+    test_lines = np.empty((len(pts_in_box), 2, 3))
+    test_lines[:, 0] = pts_in_box - ray_length * RAY_DIRECTION
     test_lines[:, 1] = pts_in_box
 
     # check if test-points are inside using ray tracing
@@ -493,12 +674,121 @@ def mask_inside_trimesh(points: np.ndarray, faces: np.ndarray) -> np.ndarray:
     return mask_inside
 
 
+def get_mesh_groups(mesh: np.ndarray, mesh_id=None) -> list:
+    """
+    Group the instances of similar meshes.
+
+    Parameters
+    ----------
+    mesh: ndarray, shape (n,n1,3,3) or ragged sequence
+        Triangular meshes of the n instances.
+
+    mesh_id: ndarray, shape (n,), default=`None`
+        Identifiers of the meshes, see `get_mesh_id`. If `None`, neighboring similar
+        meshes are found by array comparison.
+
+    Returns
+    -------
+    list of (mesh index, instance indices) tuples, one for each group
+    """
+    if mesh_id is None:
+        if mesh.ndim != 1:  # all meshes have the same number of faces
+            new = np.any(mesh[1:] != mesh[:-1], axis=(1, 2, 3))
+        else:
+            new = np.array(
+                [
+                    m1.shape != m0.shape or np.any(m1 != m0)
+                    for m0, m1 in zip(mesh[:-1], mesh[1:])
+                ],
+                dtype=bool,
+            )
+        mesh_id = np.concatenate([[0], np.cumsum(new)])
+    _, first_inds, inverse, counts = np.unique(
+        mesh_id, return_index=True, return_inverse=True, return_counts=True
+    )
+    order = np.argsort(inverse, kind="stable")
+    return list(zip(first_inds, np.split(order, np.cumsum(counts)[:-1])))
+
+
+def get_mesh_id(vertices: np.ndarray, faces: np.ndarray) -> bytes:
+    """
+    Content hash of a triangular mesh given by vertices and faces. Similar meshes have
+    the same id, also across processes, and any modification of the vertices or faces
+    arrays changes the id.
+
+    Parameters
+    ----------
+    vertices: ndarray, shape (n,3)
+    faces: ndarray, shape (m,3)
+
+    Returns
+    -------
+    bytes, 16 byte blake2b digest
+    """
+    mesh_hash = blake2b(digest_size=16)
+    for arr in (vertices, faces):
+        arr = np.ascontiguousarray(arr)
+        mesh_hash.update(f"{arr.shape}{arr.dtype.str}".encode())
+        mesh_hash.update(arr.tobytes())
+    return mesh_hash.digest()
+
+
+# inside-outside masks of the most recently used (mesh_id, observers) combinations
+TRIMESH_MASKS = OrderedDict()
+TRIMESH_MASKS_MAXSIZE = 32
+TRIMESH_MASKS_LOCK = Lock()
+
+
+def mask_inside_trimesh_groups(
+    observers: np.ndarray, mesh: np.ndarray, mesh_id=None
+) -> np.ndarray:
+    """
+    Check which observers lie inside of their respective closed triangular mesh. The
+    test is performed only once for each group of similar meshes. With `mesh_id`, the
+    masks of previous calls with the same mesh and observers are reused.
+
+    Parameters
+    ----------
+    observers: ndarray, shape (n,3)
+    mesh: ndarray, shape (n,n1,3,3) or ragged sequence
+    mesh_id: ndarray, shape (n,), default=`None`
+
+    Returns
+    -------
+    ndarray, shape (n,)
+    """
+    inside_mask = np.zeros(len(observers), dtype=bool)
+    for mesh_ind, inds in get_mesh_groups(mesh, mesh_id):
+        obs = observers[inds]
+        key = grid_key = None
+        if mesh_id is not None:
+            obs = np.ascontiguousarray(obs)
+            grid_key = mesh_id[mesh_ind]
+            key = (grid_key, obs.shape, blake2b(obs.tobytes()).digest())
+        with TRIMESH_MASKS_LOCK:
+            mask = TRIMESH_MASKS.get(key, None)
+            if mask is not None:
+                TRIMESH_MASKS.move_to_end(key)
+        if mask is None:
+            # the inside-outside test runs outside of the lock, so that threads with
+            # different observers are not serialized
+            mask = mask_inside_trimesh(obs, mesh[mesh_ind], grid_key)
+            if key is not None:
+                with TRIMESH_MASKS_LOCK:
+                    TRIMESH_MASKS[key] = mask
+                    if len(TRIMESH_MASKS) > TRIMESH_MASKS_MAXSIZE:
+                        TRIMESH_MASKS.popitem(last=False)
+        inside_mask[inds] = mask
+    return inside_mask
+
+
 def magnet_trimesh_field(
     field: str,
     observers: np.ndarray,
     magnetization: np.ndarray,
     mesh: np.ndarray,
     in_out="auto",
+    mesh_id=None,
 ) -> np.ndarray:
     """
     core-like function that computes the field of triangular meshes using the triangle_field
@@ -528,6 +818,13 @@ def magnet_trimesh_field(
         or `in_out='inside'` if it is known in advance that all observers satisfy the same
         condition.
 
+    mesh_id: ndarray, shape (n,), default=`None`
+        Content hashes of the meshes, see `get_mesh_id`. Similar meshes must have the
+        same identifier and different meshes different identifiers, also across calls.
+        They are used to group the observers of each mesh for the inside-outside test,
+        and to reuse the inside-outside masks of previous calls. By default, similar
+        meshes are found by comparing neighboring mesh arrays.
+
     Returns
     -------
     B-field or H-field: ndarray, shape (n,3)
@@ -568,24 +865,9 @@ def magnet_trimesh_field(
 
     if field == "B":
         if in_out == "auto":
-            prev_ind = 0
-            # group similar meshs for inside-outside evaluation and adding B
-            for new_ind, _ in enumerate(B):
-                if (
-                    new_ind == len(B) - 1
-                    or mesh[new_ind].shape != mesh[prev_ind].shape
-                    or not np.all(mesh[new_ind] == mesh[prev_ind])
-                ):
-                    if new_ind == len(B) - 1:
-                        new_ind = len(B)
-                    inside_mask = mask_inside_trimesh(
-                        observers[prev_ind:new_ind], mesh[prev_ind]
-                    )
-                    # if inside magnet add magnetization vector
-                    B[prev_ind:new_ind][inside_mask] += magnetization[prev_ind:new_ind][
-                        inside_mask
-                    ]
-                    prev_ind = new_ind
+            inside_mask = mask_inside_trimesh_groups(observers, mesh, mesh_id)
+            # if inside magnet add magnetization vector
+            B[inside_mask] += magnetization[inside_mask]
         elif in_out == "inside":
             B += magnetization
         return B
@@ -0,0 +1,376 @@
+"""Batched field computation of many variants of one scene"""
+import numpy as np
+from scipy.spatial.transform import Rotation as R
+
+from magpylib._src.exceptions import MagpylibBadUserInput
+from magpylib._src.exceptions import MagpylibMissingInput
+from magpylib._src.fields.field_compile import prepare_getBH_level2
+from magpylib._src.fields.field_level1 import get_compute_dtype
+from magpylib._src.fields.field_level1 import get_multipole
+from magpylib._src.fields.field_level1 import get_src_dict
+from magpylib._src.fields.field_level1 import get_symmetry
+from magpylib._src.fields.field_level1 import getBH_level1_workers
+from magpylib._src.fields.field_level1 import rotate_back_pixel_field
+from magpylib._src.fields.field_level1 import transform_pixel
+from magpylib._src.input_checks import check_positive_int
+from magpylib._src.input_checks import check_workers
+
+# default maximal number of field evaluations (variant x source x pixel) that are
+# computed in one vectorized step
+BATCH_BLOCK_SIZE = 2**20
+
+
+def get_variable_props(src) -> list:
+    """return the names of the properties of a source that can be varied"""
+    # pylint: disable=protected-access
+    props = ["position", "orientation"]
+    for prop in src._field_func_kwargs_ndim:
+        # `mesh` is derived from vertices and faces, private inputs are internal
+        if prop not in props and prop != "mesh" and hasattr(src, prop):
+            props.append(prop)
+    return props
+
+
+def get_prop_value(src, prop):
+    """return the (static) value of a variable source property as float array"""
+    # pylint: disable=protected-access
+    if prop == "position":
+        return src._position[0]
+    if prop == "orientation":
+        return src._orientation[0].as_quat()
+    return np.array(getattr(src, prop), dtype=float)
+
+
+def check_format_variations(variations, src_list) -> tuple:
+    """
+    Check the variations input of getBH_batch and bring all values to the shape
+    (N, len(src_list), ...) of N variants of each source.
+
+    Returns
+    -------
+    n_var: int, number of variants
+    variations: dict of formatted variations
+    """
+    if not isinstance(variations, dict) or not variations:
+        raise MagpylibBadUserInput(
+            "Input parameter `variations` must be a non-empty dict of property names "
+            f"and arrays of variant values.\nInstead received {variations!r}."
+        )
+    n_src = len(src_list)
+    n_vars = set()
+    formatted = {}
+    for prop, val in variations.items():
+        for src in src_list:
+            if prop not in get_variable_props(src):
+                raise MagpylibBadUserInput(
+                    f"Property {prop!r} of {src} cannot be varied. Variable properties "
+                    f"are {get_variable_props(src)}."
+                )
+        if prop == "orientation" and isinstance(val, R):
+            val = val.as_quat()
+        try:
+            val = np.array(val, dtype=float)
+        except (TypeError, ValueError) as err:
+            raise MagpylibBadUserInput(
+                f"Variations of {prop!r} must be array_like.\nInstead received {val!r}."
+            ) from err
+        shapes = {get_prop_value(src, prop).shape for src in src_list}
+        if len(shapes) != 1:
+            raise MagpylibBadUserInput(
+                f"Property {prop!r} has different shapes {shapes} for the sources of "
+                "the scene and cannot be varied."
+            )
+        shape = shapes.pop()
+        if val.ndim >= 1 and val.shape[1:] == shape:  # same for all sources
+            val = np.broadcast_to(val[:, np.newaxis], (len(val), n_src, *shape))
+        elif val.ndim < 2 or val.shape[1:] != (n_src, *shape):
+            shape_str = "".join(f", {n}" for n in shape)
+            raise MagpylibBadUserInput(
+                f"Variations of {prop!r} must have shape (N{shape_str}) or "
+                f"(N, {n_src}{shape_str}) for N variants of the {n_src} sources.\n"
+                f"Instead received shape {val.shape}."
+            )
+        if prop == "orientation":
+            norm = np.linalg.norm(val, axis=-1)
+            if not np.all(norm > 0):
+                raise MagpylibBadUserInput(
+                    "Variations of 'orientation' must be non-zero quaternions."
+                )
+            val = val / norm[..., np.newaxis]
+        n_vars.add(len(val))
+        formatted[prop] = val
+    if len(n_vars) != 1:
+        raise MagpylibBadUserInput(
+            "Variations of all properties must have the same number of variants.\n"
+            f"Instead received {sorted(n_vars)}."
+        )
+    return n_vars.pop(), formatted
+
+
+def tile_src_dict(src_dict: dict, variations: dict, n_var: int, n_pix: int) -> dict:
+    """
+    Tile the level1 input dict `src_dict` of one scene up to `n_var` variants and
+    replace the varied properties. `variations` hold arrays of shape
+    (n_var, n_group, ...) with the values of the group sources.
+    """
+    kwargs = {}
+    for key, val in src_dict.items():
+        if key in variations:
+            var = variations[key]
+            var = var.reshape((-1, *var.shape[2:]))
+            kwargs[key] = np.repeat(var, n_pix, axis=0)
+        elif key == "orientation":
+            if val is not None and not val.single:
+                val = R.from_quat(np.tile(val.as_quat(), (n_var, 1)))
+            kwargs[key] = val
+        else:
+            kwargs[key] = np.tile(val, (n_var,) + (1,) * (val.ndim - 1))
+    if "orientation" in variations:
+        kwargs["orientation"] = R.from_quat(kwargs["orientation"])
+    return kwargs
+
+
+def getBH_batch_level2(
+    sources, observers, variations, *, field, squeeze, chunksize, workers
+) -> np.ndarray:
+    """Compute the field of many variants of a static scene in one vectorized pass.
+
+    The scene inputs are checked and formatted once, and the level1 input arrays of
+    all variants are built from the ones of the unmodified scene by tiling and
+    replacing the varied properties, without creating objects for the variants.
+
+    Returns
+    -------
+    field: ndarray, shape squeeze((N,K,N1,N2,...,3)), summed field of all sources of
+    N variants at K sensors with N1xN2x.. pixel.
+    """
+    # pylint: disable=protected-access
+    chunksize = check_positive_int(chunksize, "chunksize", allow_None=True)
+    workers = check_workers(workers)
+    setup = prepare_getBH_level2(sources, observers, field=field, pixel_agg=None)
+    src_list, sensors = setup["src_list"], setup["sensors"]
+    for obj in setup["obj_list"]:
+        if len(obj._position) != 1:
+            raise MagpylibBadUserInput(
+                "Batched field computation requires a static scene. Instead "
+                f"{obj} has a path of length {len(obj._position)}."
+            )
+    n_var, variations = check_format_variations(variations, src_list)
+
+    # observer positions of all sensor pixel
+    poso = np.concatenate(
+        [
+            transform_pixel(
+                sens.pixel.reshape(-1, 3),
+                sens._position,
+                sens._orientation.as_quat().reshape(1, 4),
+            )[0]
+            for sens in sensors
+        ]
+    )
+    n_pix = len(poso)
+
+    B = np.zeros((n_var, n_pix, 3))
+    block_size = BATCH_BLOCK_SIZE if chunksize is None else chunksize
+    for field_func, group in setup["field_func_groups"].items():
+        group_srcs, order = group["sources"], group["order"]
+        src_type = type(group_srcs[0])
+        src_dict = get_src_dict(group_srcs, n_pix, n_pix, poso)
+        group_vars = {prop: val[:, order] for prop, val in variations.items()}
+        n_block = max(1, block_size // (len(group_srcs) * n_pix))
+        for start in range(0, n_var, n_block):
+            stop = min(start + n_block, n_var)
+            kwargs = tile_src_dict(
+                src_dict,
+                {prop: val[start:stop] for prop, val in group_vars.items()},
+                stop - start,
+                n_pix,
+            )
+            BH = getBH_level1_workers(
+                field_func=field_func,
+                field=field,
+                workers=workers,
+                dtype=get_compute_dtype(src_type),
+                multipole=get_multipole(src_type),
+                symmetry=get_symmetry(src_type),
+                **kwargs,
+            )
+            if BH is None:
+                raise MagpylibMissingInput(
+                    f"Cannot compute {field}-field because "
+                    f"`field_func` {field_func} has undefined {field}-field computation."
+                )
+            B[start:stop] += BH.reshape(stop - start, len(group_srcs), n_pix, 3).sum(1)
+
+    # field in sensor coordinates
+    B = np.split(B, setup["pix_inds"][1:-1], axis=1)
+    for i, sens in enumerate(sensors):
+        rot = sens._orientation.as_quat().reshape(1, 4)
+        if not np.all(rot[:, :3] == 0):
+            B[i] = rotate_back_pixel_field(B[i][:, np.newaxis], rot)[:, 0]
+    B = np.stack(B, axis=1).reshape((n_var, len(sensors), *setup["pix_shapes"][0]))
+
+    if squeeze:
+        return np.squeeze(B)
+    return B
+
+
+def getB_batch(
+    sources=None,
+    observers=None,
+    variations=None,
+    *,
+    squeeze=True,
+    chunksize=None,
+    workers=None,
+):
+    """Compute the B-field in units of mT of many variants of a static scene, e.g. for
+    tolerance and Monte-Carlo analyses.
+
+    The variants differ from the scene given by `sources` only in the properties given
+    in `variations`. All variants are computed in one vectorized pass, without
+    creating copies of the source objects.
+
+    Parameters
+    ----------
+    sources: source and collection objects or 1D list thereof
+        Sources of the scene. The field of all sources is summed up. Sources must not
+        have a path.
+
+    observers: array_like or (list of) `Sensor` objects
+        Can be array_like positions of shape (n1, n2, ..., 3) where the field
+        should be evaluated, a `Sensor` object with pixel shape (n1, n2, ..., 3) or a list
+        of such sensor objects (must all have similar pixel shapes). All positions
+        are given in units of mm. Sensors must not have a path.
+
+    variations: dict
+        Property names as keys and arrays of N variant values as values. Variable are
+        `'position'`, `'orientation'` (`scipy.spatial.transform.Rotation` object or
+        quaternions) and the excitation and dimension properties of the sources (e.g.
+        `'magnetization'`, `'dimension'`, `'diameter'`, `'current'`, `'moment'`,
+        `'vertices'`). With shape (N, ...) the same value is given to all sources, and
+        with shape (N, l, ...) each of the l sources of the flattened scene gets its
+        own value. Positions and orientations are global.
+
+    squeeze: bool, default=`True`
+        If `True`, the output is squeezed, i.e. all axes of length 1 in the output (e.g.
+        only a single sensor) are eliminated.
+
+    chunksize: int, default=`None`
+        Maximal number of field evaluations (variant x source x pixel) that are
+        computed in one vectorized step. By default steps of up to 2**20 evaluations are
+        computed.
+
+    workers: int, default=`None`
+        Number of threads among which each vectorized computation step is split. With
+        `-1` all available CPU cores are used. By default the value of
+        `magpylib.defaults.compute.workers` is used (1 unless changed).
+
+    Returns
+    -------
+    B-field: ndarray, shape squeeze(N, k, n1, n2, ..., 3)
+        Summed B-field of all sources of the N variants at each sensor (k) and each
+        sensor pixel position (n1, n2, ...) in units of mT.
+
+    Examples
+    --------
+    B-field of a cuboid magnet with three variants of its magnetization and dimension:
+
+    >>> import magpylib as magpy
+    >>> cube = magpy.magnet.Cuboid((0,0,1000), (1,1,1))
+    >>> variations = {
+    ...     'magnetization': [(0,0,1000), (0,0,1010), (0,0,990)],
+    ...     'dimension': [(1,1,1), (1,1,1.01), (1,1,1)],
+    ... }
+    >>> B = magpy.getB_batch(cube, (0,0,1), variations)
+    >>> print(B.round(3))
+    [[  0.      0.    134.782]
+     [  0.      0.    138.192]
+     [  0.      0.    133.435]]
+    """
+    return getBH_batch_level2(
+        sources,
+        observers,
+        variations,
+        field="B",
+        squeeze=squeeze,
+        chunksize=chunksize,
+        workers=workers,
+    )
+
+
+def getH_batch(
+    sources=None,
+    observers=None,
+    variations=None,
+    *,
+    squeeze=True,
+    chunksize=None,
+    workers=None,
+):
+    """Compute the H-field in units of kA/m of many variants of a static scene, e.g.
+    for tolerance and Monte-Carlo analyses.
+
+    The variants differ from the scene given by `sources` only in the properties given
+    in `variations`. All variants are computed in one vectorized pass, without
+    creating copies of the source objects.
+
+    Parameters
+    ----------
+    sources: source and collection objects or 1D list thereof
+        Sources of the scene. The field of all sources is summed up. Sources must not
+        have a path.
+
+    observers: array_like or (list of) `Sensor` objects
+        Can be array_like positions of shape (n1, n2, ..., 3) where the field
+        should be evaluated, a `Sensor` object with pixel shape (n1, n2, ..., 3) or a list
+        of such sensor objects (must all have similar pixel shapes). All positions
+        are given in units of mm. Sensors must not have a path.
+
+    variations: dict
+        Property names as keys and arrays of N variant values as values, see
+        `getB_batch`.
+
+    squeeze: bool, default=`True`
+        If `True`, the output is squeezed, i.e. all axes of length 1 in the output (e.g.
+        only a single sensor) are eliminated.
+
+    chunksize: int, default=`None`
+        Maximal number of field evaluations (variant x source x pixel) that are
+        computed in one vectorized step. By default steps of up to 2**20 evaluations are
+        computed.
+
+    workers: int, default=`None`
+        Number of threads among which each vectorized computation step is split. With
+        `-1` all available CPU cores are used. By default the value of
+        `magpylib.defaults.compute.workers` is used (1 unless changed).
+
+    Returns
+    -------
+    H-field: ndarray, shape squeeze(N, k, n1, n2, ..., 3)
+        Summed H-field of all sources of the N variants at each sensor (k) and each
+        sensor pixel position (n1, n2, ...) in units of kA/m.
+
+    Examples
+    --------
+    H-field of a current loop at two observer positions for two currents:
+
+    >>> import magpylib as magpy
+    >>> loop = magpy.current.Loop(current=1, diameter=2)
+    >>> H = magpy.getH_batch(loop, [(0,0,0), (0,0,1)], {'current': [1, 2]})
+    >>> print(H.round(3))
+    [[[0.    0.    0.5  ]
+      [0.    0.    0.177]]
+    <BLANKLINE>
+     [[0.    0.    1.   ]
+      [0.    0.    0.354]]]
+    """
+    return getBH_batch_level2(
+        sources,
+        observers,
+        variations,
+        field="H",
+        squeeze=squeeze,
+        chunksize=chunksize,
+        workers=workers,
+    )
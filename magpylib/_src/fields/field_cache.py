@@ -0,0 +1,102 @@
+"""Result cache of the object oriented field computation"""
+# pylint: disable=import-outside-toplevel
+# pylint: disable=cyclic-import
+from collections import namedtuple
+from collections import OrderedDict
+from hashlib import blake2b
+
+import numpy as np
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class ResultCache:
+    """Least recently used (LRU) store of field computation results, bounded by the
+    total memory of the stored results in bytes."""
+
+    def __init__(self):
+        self._store = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.currsize = 0
+
+    def get(self, key):
+        """return a copy of the stored result for `key` or None"""
+        result = self._store.get(key, None)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._store.move_to_end(key)
+        return result.copy()
+
+    def put(self, key, result, maxsize):
+        """store a copy of `result`, then drop least recently used results until the
+        stored memory is below `maxsize` bytes"""
+        result = result.copy()
+        self._store[key] = result
+        self.currsize += result.nbytes
+        self.trim(maxsize)
+
+    def trim(self, maxsize):
+        """drop least recently used results until the stored memory is below `maxsize`
+        bytes"""
+        while self.currsize > maxsize:
+            _, result = self._store.popitem(last=False)
+            self.currsize -= result.nbytes
+
+    def clear(self):
+        """drop all stored results and reset the statistics"""
+        self._store.clear()
+        self.hits = 0
+        self.misses = 0
+        self.currsize = 0
+
+    def __len__(self):
+        return len(self._store)
+
+
+RESULT_CACHE = ResultCache()
+
+
+def get_input_key(inp):
+    """Return a hashable key describing the state of a sources or observers input.
+    Magpylib objects are described by their identity and state version, arrays by
+    their content. Returns None if the input contains objects with a user defined
+    field function, the state of which cannot be tracked."""
+    # pylint: disable=protected-access
+    from magpylib._src.obj_classes.class_BaseGeo import BaseGeo
+
+    if isinstance(inp, BaseGeo):
+        if getattr(inp, "_editable_field_func", False):
+            return None
+        key = ("obj", id(inp), inp._version)
+        children = getattr(inp, "_children", None)  # Collection
+        if children is not None:
+            child_keys = tuple(get_input_key(child) for child in children)
+            if None in child_keys:
+                return None
+            key += child_keys
+        return key
+
+    if isinstance(inp, (list, tuple)):
+        try:  # plain positions are hashed as a whole
+            inp = np.array(inp, dtype=float)
+        except (TypeError, ValueError):
+            keys = tuple(get_input_key(i) for i in inp)
+            return None if None in keys else ("seq", *keys)
+
+    arr = np.asarray(inp)
+    if arr.dtype == object:
+        return None
+    return ("arr", arr.shape, arr.dtype.str, blake2b(arr.tobytes()).digest())
+
+
+def get_cache_key(sources, observers, **params):
+    """Return a hashable key of a getBH_level2 call, or None if the call cannot be
+    cached."""
+    src_key = get_input_key(sources)
+    obs_key = get_input_key(observers)
+    if src_key is None or obs_key is None:
+        return None
+    return (src_key, obs_key, *sorted(params.items()))
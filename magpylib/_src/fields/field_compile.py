@@ -0,0 +1,570 @@
+"""Object oriented field computation split into a preparation of the object graph
+and an evaluation of the current object states, and compiled field evaluators
+built on it"""
+# pylint: disable=cyclic-import
+import warnings
+
+import numpy as np
+
+from magpylib._src.exceptions import MagpylibBadUserInput
+from magpylib._src.exceptions import MagpylibMissingInput
+from magpylib._src.fields.field_level1 import get_cached
+from magpylib._src.fields.field_level1 import get_path_window
+from magpylib._src.fields.field_level1 import get_tree_sets
+from magpylib._src.fields.field_level1 import getBH_group
+from magpylib._src.fields.field_level1 import getBH_group_chunked
+from magpylib._src.fields.field_level1 import getBH_tree_set
+from magpylib._src.fields.field_level1 import rotate_back_pixel_field
+from magpylib._src.fields.field_level1 import split_static_sources
+from magpylib._src.fields.field_level1 import transform_pixel
+from magpylib._src.fields.field_pixel_agg import aggregate_pixel
+from magpylib._src.fields.field_pixel_agg import FUSED_PIXEL_AGG
+from magpylib._src.fields.field_pixel_agg import get_pixel_weights
+from magpylib._src.fields.field_pixel_agg import PixelAggregator
+from magpylib._src.fields.field_pixel_agg import WEIGHTED_PIXEL_AGG
+from magpylib._src.fields.field_table import getBH_table
+from magpylib._src.input_checks import check_dimensions
+from magpylib._src.input_checks import check_excitations
+from magpylib._src.input_checks import check_format_input_observers
+from magpylib._src.input_checks import check_format_pixel_agg
+from magpylib._src.input_checks import check_getBH_output_type
+from magpylib._src.input_checks import check_workers
+from magpylib._src.utility import format_obj_input
+from magpylib._src.utility import format_src_inputs
+
+
+def prepare_getBH_level2(sources, observers, *, field, pixel_agg) -> dict:
+    """Check and format the object oriented inputs of getBH_level2.
+
+    Everything computed here only depends on the object graph (which sources,
+    collections and sensors are involved), and not on the object states (paths,
+    excitations, dimensions, ...). The returned setup dict can therefore be reused
+    for repeated evaluations of an unchanged scene.
+
+    Returns
+    -------
+    setup: dict with formatted sources, sensors, pixel information and source groups.
+    """
+    # pylint: disable=import-outside-toplevel
+    from magpylib._src.obj_classes.class_Collection import Collection
+    from magpylib._src.obj_classes.class_magnet_TriangularMesh import TriangularMesh
+
+    # format sources input:
+    #   input: allow only one bare src object or a 1D list/tuple of src and col
+    #   out: sources = ordered list of sources
+    #   out: src_list = ordered list of sources with flattened collections
+    sources, src_list = format_src_inputs(sources)
+
+    # test if all source dimensions and excitations are initialized
+    check_dimensions(src_list)
+    check_excitations(src_list)
+
+    # make sure that TriangularMesh sources have a closed mesh when getB is called - warn if not
+    if field == "B":
+        for src in src_list:
+            if isinstance(src, TriangularMesh):
+                # unchecked mesh status - may be open
+                if src.status_open is None:
+                    warnings.warn(
+                        f"Unchecked mesh status of {src} detected before B-field computation. "
+                        "An open mesh may return bad results."
+                    )
+                elif src.status_open:  # mesh is open
+                    warnings.warn(
+                        f"Open mesh of {src} detected before B-field computation. "
+                        "An open mesh may return bad results."
+                    )
+
+    # format observers input:
+    #   allow only bare sensor, collection, pos_vec or list thereof
+    #   transform input into an ordered list of sensors (pos_vec->pixel)
+    #   check if all pixel shapes are similar - or else if pixel_agg is given
+    pixel_agg_func = check_format_pixel_agg(pixel_agg)
+    sensors, pix_shapes = check_format_input_observers(observers, pixel_agg)
+    pix_nums = [
+        int(np.prod(ps[:-1])) for ps in pix_shapes
+    ]  # number of pixel for each sensor
+    pix_inds = np.cumsum([0] + pix_nums)  # cumulative indices of pixel for each sensor
+
+    # number of flattened sources of each Collection (collections are summed up)
+    col_lens = {
+        src_ind: len(format_obj_input(src, allow="sources"))
+        for src_ind, src in enumerate(sources)
+        if isinstance(src, Collection)
+    }
+
+    # group similar source types----------------------------------------------
+    field_func_groups = {}
+    for ind, src in enumerate(src_list):
+        group_key = src.field_func
+        if group_key is None:
+            raise MagpylibMissingInput(
+                f"Cannot compute {field}-field because "
+                f"`field_func` of {src} has undefined {field}-field computation."
+            )
+        if group_key not in field_func_groups:
+            field_func_groups[group_key] = {
+                "sources": [],
+                "order": [],
+            }
+        field_func_groups[group_key]["sources"].append(src)
+        field_func_groups[group_key]["order"].append(ind)
+
+    return {
+        "sources": sources,
+        "src_list": src_list,
+        "sensors": sensors,
+        # unique obj entries only !!!
+        "obj_list": list(dict.fromkeys(src_list + sensors)),
+        "pixel_agg_func": pixel_agg_func,
+        "pix_shapes": pix_shapes,
+        "pix_nums": pix_nums,
+        "pix_inds": pix_inds,
+        "pix_all_same": len(set(pix_shapes)) == 1,
+        "col_lens": col_lens,
+        "field_func_groups": field_func_groups,
+    }
+
+
+def evaluate_getBH_level2(
+    setup,
+    *,
+    field,
+    sumup,
+    squeeze,
+    pixel_agg,
+    output,
+    chunksize=None,
+    workers=None,
+    path_window=None,
+    cache=None,
+) -> np.ndarray:
+    """Compute field from a setup dict generated by `prepare_getBH_level2`.
+
+    Object paths, excitations and dimensions are read from the objects at call time.
+    When a `cache` dict is given, tiled input arrays that did not change since the
+    last call with the same cache are reused. With `chunksize`, the computation is
+    split into blocks of at most `chunksize` instances (cache is not used). The
+    instances of each vectorized step are split among `workers` threads. With
+    `path_window=(start, stop)` only the path indices start to stop are computed.
+    """
+    # pylint: disable=protected-access
+    # pylint: disable=too-many-branches
+    # pylint: disable=too-many-statements
+    # pylint: disable=too-many-locals
+    workers = check_workers(workers)
+    sources = setup["sources"]
+    src_list = setup["src_list"]
+    sensors = setup["sensors"]
+    pixel_agg_func = setup["pixel_agg_func"]
+    pix_shapes = setup["pix_shapes"]
+    pix_nums = setup["pix_nums"]
+    pix_inds = setup["pix_inds"]
+
+    # some important quantities -------------------------------------------------
+    num_of_sources = len(sources)
+    num_of_src_list = len(src_list)
+    num_of_sensors = len(sensors)
+
+    # tile up paths -------------------------------------------------------------
+    #   all obj paths that are shorter than max-length are filled up with the last
+    #   position/orientation of the object (static paths). Paths are padded on
+    #   copies, the objects themselves are not modified.
+    if path_window is None:
+        start, stop = 0, max(len(obj._position) for obj in setup["obj_list"])
+    else:
+        start, stop = path_window
+    max_path_len = stop - start
+    sens_paths = [get_path_window(sens, start, stop) for sens in sensors]
+
+    # check which sensors have unit rotation
+    #   so that they dont have to be rotated back later (performance issue)
+    unitQ = np.array([0, 0, 0, 1.0])
+    unrotated_sensors = [np.all(rot == unitQ) for _, rot in sens_paths]
+
+    # check which sensors have a static orientation
+    #   either static sensor or translation path
+    static_sensor_rot = [np.all(rot == rot[0]) for _, rot in sens_paths]
+
+    # combine information form all sensors to generate pos_obs with-------------
+    #   shape (m * concat all sens flat pixel, 3)
+    #   allows sensors with different pixel shapes <- relevant?
+    def build_poso():
+        poso = [
+            transform_pixel(sens.pixel.reshape(-1, 3), pos, rot)
+            for sens, (pos, rot) in zip(sensors, sens_paths)
+        ]
+        return np.concatenate(poso, axis=1).reshape(-1, 3)
+
+    n_pix = pix_inds[-1]
+
+    # fused pixel aggregation --------------------------------------------------
+    #   with chunksize, the pixel field of each sensor is reduced block by block as
+    #   it is computed, so that the field of all pixel is never stored.
+    fused_agg = chunksize is not None and pixel_agg in FUSED_PIXEL_AGG
+    pix_weights = [None] * num_of_sensors
+    if pixel_agg in WEIGHTED_PIXEL_AGG:
+        pix_weights = [get_pixel_weights(sens) for sens in sensors]
+
+    # static observers (all sensors with static path windows) -------------------
+    #   the field of sources with static path windows is then the same for all path
+    #   steps. It is computed only for the first one and broadcast along the path.
+    static_observers = max_path_len > 1 and all(
+        np.all(pos == pos[0]) and static_rot
+        for (pos, _), static_rot in zip(sens_paths, static_sensor_rot)
+    )
+
+    def group_parts(group):
+        if static_observers:
+            return split_static_sources(group["sources"], group["order"], start, stop)
+        return [(group["sources"], group["order"], False)]
+
+    # treecode evaluation of large sets of summed sources -----------------------
+    #   the sources of these sets are removed from the groups and their summed field
+    #   is added to the output row of the set.
+    tree_sets = get_tree_sets(setup, sumup, pixel_agg)
+    field_func_groups = setup["field_func_groups"]
+    if tree_sets:
+        tree_inds = {i for _, inds in tree_sets for i in inds}
+        field_func_groups = {}
+        for field_func, group in setup["field_func_groups"].items():
+            keep = [i for i, ind in enumerate(group["order"]) if ind not in tree_inds]
+            if keep:
+                field_func_groups[field_func] = {
+                    "sources": [group["sources"][i] for i in keep],
+                    "order": [group["order"][i] for i in keep],
+                }
+
+    def add_tree_field(B, poso_steps):
+        for out_ind, inds in tree_sets:
+            B[out_ind] += getBH_tree_set(
+                field, [src_list[i] for i in inds], poso_steps, start
+            )
+
+    # evaluate each group in one vectorized step -------------------------------
+    sumup_direct = False
+    if chunksize is None:
+        sens_state = [arr for path in sens_paths for arr in path]
+        sens_state += [sens.pixel for sens in sensors]
+        poso = get_cached(cache, "observers", sens_state, build_poso)
+        B = np.empty((num_of_src_list, max_path_len, n_pix, 3))  # allocate B
+        if tree_sets:
+            B[list(tree_inds)] = 0
+        for field_func, group in field_func_groups.items():
+            for gr, order, is_static in group_parts(group):
+                cache_grp = None
+                if cache is not None:
+                    cache_grp = cache.setdefault(
+                        (field_func, is_static, bool(tree_sets)), {}
+                    )
+                B_group = getBH_group(
+                    field_func=field_func,
+                    field=field,
+                    group=gr,
+                    poso=poso[:n_pix] if is_static else poso,
+                    n_pix=n_pix,
+                    workers=workers,
+                    start=start,
+                    cache=cache_grp,
+                )
+                for gr_ind, src_ind in enumerate(order):
+                    # put into dedicated positions in B, static results are
+                    # broadcast along the path
+                    B[src_ind] = B_group[gr_ind]
+
+        # reshape output ------------------------------------------------------------
+        # rearrange B when there is at least one Collection with more than one source
+        if num_of_src_list > num_of_sources:
+            for src_ind, col_len in setup["col_lens"].items():
+                # set B[i] to sum of slice
+                B[src_ind] = np.sum(B[src_ind : src_ind + col_len], axis=0)
+                B = np.delete(
+                    B, np.s_[src_ind + 1 : src_ind + col_len], 0
+                )  # delete remaining part of slice
+        add_tree_field(B, poso.reshape((max_path_len, n_pix, 3)))
+
+    # evaluate each group in blocks of at most `chunksize` instances ------------
+    #   block results are accumulated directly into the allocated output, collection
+    #   children into the position of their collection, and with sumup (when there is
+    #   no pixel aggregation that must be applied first) all sources into one.
+    else:
+        sumup_direct = sumup and pixel_agg is None
+        out_inds = np.repeat(
+            np.arange(num_of_sources),
+            [setup["col_lens"].get(i, 1) for i in range(num_of_sources)],
+        )
+        if sumup_direct:
+            out_inds[:] = 0
+        n_out = out_inds[-1] + 1
+
+        def getBH_chunked(poso_steps):
+            """field of all sources at observers of shape (M, N, 3)"""
+            B = np.zeros((n_out, max_path_len, poso_steps.shape[1], 3))  # allocate B
+            B_static = None  # results of static sources, broadcast along the path
+            for field_func, group in field_func_groups.items():
+                for gr, order, is_static in group_parts(group):
+                    if is_static and B_static is None:
+                        B_static = np.zeros((n_out, 1, poso_steps.shape[1], 3))
+                    getBH_group_chunked(
+                        field_func=field_func,
+                        field=field,
+                        group=gr,
+                        poso=poso_steps[:1] if is_static else poso_steps,
+                        out=B_static if is_static else B,
+                        out_inds=out_inds[order],
+                        chunksize=chunksize,
+                        workers=workers,
+                        start=start,
+                    )
+            if B_static is not None:
+                B += B_static
+            add_tree_field(B, poso_steps)
+            return B
+
+        if fused_agg:
+            # pixel blocks of at most `chunksize` field values for all sources
+            n_pix_c = max(1, chunksize // (n_out * max_path_len))
+            B = np.empty((n_out, max_path_len, num_of_sensors, 3))
+            for sens_ind, (sens, (pos, rot)) in enumerate(zip(sensors, sens_paths)):
+                pixel = sens.pixel.reshape(-1, 3)
+                weights = pix_weights[sens_ind]
+                aggregator = PixelAggregator(pixel_agg, (n_out, max_path_len, 3))
+                for p0 in range(0, len(pixel), n_pix_c):
+                    p1 = min(p0 + n_pix_c, len(pixel))
+                    B_part = getBH_chunked(transform_pixel(pixel[p0:p1], pos, rot))
+                    if not unrotated_sensors[sens_ind]:
+                        B_part = rotate_back_pixel_field(B_part, rot)
+                    aggregator.update(
+                        B_part, None if weights is None else weights[p0:p1]
+                    )
+                B[:, :, sens_ind] = aggregator.result()
+        else:
+            B = getBH_chunked(build_poso().reshape((max_path_len, n_pix, 3)))
+
+    # apply sensor rotations (after summation over collections to reduce rot.apply operations)
+    for sens_ind, (_, sens_rot) in enumerate(sens_paths):  # cycle through all sensors
+        if (
+            not unrotated_sensors[sens_ind] and not fused_agg
+        ):  # apply operations only to rotated sensors
+            # rotate in path blocks to limit memory when chunksize is given
+            path_step = max_path_len
+            if chunksize is not None:
+                path_step = max(1, chunksize // (len(B) * pix_nums[sens_ind]))
+            for m0 in range(0, max_path_len, path_step):
+                m1 = min(m0 + path_step, max_path_len)
+                # select part where rot is applied and overwrite it in B
+                pix_slice = slice(pix_inds[sens_ind], pix_inds[sens_ind + 1])
+                B[:, m0:m1, pix_slice] = rotate_back_pixel_field(
+                    B[:, m0:m1, pix_slice], sens_rot[m0:m1]
+                )
+
+    # rearrange sensor-pixel shape
+    if fused_agg:
+        pass  # pixel are already aggregated
+    elif any(w is not None for w in pix_weights):
+        # weighted aggregation of the pixel of each sensor
+        B = np.stack(
+            [
+                aggregate_pixel(B[:, :, pix_inds[i] : pix_inds[i + 1]], pixel_agg, w)
+                for i, w in enumerate(pix_weights)
+            ],
+            axis=2,
+        )
+    elif setup["pix_all_same"]:
+        B = B.reshape((len(B), max_path_len, num_of_sensors, *pix_shapes[0]))
+        # aggregate pixel values
+        if pixel_agg is not None:
+            B = pixel_agg_func(B, axis=tuple(range(3 - B.ndim, -1)))
+    else:  # pixel_agg is not None when pix_all_same, checked with
+        Bsplit = np.split(B, pix_inds[1:-1], axis=2)
+        Bagg = [np.expand_dims(pixel_agg_func(b, axis=2), axis=2) for b in Bsplit]
+        B = np.concatenate(Bagg, axis=2)
+
+    # sumup over sources
+    if sumup and not sumup_direct:
+        B = np.sum(B, axis=0, keepdims=True)
+
+    output = check_getBH_output_type(output)
+
+    if output != "ndarray":
+        if sumup and len(sources) > 1:
+            src_ids = [f"sumup ({len(sources)})"]
+        else:
+            src_ids = [s.style.label if s.style.label else f"{s}" for s in sources]
+        sens_ids = [s.style.label if s.style.label else f"{s}" for s in sensors]
+        num_of_pixels = np.prod(pix_shapes[0][:-1]) if pixel_agg is None else 1
+        return getBH_table(
+            B.reshape(len(B), stop - start, num_of_sensors, num_of_pixels, 3),
+            field=field,
+            output=output,
+            src_ids=src_ids,
+            path_range=range(start, stop),
+            sens_ids=sens_ids,
+        )
+
+    # reduce all size-1 levels
+    if squeeze:
+        B = np.squeeze(B)
+    elif pixel_agg is not None:
+        # add missing dimension since `pixel_agg` reduces pixel
+        # dimensions to zero. Only needed if `squeeze is False``
+        B = np.expand_dims(B, axis=-2)
+
+    return B
+
+
+class CompiledField:
+    """Reusable field evaluator for an unchanged scene, see `magpylib.compile`.
+
+    The object graph (which sources, collections and sensors are involved) is
+    formatted and checked once at construction. At each call only the object states
+    (paths, excitations, dimensions, pixel) are read, and input arrays of the
+    vectorized computation are only rebuilt for the parts that have changed.
+    """
+
+    def __init__(
+        self, sources, observers, *, field, sumup, squeeze, pixel_agg, output, workers
+    ):
+        if isinstance(sources, str):
+            raise MagpylibBadUserInput(
+                "Compiled field evaluation is only available for the object oriented "
+                "interface. Input parameter `sources` must not be a string."
+            )
+        if field not in ("B", "H"):
+            raise MagpylibBadUserInput(
+                f"Input parameter `field` must be one of ('B', 'H').\n"
+                f"Instead received {field!r}."
+            )
+        self._params = {
+            "field": field,
+            "sumup": sumup,
+            "squeeze": squeeze,
+            "pixel_agg": pixel_agg,
+            "output": check_getBH_output_type(output),
+            "workers": workers if workers is None else check_workers(workers),
+        }
+        self._setup = prepare_getBH_level2(
+            sources, observers, field=field, pixel_agg=pixel_agg
+        )
+        self._cache = {}
+
+    @property
+    def field(self):
+        """Computed field, one of `('B', 'H')`."""
+        return self._params["field"]
+
+    def __call__(self):
+        """Compute the field for the current state of the compiled scene. The output
+        is identical to the one of `getB`/`getH` with the same inputs."""
+        return evaluate_getBH_level2(self._setup, cache=self._cache, **self._params)
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(field={self.field!r}, "
+            f"sources={len(self._setup['src_list'])}, "
+            f"sensors={len(self._setup['sensors'])})"
+        )
+
+    def clear_cache(self):
+        """Drop all stored input arrays. They are rebuilt at the next call."""
+        self._cache = {}
+
+
+def compile(  # pylint: disable=redefined-builtin
+    sources=None,
+    observers=None,
+    field="B",
+    sumup=False,
+    squeeze=True,
+    pixel_agg=None,
+    output="ndarray",
+    workers=None,
+):
+    """Compile a reusable field evaluator for repeated `getB`/`getH` calls on an
+    unchanged scene.
+
+    Input formatting, input checks and source grouping of `getB`/`getH` are performed
+    only once. Calling the returned evaluator then reads the current object paths,
+    excitations and dimensions and recomputes the field, rebuilding only the
+    vectorized input arrays that have changed since the last call.
+
+    Parameters
+    ----------
+    sources: source and collection objects or 1D list thereof
+        Sources that generate the magnetic field. Can be a single source (or collection)
+        or a 1D list of l source and/or collection objects.
+
+    observers: array_like or (list of) `Sensor` objects
+        Can be array_like positions of shape (n1, n2, ..., 3) where the field
+        should be evaluated, a `Sensor` object with pixel shape (n1, n2, ..., 3) or a list
+        of such sensor objects (must all have similar pixel shapes). All positions
+        are given in units of mm.
+
+    field: str, default=`'B'`
+        If `field='B'` the evaluator computes the B-field in units of mT, if `field='H'`
+        the H-field in units of kA/m.
+
+    sumup: bool, default=`False`
+        If `True`, the fields of all sources are summed up.
+
+    squeeze: bool, default=`True`
+        If `True`, the output is squeezed, i.e. all axes of length 1 in the output (e.g. only
+        a single sensor or only a single source) are eliminated.
+
+    pixel_agg: str, default=`None`
+        Reference to a compatible numpy aggregator function like `'min'` or `'mean'`,
+        which is applied to observer output values, e.g. mean of all sensor pixel outputs.
+        With this option, observers input with different (pixel) shapes is allowed.
+
+    output: str, default='ndarray'
+        Output type, which must be one of `('ndarray', 'dataframe',
+        'dataframe_multiindex', 'arrow')`. By default a `numpy.ndarray` object is
+        returned. If 'dataframe' is chosen, a `pandas.DataFrame` object with 'source',
+        'path', 'sensor' and 'pixel' columns is returned (the Pandas library must be
+        installed). With 'dataframe_multiindex' these columns form a
+        `pandas.MultiIndex`, and with 'arrow' a `pyarrow.Table` with dictionary encoded
+        'source' and 'sensor' columns is returned (the PyArrow library must be
+        installed).
+
+    workers: int, default=`None`
+        Number of threads among which each vectorized computation step is split. With
+        `-1` all available CPU cores are used. By default the value of
+        `magpylib.defaults.compute.workers` at call time is used.
+
+    Returns
+    -------
+    evaluator: `CompiledField` object
+        Callable without arguments, returning the same output as `getB`/`getH` for
+        the current state of the scene.
+
+    Notes
+    -----
+    Changes of the object states (e.g. `move`, `rotate`, new `magnetization` or
+    `dimension`) are taken into account at every call. Changes of the object graph
+    itself (e.g. adding children to a collection or changing sensor pixel shapes)
+    are not, in which case a new evaluator must be compiled.
+
+    Examples
+    --------
+    Repeated field computation of a magnet with changing magnetization:
+
+    >>> import magpylib as magpy
+    >>> src = magpy.magnet.Cuboid(magnetization=(0,0,100), dimension=(1,1,1))
+    >>> sens = magpy.Sensor(position=(0,0,1))
+    >>> fieldB = magpy.compile(src, sens)
+    >>> print(fieldB())
+    [ 0.          0.         13.47823862]
+    >>> src.magnetization = (0,0,200)
+    >>> print(fieldB())
+    [ 0.          0.         26.95647725]
+    """
+    return CompiledField(
+        sources,
+        observers,
+        field=field,
+        sumup=sumup,
+        squeeze=squeeze,
+        pixel_agg=pixel_agg,
+        output=output,
+        workers=workers,
+    )
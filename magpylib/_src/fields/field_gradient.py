@@ -0,0 +1,227 @@
+"""Field gradient (Jacobian) computation"""
+import numpy as np
+from scipy.spatial.transform import Rotation as R
+
+from magpylib._src.exceptions import MagpylibMissingInput
+from magpylib._src.fields.field_BH_gradient import field_gradient_stencil
+from magpylib._src.fields.field_compile import prepare_getBH_level2
+from magpylib._src.fields.field_level1 import get_path_window
+from magpylib._src.fields.field_level1 import get_src_dict
+from magpylib._src.fields.field_level1 import transform_pixel
+
+
+def getGradBH_level1(
+    *,
+    field_func,
+    gradient_func,
+    field: str,
+    position: np.ndarray,
+    orientation,
+    observers: np.ndarray,
+    **kwargs: dict,
+) -> np.ndarray:
+    """Vectorized field gradient computation
+
+    - applies spatial transformations global CS <-> source CS
+    - evaluates the analytical gradient function `gradient_func` of the source type,
+      or central differences of `field_func` if it is None
+
+    Returns
+    -------
+    gradient: ndarray, shape (N,3,3), G[:, i, j] = dB_i/dx_j in the global CS
+    """
+    pos_rel_rot = observers - position
+    if orientation is not None:
+        pos_rel_rot = orientation.apply(pos_rel_rot, inverse=True)
+
+    if gradient_func is not None:
+        grad = gradient_func(field, pos_rel_rot, **kwargs)
+    else:
+        grad = field_gradient_stencil(field_func, field, pos_rel_rot, **kwargs)
+
+    # transform gradient back into global CS, G_glob = R G R^T
+    if grad is not None:  # catch non-implemented field_func a level above
+        if orientation is not None:
+            mat = orientation.as_matrix()
+            grad = mat @ grad @ np.swapaxes(mat, -1, -2)
+        grad = grad + 0.0  # no signed zeros
+    return grad
+
+
+def getGradBH_level2(sources, observers, *, field, sumup, squeeze) -> np.ndarray:
+    """Compute the field gradient of the sources at the observers, see `getGradB`.
+
+    Returns
+    -------
+    gradient: ndarray, shape squeeze(l, m, k, n1, n2, ..., 3, 3)
+    """
+    # pylint: disable=protected-access
+    setup = prepare_getBH_level2(sources, observers, field=field, pixel_agg=None)
+    src_list, sensors = setup["src_list"], setup["sensors"]
+    pix_inds = setup["pix_inds"]
+    n_pix = pix_inds[-1]
+
+    max_path_len = max(len(obj._position) for obj in setup["obj_list"])
+    sens_paths = [get_path_window(sens, 0, max_path_len) for sens in sensors]
+    poso = np.concatenate(
+        [
+            transform_pixel(sens.pixel.reshape(-1, 3), pos, rot)
+            for sens, (pos, rot) in zip(sensors, sens_paths)
+        ],
+        axis=1,
+    ).reshape(-1, 3)
+
+    G = np.empty((len(src_list), max_path_len, n_pix, 3, 3))
+    for field_func, group in setup["field_func_groups"].items():
+        group_srcs = group["sources"]
+        grad = getGradBH_level1(
+            field_func=field_func,
+            gradient_func=type(group_srcs[0])._field_func_gradient,
+            field=field,
+            **get_src_dict(group_srcs, n_pix, len(poso), poso),
+        )
+        if grad is None:
+            raise MagpylibMissingInput(
+                f"Cannot compute {field}-field gradient because "
+                f"`field_func` {field_func} has undefined {field}-field computation."
+            )
+        G[group["order"]] = grad.reshape(len(group_srcs), max_path_len, n_pix, 3, 3)
+
+    # sum up collections
+    if len(src_list) > len(setup["sources"]):
+        for src_ind, col_len in setup["col_lens"].items():
+            G[src_ind] = np.sum(G[src_ind : src_ind + col_len], axis=0)
+            G = np.delete(G, np.s_[src_ind + 1 : src_ind + col_len], 0)
+
+    # gradient in sensor coordinates, G_sens = R^T G R
+    for sens_ind, (_, rot) in enumerate(sens_paths):
+        if not np.all(rot[:, :3] == 0):
+            mat = R.from_quat(rot).as_matrix()[:, np.newaxis]
+            pix_slice = slice(pix_inds[sens_ind], pix_inds[sens_ind + 1])
+            G[:, :, pix_slice] = np.swapaxes(mat, -1, -2) @ G[:, :, pix_slice] @ mat
+
+    G = G.reshape((len(G), max_path_len, len(sensors), *setup["pix_shapes"][0], 3))
+    if sumup:
+        G = np.sum(G, axis=0, keepdims=True)
+    if squeeze:
+        return np.squeeze(G)
+    return G
+
+
+def getGradB(sources=None, observers=None, sumup=False, squeeze=True):
+    """Compute the B-field gradient (Jacobian) in units of mT/mm for given sources and
+    observers.
+
+    The gradient is computed from closed-form expressions for `Dipole`, `Sphere`,
+    `Cuboid`, `Loop` and `Line` sources. For all other sources it is approximated by
+    central differences of the field with a step of 1e-5 times the observer distance
+    from the source, which is less accurate close to the source surfaces.
+
+    Parameters
+    ----------
+    sources: source and collection objects or 1D list thereof
+        Sources that generate the magnetic field. Can be a single source (or collection)
+        or a 1D list of l source and/or collection objects.
+
+    observers: array_like or (list of) `Sensor` objects
+        Can be array_like positions of shape (n1, n2, ..., 3) where the field gradient
+        should be evaluated, a `Sensor` object with pixel shape (n1, n2, ..., 3) or a
+        list of such sensor objects (must all have similar pixel shapes). All positions
+        are given in units of mm.
+
+    sumup: bool, default=`False`
+        If `True`, the field gradients of all sources are summed up.
+
+    squeeze: bool, default=`True`
+        If `True`, the output is squeezed, i.e. all axes of length 1 in the output (e.g.
+        only a single sensor or only a single source) are eliminated.
+
+    Returns
+    -------
+    B-field gradient: ndarray, shape squeeze(l, m, k, n1, n2, ..., 3, 3)
+        B-field gradient G[..., i, j] = dB_i/dx_j of each source (index l) at each path
+        position (index m) for each sensor (index k) and each sensor pixel position
+        (indices n1, n2, ...) in units of mT/mm. Sensor pixel positions are equivalent
+        to simple observer positions. Paths of objects that are shorter than index m are
+        considered as static beyond their end. The gradient is given in the local
+        coordinates of the sensors.
+
+    Examples
+    --------
+    B-field gradient of a dipole on the z-axis:
+
+    >>> import magpylib as magpy
+    >>> src = magpy.misc.Dipole(moment=(0,0,1000))
+    >>> G = magpy.getGradB(src, (0,0,1))
+    >>> print(G.round(3))
+    [[ 238.732    0.       0.   ]
+     [   0.     238.732    0.   ]
+     [   0.       0.    -477.465]]
+
+    The gradients of two sources at two observer positions:
+
+    >>> cube = magpy.magnet.Cuboid((0,0,1000), (1,1,1))
+    >>> loop = magpy.current.Loop(current=1, diameter=2)
+    >>> G = magpy.getGradB([cube, loop], [(0,0,1), (0,1,1)])
+    >>> print(G.shape)
+    (2, 2, 3, 3)
+    """
+    return getGradBH_level2(sources, observers, field="B", sumup=sumup, squeeze=squeeze)
+
+
+def getGradH(sources=None, observers=None, sumup=False, squeeze=True):
+    """Compute the H-field gradient (Jacobian) in units of kA/m/mm for given sources
+    and observers.
+
+    The gradient is computed from closed-form expressions for `Dipole`, `Sphere`,
+    `Cuboid`, `Loop` and `Line` sources. For all other sources it is approximated by
+    central differences of the field with a step of 1e-5 times the observer distance
+    from the source, which is less accurate close to the source surfaces.
+
+    Parameters
+    ----------
+    sources: source and collection objects or 1D list thereof
+        Sources that generate the magnetic field. Can be a single source (or collection)
+        or a 1D list of l source and/or collection objects.
+
+    observers: array_like or (list of) `Sensor` objects
+        Can be array_like positions of shape (n1, n2, ..., 3) where the field gradient
+        should be evaluated, a `Sensor` object with pixel shape (n1, n2, ..., 3) or a
+        list of such sensor objects (must all have similar pixel shapes). All positions
+        are given in units of mm.
+
+    sumup: bool, default=`False`
+        If `True`, the field gradients of all sources are summed up.
+
+    squeeze: bool, default=`True`
+        If `True`, the output is squeezed, i.e. all axes of length 1 in the output (e.g.
+        only a single sensor or only a single source) are eliminated.
+
+    Returns
+    -------
+    H-field gradient: ndarray, shape squeeze(l, m, k, n1, n2, ..., 3, 3)
+        H-field gradient G[..., i, j] = dH_i/dx_j of each source (index l) at each path
+        position (index m) for each sensor (index k) and each sensor pixel position
+        (indices n1, n2, ...) in units of kA/m/mm. Sensor pixel positions are equivalent
+        to simple observer positions. Paths of objects that are shorter than index m are
+        considered as static beyond their end. The gradient is given in the local
+        coordinates of the sensors.
+
+    Examples
+    --------
+    H-field gradient of a current loop at its center, where it vanishes, and on its
+    axis:
+
+    >>> import magpylib as magpy
+    >>> loop = magpy.current.Loop(current=1, diameter=2)
+    >>> G = magpy.getGradH(loop, [(0,0,0), (0,0,1)])
+    >>> print(G.round(3))
+    [[[ 0.     0.     0.   ]
+      [ 0.     0.     0.   ]
+      [ 0.     0.     0.   ]]
+    <BLANKLINE>
+     [[ 0.133  0.     0.   ]
+      [ 0.     0.133  0.   ]
+      [ 0.     0.    -0.265]]]
+    """
+    return getGradBH_level2(sources, observers, field="H", sumup=sumup, squeeze=squeeze)
@@ -0,0 +1,278 @@
+"""Iterative field computation over path windows"""
+# pylint: disable=cyclic-import
+import numpy as np
+
+from magpylib._src.exceptions import MagpylibBadUserInput
+from magpylib._src.fields.field_compile import evaluate_getBH_level2
+from magpylib._src.fields.field_compile import prepare_getBH_level2
+from magpylib._src.input_checks import check_getBH_output_type
+from magpylib._src.input_checks import check_positive_int
+from magpylib._src.input_checks import check_workers
+
+
+def iter_BH_level2(
+    sources,
+    observers,
+    *,
+    field,
+    path_chunk,
+    sumup,
+    squeeze,
+    pixel_agg,
+    output,
+    chunksize=None,
+    workers=None,
+):
+    """Return a generator that computes the field of getBH_level2 path window by path
+    window of length `path_chunk`.
+
+    Inputs are checked and formatted once at the call, the path windows of all objects
+    are only built when the respective result is requested. With `squeeze` all axes of
+    length 1 except the path axis are eliminated, so that all results have the same
+    number of dimensions.
+    """
+    if isinstance(sources, str):
+        raise MagpylibBadUserInput(
+            "Iterative field computation is only available for the object oriented "
+            "interface. Input parameter `sources` must not be a string."
+        )
+    path_chunk = check_positive_int(path_chunk, "path_chunk")
+    chunksize = check_positive_int(chunksize, "chunksize", allow_None=True)
+    workers = check_workers(workers)
+    output = check_getBH_output_type(output)
+    setup = prepare_getBH_level2(sources, observers, field=field, pixel_agg=pixel_agg)
+
+    # pylint: disable=protected-access
+    path_len = max(len(obj._position) for obj in setup["obj_list"])
+
+    def generate():
+        for start in range(0, path_len, path_chunk):
+            B = evaluate_getBH_level2(
+                setup,
+                field=field,
+                sumup=sumup,
+                squeeze=False,
+                pixel_agg=pixel_agg,
+                output=output,
+                chunksize=chunksize,
+                workers=workers,
+                path_window=(start, min(start + path_chunk, path_len)),
+            )
+            if squeeze and output == "ndarray":
+                axis = tuple(i for i, n in enumerate(B.shape) if n == 1 and i != 1)
+                B = np.squeeze(B, axis=axis)
+            yield B
+
+    return generate()
+
+
+def iter_B(
+    sources=None,
+    observers=None,
+    path_chunk=1000,
+    sumup=False,
+    squeeze=True,
+    pixel_agg=None,
+    output="ndarray",
+    chunksize=None,
+    workers=None,
+):
+    """Iterate over the B-field in units of mT for given sources and observers, path
+    window by path window.
+
+    The returned generator yields the output of `getB` for consecutive windows of
+    `path_chunk` path positions. The windows of the object paths are only built when
+    the respective result is requested, so that very long paths can be processed
+    (e.g. written to disk) with constant memory usage.
+
+    Parameters
+    ----------
+    sources: source and collection objects or 1D list thereof
+        Sources that generate the magnetic field. Can be a single source (or collection)
+        or a 1D list of l source and/or collection objects.
+
+    observers: array_like or (list of) `Sensor` objects
+        Can be array_like positions of shape (n1, n2, ..., 3) where the field
+        should be evaluated, a `Sensor` object with pixel shape (n1, n2, ..., 3) or a list
+        of such sensor objects (must all have similar pixel shapes). All positions
+        are given in units of mm.
+
+    path_chunk: int, default=1000
+        Number of path positions m' of each yielded result. The last result holds the
+        remaining path positions.
+
+    sumup: bool, default=`False`
+        If `True`, the fields of all sources are summed up.
+
+    squeeze: bool, default=`True`
+        If `True`, all axes of length 1 in the output (e.g. only a single sensor or only
+        a single source) are eliminated. The path axis is never eliminated, so that all
+        yielded results have the same number of dimensions.
+
+    pixel_agg: str, default=`None`
+        Reference to a compatible numpy aggregator function like `'min'` or `'mean'`,
+        which is applied to observer output values, e.g. mean of all sensor pixel outputs.
+        With this option, observers input with different (pixel) shapes is allowed.
+
+    output: str, default='ndarray'
+        Output type, which must be one of `('ndarray', 'dataframe',
+        'dataframe_multiindex', 'arrow')`. By default a `numpy.ndarray` object is
+        returned. If 'dataframe' is chosen, a `pandas.DataFrame` object with 'source',
+        'path', 'sensor' and 'pixel' columns is returned (the Pandas library must be
+        installed). With 'dataframe_multiindex' these columns form a
+        `pandas.MultiIndex`, and with 'arrow' a `pyarrow.Table` with dictionary encoded
+        'source' and 'sensor' columns is returned (the PyArrow library must be
+        installed). The 'path' column holds the global path indices.
+
+    chunksize: int, default=`None`
+        Maximal number of field evaluations (source x path position x pixel) that are
+        computed in one vectorized step, see `getB`.
+
+    workers: int, default=`None`
+        Number of threads among which each vectorized computation step is split, see
+        `getB`.
+
+    Returns
+    -------
+    B-field: generator of ndarrays, shape squeeze(l, m', k, n1, n2, ..., 3), or DataFrames
+        B-field of each source (l) at each path position of the window (m') for each
+        sensor (k) and each sensor pixel position (n1, n2, ...) in units of mT.
+
+    Notes
+    -----
+    The total path length is determined when `iter_B` is called. Changes of object
+    states between the yielded results are taken into account in the following
+    results.
+
+    Examples
+    --------
+    Compute the field of a magnet along a long path in windows of 4 path positions:
+
+    >>> import numpy as np
+    >>> import magpylib as magpy
+    >>> src = magpy.magnet.Cuboid(magnetization=(0,0,100), dimension=(1,1,1))
+    >>> src.move(np.linspace((0,0,0), (0,0,-10), 10), start=0)
+    Cuboid(id=...)
+    >>> for B in magpy.iter_B(src, (0,0,1), path_chunk=4):
+    ...     print(B.shape)
+    (4, 3)
+    (4, 3)
+    (2, 3)
+    """
+    return iter_BH_level2(
+        sources,
+        observers,
+        field="B",
+        path_chunk=path_chunk,
+        sumup=sumup,
+        squeeze=squeeze,
+        pixel_agg=pixel_agg,
+        output=output,
+        chunksize=chunksize,
+        workers=workers,
+    )
+
+
+def iter_H(
+    sources=None,
+    observers=None,
+    path_chunk=1000,
+    sumup=False,
+    squeeze=True,
+    pixel_agg=None,
+    output="ndarray",
+    chunksize=None,
+    workers=None,
+):
+    """Iterate over the H-field in units of kA/m for given sources and observers, path
+    window by path window.
+
+    The returned generator yields the output of `getH` for consecutive windows of
+    `path_chunk` path positions. The windows of the object paths are only built when
+    the respective result is requested, so that very long paths can be processed
+    (e.g. written to disk) with constant memory usage.
+
+    Parameters
+    ----------
+    sources: source and collection objects or 1D list thereof
+        Sources that generate the magnetic field. Can be a single source (or collection)
+        or a 1D list of l source and/or collection objects.
+
+    observers: array_like or (list of) `Sensor` objects
+        Can be array_like positions of shape (n1, n2, ..., 3) where the field
+        should be evaluated, a `Sensor` object with pixel shape (n1, n2, ..., 3) or a list
+        of such sensor objects (must all have similar pixel shapes). All positions
+        are given in units of mm.
+
+    path_chunk: int, default=1000
+        Number of path positions m' of each yielded result. The last result holds the
+        remaining path positions.
+
+    sumup: bool, default=`False`
+        If `True`, the fields of all sources are summed up.
+
+    squeeze: bool, default=`True`
+        If `True`, all axes of length 1 in the output (e.g. only a single sensor or only
+        a single source) are eliminated. The path axis is never eliminated, so that all
+        yielded results have the same number of dimensions.
+
+    pixel_agg: str, default=`None`
+        Reference to a compatible numpy aggregator function like `'min'` or `'mean'`,
+        which is applied to observer output values, e.g. mean of all sensor pixel outputs.
+        With this option, observers input with different (pixel) shapes is allowed.
+
+    output: str, default='ndarray'
+        Output type, which must be one of `('ndarray', 'dataframe',
+        'dataframe_multiindex', 'arrow')`. By default a `numpy.ndarray` object is
+        returned. If 'dataframe' is chosen, a `pandas.DataFrame` object with 'source',
+        'path', 'sensor' and 'pixel' columns is returned (the Pandas library must be
+        installed). With 'dataframe_multiindex' these columns form a
+        `pandas.MultiIndex`, and with 'arrow' a `pyarrow.Table` with dictionary encoded
+        'source' and 'sensor' columns is returned (the PyArrow library must be
+        installed). The 'path' column holds the global path indices.
+
+    chunksize: int, default=`None`
+        Maximal number of field evaluations (source x path position x pixel) that are
+        computed in one vectorized step, see `getH`.
+
+    workers: int, default=`None`
+        Number of threads among which each vectorized computation step is split, see
+        `getH`.
+
+    Returns
+    -------
+    H-field: generator of ndarrays, shape squeeze(l, m', k, n1, n2, ..., 3), or DataFrames
+        H-field of each source (l) at each path position of the window (m') for each
+        sensor (k) and each sensor pixel position (n1, n2, ...) in units of kA/m.
+
+    Notes
+    -----
+    The total path length is determined when `iter_H` is called. Changes of object
+    states between the yielded results are taken into account in the following
+    results.
+
+    Examples
+    --------
+    Collect the H-field of a current loop moving along a long path window by window:
+
+    >>> import numpy as np
+    >>> import magpylib as magpy
+    >>> src = magpy.current.Loop(current=1, diameter=1)
+    >>> src.move(np.linspace((0,0,0), (0,0,-10), 10), start=0)
+    Loop(id=...)
+    >>> H = np.concatenate(list(magpy.iter_H(src, (0,0,1), path_chunk=4)))
+    >>> np.allclose(H, src.getH((0,0,1)))
+    True
+    """
+    return iter_BH_level2(
+        sources,
+        observers,
+        field="H",
+        path_chunk=path_chunk,
+        sumup=sumup,
+        squeeze=squeeze,
+        pixel_agg=pixel_agg,
+        output=output,
+        chunksize=chunksize,
+        workers=workers,
+    )
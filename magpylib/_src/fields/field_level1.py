@@ -0,0 +1,641 @@
+"""Vectorized field computation of groups of similar sources (level1)"""
+# pylint: disable=cyclic-import
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import numpy as np
+from scipy.spatial.transform import Rotation as R
+
+from magpylib._src.defaults.defaults_classes import default_settings
+from magpylib._src.exceptions import MagpylibMissingInput
+from magpylib._src.fields.field_BH_multipole import get_multipole_far_mask
+from magpylib._src.fields.field_BH_multipole import multipole_field
+from magpylib._src.fields.field_BH_symmetry import get_symmetry_groups
+from magpylib._src.fields.field_BH_symmetry import rotate_z
+from magpylib._src.fields.field_tree import getBH_tree
+from magpylib._src.fields.field_tree import TREE_MIN_ELEMENTS
+
+
+def tile_group_property(group: list, n_pp: int, prop_name: str):
+    """tile up group property"""
+    out = get_group_property(group, prop_name)
+    return np.repeat(out, n_pp, axis=0)
+
+
+def get_group_property(group: list, prop_name: str):
+    """collect group property in a single array"""
+    out = [getattr(src, prop_name) for src in group]
+    if not np.isscalar(out[0]) and any(o.shape != out[0].shape for o in out):
+        return np.asarray(out, dtype="object")
+    return np.array(out)
+
+
+def get_path_window(obj, start: int, stop: int):
+    """return position path and orientation path (as quaternions) of an object
+    between the path indices `start` and `stop`. Paths that are shorter than `stop`
+    are edge-padded (static beyond their end). Objects are not modified."""
+    # pylint: disable=protected-access
+    path_len = len(obj._position)
+    start_obj = min(start, path_len - 1)
+    pos = obj._position[start_obj:stop]
+    rot = obj._orientation[start_obj:stop].as_quat()
+    if start >= path_len:  # window lies entirely beyond path end
+        pos, rot = pos[-1:], rot[-1:]
+    delta = stop - start - len(pos)
+    if delta > 0:
+        pos = np.pad(pos, ((0, delta), (0, 0)), "edge")
+        rot = np.pad(rot, ((0, delta), (0, 0)), "edge")
+    return pos, rot
+
+
+def transform_pixel(pixel: np.ndarray, pos: np.ndarray, rot: np.ndarray) -> np.ndarray:
+    """return the global positions of sensor pixel of shape (n,3) along a path window
+    with positions of shape (m,3) and orientations as quaternions of shape (m,4). All
+    path steps are transformed in one vectorized operation, translation-only paths
+    and paths with constant orientation require only a single rotation.
+
+    Returns
+    -------
+    positions: ndarray, shape (m,n,3)
+    """
+    if np.all(rot[:, :3] == 0):  # translation only
+        return pixel + pos[:, np.newaxis]
+    if np.all(rot == rot[0]):  # constant orientation
+        return R.from_quat(rot[0]).apply(pixel) + pos[:, np.newaxis]
+    mat = R.from_quat(rot).as_matrix()
+    # row vectors: (M @ v)^T = v^T @ M^T
+    return pixel @ mat.transpose(0, 2, 1) + pos[:, np.newaxis]
+
+
+def rotate_back_pixel_field(BH: np.ndarray, rot: np.ndarray) -> np.ndarray:
+    """return the field BH of shape (l,m,n,3) (l sources, m path steps, n pixel) in the
+    local coordinates of a sensor with orientations given as quaternions of shape
+    (m,4). All path steps are transformed in one vectorized operation."""
+    if np.all(rot == rot[0]):  # constant orientation
+        return R.from_quat(rot[0]).inv().apply(BH.reshape(-1, 3)).reshape(BH.shape)
+    mat = R.from_quat(rot).as_matrix()
+    # inverse rotation with row vectors: (M^T @ v)^T = v^T @ M
+    return BH @ mat
+
+
+def is_static_path_window(obj, start: int, stop: int) -> bool:
+    """return True if position and orientation of an object are constant between the
+    path indices `start` and `stop` (including edge-padding beyond the path end)."""
+    # pylint: disable=protected-access
+    pos = obj._position[start:stop]
+    if len(pos) <= 1:
+        return True
+    if not np.all(pos == pos[0]):
+        return False
+    rot = obj._orientation[start:stop].as_quat()
+    return bool(np.all(rot == rot[0]))
+
+
+def get_state_key(state) -> tuple:
+    """return a hashable and comparable signature of a list of arrays"""
+    key = []
+    for arr in state:
+        arr = np.asarray(arr)
+        if arr.dtype == object:  # ragged properties, e.g. vertices of different shapes
+            key.append(tuple(get_state_key(arr)))
+        else:
+            key.append((arr.shape, arr.dtype.str, arr.tobytes()))
+    return tuple(key)
+
+
+def get_cached(cache, key, state, builder):
+    """return the cached result stored under `key` if `state` has not changed since
+    it was stored, else build, store and return a new result. Rebuilding sets the
+    `'modified'` flag of the cache. Without cache the result is simply built."""
+    if cache is None:
+        return builder()
+    state_key = get_state_key(state)
+    state_key_old, result = cache.get(key, (None, None))
+    if state_key != state_key_old:
+        result = builder()
+        cache[key] = (state_key, result)
+        cache["modified"] = True
+    return result
+
+
+def get_src_dict(
+    group: list, n_pix: int, n_pp: int, poso: np.ndarray, cache=None, start=0
+) -> dict:
+    """create dictionaries for level1 input
+
+    `poso` are the observer positions of n_pp/n_pix path steps, beginning with
+    path index `start`.
+
+    With a `cache` dict (one per group), tiled arrays are only rebuilt for the group
+    properties that have changed since the last call.
+    """
+    # pylint: disable=protected-access
+    # pylint: disable=too-many-return-statements
+    max_path_len = n_pp // n_pix
+    sizes = np.array([n_pix, n_pp])  # tiled array shapes depend on these
+
+    # tile up basic attributes that all sources have
+    paths = [get_path_window(src, start, start + max_path_len) for src in group]
+
+    # position
+    poss = np.array([p for p, _ in paths])
+    posv = get_cached(
+        cache,
+        "position",
+        [sizes, poss],
+        lambda: np.tile(poss, n_pix).reshape((-1, 3)),
+    )
+
+    # orientation
+    #   groups of unrotated sources or sources that all share the same orientation
+    #   (e.g. axis-aligned magnet arrays) do not require tiling (performance issue)
+    rots = np.array([r for _, r in paths])
+
+    def build_orientation():
+        if np.all(rots[..., :3] == 0):
+            return None  # unit rotation
+        if np.all(rots == rots[0, 0]):
+            return R.from_quat(rots[0, 0])  # single rotation applies to all instances
+        return R.from_quat(np.tile(rots, n_pix).reshape((-1, 4)))
+
+    rotobj = get_cached(cache, "orientation", [sizes, rots], build_orientation)
+
+    # pos_obs
+    posov = get_cached(
+        cache,
+        "observers",
+        [poso],
+        lambda: np.tile(poso, (len(group), 1)),
+    )
+
+    # determine which group we are dealing with and tile up properties
+
+    kwargs = {
+        "position": posv,
+        "observers": posov,
+        "orientation": rotobj,
+    }
+
+    src_props = group[0]._field_func_kwargs_ndim
+
+    for prop in src_props:
+        # internal field function inputs (e.g. mesh_id) are private attributes
+        attr = prop if hasattr(group[0], prop) else f"_{prop}"
+        if hasattr(group[0], attr) and prop not in (
+            "position",
+            "orientation",
+            "observers",
+        ):
+            out = get_group_property(group, attr)
+            kwargs[prop] = get_cached(
+                cache,
+                prop,
+                [sizes, out],
+                lambda out=out: np.repeat(out, n_pp, axis=0),
+            )
+
+    return kwargs
+
+
+def getBH_level1(
+    *,
+    field_func: Callable,
+    field: str,
+    position: np.ndarray,
+    orientation: R,
+    observers: np.ndarray,
+    dtype=None,
+    multipole=None,
+    symmetry=None,
+    **kwargs: dict,
+) -> np.ndarray:
+    """Vectorized field computation
+
+    - applies spatial transformations global CS <-> source CS
+    - selects the correct Bfield_XXX function from input
+
+    Args
+    ----
+    orientation: Rotation of length N, single Rotation that applies to all instances,
+        or None for unrotated sources (rotations are skipped).
+    dtype: floating point type in which field_func is evaluated, None for float64.
+        Spatial transformations are always computed in float64.
+    multipole: tuple (moments_func, tolerance) or None. If given, instances with
+        observers far from the source are computed from the multipole expansion of
+        the source volume and only the remaining ones with field_func.
+    symmetry: function that maps the instances onto canonical configurations of a
+        rotational symmetry of the source (see `field_BH_symmetry`), or None. If
+        given, the field is only computed once for equal canonical configurations.
+    kwargs: dict of shape (N,x) input vectors that describes the computation.
+
+    Returns
+    -------
+    field: ndarray, shape (N,3)
+
+    """
+
+    # transform obs_pos into source CS
+    pos_rel_rot = observers - position
+    if orientation is not None:
+        pos_rel_rot = orientation.apply(pos_rel_rot, inverse=True)
+
+    # compute field
+    if symmetry is not None:
+        BH = getBH_symmetric(
+            field_func, field, pos_rel_rot, dtype, multipole, symmetry, **kwargs
+        )
+    elif multipole is not None:
+        BH = getBH_multipole(field_func, field, pos_rel_rot, dtype, multipole, **kwargs)
+    else:
+        BH = getBH_exact(field_func, field, pos_rel_rot, dtype, **kwargs)
+
+    # transform field back into global CS
+    if BH is not None:  # catch non-implemented field_func a level above
+        if orientation is not None:
+            BH = orientation.apply(BH)
+        else:
+            # same output as with unit rotation: no signed zeros, and field vectors
+            # with non-finite components become nan
+            BH = BH + 0.0
+            BH[~np.isfinite(BH).all(axis=1)] = np.nan
+
+    return BH
+
+
+def getBH_exact(field_func, field, observers, dtype, **kwargs):
+    """evaluate field_func in the floating point type `dtype` (None for float64) and
+    return the field in float64"""
+    if dtype is not None:
+        observers = observers.astype(dtype)
+        kwargs = {
+            k: v.astype(dtype) if isinstance(v, np.ndarray) and v.dtype == float else v
+            for k, v in kwargs.items()
+        }
+    BH = field_func(field=field, observers=observers, **kwargs)
+    if BH is not None and dtype is not None:
+        BH = BH.astype(float)
+    return BH
+
+
+def getBH_multipole(field_func, field, observers, dtype, multipole, **kwargs):
+    """compute the field of the instances with observers far from the source from the
+    multipole expansion of the source volume, and of all other instances with
+    field_func"""
+    moments_func, tolerance = multipole
+    moments = moments_func(**kwargs)
+    far = get_multipole_far_mask(observers, moments, tolerance)
+    if not np.any(far):
+        return getBH_exact(field_func, field, observers, dtype, **kwargs)
+
+    if np.all(far):
+        return multipole_field(
+            field,
+            observers - moments["centroid"],
+            kwargs["magnetization"],
+            moments["volume"],
+            moments["moment2"],
+        )
+
+    BH = np.empty_like(observers)
+    BH[far] = multipole_field(
+        field,
+        observers[far] - moments["centroid"][far],
+        kwargs["magnetization"][far],
+        moments["volume"][far],
+        moments["moment2"][far],
+    )
+    n = len(observers)
+    near = ~far
+    kwargs_near = {
+        k: v[near] if isinstance(v, np.ndarray) and len(v) == n else v
+        for k, v in kwargs.items()
+    }
+    BH_near = getBH_exact(field_func, field, observers[near], dtype, **kwargs_near)
+    if BH_near is None:
+        return None
+    BH[near] = BH_near
+    return BH
+
+
+def getBH_symmetric(field_func, field, observers, dtype, multipole, symmetry, **kwargs):
+    """compute the field only once for all instances with the same canonical
+    configuration of the rotational symmetry `symmetry`, and rotate it back"""
+    # inputs of length 1 (direct interface) are broadcast to all instances
+    inputs = {"observers": observers, **kwargs}
+    n = max(len(v) for v in inputs.values() if isinstance(v, np.ndarray))
+    inputs = {
+        k: np.broadcast_to(v, (n, *v.shape[1:]))
+        if isinstance(v, np.ndarray) and len(v) == 1
+        else v
+        for k, v in inputs.items()
+    }
+    observers, kwargs_sym, angle, keys = symmetry(**inputs)
+    first, inverse = get_symmetry_groups(keys)
+    inputs.update(kwargs_sym)
+    kwargs = {
+        k: v[first] if isinstance(v, np.ndarray) and len(v) == n else v
+        for k, v in inputs.items()
+        if k != "observers"
+    }
+    if multipole is not None:
+        BH = getBH_multipole(
+            field_func, field, observers[first], dtype, multipole, **kwargs
+        )
+    else:
+        BH = getBH_exact(field_func, field, observers[first], dtype, **kwargs)
+    if BH is None:
+        return None
+    return rotate_z(BH[inverse], angle)
+
+
+# minimal number of instances per worker, below which splitting does not pay off
+MIN_INSTANCES_PER_WORKER = 2000
+
+
+def getBH_level1_workers(*, workers: int, **kwargs: dict) -> np.ndarray:
+    """Vectorized field computation with the N input instances split into contiguous
+    parts that are computed by `workers` threads of a thread pool. The NumPy
+    operations of the field functions release the GIL, so that the parts are computed
+    in parallel.
+
+    Args
+    ----
+    workers: int, maximal number of threads.
+    kwargs: getBH_level1 input, dict of shape (N,x) input vectors.
+
+    Returns
+    -------
+    field: ndarray, shape (N,3)
+    """
+    n = len(kwargs["observers"])
+    n_parts = min(workers, n // MIN_INSTANCES_PER_WORKER)
+    if n_parts < 2:
+        return getBH_level1(**kwargs)
+
+    bounds = np.linspace(0, n, n_parts + 1).astype(int)
+    # inputs of length 1 (direct interface) and single or None orientations are
+    # broadcast to all instances
+    split_keys = [
+        k
+        for k, v in kwargs.items()
+        if k not in ("field_func", "field", "dtype", "multipole", "symmetry")
+        and v is not None
+        and not (isinstance(v, R) and v.single)
+        and len(v) == n
+    ]
+
+    def compute_part(i):
+        part = dict(kwargs)
+        for k in split_keys:
+            part[k] = kwargs[k][bounds[i] : bounds[i + 1]]
+        return getBH_level1(**part)
+
+    with ThreadPoolExecutor(max_workers=n_parts) as pool:
+        BH_parts = list(pool.map(compute_part, range(n_parts)))
+    if any(BH is None for BH in BH_parts):
+        return None
+    return np.concatenate(BH_parts)
+
+
+def get_compute_dtype(src_type):
+    """Return the floating point type in which the field function of the source class
+    `src_type` is evaluated, None for float64. Single precision is only used for
+    source types with numerically safe field functions, all others (e.g. elliptic
+    integral based) fall back to float64."""
+    # pylint: disable=protected-access
+    if default_settings.compute.dtype == "float32" and src_type._field_func_float32:
+        return np.float32
+    return None
+
+
+def get_multipole(src_type):
+    """Return the (moments_func, tolerance) input of getBH_level1 for the source class
+    `src_type` if the multipole approximation is enabled and available for it, and
+    None otherwise."""
+    # pylint: disable=protected-access
+    moments_func = src_type._field_func_moments
+    if default_settings.compute.approximation != "multipole" or moments_func is None:
+        return None
+    return moments_func, default_settings.compute.tolerance
+
+
+def get_symmetry(src_type):
+    """Return the symmetry input of getBH_level1 for the source class `src_type` if the
+    reuse of rotationally symmetric configurations is enabled and available for it,
+    and None otherwise."""
+    # pylint: disable=protected-access
+    if not default_settings.compute.symmetry:
+        return None
+    return src_type._field_func_symmetry
+
+
+def get_tree_sets(setup: dict, sumup: bool, pixel_agg) -> list:
+    """Return the sets of sources whose summed field is computed with the treecode
+    (`magpylib.defaults.compute.approximation='tree'`). With `sumup` all sources are
+    summed when no (nonlinear) pixel aggregation must be applied first, else the sources
+    of each Collection. Only source classes with surface charge or dipole representation
+    and sets with at least `TREE_MIN_ELEMENTS` elements are considered.
+
+    Returns
+    -------
+    list of (output index, list of src_list indices) tuples
+    """
+    # pylint: disable=import-outside-toplevel
+    # pylint: disable=protected-access
+    from magpylib._src.obj_classes.class_magnet_TriangularMesh import TriangularMesh
+
+    if default_settings.compute.approximation != "tree":
+        return []
+    src_list = setup["src_list"]
+    if sumup and pixel_agg in (None, "mean", "sum"):
+        sets = [(0, range(len(src_list)))]
+    else:
+        sets, offset = [], 0
+        for src_ind in range(len(setup["sources"])):
+            col_len = setup["col_lens"].get(src_ind, 1)
+            if src_ind in setup["col_lens"]:
+                sets.append((src_ind, range(offset, offset + col_len)))
+            offset += col_len
+    tree_sets = []
+    for out_ind, inds in sets:
+        inds = [i for i in inds if src_list[i]._field_func_tree is not None]
+        n_elements = sum(
+            len(src_list[i].faces) if isinstance(src_list[i], TriangularMesh) else 1
+            for i in inds
+        )
+        if n_elements >= TREE_MIN_ELEMENTS:
+            tree_sets.append((out_ind, inds))
+    return tree_sets
+
+
+def getBH_tree_set(field: str, group: list, poso: np.ndarray, start: int):
+    """Compute the summed field of a set of sources with the treecode.
+
+    Parameters
+    ----------
+    poso: ndarray, shape (M, N, 3)
+        observer positions for M path steps and N pixel, beginning with path index
+        `start`.
+
+    Returns
+    -------
+    field: ndarray, shape (M, N, 3)
+    """
+    # pylint: disable=protected-access
+    src_types = {}
+    for src in group:
+        src_types.setdefault(type(src), []).append(src)
+    tree_groups = []
+    for src_type, srcs in src_types.items():
+        paths = [get_path_window(src, start, start + len(poso)) for src in srcs]
+        kwargs = {}
+        for prop in src_type._field_func_kwargs_ndim:
+            attr = prop if hasattr(srcs[0], prop) else f"_{prop}"
+            kwargs[prop] = get_group_property(srcs, attr)
+        tree_groups.append(
+            {
+                "field_func": src_type._field_func,
+                "charges_func": src_type._field_func_tree,
+                "kwargs": kwargs,
+                "position": np.array([pos for pos, _ in paths]),
+                "orientation": np.array([rot for _, rot in paths]),
+            }
+        )
+    return getBH_tree(field, tree_groups, poso, default_settings.compute.tolerance)
+
+
+def getBH_group(
+    *,
+    field_func: Callable,
+    field: str,
+    group: list,
+    poso: np.ndarray,
+    n_pix: int,
+    workers: int,
+    start: int,
+    cache=None,
+) -> np.ndarray:
+    """Compute the field of a group of similar sources in one vectorized step.
+
+    Parameters
+    ----------
+    poso: ndarray, shape (M*N, 3)
+        observer positions for M path steps and N pixel, beginning with path index
+        `start`.
+    cache: dict
+        per group cache, the previous result is returned if no input has changed.
+
+    Returns
+    -------
+    field: ndarray, shape (len(group), M, N, 3)
+    """
+    # pylint: disable=protected-access
+    dtype = get_compute_dtype(type(group[0]))
+    multipole = get_multipole(type(group[0]))
+    symmetry = get_symmetry(type(group[0]))
+    if cache is not None:
+        # a change of the compute precision, approximation or kernel backend
+        # invalidates the previous result
+        settings = (dtype, multipole, symmetry, default_settings.compute.backend)
+        cache["modified"] = cache.get("settings", settings) != settings
+        cache["settings"] = settings
+    src_dict = get_src_dict(
+        group, n_pix, len(poso), poso, cache=cache, start=start
+    )  # compute array dict for level1
+    if (
+        cache is not None
+        and not cache["modified"]
+        and not group[0]._editable_field_func  # custom field_func may hold a state
+    ):
+        BH = cache["field"]  # inputs unchanged, reuse previous result
+    else:
+        BH = getBH_level1_workers(
+            field_func=field_func,
+            field=field,
+            workers=workers,
+            dtype=dtype,
+            multipole=multipole,
+            symmetry=symmetry,
+            **src_dict,
+        )  # compute field
+        if cache is not None:
+            cache["field"] = BH
+    if BH is None:
+        raise MagpylibMissingInput(
+            f"Cannot compute {field}-field because "
+            f"`field_func` {field_func} has undefined {field}-field computation."
+        )
+    return BH.reshape((len(group), -1, n_pix, 3))  # (2% slower for large arrays)
+
+
+def split_static_sources(group: list, order, start: int, stop: int):
+    """split a source group into sources with a static path window and the others.
+    Returns a list of (sources, order, is_static) tuples with non-empty source lists."""
+    static = np.array([is_static_path_window(src, start, stop) for src in group])
+    order = np.asarray(order)
+    parts = []
+    for is_static in (False, True):
+        inds = np.flatnonzero(static == is_static)
+        if len(inds):
+            parts.append(([group[i] for i in inds], order[inds], is_static))
+    return parts
+
+
+def getBH_group_chunked(
+    *,
+    field_func: Callable,
+    field: str,
+    group: list,
+    poso: np.ndarray,
+    out: np.ndarray,
+    out_inds: np.ndarray,
+    chunksize: int,
+    workers: int = 1,
+    start: int = 0,
+):
+    """Compute the field of a group of similar sources in blocks of at most `chunksize`
+    instances. The block results are added to `out`.
+
+    Parameters
+    ----------
+    poso: ndarray, shape (M, N, 3)
+        observer positions for M path steps and N pixel, beginning with path index
+        `start`.
+    out: ndarray, shape (L, M, N, 3)
+        output array, the field of the i-th group source is added to out[out_inds[i]].
+    """
+    max_path_len, n_pix, _ = poso.shape
+    n_pix_c = min(n_pix, chunksize)
+    n_path_c = max(1, min(max_path_len, chunksize // n_pix_c))
+    n_src_c = max(1, min(len(group), chunksize // (n_pix_c * n_path_c)))
+    dtype = get_compute_dtype(type(group[0]))
+    multipole = get_multipole(type(group[0]))
+    symmetry = get_symmetry(type(group[0]))
+
+    for i0 in range(0, len(group), n_src_c):
+        subgroup = group[i0 : i0 + n_src_c]
+        for m0 in range(0, max_path_len, n_path_c):
+            m1 = min(m0 + n_path_c, max_path_len)
+            for p0 in range(0, n_pix, n_pix_c):
+                p1 = min(p0 + n_pix_c, n_pix)
+                poso_block = poso[m0:m1, p0:p1].reshape(-1, 3)
+                src_dict = get_src_dict(
+                    subgroup, p1 - p0, len(poso_block), poso_block, start=start + m0
+                )
+                B_block = getBH_level1_workers(
+                    field_func=field_func,
+                    field=field,
+                    workers=workers,
+                    dtype=dtype,
+                    multipole=multipole,
+                    symmetry=symmetry,
+                    **src_dict,
+                )
+                if B_block is None:
+                    raise MagpylibMissingInput(
+                        f"Cannot compute {field}-field because "
+                        f"`field_func` {field_func} has undefined {field}-field computation."
+                    )
+                B_block = B_block.reshape((len(subgroup), m1 - m0, p1 - p0, 3))
+                for blk_ind, out_ind in enumerate(out_inds[i0 : i0 + n_src_c]):
+                    out[out_ind, m0:m1, p0:p1] += B_block[blk_ind]
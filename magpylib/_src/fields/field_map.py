@@ -0,0 +1,434 @@
+"""Tabulated source fields with fast interpolation"""
+# pylint: disable=too-many-locals
+import struct
+import zipfile
+
+import numpy as np
+
+from magpylib._src.exceptions import MagpylibBadUserInput
+from magpylib._src.fields.field_compile import evaluate_getBH_level2
+from magpylib._src.fields.field_compile import prepare_getBH_level2
+
+# maximal number of observers that are interpolated in one vectorized step
+FIELD_MAP_BATCH_SIZE = 2**16
+
+# number of grid points whose exact field is computed in one vectorized step
+TABULATE_BATCH_SIZE = 2**18
+
+# number of points per axis of the interpolation stencils
+STENCIL_SIZE = {"linear": 2, "cubic": 4}
+
+
+def check_grid_axes(grid, method) -> tuple:
+    """return the grid axes as a tuple of three float arrays, raise an error if they
+    are not strictly increasing or too short for the interpolation method"""
+    msg = (
+        "Input parameter `grid` must be a sequence of three strictly increasing 1D "
+        f"array_like axes with at least {STENCIL_SIZE[method]} values each for "
+        f"`method='{method}'`.\nInstead received {grid!r}."
+    )
+    try:
+        axes = tuple(np.array(ax, dtype=float) for ax in grid)
+    except (TypeError, ValueError) as err:
+        raise MagpylibBadUserInput(msg) from err
+    if len(axes) != 3 or any(
+        ax.ndim != 1 or len(ax) < STENCIL_SIZE[method] or np.any(np.diff(ax) <= 0)
+        for ax in axes
+    ):
+        raise MagpylibBadUserInput(msg)
+    return axes
+
+
+def check_method(method) -> str:
+    """check the interpolation method input"""
+    if method not in STENCIL_SIZE:
+        raise MagpylibBadUserInput(
+            "Input parameter `method` must be one of ('linear', 'cubic').\n"
+            f"Instead received {method!r}."
+        )
+    return method
+
+
+def axis_stencil(ax: np.ndarray, x: np.ndarray, size: int):
+    """
+    Indices and interpolation weights of the `size` grid points of axis `ax` that are
+    used for the positions `x`. Uses an index computation on uniform axes and a binary
+    search on others. The weights are those of Lagrange interpolation through the
+    stencil points, which also applies to non-uniform axes.
+
+    Returns
+    -------
+    inds: ndarray, shape (n,size)
+    weights: ndarray, shape (n,size)
+    inside: ndarray, shape (n,), True where x lies within the axis range
+    """
+    n = len(ax)
+    step = (ax[-1] - ax[0]) / (n - 1)
+    if np.allclose(np.diff(ax), step, rtol=1e-12, atol=0):
+        cell = np.floor((x - ax[0]) / step)
+    else:
+        cell = np.searchsorted(ax, x, side="right") - 1.0
+    inside = (x >= ax[0]) & (x <= ax[-1])
+    first = np.clip(cell - (size // 2 - 1), 0, n - size).astype(int)
+    first[~inside] = 0  # nan positions
+    inds = first[:, np.newaxis] + np.arange(size)
+    nodes = ax[inds]
+    weights = np.ones(inds.shape)
+    for j in range(size):
+        for m in range(size):
+            if m != j:
+                weights[:, j] *= (x - nodes[:, m]) / (nodes[:, j] - nodes[:, m])
+    return inds, weights, inside
+
+
+def memmap_npz_member(file, name: str, mode: str) -> np.memmap:
+    """memory-map an array that is stored uncompressed in a .npz archive"""
+    with zipfile.ZipFile(file) as archive:
+        info = archive.getinfo(f"{name}.npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        raise MagpylibBadUserInput(
+            f"Array `{name}` of {file} is compressed and cannot be memory-mapped."
+        )
+    with open(file, "rb") as f:
+        # local file header of the zip member, followed by the .npy file
+        f.seek(info.header_offset + 26)
+        name_len, extra_len = struct.unpack("<HH", f.read(4))
+        f.seek(name_len + extra_len, 1)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    return np.memmap(
+        file,
+        dtype=dtype,
+        mode=mode,
+        offset=offset,
+        shape=shape,
+        order="F" if fortran_order else "C",
+    )
+
+
+class FieldMap:
+    """Field of a source tabulated on a rectilinear grid in its local coordinates,
+    which is evaluated by trilinear or tricubic interpolation.
+
+    A `FieldMap` is typically generated with `magpylib.tabulate`. It is a callable
+    with the signature `field_map(field, observers)` that can be used as `field_func`
+    of a `CustomSource`, so that any number of moved and rotated instances share one
+    table.
+
+    Parameters
+    ----------
+    grid: sequence of three 1D array_like
+        Strictly increasing grid axes (x, y, z) in units of mm. Axes can be uniform or
+        non-uniform, e.g. with finer spacing close to the source.
+
+    B: ndarray, shape (nx,ny,nz,3), default=`None`
+        Tabulated B-field in units of mT.
+
+    H: ndarray, shape (nx,ny,nz,3), default=`None`
+        Tabulated H-field in units of kA/m.
+
+    method: {'linear', 'cubic'}, default='linear'
+        Interpolation method. `'cubic'` uses Lagrange polynomials through the 4x4x4
+        closest grid points, which is more accurate for smooth fields.
+
+    error: dict, default=`None`
+        Maximal interpolation errors of `'B'` and `'H'` at test points, as computed
+        by `magpylib.tabulate`.
+
+    Returns
+    -------
+    FieldMap object
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import magpylib as magpy
+    >>> cube = magpy.magnet.Cuboid(magnetization=(0,0,1000), dimension=(1,1,1))
+    >>> axis = np.linspace(-5, 5, 101)
+    >>> fmap = magpy.tabulate(cube, (axis, axis, axis + 3), method='cubic')
+    >>> src = magpy.misc.CustomSource(field_func=fmap, position=(0,0,-3))
+    >>> B = src.getB((0.11, 0.22, 0.33))
+    >>> B_exact = cube.copy(position=(0,0,-3)).getB((0.11, 0.22, 0.33))
+    >>> print(np.allclose(B, B_exact, rtol=1e-3))
+    True
+    """
+
+    def __init__(self, grid, B=None, H=None, method="linear", error=None):
+        self._method = check_method(method)
+        self._grid = check_grid_axes(grid, method)
+        shape = tuple(len(ax) for ax in self._grid) + (3,)
+        for name, table in (("B", B), ("H", H)):
+            if table is not None and np.shape(table) != shape:
+                raise MagpylibBadUserInput(
+                    f"Input parameter `{name}` must have the shape {shape} of the grid.\n"
+                    f"Instead received array_like with shape {np.shape(table)}."
+                )
+        self._tables = {"B": B, "H": H}
+        self.error = error
+
+    @property
+    def grid(self):
+        """Grid axes (x, y, z) in units of mm."""
+        return self._grid
+
+    @property
+    def B(self):
+        """Tabulated B-field of shape (nx,ny,nz,3) in units of mT."""
+        return self._tables["B"]
+
+    @property
+    def H(self):
+        """Tabulated H-field of shape (nx,ny,nz,3) in units of kA/m."""
+        return self._tables["H"]
+
+    @property
+    def method(self):
+        """Interpolation method, one of `('linear', 'cubic')`."""
+        return self._method
+
+    @method.setter
+    def method(self, val):
+        self._method = check_method(val)
+        check_grid_axes(self._grid, val)
+
+    def __repr__(self):
+        shape = "x".join(str(len(ax)) for ax in self._grid)
+        fields = "".join(k for k, v in self._tables.items() if v is not None)
+        return f"FieldMap(grid={shape}, fields={fields}, method={self._method!r})"
+
+    def __call__(self, field, observers, method=None):
+        """Interpolate the tabulated field.
+
+        Parameters
+        ----------
+        field: str
+            `'B'` or `'H'`.
+
+        observers: ndarray, shape (n,3)
+            Observer positions in the local coordinates of the map in units of mm.
+
+        method: {'linear', 'cubic'}, default=`None`
+            Interpolation method, by default `method` of the map.
+
+        Returns
+        -------
+        B-field or H-field: ndarray, shape (n,3) or `None`
+            Interpolated field. Observers outside of the grid return `nan`. Returns
+            `None` if the field was not tabulated.
+        """
+        table = self._tables[field]
+        if table is None:
+            return None
+        method = self._method if method is None else check_method(method)
+        size = STENCIL_SIZE[method]
+        observers = np.asarray(observers, dtype=float)
+        shape = np.array(table.shape[:3])
+        strides = np.array([shape[1] * shape[2], shape[2], 1])
+        flat = table.reshape(-1, 3)
+        out = np.empty((len(observers), 3))
+        for i0 in range(0, len(observers), FIELD_MAP_BATCH_SIZE):
+            obs = observers[i0 : i0 + FIELD_MAP_BATCH_SIZE]
+            stencils = [
+                axis_stencil(ax, obs[:, i], size) for i, ax in enumerate(self._grid)
+            ]
+            (ix, wx, in_x), (iy, wy, in_y), (iz, wz, in_z) = stencils
+            res = np.zeros((len(obs), 3))
+            for a in range(size):
+                for b in range(size):
+                    ind_ab = ix[:, a] * strides[0] + iy[:, b] * strides[1]
+                    w_ab = wx[:, a] * wy[:, b]
+                    for c in range(size):
+                        w = w_ab * wz[:, c]
+                        res += w[:, np.newaxis] * flat[ind_ab + iz[:, c]]
+            res[~(in_x & in_y & in_z)] = np.nan
+            out[i0 : i0 + FIELD_MAP_BATCH_SIZE] = res
+        return out
+
+    def estimate_error(self, field, observers):
+        """Estimate the interpolation error at the observers from the difference of
+        the trilinear and tricubic interpolations. This is an estimate of the error of
+        `method='linear'` and an upper bound estimate for `method='cubic'`.
+
+        Parameters
+        ----------
+        field: str
+            `'B'` or `'H'`.
+
+        observers: ndarray, shape (n,3)
+            Observer positions in the local coordinates of the map in units of mm.
+
+        Returns
+        -------
+        error: ndarray, shape (n,)
+            Estimated absolute error in units of mT or kA/m.
+        """
+        check_grid_axes(self._grid, "cubic")
+        linear = self(field, observers, method="linear")
+        if linear is None:
+            return None
+        cubic = self(field, observers, method="cubic")
+        return np.linalg.norm(cubic - linear, axis=-1)
+
+    def save(self, file):
+        """Store the map in an uncompressed NumPy `.npz` file, which can be loaded with
+        `FieldMap.load`, also memory-mapped.
+
+        Parameters
+        ----------
+        file: str or path-like
+            Output file name.
+        """
+        arrays = {f"grid_{k}": ax for k, ax in zip("xyz", self._grid)}
+        arrays.update({k: v for k, v in self._tables.items() if v is not None})
+        if self.error is not None:
+            arrays.update({f"error_{k}": v for k, v in self.error.items()})
+        np.savez(file, method=self._method, **arrays)
+
+    @classmethod
+    def load(cls, file, mmap_mode=None):
+        """Load a map that was stored with `FieldMap.save`.
+
+        Parameters
+        ----------
+        file: str or path-like
+            `.npz` file name.
+
+        mmap_mode: {None, 'r', 'r+', 'c'}, default=`None`
+            With a mode other than `None`, the tables are memory-mapped instead of read
+            into memory (see `numpy.memmap`), so that maps larger than the memory can
+            be used and several processes share one table.
+
+        Returns
+        -------
+        FieldMap object
+        """
+        with np.load(file) as data:
+            grid = [data[f"grid_{k}"] for k in "xyz"]
+            method = str(data["method"])
+            tables = {k: None for k in "BH"}
+            for k in tables:
+                if k in data.files:
+                    tables[k] = (
+                        data[k]
+                        if mmap_mode is None
+                        else memmap_npz_member(file, k, mmap_mode)
+                    )
+            error = {
+                name[6:]: float(data[name])
+                for name in data.files
+                if name.startswith("error_")
+            }
+        return cls(grid, method=method, error=error or None, **tables)
+
+
+def tabulate(
+    source, grid, *, field="BH", method="linear", dtype="float64", n_check=1000
+):
+    """Tabulate the field of a source on a grid in its local coordinates.
+
+    The returned `FieldMap` interpolates the field much faster than its exact
+    computation and can be used as `field_func` of a `CustomSource`, so that moved and
+    rotated instances of a rigid source reuse one table.
+
+    Parameters
+    ----------
+    source: source object or Collection
+        The field is tabulated in the local coordinates of `source` at the end of its
+        path, i.e. relative to its last position and orientation.
+
+    grid: sequence of three 1D array_like
+        Strictly increasing grid axes (x, y, z) in units of mm. Axes can be uniform,
+        e.g. `np.linspace(-5, 5, 51)`, or non-uniform with finer spacing where the
+        field varies quickly.
+
+    field: {'BH', 'B', 'H'}, default='BH'
+        Fields that are tabulated.
+
+    method: {'linear', 'cubic'}, default='linear'
+        Interpolation method of the map.
+
+    dtype: {'float64', 'float32'}, default='float64'
+        Storage precision of the tables. `'float32'` halves the memory footprint at a
+        relative accuracy of about 1e-7.
+
+    n_check: int, default=1000
+        Number of random test points within the grid at which the interpolated field is
+        compared to the exact solution. The maximal errors are stored in the `error`
+        attribute of the map.
+
+    Returns
+    -------
+    FieldMap object
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import magpylib as magpy
+    >>> cube = magpy.magnet.Cuboid(magnetization=(0,0,1000), dimension=(1,1,1))
+    >>> axis = np.linspace(2, 10, 81)
+    >>> fmap = magpy.tabulate(cube, (axis, axis, axis), field='B', method='cubic')
+    >>> print(fmap)
+    FieldMap(grid=81x81x81, fields=B, method='cubic')
+    >>> print(fmap.error['B'] < 1e-3)
+    True
+    """
+    # pylint: disable=protected-access
+    if field not in ("BH", "B", "H"):
+        raise MagpylibBadUserInput(
+            "Input parameter `field` must be one of ('BH', 'B', 'H').\n"
+            f"Instead received {field!r}."
+        )
+    if dtype not in ("float64", "float32"):
+        raise MagpylibBadUserInput(
+            "Input parameter `dtype` must be one of ('float64', 'float32').\n"
+            f"Instead received {dtype!r}."
+        )
+    method = check_method(method)
+    axes = check_grid_axes(grid, method)
+    rot = source._orientation[-1]
+    pos = source._position[-1]
+
+    def compute(fld, points):
+        """exact field at points in the source coordinates"""
+        BH = np.empty(points.shape)
+        for i0 in range(0, len(points), TABULATE_BATCH_SIZE):
+            pts = points[i0 : i0 + TABULATE_BATCH_SIZE]
+            setup = prepare_getBH_level2(
+                source, rot.apply(pts) + pos, field=fld, pixel_agg=None
+            )
+            path_len = max(len(obj._position) for obj in setup["obj_list"])
+            BH_pts = evaluate_getBH_level2(
+                setup,
+                field=fld,
+                sumup=True,
+                squeeze=False,
+                pixel_agg=None,
+                output="ndarray",
+                path_window=(path_len - 1, path_len),
+            )
+            BH[i0 : i0 + TABULATE_BATCH_SIZE] = rot.inv().apply(BH_pts.reshape(-1, 3))
+        return BH
+
+    points = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1)
+    tables = {
+        fld: compute(fld, points.reshape(-1, 3)).reshape(points.shape).astype(dtype)
+        for fld in field
+    }
+    field_map = FieldMap(axes, method=method, **tables)
+
+    if n_check:
+        rng = np.random.default_rng(0)
+        lo = np.array([ax[0] for ax in axes])
+        hi = np.array([ax[-1] for ax in axes])
+        pts = rng.uniform(lo, hi, (n_check, 3))
+        field_map.error = {
+            fld: float(
+                np.max(np.linalg.norm(field_map(fld, pts) - compute(fld, pts), axis=1))
+            )
+            for fld in field
+        }
+    return field_map
@@ -0,0 +1,82 @@
+"""On-disk output of field computations"""
+import os
+
+import numpy as np
+
+from magpylib._src.exceptions import MagpylibBadUserInput
+
+# default maximal number of field evaluations (source x path position x pixel) of the
+# path blocks that are written to the output one after the other
+OUT_BLOCK_SIZE = 2**18
+
+
+def open_field_output(out, shape: tuple, squeeze: bool):
+    """
+    Prepare the output `out` of a field computation with the unsqueezed output shape
+    `shape`.
+
+    Parameters
+    ----------
+    out: str, path-like or ndarray
+        File name of a `.npy` file that is created as memory-map, or a preallocated
+        array (e.g. `numpy.memmap`) with the (squeezed) output shape.
+
+    Returns
+    -------
+    view: ndarray with shape `shape` that shares the memory of the output
+    result: output that is returned to the user
+    """
+    squeezed = tuple(n for n in shape if n != 1) if squeeze else shape
+    if isinstance(out, (str, os.PathLike)):
+        view = np.lib.format.open_memmap(out, mode="w+", dtype=float, shape=shape)
+        return view, view.reshape(squeezed)
+    if not isinstance(out, np.ndarray) or out.shape not in (shape, squeezed):
+        raise MagpylibBadUserInput(
+            "Input parameter `out` must be a file name or an ndarray with the output "
+            f"shape {squeezed}.\nInstead received {out!r}."
+        )
+    if out.dtype != float or not out.flags.c_contiguous:
+        raise MagpylibBadUserInput(
+            "Input parameter `out` must be a C-contiguous float64 array.\n"
+            f"Instead received an array with dtype {out.dtype}."
+        )
+    return out.reshape(shape), out
+
+
+def load_field(file, squeeze=True, mmap_mode="r"):
+    """Open a field computation result that was written to a `.npy` file with the `out`
+    argument of `getB` or `getH`, without reading it into memory.
+
+    Parameters
+    ----------
+    file: str or path-like
+        `.npy` file name.
+
+    squeeze: bool, default=`True`
+        If `True`, all axes of length 1 are eliminated, as with the `squeeze` argument
+        of `getB`.
+
+    mmap_mode: {'r', 'r+', 'c'}, default='r'
+        Memory-map mode, see `numpy.memmap`.
+
+    Returns
+    -------
+    field: numpy.memmap, shape squeeze(l, m, k, n1, n2, ..., 3)
+        Field of l sources, m path positions, k sensors and sensor pixel shape
+        (n1, n2, ...), that is only read from disk when it is sliced.
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> import magpylib as magpy
+    >>> src = magpy.magnet.Sphere((0,0,1000), 1, position=[(0,0,1), (0,0,2)])
+    >>> file = os.path.join(tempfile.mkdtemp(), 'B.npy')
+    >>> _ = magpy.getB(src, (0,0,0), out=file)
+    >>> B = magpy.load_field(file)
+    >>> print(B.shape, B[1])
+    (2, 3) [ 0.          0.         10.41666667]
+    """
+    field = np.load(file, mmap_mode=mmap_mode)
+    if squeeze:
+        field = field.reshape(tuple(n for n in field.shape if n != 1))
+    return field
@@ -0,0 +1,108 @@
+"""Streaming aggregation of sensor pixel fields"""
+import numpy as np
+
+from magpylib._src.exceptions import MagpylibBadUserInput
+
+# pixel_agg inputs that can be reduced block by block, with their canonical names
+FUSED_PIXEL_AGG = {
+    "mean": "mean",
+    "sum": "sum",
+    "min": "min",
+    "amin": "min",
+    "max": "max",
+    "amax": "max",
+    "std": "std",
+}
+
+# pixel_agg inputs that take the sensor `pixel_weights` into account
+WEIGHTED_PIXEL_AGG = ("mean", "sum", "std")
+
+
+def get_pixel_weights(sensor):
+    """return the flattened pixel weights of a sensor, or None if the sensor has no
+    pixel weights. Raises an error if the weights do not match the pixel shape."""
+    # pylint: disable=protected-access
+    weights = sensor._pixel_weights
+    if weights is None:
+        return None
+    pix_shape = sensor.pixel.shape[:-1]
+    n_pix = int(np.prod(pix_shape))
+    if weights.shape not in (pix_shape, (n_pix,)):
+        raise MagpylibBadUserInput(
+            f"Input parameter `pixel_weights` of {sensor!r} must have the pixel shape "
+            f"{pix_shape}.\nInstead received array_like with shape {weights.shape}."
+        )
+    return weights.reshape(-1)
+
+
+class PixelAggregator:
+    """Reduction of pixel fields over the pixel axis that is updated block by block,
+    so that the fields of all pixel never have to be stored at the same time.
+
+    Parameters
+    ----------
+    pixel_agg: str
+        one of the keys of `FUSED_PIXEL_AGG`.
+
+    shape: tuple
+        shape of the reduced field, e.g. (l,m,3) for l sources and m path steps.
+    """
+
+    def __init__(self, pixel_agg, shape):
+        self.agg = FUSED_PIXEL_AGG[pixel_agg]
+        self.weight = 0.0
+        if self.agg == "min":
+            self.value = np.full(shape, np.inf)
+        elif self.agg == "max":
+            self.value = np.full(shape, -np.inf)
+        else:
+            self.value = np.zeros(shape)  # sum or mean
+        self.m2 = np.zeros(shape) if self.agg == "std" else None
+
+    def update(self, BH, weights=None):
+        """add the field BH of shape (..., n, 3) of n further pixel with optional
+        weights of shape (n,)"""
+        if self.agg == "min":
+            np.minimum(self.value, BH.min(axis=-2), out=self.value)
+            return
+        if self.agg == "max":
+            np.maximum(self.value, BH.max(axis=-2), out=self.value)
+            return
+        if weights is None:
+            w_sum = BH.shape[-2]
+            BH_sum = BH.sum(axis=-2)
+        else:
+            w_sum = weights.sum()
+            BH_sum = np.swapaxes(BH, -1, -2) @ weights
+        if self.agg == "sum":
+            self.value += BH_sum
+            return
+        if w_sum == 0:
+            return
+        # merge the block mean and squared deviations with the previous ones
+        # (Chan et al.), numerically stable for any block sizes
+        mean = BH_sum / w_sum
+        delta = mean - self.value
+        weight = self.weight + w_sum
+        self.value += delta * (w_sum / weight)
+        if self.m2 is not None:
+            dev2 = (BH - mean[..., np.newaxis, :]) ** 2
+            if weights is None:
+                self.m2 += dev2.sum(axis=-2)
+            else:
+                self.m2 += np.swapaxes(dev2, -1, -2) @ weights
+            self.m2 += delta**2 * (self.weight * w_sum / weight)
+        self.weight = weight
+
+    def result(self):
+        """return the reduced field"""
+        if self.agg == "std":
+            return np.sqrt(self.m2 / self.weight)
+        return self.value
+
+
+def aggregate_pixel(BH, pixel_agg, weights=None):
+    """reduce the field BH of shape (..., n, 3) over the pixel axis in one step"""
+    aggregator = PixelAggregator(pixel_agg, BH.shape[:-2] + BH.shape[-1:])
+    aggregator.update(BH, weights)
+    return aggregator.result()
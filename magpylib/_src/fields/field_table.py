@@ -0,0 +1,90 @@
+"""Tabular output of field computations"""
+import numpy as np
+
+TABLE_INDEX = ("source", "path", "sensor", "pixel")
+
+
+def index_columns(shape: tuple) -> list:
+    """
+    Row indices along each axis of an array with shape `shape`, whose elements are
+    arranged in rows in C-order.
+
+    Returns
+    -------
+    list of len(shape) integer arrays of length prod(shape)
+    """
+    cols = []
+    inner, outer = int(np.prod(shape)), 1
+    for n in shape:
+        inner //= n
+        cols.append(np.tile(np.repeat(np.arange(n), inner), outer))
+        outer *= n
+    return cols
+
+
+def getBH_table(B, *, field, output, src_ids, path_range, sens_ids):
+    """
+    Convert the field array `B` of shape (l, m, k, n, 3) into a table with one row per
+    source, path position, sensor and pixel.
+
+    Parameters
+    ----------
+    B: ndarray, shape (l, m, k, n, 3)
+        Field of l sources, m path positions, k sensors and n pixel.
+
+    field: str, `'B'` or `'H'`
+
+    output: str, one of `('dataframe', 'dataframe_multiindex', 'arrow')`
+        Output type. `'dataframe'` returns a `pandas.DataFrame` with index columns,
+        `'dataframe_multiindex'` a `pandas.DataFrame` with a `pandas.MultiIndex` and
+        `'arrow'` a `pyarrow.Table` with dictionary encoded source and sensor columns.
+
+    src_ids, sens_ids: list of str, length l and k
+        Labels of the sources and sensors, that may be repeated.
+
+    path_range: range, length m
+        Global path indices.
+
+    Returns
+    -------
+    pandas.DataFrame or pyarrow.Table
+    """
+    # pylint: disable=import-outside-toplevel
+    import pandas as pd
+
+    # labels are factorized once and expanded to the rows through integer codes
+    src_codes, src_cats = pd.factorize(np.array(src_ids, dtype=object))
+    sens_codes, sens_cats = pd.factorize(np.array(sens_ids, dtype=object))
+    cols = index_columns(B.shape[:-1])
+    codes = [src_codes[cols[0]], cols[1], sens_codes[cols[2]], cols[3]]
+    levels = [src_cats, np.arange(path_range.start, path_range.stop), sens_cats]
+    levels.append(np.arange(B.shape[3]))
+    B = B.reshape(-1, 3)
+    field_cols = [field + k for k in "xyz"]
+
+    if output == "dataframe_multiindex":
+        index = pd.MultiIndex(
+            levels=levels, codes=codes, names=TABLE_INDEX, verify_integrity=False
+        )
+        return pd.DataFrame(B, index=index, columns=field_cols)
+
+    if output == "arrow":
+        import pyarrow as pa
+
+        arrays = [
+            pa.DictionaryArray.from_arrays(codes[0].astype(np.int32), src_cats),
+            pa.array(codes[1] + path_range.start),
+            pa.DictionaryArray.from_arrays(codes[2].astype(np.int32), sens_cats),
+            pa.array(codes[3]),
+        ]
+        arrays.extend(pa.array(B[:, i]) for i in range(3))
+        return pa.Table.from_arrays(arrays, names=[*TABLE_INDEX, *field_cols])
+
+    columns = {
+        "source": np.asarray(src_cats, dtype=object)[codes[0]],
+        "path": codes[1] + path_range.start,
+        "sensor": np.asarray(sens_cats, dtype=object)[codes[2]],
+        "pixel": codes[3],
+    }
+    columns.update(zip(field_cols, B.T))
+    return pd.DataFrame(columns)
@@ -0,0 +1,738 @@
+"""
+Hierarchical evaluation (treecode) of the summed field of many sources.
+
+The sources are split into elements (point dipoles, magnets, triangular facets) that
+are clustered in an octree. Each tree node holds the Cartesian multipole moments of
+the magnetic charges of its elements. The field of a node at an observer that is well
+separated from it is computed from its moments, and only the elements of nearby leaf
+nodes are evaluated exactly. For N elements and M observers the effort scales like
+O(M log N) instead of O(M N).
+"""
+# pylint: disable=too-many-locals
+# pylint: disable=too-many-arguments
+# pylint: disable=too-many-instance-attributes
+from functools import lru_cache
+from math import comb
+
+import numpy as np
+from scipy.spatial import cKDTree  # pylint: disable=no-name-in-module
+from scipy.spatial.transform import Rotation as R
+
+from magpylib._src.fields.field_BH_triangle import triangle_field
+from magpylib._src.fields.field_BH_triangularmesh import mask_inside_trimesh
+
+# minimal number of elements for which the tree evaluation pays off
+TREE_MIN_ELEMENTS = 256
+
+# maximal number of elements in a leaf node
+TREE_LEAF_SIZE = 16
+
+# octree depth (Morton codes with TREE_DEPTH bits per axis)
+TREE_DEPTH = 10
+
+# maximal number of (observer, node) or (observer, element) pairs that are evaluated
+# in one vectorized step
+TREE_BATCH_SIZE = 2**17
+
+
+def get_tree_params(tolerance: float) -> tuple:
+    """Return expansion order p and opening angle theta of the treecode for a relative
+    error `tolerance`. A node of radius r is expanded at observers with distance d > r
+    / theta from its center. The truncation error of the field is then bounded by
+    about (p+2)*theta**p relative to the field of the node (for dipole elements the
+    expansion is one order lower than for charges), and the order is chosen for a
+    moderate number of moments."""
+    order = int(np.clip(np.ceil(-np.log10(tolerance)) + 3, 4, 12))
+    theta = (tolerance / (2 * (order + 2))) ** (1 / order)
+    return order, theta
+
+
+@lru_cache(maxsize=None)
+def get_multi_indices(order: int) -> dict:
+    """
+    Multi-indices k=(kx,ky,kz) with |k|<=order in graded order, together with the index
+    arrays of k-e_i, k-2e_i and k+e_i that are used in the recurrences. Invalid indices
+    point to an additional zero column at position n_k.
+
+    Returns
+    -------
+    dict with
+    - k: ndarray, shape (n_k,3)
+    - slices: list of slices of the multi-indices of each degree
+    - minus1, minus2, plus1: ndarray, shape (3,n_k)
+    - parent, axis: ndarray, shape (n_k,), index of k-e_i and i, with i the first
+      nonzero component of k (for monomials)
+    - shift_k, shift_j, shift_kj, shift_coef: binomial expansion of (y+d)^k
+    """
+    ks = [
+        (i, j, n - i - j)
+        for n in range(order + 1)
+        for i in range(n, -1, -1)
+        for j in range(n - i, -1, -1)
+    ]
+    lookup = {k: ind for ind, k in enumerate(ks)}
+    n_k = len(ks)
+    unit = np.eye(3, dtype=int)
+
+    def index(k):
+        return lookup.get(tuple(k), n_k)
+
+    k_arr = np.array(ks)
+    minus1 = np.array([[index(k - e) for k in k_arr] for e in unit])
+    minus2 = np.array([[index(k - 2 * e) for k in k_arr] for e in unit])
+    plus1 = np.array([[index(k + e) for k in k_arr] for e in unit])
+    axis = np.array([np.flatnonzero(k)[0] if any(k) else 0 for k in k_arr])
+    parent = minus1[axis, np.arange(n_k)]
+
+    slices, n0 = [], 0
+    for n in range(order + 1):
+        n1 = n0 + (n + 1) * (n + 2) // 2
+        slices.append(slice(n0, n1))
+        n0 = n1
+
+    # (y+d)^k = sum_{j<=k} binom(k,j) d^(k-j) y^j
+    shift = [
+        (ind_k, lookup[j], lookup[tuple(np.subtract(k, j))], coef)
+        for ind_k, k in enumerate(ks)
+        for j, coef in binomial_terms(k)
+    ]
+    shift_k, shift_j, shift_kj, shift_coef = (np.array(s) for s in zip(*shift))
+    return {
+        "k": k_arr,
+        "slices": slices,
+        "minus1": minus1,
+        "minus2": minus2,
+        "plus1": plus1,
+        "parent": parent,
+        "axis": axis,
+        "shift_k": shift_k,
+        "shift_j": shift_j,
+        "shift_kj": shift_kj,
+        "shift_coef": shift_coef.astype(float),
+    }
+
+
+def binomial_terms(k: tuple) -> list:
+    """return all multi-indices j<=k with the multinomial coefficients binom(k,j)"""
+    return [
+        ((j0, j1, j2), comb(k[0], j0) * comb(k[1], j1) * comb(k[2], j2))
+        for j0 in range(k[0] + 1)
+        for j1 in range(k[1] + 1)
+        for j2 in range(k[2] + 1)
+    ]
+
+
+def monomials(y: np.ndarray, order: int) -> np.ndarray:
+    """
+    Monomials y^k = y_x^kx * y_y^ky * y_z^kz for all |k|<=order.
+
+    Parameters
+    ----------
+    y: ndarray, shape (n,3)
+
+    Returns
+    -------
+    ndarray, shape (n,n_k+1), the last column is zero
+    """
+    ind = get_multi_indices(order)
+    n_k = len(ind["k"])
+    Y = np.zeros((len(y), n_k + 1))
+    Y[:, 0] = 1
+    for sl in ind["slices"][1:]:
+        Y[:, sl] = Y[:, ind["parent"][sl]] * y[:, ind["axis"][sl]]
+    return Y
+
+
+def taylor_coefficients(R_obs: np.ndarray, order: int) -> np.ndarray:
+    """
+    Taylor coefficients a_k(R) = 1/k! d^k/dy^k 1/|R-y| at y=0 for all |k|<=order,
+    computed with the recurrence
+    |k| R^2 a_k = (2|k|-1) sum_i R_i a_(k-e_i) - (|k|-1) sum_i a_(k-2e_i).
+
+    Parameters
+    ----------
+    R_obs: ndarray, shape (n,3)
+        Observer positions relative to the expansion center.
+
+    Returns
+    -------
+    ndarray, shape (n,n_k+1), the last column is zero
+    """
+    ind = get_multi_indices(order)
+    minus1, minus2 = ind["minus1"], ind["minus2"]
+    n_k = len(ind["k"])
+    # coefficients along the first axis, so that the recurrence gathers whole rows
+    A = np.zeros((n_k + 1, len(R_obs)))
+    r2_inv = 1 / np.einsum("ni,ni->n", R_obs, R_obs)
+    A[0] = np.sqrt(r2_inv)
+    Rx, Ry, Rz = R_obs.T
+    for n, sl in enumerate(ind["slices"][1:], start=1):
+        val = Rx * A[minus1[0, sl]]
+        val += Ry * A[minus1[1, sl]]
+        val += Rz * A[minus1[2, sl]]
+        val *= 2 * n - 1
+        if n > 1:
+            val -= (n - 1) * (A[minus2[0, sl]] + A[minus2[1, sl]] + A[minus2[2, sl]])
+        A[sl] = val * (r2_inv / n)
+    return A.T
+
+
+def moments_field(R_obs: np.ndarray, moments: np.ndarray, order: int) -> np.ndarray:
+    """
+    B-field in units of mT of magnetic charge distributions with moments
+    M_k = int rho(y) y^k dV about an expansion center at observers R_obs relative to
+    it, B = -grad(phi) with phi = 1/4pi sum_k M_k a_k(R).
+
+    Parameters
+    ----------
+    R_obs: ndarray, shape (n,3)
+    moments: ndarray, shape (n,n_k)
+
+    Returns
+    -------
+    ndarray, shape (n,3)
+    """
+    ind = get_multi_indices(order)
+    A = taylor_coefficients(R_obs, order + 1).T
+    plus1 = get_multi_indices(order + 1)["plus1"][:, : len(ind["k"])]
+    # da_k/dR_i = -(k_i+1) a_(k+e_i)
+    moments = moments.T
+    B = np.empty((len(R_obs), 3))
+    for i in range(3):
+        B[:, i] = np.einsum(
+            "kn,kn->n", moments * (ind["k"][:, i : i + 1] + 1), A[plus1[i]]
+        )
+    return B / (4 * np.pi)
+
+
+def shift_moments(moments: np.ndarray, d: np.ndarray, order: int) -> np.ndarray:
+    """
+    Moments about the center c-d of charge distributions with moments about the
+    center c.
+
+    Parameters
+    ----------
+    moments: ndarray, shape (n,n_k)
+    d: ndarray, shape (n,3)
+
+    Returns
+    -------
+    ndarray, shape (n,n_k)
+    """
+    ind = get_multi_indices(order)
+    D = monomials(d, order)
+    terms = ind["shift_coef"] * D[:, ind["shift_kj"]] * moments[:, ind["shift_j"]]
+    starts = np.flatnonzero(np.diff(ind["shift_k"], prepend=-1))
+    return np.add.reduceat(terms, starts, axis=1)
+
+
+def triangle_quadrature(vertices: np.ndarray, order: int) -> tuple:
+    """
+    Quadrature rule on triangles that integrates polynomials of degree `order` exactly
+    (collapsed Gauss-Legendre product rule).
+
+    Parameters
+    ----------
+    vertices: ndarray, shape (n,3,3)
+
+    Returns
+    -------
+    points: ndarray, shape (n,q,3)
+    weights: ndarray, shape (n,q), the weights sum up to the triangle areas
+    """
+    xs, ws = np.polynomial.legendre.leggauss(order // 2 + 1)
+    xs, ws = (xs + 1) / 2, ws / 2
+    s, t = (a.ravel() for a in np.meshgrid(xs, xs, indexing="ij"))
+    w = np.outer(ws, ws).ravel() * s
+    lam = np.stack([1 - s, s * (1 - t), s * t], axis=1)  # barycentric, shape (q,3)
+    points = np.einsum("qj,njk->nqk", lam, vertices)
+    normal = np.cross(vertices[:, 1] - vertices[:, 0], vertices[:, 2] - vertices[:, 0])
+    area2 = np.linalg.norm(normal, axis=1)
+    return points, area2[:, np.newaxis] * w
+
+
+class SourceTree:
+    """
+    Octree of source elements with the multipole moments of each node.
+
+    Parameters
+    ----------
+    centers: ndarray, shape (n,3)
+        Element centers.
+
+    radii: ndarray, shape (n,)
+        Radius of each element around its center.
+
+    charges: tuple (points, values, element index) of magnetic point charges
+        Quadrature points of the surface charges of the elements.
+
+    dipoles: tuple (points, moments, element index) of point dipoles
+
+    order: int
+        Expansion order.
+    """
+
+    def __init__(self, centers, radii, charges, dipoles, order):
+        self.order = order
+        n = len(centers)
+
+        # sort elements by Morton code of their centers
+        lo = centers.min(axis=0)
+        size = max(np.max(centers.max(axis=0) - lo), 1e-300)
+        cells = 2**TREE_DEPTH
+        quant = np.clip(((centers - lo) / size * cells).astype(np.int64), 0, cells - 1)
+        codes = np.zeros(n, dtype=np.int64)
+        for bit in range(TREE_DEPTH):
+            for axis in range(3):
+                codes |= ((quant[:, axis] >> bit) & 1) << (3 * bit + axis)
+        self.order_elements = np.argsort(codes, kind="stable")
+        codes = codes[self.order_elements]
+        self.centers = centers[self.order_elements]
+        self.radii = radii[self.order_elements]
+        self.build_nodes(codes)
+        self.compute_geometry()
+        self.compute_moments(charges, dipoles)
+
+    def build_nodes(self, codes):
+        """split the sorted elements into octree nodes, level by level"""
+        n = len(codes)
+        starts, ends, levels = [np.array([0])], [np.array([n])], [np.array([0])]
+        first_child, n_child = [], []
+        split_start, split_end = starts[0], ends[0]
+        n_nodes = 1
+        for level in range(TREE_DEPTH + 1):
+            split = (split_end - split_start > TREE_LEAF_SIZE) & (level < TREE_DEPTH)
+            fc = np.full(len(split_start), -1)
+            nc = np.zeros(len(split_start), dtype=int)
+            if np.any(split):
+                s0, s1 = split_start[split], split_end[split]
+                # element indices of all split nodes
+                counts = s1 - s0
+                idx = np.repeat(s0 - np.cumsum(counts) + counts, counts) + np.arange(
+                    counts.sum()
+                )
+                prefix = codes[idx] >> (3 * (TREE_DEPTH - level - 1))
+                new = np.ones(len(idx), dtype=bool)
+                new[1:] = prefix[1:] != prefix[:-1]
+                new[np.cumsum(counts)[:-1]] = True  # node boundaries
+                child_start = idx[new]
+                parent = np.searchsorted(s0, child_start, side="right") - 1
+                child_end = np.append(child_start[1:], 0)
+                last_child = np.append(parent[1:] != parent[:-1], True)
+                child_end[last_child] = s1[parent[last_child]]
+                n_per_parent = np.bincount(parent, minlength=len(s0))
+                fc[split] = n_nodes + np.cumsum(n_per_parent) - n_per_parent
+                nc[split] = n_per_parent
+                n_nodes += len(child_start)
+                starts.append(child_start)
+                ends.append(child_end)
+                levels.append(np.full(len(child_start), level + 1))
+                split_start, split_end = child_start, child_end
+            else:
+                split_start = split_end = np.zeros(0, dtype=int)
+            first_child.append(fc)
+            n_child.append(nc)
+            if split_start.size == 0:
+                break
+        self.start = np.concatenate(starts)
+        self.end = np.concatenate(ends)
+        self.level = np.concatenate(levels)
+        self.first_child = np.concatenate(first_child)
+        self.n_child = np.concatenate(n_child)
+        self.is_leaf = self.n_child == 0
+
+    def node_elements(self, nodes):
+        """return (node position, element index) pairs of all elements of `nodes`"""
+        counts = self.end[nodes] - self.start[nodes]
+        offsets = np.cumsum(counts) - counts
+        pos = np.repeat(np.arange(len(nodes)), counts)
+        elements = self.start[nodes][pos] + np.arange(counts.sum()) - offsets[pos]
+        return pos, elements
+
+    def compute_geometry(self):
+        """centers and radii of all nodes, the node spheres enclose all elements"""
+        n_nodes = len(self.start)
+        self.node_center = np.empty((n_nodes, 3))
+        self.node_radius = np.empty(n_nodes)
+        for level in np.unique(self.level):
+            nodes = np.flatnonzero(self.level == level)
+            pos, elements = self.node_elements(nodes)
+            bounds = np.cumsum(self.end[nodes] - self.start[nodes])
+            bounds = np.append(0, bounds[:-1])
+            cen = self.centers[elements]
+            lo = np.minimum.reduceat(cen, bounds, axis=0)
+            hi = np.maximum.reduceat(cen, bounds, axis=0)
+            center = (lo + hi) / 2
+            dist = np.linalg.norm(cen - center[pos], axis=1) + self.radii[elements]
+            self.node_center[nodes] = center
+            self.node_radius[nodes] = np.maximum.reduceat(dist, bounds)
+
+    def compute_moments(self, charges, dipoles):
+        """moments of leaf nodes from the element charges and dipoles, and of all other
+        nodes from the shifted moments of their children"""
+        order = self.order
+        ind = get_multi_indices(order)
+        n_k = len(ind["k"])
+        self.moments = np.zeros((len(self.start), n_k))
+
+        # leaf node of each (sorted) element
+        leaves = np.flatnonzero(self.is_leaf)
+        pos, elements = self.node_elements(leaves)
+        elem_leaf = np.empty(len(self.centers), dtype=int)
+        elem_leaf[elements] = leaves[pos]
+        # leaf node of each original element
+        leaf_of = np.empty_like(elem_leaf)
+        leaf_of[self.order_elements] = elem_leaf
+
+        for points, values, elem_ind, is_dipole in (
+            charges + (False,),
+            dipoles + (True,),
+        ):
+            if len(points) == 0:
+                continue
+            leaf = leaf_of[elem_ind]
+            sort = np.argsort(leaf, kind="stable")
+            points, values, leaf = points[sort], values[sort], leaf[sort]
+            step = max(1, TREE_BATCH_SIZE // n_k)
+            for i0 in range(0, len(points), step):
+                lf = leaf[i0 : i0 + step]
+                y = points[i0 : i0 + step] - self.node_center[lf]
+                if is_dipole:
+                    # M_k = sum_i m_i k_i y^(k-e_i)
+                    Y = monomials(y, order)
+                    mom = values[i0 : i0 + step]
+                    vals = sum(
+                        mom[:, i : i + 1] * ind["k"][:, i] * Y[:, ind["minus1"][i]]
+                        for i in range(3)
+                    )
+                else:
+                    vals = monomials(y, order)[:, :n_k]
+                    vals *= values[i0 : i0 + step, np.newaxis]
+                bounds = np.flatnonzero(np.diff(lf, prepend=-1))
+                self.moments[lf[bounds]] += np.add.reduceat(vals, bounds, axis=0)
+
+        # upward pass
+        for level in range(self.level.max() - 1, -1, -1):
+            nodes = np.flatnonzero((self.level == level) & ~self.is_leaf)
+            if nodes.size == 0:
+                continue
+            counts = self.n_child[nodes]
+            children = np.repeat(
+                self.first_child[nodes] - np.cumsum(counts) + counts, counts
+            ) + np.arange(counts.sum())
+            parent = np.repeat(nodes, counts)
+            shifted = shift_moments(
+                self.moments[children],
+                self.node_center[children] - self.node_center[parent],
+                order,
+            )
+            bounds = np.append(0, np.cumsum(counts)[:-1])
+            self.moments[nodes] = np.add.reduceat(shifted, bounds, axis=0)
+
+    def traverse(self, observers, theta):
+        """
+        Interaction lists of the observers.
+
+        Returns
+        -------
+        far: tuple (observer index, node index) of well separated pairs
+        near: tuple (observer index, element index) of all other pairs, element indices
+            refer to the original element order
+        """
+        far_obs, far_node, near_obs, near_node = [], [], [], []
+        obs = np.arange(len(observers))
+        node = np.zeros(len(observers), dtype=int)
+        while len(obs):
+            d = observers[obs] - self.node_center[node]
+            dist2 = np.einsum("ni,ni->n", d, d)
+            accept = self.node_radius[node] ** 2 < theta**2 * dist2
+            far_obs.append(obs[accept])
+            far_node.append(node[accept])
+            obs, node = obs[~accept], node[~accept]
+            leaf = self.is_leaf[node]
+            near_obs.append(obs[leaf])
+            near_node.append(node[leaf])
+            obs, node = obs[~leaf], node[~leaf]
+            counts = self.n_child[node]
+            obs = np.repeat(obs, counts)
+            node = np.repeat(
+                self.first_child[node] - np.cumsum(counts) + counts, counts
+            ) + np.arange(counts.sum())
+        near_obs, near_node = np.concatenate(near_obs), np.concatenate(near_node)
+        pos, elements = self.node_elements(near_node)
+        return (
+            (np.concatenate(far_obs), np.concatenate(far_node)),
+            (near_obs[pos], self.order_elements[elements]),
+        )
+
+    def far_field(self, observers, far):
+        """B-field of the well separated nodes at the observers, shape (n,3)"""
+        obs_ind, nodes = far
+        B = np.zeros((len(observers), 3))
+        step = max(1, TREE_BATCH_SIZE // len(self.moments[0]))
+        for i0 in range(0, len(obs_ind), step):
+            o, nd = obs_ind[i0 : i0 + step], nodes[i0 : i0 + step]
+            B_pairs = moments_field(
+                observers[o] - self.node_center[nd], self.moments[nd], self.order
+            )
+            for i in range(3):
+                B[:, i] += np.bincount(o, B_pairs[:, i], minlength=len(observers))
+        return B
+
+
+# outward oriented faces of the cube [-1,1]^3, two triangles per face
+CUBE_FACES = np.array(
+    [
+        [[-1, -1, -1], [-1, 1, 1], [-1, 1, -1]],
+        [[-1, -1, -1], [-1, -1, 1], [-1, 1, 1]],
+        [[1, -1, -1], [1, 1, -1], [1, 1, 1]],
+        [[1, -1, -1], [1, 1, 1], [1, -1, 1]],
+        [[-1, -1, -1], [1, -1, -1], [1, -1, 1]],
+        [[-1, -1, -1], [1, -1, 1], [-1, -1, 1]],
+        [[-1, 1, -1], [1, 1, 1], [1, 1, -1]],
+        [[-1, 1, -1], [-1, 1, 1], [1, 1, 1]],
+        [[-1, -1, -1], [1, 1, -1], [1, -1, -1]],
+        [[-1, -1, -1], [-1, 1, -1], [1, 1, -1]],
+        [[-1, -1, 1], [1, -1, 1], [1, 1, 1]],
+        [[-1, -1, 1], [1, 1, 1], [-1, 1, 1]],
+    ],
+    dtype=float,
+)
+
+
+def facet_charges(magnetization, facets, source, split=False) -> dict:
+    """surface charge description of facets with outward normals (right-hand-rule)"""
+    normal = np.cross(facets[:, 1] - facets[:, 0], facets[:, 2] - facets[:, 0])
+    normal /= np.linalg.norm(normal, axis=1, keepdims=True)
+    sigma = np.einsum("ni,ni->n", magnetization[source], normal)
+    return {"facets": facets, "sigma": sigma, "source": source, "split": split}
+
+
+def cuboid_charges(magnetization, dimension, **_) -> dict:
+    """surface charges of Cuboid magnets in their local coordinates"""
+    n = len(dimension)
+    facets = CUBE_FACES * dimension[:, np.newaxis, np.newaxis, :] / 2
+    source = np.repeat(np.arange(n), len(CUBE_FACES))
+    return facet_charges(magnetization, facets.reshape(-1, 3, 3), source)
+
+
+def tetrahedron_charges(magnetization, vertices, **_) -> dict:
+    """surface charges of Tetrahedron magnets in their local coordinates"""
+    n = len(vertices)
+    facets = vertices[:, [[0, 1, 2], [0, 1, 3], [0, 2, 3], [1, 2, 3]]]
+    # orient all faces away from the opposite vertex
+    normal = np.cross(
+        facets[:, :, 1] - facets[:, :, 0], facets[:, :, 2] - facets[:, :, 0]
+    )
+    opposite = vertices[:, [3, 2, 1, 0]] - facets[:, :, 0]
+    inwards = np.einsum("nfi,nfi->nf", normal, opposite) > 0
+    facets[inwards] = facets[inwards][:, [0, 2, 1]]
+    source = np.repeat(np.arange(n), 4)
+    return facet_charges(
+        np.reshape(magnetization, (-1, 3)), facets.reshape(-1, 3, 3), source
+    )
+
+
+def triangle_charges(magnetization, vertices, **_) -> dict:
+    """surface charges of Triangle sources in their local coordinates"""
+    return facet_charges(magnetization, vertices, np.arange(len(vertices)))
+
+
+def trimesh_charges(magnetization, mesh, **_) -> dict:
+    """surface charges of TriangularMesh magnets in their local coordinates, each
+    facet is an element of its own"""
+    facets = [np.reshape(m, (-1, 3, 3)) for m in mesh]
+    source = np.repeat(np.arange(len(facets)), [len(f) for f in facets])
+    return facet_charges(magnetization, np.concatenate(facets), source, split=True)
+
+
+def dipole_charges(moment, **_) -> dict:
+    """point dipoles of Dipole sources in their local coordinates"""
+    return {"dipoles": moment, "radius": np.zeros(len(moment))}
+
+
+def sphere_charges(magnetization, diameter, **_) -> dict:
+    """equivalent point dipoles of Sphere magnets in their local coordinates"""
+    volume = np.pi / 6 * diameter**3
+    return {"dipoles": magnetization * volume[:, np.newaxis], "radius": diameter / 2}
+
+
+def near_source_func(field_func, kwargs, pos, rot):
+    """exact field of the elements of a source group at observers close to them"""
+
+    def near(field, observers, elem):
+        obs = rot[elem].apply(observers - pos[elem], inverse=True)
+        BH = field_func(
+            field=field, observers=obs, **{k: v[elem] for k, v in kwargs.items()}
+        )
+        return rot[elem].apply(BH)
+
+    return near
+
+
+def near_facet_func(magnetization, facets):
+    """exact field of single facet elements at observers close to them"""
+
+    def near(field, observers, elem):
+        return triangle_field(field, observers, magnetization[elem], facets[elem])
+
+    return near
+
+
+def get_tree_elements(groups: list, step: int, order: int) -> dict:
+    """
+    Elements of all source groups at the path index `step` in global coordinates.
+
+    Returns
+    -------
+    dict with element centers and radii, charges and dipoles inputs of `SourceTree`,
+    `parts` (first element, last element + 1, near field function) of each group and
+    `inside` (facets, magnetization) of each TriangularMesh magnet.
+    """
+    centers, radii, charges, dipoles, parts, inside = [], [], [], [], [], []
+    n_elem = 0
+    for group in groups:
+        pos = group["position"][:, step]
+        rot = R.from_quat(group["orientation"][:, step])
+        desc = group["charges"]
+        if "dipoles" in desc:
+            n = len(pos)
+            elem_ind = n_elem + np.arange(n)
+            centers.append(pos)
+            radii.append(desc["radius"])
+            dipoles.append((pos, rot.apply(desc["dipoles"]), elem_ind))
+            near = near_source_func(group["field_func"], group["kwargs"], pos, rot)
+        else:
+            src = desc["source"]
+            rot_f = rot[src]
+            facets = np.stack([rot_f.apply(desc["facets"][:, i]) for i in range(3)], 1)
+            facets += pos[src, np.newaxis]
+            points, weights = triangle_quadrature(facets, order)
+            if desc["split"]:
+                # TriangularMesh: every facet is an element
+                n = len(facets)
+                center = facets.mean(axis=1)
+                radius = np.linalg.norm(facets - center[:, np.newaxis], axis=2)
+                centers.append(center)
+                radii.append(radius.max(axis=1))
+                mag = rot.apply(group["kwargs"]["magnetization"])
+                near = near_facet_func(mag[src], facets)
+                elem_ind = n_elem + np.arange(n)
+                for i in range(len(pos)):
+                    inside.append((facets[src == i], mag[i]))
+            else:
+                n = len(pos)
+                radius = np.zeros(n)
+                dist = np.linalg.norm(facets - pos[src, np.newaxis], axis=2)
+                np.maximum.at(radius, src, dist.max(axis=1))
+                centers.append(pos)
+                radii.append(radius)
+                near = near_source_func(group["field_func"], group["kwargs"], pos, rot)
+                elem_ind = n_elem + src
+            charges.append(
+                (
+                    points.reshape(-1, 3),
+                    (weights * desc["sigma"][:, np.newaxis]).ravel(),
+                    np.repeat(elem_ind, points.shape[1]),
+                )
+            )
+        parts.append((n_elem, n_elem + n, near))
+        n_elem += n
+
+    def concat(items):
+        if not items:
+            return np.zeros((0, 3)), np.zeros(0), np.zeros(0, dtype=int)
+        return tuple(np.concatenate(arrs) for arrs in zip(*items))
+
+    return {
+        "centers": np.concatenate(centers),
+        "radii": np.concatenate(radii),
+        "charges": concat(charges),
+        "dipoles": concat(dipoles),
+        "parts": parts,
+        "inside": inside,
+    }
+
+
+def get_tree_field(field, tree, elements, observers, theta) -> np.ndarray:
+    """field of all elements of `tree` at observers of shape (n,3)"""
+    far, (near_obs, near_elem) = tree.traverse(observers, theta)
+    BH = tree.far_field(observers, far)
+    if field == "H":
+        BH *= 10 / 4 / np.pi  # mT -> kA/m
+
+    # exact field of close elements
+    for e0, e1, near in elements["parts"]:
+        mask = (near_elem >= e0) & (near_elem < e1)
+        obs_ind, elem = near_obs[mask], near_elem[mask] - e0
+        for i0 in range(0, len(obs_ind), TREE_BATCH_SIZE):
+            o = obs_ind[i0 : i0 + TREE_BATCH_SIZE]
+            BH_pairs = near(field, observers[o], elem[i0 : i0 + TREE_BATCH_SIZE])
+            for i in range(3):
+                BH[:, i] += np.bincount(o, BH_pairs[:, i], minlength=len(observers))
+
+    # B-field inside of TriangularMesh magnets
+    if field == "B" and elements["inside"]:
+        kdtree = cKDTree(observers)
+        for facets, mag in elements["inside"]:
+            vertices = facets.reshape(-1, 3)
+            lo, hi = vertices.min(axis=0), vertices.max(axis=0)
+            cand = kdtree.query_ball_point((lo + hi) / 2, np.linalg.norm(hi - lo) / 2)
+            if cand:
+                cand = np.array(cand)
+                BH[cand[mask_inside_trimesh(observers[cand], facets)]] += mag
+    return BH
+
+
+def getBH_tree(field: str, groups: list, observers: np.ndarray, tolerance: float):
+    """
+    Summed field of many sources computed with a treecode.
+
+    Parameters
+    ----------
+    field: str
+        `'B'` or `'H'`.
+
+    groups: list of dicts
+        One dict for each source class with the keys `field_func`, `charges_func`,
+        `kwargs` (field function inputs of shape (n,...)), `position` of shape (n,m,3)
+        and `orientation` (quaternions) of shape (n,m,4) for n sources and m path
+        steps.
+
+    observers: ndarray, shape (m,k,3)
+        Observer positions for each path step.
+
+    tolerance: float
+        Relative accuracy of the field of each tree node.
+
+    Returns
+    -------
+    B-field or H-field: ndarray, shape (m,k,3)
+    """
+    order, theta = get_tree_params(tolerance)
+    for group in groups:
+        group["charges"] = group["charges_func"](**group["kwargs"])
+    static_sources = all(
+        np.all(group[key] == group[key][:, :1])
+        for group in groups
+        for key in ("position", "orientation")
+    )
+    n_steps = len(observers)
+    if static_sources and np.all(observers == observers[:1]):
+        n_steps = 1  # result is the same for all path steps
+
+    BH = np.empty(observers.shape)
+    tree = None
+    for step in range(n_steps):
+        if tree is None or not static_sources:
+            elements = get_tree_elements(groups, step, order)
+            tree = SourceTree(
+                elements["centers"],
+                elements["radii"],
+                elements["charges"],
+                elements["dipoles"],
+                order,
+            )
+        BH[step] = get_tree_field(field, tree, elements, observers[step], theta)
+    BH[n_steps:] = BH[:1]
+    return BH
@@ -42,114 +42,41 @@ level5(sens.getB, sens.getH): <--- USER INTERFACE
 """
 # pylint: disable=cyclic-import
 import numbers
-import warnings
-from itertools import product
-from typing import Callable
 
 import numpy as np
 from scipy.spatial.transform import Rotation as R
 
+from magpylib._src.defaults.defaults_classes import default_settings
 from magpylib._src.exceptions import MagpylibBadUserInput
-from magpylib._src.exceptions import MagpylibMissingInput
-from magpylib._src.input_checks import check_dimensions
-from magpylib._src.input_checks import check_excitations
-from magpylib._src.input_checks import check_format_input_observers
-from magpylib._src.input_checks import check_format_pixel_agg
+from magpylib._src.fields.field_cache import get_cache_key
+from magpylib._src.fields.field_cache import RESULT_CACHE
+from magpylib._src.fields.field_compile import evaluate_getBH_level2
+from magpylib._src.fields.field_compile import prepare_getBH_level2
+from magpylib._src.fields.field_level1 import get_compute_dtype
+from magpylib._src.fields.field_level1 import get_multipole
+from magpylib._src.fields.field_level1 import get_symmetry
+from magpylib._src.fields.field_level1 import getBH_level1_workers
+from magpylib._src.fields.field_output import open_field_output
+from magpylib._src.fields.field_output import OUT_BLOCK_SIZE
 from magpylib._src.input_checks import check_getBH_output_type
-from magpylib._src.utility import check_static_sensor_orient
-from magpylib._src.utility import format_obj_input
-from magpylib._src.utility import format_src_inputs
+from magpylib._src.input_checks import check_positive_int
+from magpylib._src.input_checks import check_workers
 from magpylib._src.utility import get_registered_sources
 
 
-def tile_group_property(group: list, n_pp: int, prop_name: str):
-    """tile up group property"""
-    out = [getattr(src, prop_name) for src in group]
-    if not np.isscalar(out[0]) and any(o.shape != out[0].shape for o in out):
-        out = np.asarray(out, dtype="object")
-    else:
-        out = np.array(out)
-    return np.repeat(out, n_pp, axis=0)
-
-
-def get_src_dict(group: list, n_pix: int, n_pp: int, poso: np.ndarray) -> dict:
-    """create dictionaries for level1 input"""
-    # pylint: disable=protected-access
-    # pylint: disable=too-many-return-statements
-
-    # tile up basic attributes that all sources have
-    # position
-    poss = np.array([src._position for src in group])
-    posv = np.tile(poss, n_pix).reshape((-1, 3))
-
-    # orientation
-    rots = np.array([src._orientation.as_quat() for src in group])
-    rotv = np.tile(rots, n_pix).reshape((-1, 4))
-    rotobj = R.from_quat(rotv)
-
-    # pos_obs
-    posov = np.tile(poso, (len(group), 1))
-
-    # determine which group we are dealing with and tile up properties
-
-    kwargs = {
-        "position": posv,
-        "observers": posov,
-        "orientation": rotobj,
-    }
-
-    src_props = group[0]._field_func_kwargs_ndim
-
-    for prop in src_props:
-        if hasattr(group[0], prop) and prop not in (
-            "position",
-            "orientation",
-            "observers",
-        ):
-            kwargs[prop] = tile_group_property(group, n_pp, prop)
-
-    return kwargs
-
-
-def getBH_level1(
-    *,
-    field_func: Callable,
-    field: str,
-    position: np.ndarray,
-    orientation: np.ndarray,
-    observers: np.ndarray,
-    **kwargs: dict,
-) -> np.ndarray:
-    """Vectorized field computation
-
-    - applies spatial transformations global CS <-> source CS
-    - selects the correct Bfield_XXX function from input
-
-    Args
-    ----
-    kwargs: dict of shape (N,x) input vectors that describes the computation.
-
-    Returns
-    -------
-    field: ndarray, shape (N,3)
-
-    """
-
-    # transform obs_pos into source CS
-    pos_rel_rot = orientation.apply(observers - position, inverse=True)
-
-    # compute field
-    BH = field_func(field=field, observers=pos_rel_rot, **kwargs)
-
-    # transform field back into global CS
-    if BH is not None:  # catch non-implemented field_func a level above
-        BH = orientation.apply(BH)
-
-    return BH
-
-
 def getBH_level2(
-    sources, observers, *, field, sumup, squeeze, pixel_agg, output, **kwargs
+    sources,
+    observers,
+    *,
+    field,
+    sumup,
+    squeeze,
+    pixel_agg,
+    output,
+    chunksize=None,
+    workers=None,
+    out=None,
+    **kwargs,
 ) -> np.ndarray:
     """Compute field for given sources and observers.
 
@@ -171,10 +98,23 @@ def getBH_level2(
     field : {'B', 'H'}
         'B' computes B field, 'H' computes H-field
     output: str, default='ndarray'
-        Output type, which must be one of `('ndarray', 'dataframe')`. By default a multi-
-        dimensional array ('ndarray') is returned. If 'dataframe' is chosen, the function
-        returns a 2D-table as a `pandas.DataFrame` object (the Pandas library must be
+        Output type, which must be one of `('ndarray', 'dataframe',
+        'dataframe_multiindex', 'arrow')`. By default a `numpy.ndarray` object is
+        returned. If 'dataframe' is chosen, a `pandas.DataFrame` object with 'source',
+        'path', 'sensor' and 'pixel' columns is returned (the Pandas library must be
+        installed). With 'dataframe_multiindex' these columns form a
+        `pandas.MultiIndex`, and with 'arrow' a `pyarrow.Table` with dictionary encoded
+        'source' and 'sensor' columns is returned (the PyArrow library must be
         installed).
+    chunksize: int, default=None
+        Maximal number of field evaluation instances (source x path x pixel) that are
+        computed in one vectorized step. Limits the peak memory usage.
+    workers: int, default=None
+        Number of threads among which each vectorized step is split. By default
+        `magpylib.defaults.compute.workers` is used.
+    out: str, path-like or ndarray, default=None
+        File name of a `.npy` file or preallocated array (e.g. `numpy.memmap`) into
+        which the field is written path block by path block.
 
     Returns
     -------
@@ -190,21 +130,20 @@ def getBH_level2(
     - compute field and store in allocated array
     - rearrange the array in the shape squeeze((L, M, K, N1, N2, ...,3))
     """
-    # pylint: disable=protected-access
-    # pylint: disable=too-many-branches
-    # pylint: disable=too-many-statements
-    # pylint: disable=import-outside-toplevel
-
-    from magpylib._src.obj_classes.class_Collection import Collection
-    from magpylib._src.obj_classes.class_magnet_TriangularMesh import TriangularMesh
 
     # CHECK AND FORMAT INPUT ---------------------------------------------------
     if isinstance(sources, str):
+        if out is not None:
+            raise MagpylibBadUserInput(
+                "Input parameter `out` is only available for the object oriented "
+                "interface. Input parameter `sources` must not be a string."
+            )
         return getBH_dict_level2(
             source_type=sources,
             observers=observers,
             field=field,
             squeeze=squeeze,
+            workers=workers,
             **kwargs,
         )
 
@@ -215,226 +154,116 @@ def getBH_level2(
             "is defined by a string (e.g. sources='Cylinder')"
         )
 
-    # format sources input:
-    #   input: allow only one bare src object or a 1D list/tuple of src and col
-    #   out: sources = ordered list of sources
-    #   out: src_list = ordered list of sources with flattened collections
-    sources, src_list = format_src_inputs(sources)
-
-    # test if all source dimensions and excitations are initialized
-    check_dimensions(src_list)
-    check_excitations(src_list)
-
-    # make sure that TriangularMesh sources have a closed mesh when getB is called - warn if not
-    if field == "B":
-        for src in src_list:
-            if isinstance(src, TriangularMesh):
-                # unchecked mesh status - may be open
-                if src.status_open is None:
-                    warnings.warn(
-                        f"Unchecked mesh status of {src} detected before B-field computation. "
-                        "An open mesh may return bad results."
-                    )
-                elif src.status_open:  # mesh is open
-                    warnings.warn(
-                        f"Open mesh of {src} detected before B-field computation. "
-                        "An open mesh may return bad results."
-                    )
-
-    # format observers input:
-    #   allow only bare sensor, collection, pos_vec or list thereof
-    #   transform input into an ordered list of sensors (pos_vec->pixel)
-    #   check if all pixel shapes are similar - or else if pixel_agg is given
-    pixel_agg_func = check_format_pixel_agg(pixel_agg)
-    sensors, pix_shapes = check_format_input_observers(observers, pixel_agg)
-    pix_nums = [
-        int(np.prod(ps[:-1])) for ps in pix_shapes
-    ]  # number of pixel for each sensor
-    pix_inds = np.cumsum([0] + pix_nums)  # cumulative indices of pixel for each sensor
-    pix_all_same = len(set(pix_shapes)) == 1
-
-    # check which sensors have unit rotation
-    #   so that they dont have to be rotated back later (performance issue)
-    #   this check is made now when sensor paths are not yet tiled.
-    unitQ = np.array([0, 0, 0, 1.0])
-    unrotated_sensors = [
-        all(all(r == unitQ) for r in sens._orientation.as_quat()) for sens in sensors
-    ]
-
-    # check which sensors have a static orientation
-    #   either static sensor or translation path
-    #   later such sensors require less back-rotation effort (performance issue)
-    static_sensor_rot = check_static_sensor_orient(sensors)
-
-    # some important quantities -------------------------------------------------
-    obj_list = set(src_list + sensors)  # unique obj entries only !!!
-    num_of_sources = len(sources)
-    num_of_src_list = len(src_list)
-    num_of_sensors = len(sensors)
-
-    # tile up paths -------------------------------------------------------------
-    #   all obj paths that are shorter than max-length are filled up with the last
-    #   position/orientation of the object (static paths)
-    path_lengths = [len(obj._position) for obj in obj_list]
-    max_path_len = max(path_lengths)
-
-    # objects to tile up and reset below
-    mask_reset = [max_path_len != pl for pl in path_lengths]
-    reset_obj = [obj for obj, mask in zip(obj_list, mask_reset) if mask]
-    reset_obj_m0 = [pl for pl, mask in zip(path_lengths, mask_reset) if mask]
-
-    if max_path_len > 1:
-        for obj, m0 in zip(reset_obj, reset_obj_m0):
-            # length to be tiled
-            m_tile = max_path_len - m0
-            # tile up position
-            tile_pos = np.tile(obj._position[-1], (m_tile, 1))
-            obj._position = np.concatenate((obj._position, tile_pos))
-            # tile up orientation
-            tile_orient = np.tile(obj._orientation.as_quat()[-1], (m_tile, 1))
-            # FUTURE use Rotation.concatenate() requires scipy>=1.8 and python 3.8
-            tile_orient = np.concatenate((obj._orientation.as_quat(), tile_orient))
-            obj._orientation = R.from_quat(tile_orient)
-
-    # combine information form all sensors to generate pos_obs with-------------
-    #   shape (m * concat all sens flat pixel, 3)
-    #   allows sensors with different pixel shapes <- relevant?
-    poso = [
-        [
-            r.apply(sens.pixel.reshape(-1, 3)) + p
-            for r, p in zip(sens._orientation, sens._position)
-        ]
-        for sens in sensors
-    ]
-    poso = np.concatenate(poso, axis=1).reshape(-1, 3)
-    n_pp = len(poso)
-    n_pix = int(n_pp / max_path_len)
-
-    # group similar source types----------------------------------------------
-    field_func_groups = {}
-    for ind, src in enumerate(src_list):
-        group_key = src.field_func
-        if group_key is None:
-            raise MagpylibMissingInput(
-                f"Cannot compute {field}-field because "
-                f"`field_func` of {src} has undefined {field}-field computation."
-            )
-        if group_key not in field_func_groups:
-            field_func_groups[group_key] = {
-                "sources": [],
-                "order": [],
-            }
-        field_func_groups[group_key]["sources"].append(src)
-        field_func_groups[group_key]["order"].append(ind)
-
-    # evaluate each group in one vectorized step -------------------------------
-    B = np.empty((num_of_src_list, max_path_len, n_pix, 3))  # allocate B
-    for field_func, group in field_func_groups.items():
-        lg = len(group["sources"])
-        gr = group["sources"]
-        src_dict = get_src_dict(gr, n_pix, n_pp, poso)  # compute array dict for level1
-        B_group = getBH_level1(
-            field_func=field_func, field=field, **src_dict
-        )  # compute field
-        if B_group is None:
-            raise MagpylibMissingInput(
-                f"Cannot compute {field}-field because "
-                f"`field_func` {field_func} has undefined {field}-field computation."
-            )
-        B_group = B_group.reshape(
-            (lg, max_path_len, n_pix, 3)
-        )  # reshape (2% slower for large arrays)
-        for gr_ind in range(lg):  # put into dedicated positions in B
-            B[group["order"][gr_ind]] = B_group[gr_ind]
-
-    # reshape output ----------------------------------------------------------------
-    # rearrange B when there is at least one Collection with more than one source
-    if num_of_src_list > num_of_sources:
-        for src_ind, src in enumerate(sources):
-            if isinstance(src, Collection):
-                col_len = len(format_obj_input(src, allow="sources"))
-                # set B[i] to sum of slice
-                B[src_ind] = np.sum(B[src_ind : src_ind + col_len], axis=0)
-                B = np.delete(
-                    B, np.s_[src_ind + 1 : src_ind + col_len], 0
-                )  # delete remaining part of slice
-
-    # apply sensor rotations (after summation over collections to reduce rot.apply operations)
-    for sens_ind, sens in enumerate(sensors):  # cycle through all sensors
-        if not unrotated_sensors[sens_ind]:  # apply operations only to rotated sensors
-            # select part where rot is applied
-            Bpart = B[:, :, pix_inds[sens_ind] : pix_inds[sens_ind + 1]]
-            # change shape to (P,3) for rot package
-            Bpart_orig_shape = Bpart.shape
-            Bpart_flat = np.reshape(Bpart, (-1, 3))
-            # apply sensor rotation
-            if static_sensor_rot[sens_ind]:  # special case: same rotation along path
-                sens_orient = sens._orientation[0]
-            else:
-                sens_orient = R.from_quat(
-                    np.tile(  # tile for each source from list
-                        np.repeat(  # same orientation path index for all indices
-                            sens._orientation.as_quat(), pix_nums[sens_ind], axis=0
-                        ),
-                        (num_of_sources, 1),
-                    )
-                )
-            Bpart_flat_rot = sens_orient.inv().apply(Bpart_flat)
-            # overwrite Bpart in B
-            B[:, :, pix_inds[sens_ind] : pix_inds[sens_ind + 1]] = np.reshape(
-                Bpart_flat_rot, Bpart_orig_shape
+    chunksize = check_positive_int(chunksize, "chunksize", allow_None=True)
+    workers = check_workers(workers)
+
+    if out is not None:
+        if check_getBH_output_type(output) != "ndarray":
+            raise MagpylibBadUserInput(
+                "Input parameter `out` requires `output='ndarray'`.\n"
+                f"Instead received output={output!r}."
             )
+        setup = prepare_getBH_level2(
+            sources, observers, field=field, pixel_agg=pixel_agg
+        )
+        return getBH_level2_out(
+            setup,
+            out,
+            field=field,
+            sumup=sumup,
+            squeeze=squeeze,
+            pixel_agg=pixel_agg,
+            chunksize=chunksize,
+            workers=workers,
+        )
 
-    # rearrange sensor-pixel shape
-    if pix_all_same:
-        B = B.reshape((num_of_sources, max_path_len, num_of_sensors, *pix_shapes[0]))
-        # aggregate pixel values
-        if pixel_agg is not None:
-            B = pixel_agg_func(B, axis=tuple(range(3 - B.ndim, -1)))
-    else:  # pixel_agg is not None when pix_all_same, checked with
-        Bsplit = np.split(B, pix_inds[1:-1], axis=2)
-        Bagg = [np.expand_dims(pixel_agg_func(b, axis=2), axis=2) for b in Bsplit]
-        B = np.concatenate(Bagg, axis=2)
-
-    # reset tiled objects
-    for obj, m0 in zip(reset_obj, reset_obj_m0):
-        obj._position = obj._position[:m0]
-        obj._orientation = obj._orientation[:m0]
-
-    # sumup over sources
-    if sumup:
-        B = np.sum(B, axis=0, keepdims=True)
-
-    output = check_getBH_output_type(output)
-
-    if output == "dataframe":
-        # pylint: disable=import-outside-toplevel
-        import pandas as pd
-
-        if sumup and len(sources) > 1:
-            src_ids = [f"sumup ({len(sources)})"]
-        else:
-            src_ids = [s.style.label if s.style.label else f"{s}" for s in sources]
-        sens_ids = [s.style.label if s.style.label else f"{s}" for s in sensors]
-        num_of_pixels = np.prod(pix_shapes[0][:-1]) if pixel_agg is None else 1
-        df = pd.DataFrame(
-            data=product(src_ids, range(max_path_len), sens_ids, range(num_of_pixels)),
-            columns=["source", "path", "sensor", "pixel"],
+    # return a previous result for unchanged sources and observers
+    cache_settings = default_settings.compute.cache
+    cache_key = None
+    if not cache_settings.enabled:
+        RESULT_CACHE.trim(0)  # free memory when the cache was disabled
+    elif output == "ndarray":
+        cache_key = get_cache_key(
+            sources,
+            observers,
+            field=field,
+            sumup=sumup,
+            squeeze=squeeze,
+            pixel_agg=pixel_agg,
+            dtype=default_settings.compute.dtype,
+            approximation=default_settings.compute.approximation,
+            tolerance=default_settings.compute.tolerance,
+            symmetry=default_settings.compute.symmetry,
+            backend=default_settings.compute.backend,
         )
-        df[[field + k for k in "xyz"]] = B.reshape(-1, 3)
-        return df
+        if cache_key is not None:
+            B = RESULT_CACHE.get(cache_key)
+            if B is not None:
+                return B
 
-    # reduce all size-1 levels
-    if squeeze:
-        B = np.squeeze(B)
-    elif pixel_agg is not None:
-        # add missing dimension since `pixel_agg` reduces pixel
-        # dimensions to zero. Only needed if `squeeze is False``
-        B = np.expand_dims(B, axis=-2)
+    setup = prepare_getBH_level2(sources, observers, field=field, pixel_agg=pixel_agg)
 
+    B = evaluate_getBH_level2(
+        setup,
+        field=field,
+        sumup=sumup,
+        squeeze=squeeze,
+        pixel_agg=pixel_agg,
+        output=output,
+        chunksize=chunksize,
+        workers=workers,
+    )
+
+    if cache_key is not None:
+        maxsize = cache_settings.maxsize
+        RESULT_CACHE.put(cache_key, B, np.inf if maxsize is None else maxsize * 1e6)
     return B
 
 
+def getBH_level2_out(
+    setup, out, *, field, sumup, squeeze, pixel_agg, chunksize, workers
+) -> np.ndarray:
+    """Compute the field from a setup dict generated by `prepare_getBH_level2` in
+    blocks of path positions that are written to `out` one after the other, so that
+    the complete result is never held in memory.
+
+    The path blocks contain at most `chunksize` (or `OUT_BLOCK_SIZE` without
+    `chunksize`) field evaluations, but at least one path position.
+    """
+    # pylint: disable=protected-access
+    path_len = max(len(obj._position) for obj in setup["obj_list"])
+    if pixel_agg is None:
+        pix_shape = setup["pix_shapes"][0][:-1]
+    else:
+        pix_shape = (1,)
+    shape = (
+        1 if sumup else len(setup["sources"]),
+        path_len,
+        len(setup["sensors"]),
+        *pix_shape,
+        3,
+    )
+    view, result = open_field_output(out, shape, squeeze)
+    block_size = OUT_BLOCK_SIZE if chunksize is None else chunksize
+    n_path = max(1, block_size // (len(setup["src_list"]) * setup["pix_inds"][-1]))
+    for start in range(0, path_len, n_path):
+        stop = min(start + n_path, path_len)
+        view[:, start:stop] = evaluate_getBH_level2(
+            setup,
+            field=field,
+            sumup=sumup,
+            squeeze=False,
+            pixel_agg=pixel_agg,
+            output="ndarray",
+            chunksize=chunksize,
+            workers=workers,
+            path_window=(start, stop),
+        )
+    if isinstance(view, np.memmap):
+        view.flush()
+    return result
+
+
 def getBH_dict_level2(
     source_type,
     observers,
@@ -443,12 +272,14 @@ def getBH_dict_level2(
     position=(0, 0, 0),
     orientation=R.identity(),
     squeeze=True,
+    workers=None,
     **kwargs: dict,
 ) -> np.ndarray:
     """Direct interface access to vectorized computation
 
     Parameters
     ----------
+    workers: number of threads among which the computation is split.
     kwargs: dict that describes the computation.
 
     Returns
@@ -535,11 +366,22 @@ def getBH_dict_level2(
         if val.ndim < expected_dim and not ragged_seq[key]:
             kwargs[key] = np.tile(val, (vec_len, *[1] * (expected_dim - 1)))
 
-    # change orientation back to Rotation object
-    kwargs["orientation"] = R.from_quat(kwargs["orientation"])
+    # change orientation back to Rotation object, skip unit rotations
+    if np.all(kwargs["orientation"][:, :3] == 0):
+        kwargs["orientation"] = None
+    else:
+        kwargs["orientation"] = R.from_quat(kwargs["orientation"])
 
     # compute and return B
-    B = getBH_level1(field=field, field_func=field_func, **kwargs)
+    B = getBH_level1_workers(
+        field=field,
+        field_func=field_func,
+        workers=check_workers(workers),
+        dtype=get_compute_dtype(source_classes[source_type]),
+        multipole=get_multipole(source_classes[source_type]),
+        symmetry=get_symmetry(source_classes[source_type]),
+        **kwargs,
+    )
 
     if B is not None and squeeze:
         return np.squeeze(B)
@@ -553,6 +395,9 @@ def getB(
     squeeze=True,
     pixel_agg=None,
     output="ndarray",
+    chunksize=None,
+    workers=None,
+    out=None,
     **kwargs,
 ):
     """Compute B-field in units of mT for given sources and observers.
@@ -593,9 +438,34 @@ def getB(
         With this option, observers input with different (pixel) shapes is allowed.
 
     output: str, default='ndarray'
-        Output type, which must be one of `('ndarray', 'dataframe')`. By default a
-        `numpy.ndarray` object is returned. If 'dataframe' is chosen, a `pandas.DataFrame`
-        object is returned (the Pandas library must be installed).
+        Output type, which must be one of `('ndarray', 'dataframe',
+        'dataframe_multiindex', 'arrow')`. By default a `numpy.ndarray` object is
+        returned. If 'dataframe' is chosen, a `pandas.DataFrame` object with 'source',
+        'path', 'sensor' and 'pixel' columns is returned (the Pandas library must be
+        installed). With 'dataframe_multiindex' these columns form a
+        `pandas.MultiIndex`, and with 'arrow' a `pyarrow.Table` with dictionary encoded
+        'source' and 'sensor' columns is returned (the PyArrow library must be
+        installed).
+
+    chunksize: int, default=`None`
+        Maximal number of field evaluations (source x path position x pixel) that are
+        computed in one vectorized step. With this option the computation is split into
+        blocks, which bounds the peak memory usage independent of the problem size.
+        With `pixel_agg` one of `'mean'`, `'sum'`, `'min'`, `'max'` or `'std'`, the
+        pixel fields of each block are aggregated directly and never stored.
+        By default all evaluations are vectorized in one step.
+
+    workers: int, default=`None`
+        Number of threads among which each vectorized computation step is split. With
+        `-1` all available CPU cores are used. By default the value of
+        `magpylib.defaults.compute.workers` is used (1 unless changed).
+
+    out: str, path-like or ndarray, default=`None`
+        File name of a `.npy` file that is created as memory-map, or a preallocated
+        float64 array (e.g. a `numpy.memmap`) with the output shape, into which the
+        field is written block by block of path positions. The returned array shares
+        the memory of `out`, so that results larger than RAM can be computed and read
+        lazily with `magpylib.load_field`. Only available with `output='ndarray'`.
 
     See Also
     --------
@@ -712,6 +582,9 @@ def getB(
         squeeze=squeeze,
         pixel_agg=pixel_agg,
         output=output,
+        chunksize=chunksize,
+        workers=workers,
+        out=out,
         field="B",
         **kwargs,
     )
@@ -724,6 +597,9 @@ def getH(
     squeeze=True,
     pixel_agg=None,
     output="ndarray",
+    chunksize=None,
+    workers=None,
+    out=None,
     **kwargs,
 ):
     """Compute H-field in kA/m for given sources and observers.
@@ -764,9 +640,34 @@ def getH(
         With this option, observers input with different (pixel) shapes is allowed.
 
     output: str, default='ndarray'
-        Output type, which must be one of `('ndarray', 'dataframe')`. By default a
-        `numpy.ndarray` object is returned. If 'dataframe' is chosen, a `pandas.DataFrame`
-        object is returned (the Pandas library must be installed).
+        Output type, which must be one of `('ndarray', 'dataframe',
+        'dataframe_multiindex', 'arrow')`. By default a `numpy.ndarray` object is
+        returned. If 'dataframe' is chosen, a `pandas.DataFrame` object with 'source',
+        'path', 'sensor' and 'pixel' columns is returned (the Pandas library must be
+        installed). With 'dataframe_multiindex' these columns form a
+        `pandas.MultiIndex`, and with 'arrow' a `pyarrow.Table` with dictionary encoded
+        'source' and 'sensor' columns is returned (the PyArrow library must be
+        installed).
+
+    chunksize: int, default=`None`
+        Maximal number of field evaluations (source x path position x pixel) that are
+        computed in one vectorized step. With this option the computation is split into
+        blocks, which bounds the peak memory usage independent of the problem size.
+        With `pixel_agg` one of `'mean'`, `'sum'`, `'min'`, `'max'` or `'std'`, the
+        pixel fields of each block are aggregated directly and never stored.
+        By default all evaluations are vectorized in one step.
+
+    workers: int, default=`None`
+        Number of threads among which each vectorized computation step is split. With
+        `-1` all available CPU cores are used. By default the value of
+        `magpylib.defaults.compute.workers` is used (1 unless changed).
+
+    out: str, path-like or ndarray, default=`None`
+        File name of a `.npy` file that is created as memory-map, or a preallocated
+        float64 array (e.g. a `numpy.memmap`) with the output shape, into which the
+        field is written block by block of path positions. The returned array shares
+        the memory of `out`, so that results larger than RAM can be computed and read
+        lazily with `magpylib.load_field`. Only available with `output='ndarray'`.
 
     See Also
     --------
@@ -883,6 +784,9 @@ def getH(
         squeeze=squeeze,
         pixel_agg=pixel_agg,
         output=output,
+        chunksize=chunksize,
+        workers=workers,
+        out=out,
         field="H",
         **kwargs,
     )
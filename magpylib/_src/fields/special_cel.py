@@ -2,6 +2,10 @@ import math as m
 
 import numpy as np
 
+# the active set of cel_iterv is compacted when less than this fraction of it is
+# still unconverged
+CEL_COMPACT_FRACTION = 0.25
+
 
 def cel0(kc, p, c, s):
     """
@@ -91,24 +95,44 @@ def celv(kc, p, c, s):
     em = k + em
     kk = k.copy()
 
-    # define a mask that adjusts with every evaluation step so that only
-    # non-converged entries are further iterated.
-    mask = np.ones(n, dtype=bool)
-    while np.any(mask):
-        k[mask] = 2 * np.sqrt(kk[mask])
-        kk[mask] = np.copy(k[mask] * em[mask])
-        f[mask] = cc[mask]
-        cc[mask] = cc[mask] + ss[mask] / pp[mask]
-        g[mask] = kk[mask] / pp[mask]
-        ss[mask] = 2 * (ss[mask] + f[mask] * g[mask])
-        pp[mask] = g[mask] + pp[mask]
-        g[mask] = em[mask]
-        em[mask] = k[mask] + em[mask]
-
-        # redefine mask
-        mask = np.abs(g - k) > g * errtol
+    # only non-converged entries are further iterated. The result of each entry is
+    # computed at the iteration where it converges. Converged entries are removed from
+    # the computation (active set) once a significant fraction has converged.
+    result = np.empty(n)
+    ind = np.arange(n)  # indices of the active set in the result
+    pending = np.ones(n, dtype=bool)  # active set entries without result
+    while True:
+        k = 2 * np.sqrt(kk)
+        kk = k * em
+        f = cc
+        cc = cc + ss / pp
+        g = kk / pp
+        ss = 2 * (ss + f * g)
+        pp = g + pp
+        g = em
+        em = k + em
 
-    return (np.pi / 2) * (ss + cc * em) / (em * (em + pp))
+        done = pending & ~(np.abs(g - k) > g * errtol)  # NaN counts as converged
+        done = np.flatnonzero(done)  # integer indexing only visits the done entries
+        emd = em[done]
+        result[ind[done]] = (
+            (np.pi / 2) * (ss[done] + cc[done] * emd) / (emd * (emd + pp[done]))
+        )
+        pending[done] = False
+        n_pending = np.count_nonzero(pending)
+        if n_pending == 0:
+            return result
+        if n_pending < len(ind) * CEL_COMPACT_FRACTION:
+            ind = ind[pending]
+            k, kk, cc, ss, pp, em = (
+                k[pending],
+                kk[pending],
+                cc[pending],
+                ss[pending],
+                pp[pending],
+                em[pending],
+            )
+            pending = np.ones(n_pending, dtype=bool)
 
 
 def cel(kcv: np.ndarray, pv: np.ndarray, cv: np.ndarray, sv: np.ndarray) -> np.ndarray:
@@ -132,9 +156,13 @@ def cel(kcv: np.ndarray, pv: np.ndarray, cv: np.ndarray, sv: np.ndarray) -> np.n
     return celv(kcv, pv, cv, sv)
 
 
-def cel_iter(qc, p, g, cc, ss, em, kk):
+def cel_iter(qc, p, g, cc, ss, em, kk, n_iter=None):
     """
     Iterative part of Bulirsch cel algorithm
+
+    With `n_iter` the vectorized iteration is performed a fixed number of times
+    without convergence checks, see cel_iterv. Small inputs are always evaluated
+    element-wise until convergence.
     """
     # case1: scalar input
     #   This cannot happen in core functions
@@ -145,9 +173,10 @@ def cel_iter(qc, p, g, cc, ss, em, kk):
         result = np.zeros(n_input)
         for i in range(n_input):
             result[i] = cel_iter0(qc[i], p[i], g[i], cc[i], ss[i], em[i], kk[i])
+        return result
 
     # case3: vectorized evaluation
-    return cel_iterv(qc, p, g, cc, ss, em, kk)
+    return cel_iterv(qc, p, g, cc, ss, em, kk, n_iter=n_iter)
 
 
 def cel_iter0(qc, p, g, cc, ss, em, kk):
@@ -167,11 +196,75 @@ def cel_iter0(qc, p, g, cc, ss, em, kk):
     return 1.5707963267948966 * (ss + cc * em) / (em * (em + p))
 
 
-def cel_iterv(qc, p, g, cc, ss, em, kk):
+def cel_iter_count(qc, g, em, kk):
+    """
+    Number of iterations of the Bulirsch cel algorithm until convergence for scalar
+    inputs. The convergence only depends on qc, g, em and kk.
+    """
+    n_iter = 0
+    while m.fabs(g - qc) >= qc * 1e-8:
+        qc = 2 * m.sqrt(kk)
+        kk = qc * em
+        g = em
+        em = em + qc
+        n_iter += 1
+    return n_iter
+
+
+def cel_iterv(qc, p, g, cc, ss, em, kk, n_iter=None):
     """
     Iterative part of Bulirsch cel algorithm
+
+    The number of iterations until convergence depends on the input. The result of
+    each element is computed at the iteration where it converges, as in cel_iter0.
+    Converged elements are removed from the computation (active set), so that each
+    iteration only operates on the remaining unconverged elements. The active set is
+    only compacted when a significant fraction of it has converged, as compaction
+    requires copying all arrays.
+
+    With `n_iter` all elements are iterated exactly `n_iter` times without any
+    convergence checks, which is faster when the required number of iterations is
+    known (e.g. for a known range of qc).
     """
-    while np.any(np.fabs(g - qc) >= qc * 1e-8):
+    if n_iter is not None:
+        for _ in range(n_iter):
+            qc = 2 * np.sqrt(kk)
+            kk = qc * em
+            f = cc
+            cc = cc + ss / p
+            g = kk / p
+            ss = 2 * (ss + f * g)
+            p = p + g
+            g = em
+            em = em + qc
+        return 1.5707963267948966 * (ss + cc * em) / (em * (em + p))
+
+    result = np.empty(len(qc))
+    ind = np.arange(len(qc))  # indices of the active set in the result
+    pending = np.ones(len(qc), dtype=bool)  # active set entries without result
+    while True:
+        done = pending & ~(np.fabs(g - qc) >= qc * 1e-8)  # NaN counts as converged
+        done = np.flatnonzero(done)  # integer indexing only visits the done entries
+        emd = em[done]
+        result[ind[done]] = (
+            1.5707963267948966 * (ss[done] + cc[done] * emd) / (emd * (emd + p[done]))
+        )
+        pending[done] = False
+        n_pending = np.count_nonzero(pending)
+        if n_pending == 0:
+            return result
+        if n_pending < len(ind) * CEL_COMPACT_FRACTION:
+            ind = ind[pending]
+            qc, p, g, cc, ss, em, kk = (
+                qc[pending],
+                p[pending],
+                g[pending],
+                cc[pending],
+                ss[pending],
+                em[pending],
+                kk[pending],
+            )
+            pending = np.ones(n_pending, dtype=bool)
         qc = 2 * np.sqrt(kk)
         kk = qc * em
         f = cc
@@ -181,4 +274,3 @@ def cel_iterv(qc, p, g, cc, ss, em, kk):
         p = p + g
         g = em
         em = em + qc
-    return 1.5707963267948966 * (ss + cc * em) / (em * (em + p))
@@ -0,0 +1,145 @@
+"""
+Shared evaluation of incomplete elliptic integrals.
+
+Field kernels that evaluate many incomplete elliptic integrals (e.g. the
+`CylinderSegment` case functions) request them through `ellipeinc`, `ellipkinc` and
+`el3_angle` of this module. Inside an `elliptic_integrals()` context, all requests
+are evaluated by one `EllipticIntegrals` instance that computes each distinct
+parameter set only once: duplicates within a request and parameter sets of earlier
+requests (e.g. identical segment geometries along a path, or the same integral
+required by several field components) are looked up instead of recomputed. Outside
+of such a context, the requests are evaluated directly.
+"""
+import contextvars
+from contextlib import contextmanager
+
+import numpy as np
+from scipy.special import ellipeinc as scipy_ellipeinc
+from scipy.special import ellipkinc as scipy_ellipkinc
+
+from magpylib._src.fields.special_el3 import el3_angle as el3_angle_direct
+from magpylib._src.utility import hash_rows
+from magpylib._src.utility import unique_hashes
+
+# active evaluator of the current context (thread)
+ACTIVE_ELLIPTIC_INTEGRALS = contextvars.ContextVar("elliptic_integrals", default=None)
+
+
+class EllipticIntegrals:
+    """
+    Evaluator of incomplete elliptic integrals that computes each distinct parameter
+    set only once and stores the results for later requests.
+
+    The stored parameter sets are identified by 64 bit hashes that are kept sorted,
+    so that requests are looked up with a binary search. Hash collisions are detected
+    by comparing the parameters and are then computed without lookup.
+    """
+
+    def __init__(self):
+        # kind -> (sorted hashes, parameter bits (n, n_params), values (n, n_values))
+        self._store = {}
+        self.stats = {"requested": 0, "computed": 0}
+
+    def evaluate(self, kind: str, func, params: tuple) -> np.ndarray:
+        """
+        Return func(*params) with shape (n, n_values) for the parameter arrays
+        `params` of shape (n,), computing only the parameter sets that have not been
+        computed before by requests of the same `kind`.
+        """
+        params = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in params))
+        params = [np.ascontiguousarray(p).ravel() for p in params]
+        self.stats["requested"] += len(params[0])
+        bits = [p.view(np.uint64) for p in params]
+        h_unique, first, inverse = unique_hashes(hash_rows(bits))
+        bits_unique = [b[first] for b in bits]
+        if any(np.any(b_u[inverse] != b) for b_u, b in zip(bits_unique, bits)):
+            # hash collision
+            self.stats["computed"] += len(params[0])
+            return func(*params)
+
+        h_store, bits_store, values_store = self._store.get(kind, (None, None, None))
+        if h_store is None:
+            hit = np.zeros(len(h_unique), dtype=bool)
+        else:
+            pos = np.searchsorted(h_store, h_unique).clip(max=len(h_store) - 1)
+            hit = h_store[pos] == h_unique
+            for b_s, b_u in zip(bits_store, bits_unique):
+                hit[hit] = b_s[pos[hit]] == b_u[hit]
+        miss = ~hit
+
+        bits_miss = [b_u[miss] for b_u in bits_unique]
+        values_miss = func(*(b.view(float) for b in bits_miss))
+        self.stats["computed"] += len(values_miss)
+        if h_store is None:
+            values = values_miss
+        else:
+            values = np.empty((len(h_unique), values_miss.shape[1]))
+            values[miss] = values_miss
+            values[hit] = values_store[pos[hit]]
+
+        # store the new parameter sets, the hashes remain sorted
+        if h_store is None:
+            self._store[kind] = (h_unique, bits_unique, values)
+        elif len(values_miss):
+            ins = np.searchsorted(h_store, h_unique[miss])
+            self._store[kind] = (
+                np.insert(h_store, ins, h_unique[miss]),
+                [np.insert(b_s, ins, b_m) for b_s, b_m in zip(bits_store, bits_miss)],
+                np.insert(values_store, ins, values_miss, axis=0),
+            )
+        return values[inverse]
+
+    def ellip_ef(self, phi, m) -> np.ndarray:
+        """incomplete elliptic integrals of the 2nd (E) and 1st kind (F), shape (n,2)"""
+
+        def func(phi, m):
+            return np.stack([scipy_ellipeinc(phi, m), scipy_ellipkinc(phi, m)], axis=1)
+
+        return self.evaluate("ef", func, (phi, m))
+
+    def el3_angle(self, phi, n, m) -> np.ndarray:
+        """incomplete elliptic integral of the 3rd kind, see `special_el3.el3_angle`"""
+
+        def func(phi, n, m):
+            return el3_angle_direct(phi, n, m)[:, np.newaxis]
+
+        return self.evaluate("el3", func, (phi, n, m))
+
+
+@contextmanager
+def elliptic_integrals():
+    """Context in which all elliptic integral requests of this module are evaluated
+    by one shared `EllipticIntegrals` instance, that is returned."""
+    evaluator = EllipticIntegrals()
+    token = ACTIVE_ELLIPTIC_INTEGRALS.set(evaluator)
+    try:
+        yield evaluator
+    finally:
+        ACTIVE_ELLIPTIC_INTEGRALS.reset(token)
+
+
+def ellipeinc(phi, m):
+    """incomplete elliptic integral of the 2nd kind, see `scipy.special.ellipeinc`"""
+    evaluator = ACTIVE_ELLIPTIC_INTEGRALS.get()
+    if evaluator is None:
+        return scipy_ellipeinc(phi, m)
+    shape = np.broadcast(phi, m).shape
+    return evaluator.ellip_ef(phi, m)[:, 0].reshape(shape)
+
+
+def ellipkinc(phi, m):
+    """incomplete elliptic integral of the 1st kind, see `scipy.special.ellipkinc`"""
+    evaluator = ACTIVE_ELLIPTIC_INTEGRALS.get()
+    if evaluator is None:
+        return scipy_ellipkinc(phi, m)
+    shape = np.broadcast(phi, m).shape
+    return evaluator.ellip_ef(phi, m)[:, 1].reshape(shape)
+
+
+def el3_angle(phi, n, m):
+    """incomplete elliptic integral of the 3rd kind, see `special_el3.el3_angle`"""
+    evaluator = ACTIVE_ELLIPTIC_INTEGRALS.get()
+    if evaluator is None:
+        return el3_angle_direct(phi, n, m)
+    shape = np.broadcast(phi, n, m).shape
+    return evaluator.el3_angle(phi, n, m)[:, 0].reshape(shape)
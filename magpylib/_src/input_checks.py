@@ -3,6 +3,7 @@
 # pylint: disable=cyclic-import
 import inspect
 import numbers
+import os
 
 import numpy as np
 from scipy.spatial.transform import Rotation
@@ -129,6 +130,27 @@ def check_field_input(inp, origin):
     )
 
 
+def check_field_output(out, origin, observers, *inputs):
+    """check if the `out` input of a core field function is None or a float ndarray
+    with the shape of the observers input, that does not share memory with the
+    observers or any other array input"""
+    if out is None:
+        return
+    shape = np.shape(observers)
+    if (
+        not isinstance(out, np.ndarray)
+        or out.shape != shape
+        or out.dtype.kind != "f"
+        or not out.flags.writeable
+        or any(np.may_share_memory(out, inp) for inp in (observers, *inputs))
+    ):
+        raise MagpylibBadUserInput(
+            f"{origin} input `out` must be `None` or a writeable float ndarray of shape "
+            f"{shape} that does not share memory with the array inputs.\n"
+            f"Instead received {out!r}."
+        )
+
+
 def validate_field_func(val):
     """test if field function for custom source is valid
     - needs to be a callable
@@ -143,7 +165,8 @@ def validate_field_func(val):
             f"Instead received {type(val).__name__}."
         )
 
-    fn_args = inspect.getfullargspec(val).args
+    # signature of functions and of the __call__ method of callable objects
+    fn_args = list(inspect.signature(val).parameters)
     if fn_args[:2] != ["field", "observers"]:
         raise MagpylibBadUserInput(
             "Input parameter `field_func` must have two positional args"
@@ -631,24 +654,99 @@ def check_format_pixel_agg(pixel_agg):
     return pixel_agg_func
 
 
+def check_format_pixel_weights(weights, pixel):
+    """check pixel weights input, None or non-negative float array_like with the
+    pixel shape and a positive sum, and return it as ndarray"""
+    if weights is None:
+        return None
+    pix_shape = pixel.shape[:-1]
+    sig_type = f"`None` or non-negative array_like with pixel shape {pix_shape}"
+    is_array_like(
+        weights,
+        f"Input parameter `pixel_weights` must be {sig_type}.\n"
+        f"Instead received type {type(weights)}.",
+    )
+    weights = make_float_array(
+        weights,
+        "Input parameter `pixel_weights` must contain only float compatible entries.\n",
+    )
+    if weights.shape not in (pix_shape, (int(np.prod(pix_shape)),)):
+        raise MagpylibBadUserInput(
+            f"Input parameter `pixel_weights` must be {sig_type}.\n"
+            f"Instead received array_like with shape {weights.shape}."
+        )
+    if not np.all(np.isfinite(weights)) or np.any(weights < 0) or weights.sum() <= 0:
+        raise MagpylibBadUserInput(
+            "Input parameter `pixel_weights` must be finite and non-negative with a "
+            "positive sum."
+        )
+    return weights
+
+
+def check_positive_int(inp, sig_name, allow_None=False):
+    """check if input is a positive integer (or None if allowed) and return it as int"""
+    if allow_None and inp is None:
+        return None
+    if not isinstance(inp, numbers.Integral) or isinstance(inp, bool) or inp < 1:
+        raise MagpylibBadUserInput(
+            f"Input parameter `{sig_name}` must be "
+            f"{'`None` or ' if allow_None else ''}a positive integer.\n"
+            f"Instead received {inp!r}."
+        )
+    return int(inp)
+
+
+def check_workers(workers):
+    """check if workers input is None, a positive integer or -1 and return the number
+    of workers. `None` falls back to `magpylib.defaults.compute.workers`, -1 to the
+    number of available CPU cores."""
+    if workers is None:
+        workers = default_settings.compute.workers
+        if workers is None:
+            return 1
+    if (
+        not isinstance(workers, numbers.Integral)
+        or isinstance(workers, bool)
+        or (workers < 1 and workers != -1)
+    ):
+        raise MagpylibBadUserInput(
+            "Input parameter `workers` must be `None`, a positive integer or -1.\n"
+            f"Instead received {workers!r}."
+        )
+    if workers == -1:
+        return os.cpu_count() or 1
+    return int(workers)
+
+
 def check_getBH_output_type(output):
     """check if getBH output is acceptable"""
-    acceptable = ("ndarray", "dataframe")
+    acceptable = ("ndarray", "dataframe", "dataframe_multiindex", "arrow")
     if output not in acceptable:
         raise ValueError(
             f"The `output` argument must be one of {acceptable}."
             f"\nInstead received {output}."
         )
-    if output == "dataframe":
+    if output != "ndarray":
         try:
             # pylint: disable=import-outside-toplevel
             # pylint: disable=unused-import
             import pandas
         except ImportError as missing_module:  # pragma: no cover
             raise ModuleNotFoundError(
-                "In order to use the `dataframe` output type, you need to install pandas "
-                "via pip or conda, "
+                f"In order to use the `{output}` output type, you need to install "
+                "pandas via pip or conda, "
                 "see https://pandas.pydata.org/docs/getting_started/install.html"
             ) from missing_module
+    if output == "arrow":
+        try:
+            # pylint: disable=import-outside-toplevel
+            # pylint: disable=unused-import
+            import pyarrow
+        except ImportError as missing_module:  # pragma: no cover
+            raise ModuleNotFoundError(
+                "In order to use the `arrow` output type, you need to install pyarrow "
+                "via pip or conda, "
+                "see https://arrow.apache.org/docs/python/install.html"
+            ) from missing_module
 
     return output
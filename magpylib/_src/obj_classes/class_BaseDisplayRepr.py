@@ -66,6 +66,11 @@ class BaseDisplayRepr:
                     if val.ndim > 2:
                         val_str += f" ({'x'.join(str(p) for p in px_shape)})"
                     val = val_str
+                elif k == "pixel_weights":
+                    val = getattr(self, k)
+                    if val is None:
+                        continue  # equal weights are not shown
+                    val = f"shape{val.shape}"
                 elif k == "status_disconnected_data":
                     val = getattr(self, k)
                     if val is not None:
@@ -17,6 +17,11 @@ class BaseSource(BaseGeo, BaseDisplayRepr):
 
     _field_func = None
     _field_func_kwargs_ndim = {}
+    _field_func_float32 = False  # field_func can run in single precision
+    _field_func_gradient = None  # analytical field gradient
+    _field_func_moments = None  # volume moments for the multipole approximation
+    _field_func_tree = None  # surface charges or dipoles for the treecode
+    _field_func_symmetry = None  # canonical configurations of a rotational symmetry
     _editable_field_func = False
 
     def __init__(self, position, orientation, field_func=None, style=None, **kwargs):
@@ -46,7 +51,16 @@ class BaseSource(BaseGeo, BaseDisplayRepr):
             )
         self._field_func = val
 
-    def getB(self, *observers, squeeze=True, pixel_agg=None, output="ndarray"):
+    def getB(
+        self,
+        *observers,
+        squeeze=True,
+        pixel_agg=None,
+        output="ndarray",
+        chunksize=None,
+        workers=None,
+        out=None,
+    ):
         """Compute the B-field in units of mT generated by the source.
 
         Parameters
@@ -67,10 +81,33 @@ class BaseSource(BaseGeo, BaseDisplayRepr):
             With this option, observers input with different (pixel) shapes is allowed.
 
         output: str, default='ndarray'
-            Output type, which must be one of `('ndarray', 'dataframe')`. By default a multi-
-            dimensional array ('ndarray') is returned. If 'dataframe' is chosen, the function
-            returns a 2D-table as a `pandas.DataFrame` object (the Pandas library must be
-            installed).
+            Output type, which must be one of `('ndarray', 'dataframe',
+            'dataframe_multiindex', 'arrow')`. By default a `numpy.ndarray` object is
+            returned. If 'dataframe' is chosen, a `pandas.DataFrame` object with
+            'source', 'path', 'sensor' and 'pixel' columns is returned (the Pandas
+            library must be installed). With 'dataframe_multiindex' these columns form a
+            `pandas.MultiIndex`, and with 'arrow' a `pyarrow.Table` with dictionary
+            encoded 'source' and 'sensor' columns is returned (the PyArrow library must
+            be installed).
+
+        chunksize: int, default=`None`
+            Maximal number of field evaluations (source x path position x pixel) that are
+            computed in one vectorized step. With this option the computation is split into
+            blocks, which bounds the peak memory usage independent of the problem size.
+            With `pixel_agg` one of `'mean'`, `'sum'`, `'min'`, `'max'` or `'std'`, the
+            pixel fields of each block are aggregated directly and never stored.
+
+        workers: int, default=`None`
+            Number of threads among which each vectorized computation step is split. With
+            `-1` all available CPU cores are used. By default the value of
+            `magpylib.defaults.compute.workers` is used.
+
+        out: str, path-like or ndarray, default=`None`
+            File name of a `.npy` file that is created as memory-map, or a preallocated
+            float64 array (e.g. a `numpy.memmap`) with the output shape, into which the
+            field is written block by block of path positions. The returned array shares
+            the memory of `out`, so that results larger than RAM can be computed and read
+            lazily with `magpylib.load_field`. Only available with `output='ndarray'`.
 
         Returns
         -------
@@ -112,10 +149,22 @@ class BaseSource(BaseGeo, BaseDisplayRepr):
             squeeze=squeeze,
             pixel_agg=pixel_agg,
             output=output,
+            chunksize=chunksize,
+            workers=workers,
+            out=out,
             field="B",
         )
 
-    def getH(self, *observers, squeeze=True, pixel_agg=None, output="ndarray"):
+    def getH(
+        self,
+        *observers,
+        squeeze=True,
+        pixel_agg=None,
+        output="ndarray",
+        chunksize=None,
+        workers=None,
+        out=None,
+    ):
         """Compute the H-field in units of kA/m generated by the source.
 
         Parameters
@@ -136,10 +185,33 @@ class BaseSource(BaseGeo, BaseDisplayRepr):
             With this option, observers input with different (pixel) shapes is allowed.
 
         output: str, default='ndarray'
-            Output type, which must be one of `('ndarray', 'dataframe')`. By default a multi-
-            dimensional array ('ndarray') is returned. If 'dataframe' is chosen, the function
-            returns a 2D-table as a `pandas.DataFrame` object (the Pandas library must be
-            installed).
+            Output type, which must be one of `('ndarray', 'dataframe',
+            'dataframe_multiindex', 'arrow')`. By default a `numpy.ndarray` object is
+            returned. If 'dataframe' is chosen, a `pandas.DataFrame` object with
+            'source', 'path', 'sensor' and 'pixel' columns is returned (the Pandas
+            library must be installed). With 'dataframe_multiindex' these columns form a
+            `pandas.MultiIndex`, and with 'arrow' a `pyarrow.Table` with dictionary
+            encoded 'source' and 'sensor' columns is returned (the PyArrow library must
+            be installed).
+
+        chunksize: int, default=`None`
+            Maximal number of field evaluations (source x path position x pixel) that are
+            computed in one vectorized step. With this option the computation is split into
+            blocks, which bounds the peak memory usage independent of the problem size.
+            With `pixel_agg` one of `'mean'`, `'sum'`, `'min'`, `'max'` or `'std'`, the
+            pixel fields of each block are aggregated directly and never stored.
+
+        workers: int, default=`None`
+            Number of threads among which each vectorized computation step is split. With
+            `-1` all available CPU cores are used. By default the value of
+            `magpylib.defaults.compute.workers` is used.
+
+        out: str, path-like or ndarray, default=`None`
+            File name of a `.npy` file that is created as memory-map, or a preallocated
+            float64 array (e.g. a `numpy.memmap`) with the output shape, into which the
+            field is written block by block of path positions. The returned array shares
+            the memory of `out`, so that results larger than RAM can be computed and read
+            lazily with `magpylib.load_field`. Only available with `output='ndarray'`.
 
         Returns
         -------
@@ -182,6 +254,9 @@ class BaseSource(BaseGeo, BaseDisplayRepr):
             squeeze=squeeze,
             pixel_agg=pixel_agg,
             output=output,
+            chunksize=chunksize,
+            workers=workers,
+            out=out,
             field="H",
         )
 
@@ -203,6 +278,7 @@ class BaseMagnet(BaseSource):
     @magnetization.setter
     def magnetization(self, mag):
         """Set magnetization vector, array_like, shape (3,), unit mT."""
+        self._bump_version()
         self._magnetization = check_format_input_vector(
             mag,
             dims=(1,),
@@ -230,6 +306,7 @@ class BaseCurrent(BaseSource):
     @current.setter
     def current(self, current):
         """Set current value, scalar, unit A."""
+        self._bump_version()
         # input type and init check
         self._current = check_format_input_scalar(
             current,
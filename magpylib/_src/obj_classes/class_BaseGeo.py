@@ -2,6 +2,8 @@
 # pylint: disable=cyclic-import
 # pylint: disable=too-many-instance-attributes
 # pylint: disable=protected-access
+from itertools import count
+
 import numpy as np
 from scipy.spatial.transform import Rotation as R
 
@@ -12,6 +14,9 @@ from magpylib._src.obj_classes.class_BaseTransform import BaseTransform
 from magpylib._src.style import BaseStyle
 from magpylib._src.utility import add_iteration_suffix
 
+# globally unique object state versions, see `BaseGeo._bump_version`
+STATE_VERSIONS = count()
+
 
 def pad_slice_path(path1, path2):
     """edge-pads or end-slices path 2 to fit path 1 format
@@ -72,6 +77,7 @@ class BaseGeo(BaseTransform):
         style=None,
         **kwargs,
     ):
+        self._bump_version()
         self._style_kwargs = {}
         self._parent = None
         # set _position and _orientation attributes
@@ -80,6 +86,13 @@ class BaseGeo(BaseTransform):
         if style is not None or kwargs:  # avoid style creation cost if not needed
             self._style_kwargs = self._process_style_kwargs(style=style, **kwargs)
 
+    def _bump_version(self):
+        """Give the object a new, globally unique state version. Called by the
+        setters of field relevant properties and by move/rotate, so that object states
+        can be compared in O(1) by the field result cache. In-place modifications of
+        arrays returned by the getters are not tracked."""
+        self._version = next(STATE_VERSIONS)
+
     @staticmethod
     def _process_style_kwargs(style=None, **kwargs):
         if kwargs:
@@ -125,6 +138,7 @@ class BaseGeo(BaseTransform):
             pos = np.pad(pos, ((0, len_ori - len_pos), (0, 0)), "edge")
 
         # set attributes
+        self._bump_version()
         self._position = pos
         self._orientation = R.from_quat(oriQ)
 
@@ -173,6 +187,7 @@ class BaseGeo(BaseTransform):
             Position-path of object.
         """
         old_pos = self._position
+        self._bump_version()
 
         # check and set new position
         self._position = check_format_input_vector(
@@ -217,6 +232,7 @@ class BaseGeo(BaseTransform):
             for every path step.
         """
         old_oriQ = self._orientation.as_quat()
+        self._bump_version()
 
         # set _orientation attribute with ndim=2 format
         oriQ = check_format_input_orientation(inp, init_format=True)
@@ -351,6 +367,7 @@ class BaseGeo(BaseTransform):
             self._parent = parent
         else:
             obj_copy = deepcopy(self)
+        obj_copy._bump_version()  # a copy is a new object state
 
         if getattr(self, "_style", None) is not None or bool(
             getattr(self, "_style_kwargs", False)
@@ -166,6 +166,7 @@ def apply_move(target_object, displacement, start="auto"):
     # apply move operation
     ppath[start:end] += inpath
     target_object._position = ppath
+    target_object._bump_version()
 
     return target_object
 
@@ -240,6 +241,7 @@ def apply_rotation(
     # pylint: disable=attribute-defined-outside-init
     target_object._orientation = R.from_quat(opath)
     target_object._position = ppath
+    target_object._bump_version()
 
     return target_object
 
@@ -515,7 +515,16 @@ class BaseCollection(BaseDisplayRepr):
             sources, sensors = self, inputs
         return sources, sensors
 
-    def getB(self, *inputs, squeeze=True, pixel_agg=None, output="ndarray"):
+    def getB(
+        self,
+        *inputs,
+        squeeze=True,
+        pixel_agg=None,
+        output="ndarray",
+        chunksize=None,
+        workers=None,
+        out=None,
+    ):
         """Compute B-field in mT for given sources and observers.
 
         Parameters
@@ -536,9 +545,33 @@ class BaseCollection(BaseDisplayRepr):
             With this option, observers input with different (pixel) shapes is allowed.
 
         output: str, default='ndarray'
-            Output type, which must be one of `('ndarray', 'dataframe')`. By default a
-            `numpy.ndarray` object is returned. If 'dataframe' is chosen, a `pandas.DataFrame`
-            object is returned (the Pandas library must be installed).
+            Output type, which must be one of `('ndarray', 'dataframe',
+            'dataframe_multiindex', 'arrow')`. By default a `numpy.ndarray` object is
+            returned. If 'dataframe' is chosen, a `pandas.DataFrame` object with
+            'source', 'path', 'sensor' and 'pixel' columns is returned (the Pandas
+            library must be installed). With 'dataframe_multiindex' these columns form a
+            `pandas.MultiIndex`, and with 'arrow' a `pyarrow.Table` with dictionary
+            encoded 'source' and 'sensor' columns is returned (the PyArrow library must
+            be installed).
+
+        chunksize: int, default=`None`
+            Maximal number of field evaluations (source x path position x pixel) that are
+            computed in one vectorized step. With this option the computation is split into
+            blocks, which bounds the peak memory usage independent of the problem size.
+            With `pixel_agg` one of `'mean'`, `'sum'`, `'min'`, `'max'` or `'std'`, the
+            pixel fields of each block are aggregated directly and never stored.
+
+        workers: int, default=`None`
+            Number of threads among which each vectorized computation step is split. With
+            `-1` all available CPU cores are used. By default the value of
+            `magpylib.defaults.compute.workers` is used.
+
+        out: str, path-like or ndarray, default=`None`
+            File name of a `.npy` file that is created as memory-map, or a preallocated
+            float64 array (e.g. a `numpy.memmap`) with the output shape, into which the
+            field is written block by block of path positions. The returned array shares
+            the memory of `out`, so that results larger than RAM can be computed and read
+            lazily with `magpylib.load_field`. Only available with `output='ndarray'`.
 
         Returns
         -------
@@ -583,10 +616,22 @@ class BaseCollection(BaseDisplayRepr):
             squeeze=squeeze,
             pixel_agg=pixel_agg,
             output=output,
+            chunksize=chunksize,
+            workers=workers,
+            out=out,
             field="B",
         )
 
-    def getH(self, *inputs, squeeze=True, pixel_agg=None, output="ndarray"):
+    def getH(
+        self,
+        *inputs,
+        squeeze=True,
+        pixel_agg=None,
+        output="ndarray",
+        chunksize=None,
+        workers=None,
+        out=None,
+    ):
         """Compute H-field in kA/m for given sources and observers.
 
         Parameters
@@ -607,9 +652,33 @@ class BaseCollection(BaseDisplayRepr):
             With this option, observers input with different (pixel) shapes is allowed.
 
         output: str, default='ndarray'
-            Output type, which must be one of `('ndarray', 'dataframe')`. By default a
-            `numpy.ndarray` object is returned. If 'dataframe' is chosen, a `pandas.DataFrame`
-            object is returned (the Pandas library must be installed).
+            Output type, which must be one of `('ndarray', 'dataframe',
+            'dataframe_multiindex', 'arrow')`. By default a `numpy.ndarray` object is
+            returned. If 'dataframe' is chosen, a `pandas.DataFrame` object with
+            'source', 'path', 'sensor' and 'pixel' columns is returned (the Pandas
+            library must be installed). With 'dataframe_multiindex' these columns form a
+            `pandas.MultiIndex`, and with 'arrow' a `pyarrow.Table` with dictionary
+            encoded 'source' and 'sensor' columns is returned (the PyArrow library must
+            be installed).
+
+        chunksize: int, default=`None`
+            Maximal number of field evaluations (source x path position x pixel) that are
+            computed in one vectorized step. With this option the computation is split into
+            blocks, which bounds the peak memory usage independent of the problem size.
+            With `pixel_agg` one of `'mean'`, `'sum'`, `'min'`, `'max'` or `'std'`, the
+            pixel fields of each block are aggregated directly and never stored.
+
+        workers: int, default=`None`
+            Number of threads among which each vectorized computation step is split. With
+            `-1` all available CPU cores are used. By default the value of
+            `magpylib.defaults.compute.workers` is used.
+
+        out: str, path-like or ndarray, default=`None`
+            File name of a `.npy` file that is created as memory-map, or a preallocated
+            float64 array (e.g. a `numpy.memmap`) with the output shape, into which the
+            field is written block by block of path positions. The returned array shares
+            the memory of `out`, so that results larger than RAM can be computed and read
+            lazily with `magpylib.load_field`. Only available with `output='ndarray'`.
 
         Returns
         -------
@@ -654,6 +723,9 @@ class BaseCollection(BaseDisplayRepr):
             squeeze=squeeze,
             pixel_agg=pixel_agg,
             output=output,
+            chunksize=chunksize,
+            workers=workers,
+            out=out,
             field="H",
         )
 
@@ -4,6 +4,7 @@ import numpy as np
 from magpylib._src.display.traces_core import make_Sensor
 from magpylib._src.fields.field_wrap_BH import getBH_level2
 from magpylib._src.input_checks import check_format_input_vector
+from magpylib._src.input_checks import check_format_pixel_weights
 from magpylib._src.obj_classes.class_BaseDisplayRepr import BaseDisplayRepr
 from magpylib._src.obj_classes.class_BaseGeo import BaseGeo
 from magpylib._src.style import SensorStyle
@@ -35,6 +36,11 @@ class Sensor(BaseGeo, BaseDisplayRepr):
         a unit-rotation. For m>1, the `position` and `orientation` attributes
         together represent an object path.
 
+    pixel_weights: array_like, shape (n1,n2,...), default=`None`
+        Non-negative weights of the sensor pixel, used by the pixel aggregations
+        `pixel_agg='mean'` (weighted average), `'sum'` (weighted sum, e.g. for
+        quadrature rules) and `'std'`. `None` corresponds to equal weights.
+
     parent: `Collection` object or `None`
         The object is a child of it's parent collection.
 
@@ -85,11 +91,13 @@ class Sensor(BaseGeo, BaseDisplayRepr):
         position=(0, 0, 0),
         pixel=(0, 0, 0),
         orientation=None,
+        pixel_weights=None,
         style=None,
         **kwargs,
     ):
         # instance attributes
         self.pixel = pixel
+        self.pixel_weights = pixel_weights
 
         # init inheritance
         BaseGeo.__init__(self, position, orientation, style=style, **kwargs)
@@ -108,6 +116,7 @@ class Sensor(BaseGeo, BaseDisplayRepr):
         """Set sensor pixel positions in the local sensor coordinates.
         Must be an array_like, float compatible with shape (..., 3)
         """
+        self._bump_version()
         self._pixel = check_format_input_vector(
             pix,
             dims=range(1, 20),
@@ -116,8 +125,29 @@ class Sensor(BaseGeo, BaseDisplayRepr):
             sig_type="array_like (list, tuple, ndarray) with shape (n1, n2, ..., 3)",
         )
 
+    @property
+    def pixel_weights(self):
+        """Non-negative weights of the sensor pixel used by the `'mean'`, `'sum'` and
+        `'std'` pixel aggregations. `None` corresponds to equal weights.
+        """
+        return self._pixel_weights
+
+    @pixel_weights.setter
+    def pixel_weights(self, weights):
+        """Set pixel weights, `None` or array_like with the pixel shape (n1, n2, ...)."""
+        self._bump_version()
+        self._pixel_weights = check_format_pixel_weights(weights, self._pixel)
+
     def getB(
-        self, *sources, sumup=False, squeeze=True, pixel_agg=None, output="ndarray"
+        self,
+        *sources,
+        sumup=False,
+        squeeze=True,
+        pixel_agg=None,
+        output="ndarray",
+        chunksize=None,
+        workers=None,
+        out=None,
     ):
         """Compute the B-field in units of mT as seen by the sensor.
 
@@ -140,9 +170,33 @@ class Sensor(BaseGeo, BaseDisplayRepr):
             With this option, observers input with different (pixel) shapes is allowed.
 
         output: str, default='ndarray'
-            Output type, which must be one of `('ndarray', 'dataframe')`. By default a
-            `numpy.ndarray` object is returned. If 'dataframe' is chosen, a `pandas.DataFrame`
-            object is returned (the Pandas library must be installed).
+            Output type, which must be one of `('ndarray', 'dataframe',
+            'dataframe_multiindex', 'arrow')`. By default a `numpy.ndarray` object is
+            returned. If 'dataframe' is chosen, a `pandas.DataFrame` object with
+            'source', 'path', 'sensor' and 'pixel' columns is returned (the Pandas
+            library must be installed). With 'dataframe_multiindex' these columns form a
+            `pandas.MultiIndex`, and with 'arrow' a `pyarrow.Table` with dictionary
+            encoded 'source' and 'sensor' columns is returned (the PyArrow library must
+            be installed).
+
+        chunksize: int, default=`None`
+            Maximal number of field evaluations (source x path position x pixel) that are
+            computed in one vectorized step. With this option the computation is split into
+            blocks, which bounds the peak memory usage independent of the problem size.
+            With `pixel_agg` one of `'mean'`, `'sum'`, `'min'`, `'max'` or `'std'`, the
+            pixel fields of each block are aggregated directly and never stored.
+
+        workers: int, default=`None`
+            Number of threads among which each vectorized computation step is split. With
+            `-1` all available CPU cores are used. By default the value of
+            `magpylib.defaults.compute.workers` is used.
+
+        out: str, path-like or ndarray, default=`None`
+            File name of a `.npy` file that is created as memory-map, or a preallocated
+            float64 array (e.g. a `numpy.memmap`) with the output shape, into which the
+            field is written block by block of path positions. The returned array shares
+            the memory of `out`, so that results larger than RAM can be computed and read
+            lazily with `magpylib.load_field`. Only available with `output='ndarray'`.
 
         Returns
         -------
@@ -188,11 +242,22 @@ class Sensor(BaseGeo, BaseDisplayRepr):
             squeeze=squeeze,
             pixel_agg=pixel_agg,
             output=output,
+            chunksize=chunksize,
+            workers=workers,
+            out=out,
             field="B",
         )
 
     def getH(
-        self, *sources, sumup=False, squeeze=True, pixel_agg=None, output="ndarray"
+        self,
+        *sources,
+        sumup=False,
+        squeeze=True,
+        pixel_agg=None,
+        output="ndarray",
+        chunksize=None,
+        workers=None,
+        out=None,
     ):
         """Compute the H-field in units of kA/m as seen by the sensor.
 
@@ -215,9 +280,33 @@ class Sensor(BaseGeo, BaseDisplayRepr):
             With this option, observers input with different (pixel) shapes is allowed.
 
         output: str, default='ndarray'
-            Output type, which must be one of `('ndarray', 'dataframe')`. By default a
-            `numpy.ndarray` object is returned. If 'dataframe' is chosen, a `pandas.DataFrame`
-            object is returned (the Pandas library must be installed).
+            Output type, which must be one of `('ndarray', 'dataframe',
+            'dataframe_multiindex', 'arrow')`. By default a `numpy.ndarray` object is
+            returned. If 'dataframe' is chosen, a `pandas.DataFrame` object with
+            'source', 'path', 'sensor' and 'pixel' columns is returned (the Pandas
+            library must be installed). With 'dataframe_multiindex' these columns form a
+            `pandas.MultiIndex`, and with 'arrow' a `pyarrow.Table` with dictionary
+            encoded 'source' and 'sensor' columns is returned (the PyArrow library must
+            be installed).
+
+        chunksize: int, default=`None`
+            Maximal number of field evaluations (source x path position x pixel) that are
+            computed in one vectorized step. With this option the computation is split into
+            blocks, which bounds the peak memory usage independent of the problem size.
+            With `pixel_agg` one of `'mean'`, `'sum'`, `'min'`, `'max'` or `'std'`, the
+            pixel fields of each block are aggregated directly and never stored.
+
+        workers: int, default=`None`
+            Number of threads among which each vectorized computation step is split. With
+            `-1` all available CPU cores are used. By default the value of
+            `magpylib.defaults.compute.workers` is used.
+
+        out: str, path-like or ndarray, default=`None`
+            File name of a `.npy` file that is created as memory-map, or a preallocated
+            float64 array (e.g. a `numpy.memmap`) with the output shape, into which the
+            field is written block by block of path positions. The returned array shares
+            the memory of `out`, so that results larger than RAM can be computed and read
+            lazily with `magpylib.load_field`. Only available with `output='ndarray'`.
 
         Returns
         -------
@@ -263,6 +352,9 @@ class Sensor(BaseGeo, BaseDisplayRepr):
             squeeze=squeeze,
             pixel_agg=pixel_agg,
             output=output,
+            chunksize=chunksize,
+            workers=workers,
+            out=out,
             field="H",
         )
 
@@ -1,5 +1,6 @@
 """Line current class code"""
 from magpylib._src.display.traces_core import make_Line
+from magpylib._src.fields.field_BH_gradient import current_vertices_field_gradient
 from magpylib._src.fields.field_BH_line import current_vertices_field
 from magpylib._src.input_checks import check_format_input_vertices
 from magpylib._src.obj_classes.class_BaseExcitations import BaseCurrent
@@ -90,6 +91,8 @@ class Line(BaseCurrent):
         "segment_start": 2,
         "segment_end": 2,
     }
+    _field_func_gradient = staticmethod(current_vertices_field_gradient)
+    _field_func_float32 = True
     get_trace = make_Line
 
     def __init__(
@@ -120,6 +123,7 @@ class Line(BaseCurrent):
     @vertices.setter
     def vertices(self, vert):
         """Set Line vertices, array_like, mm."""
+        self._bump_version()
         self._vertices = check_format_input_vertices(vert)
 
     @property
@@ -1,5 +1,6 @@
 """Loop current class code"""
 from magpylib._src.display.traces_core import make_Loop
+from magpylib._src.fields.field_BH_gradient import current_loop_field_gradient
 from magpylib._src.fields.field_BH_loop import current_loop_field
 from magpylib._src.input_checks import check_format_input_scalar
 from magpylib._src.obj_classes.class_BaseExcitations import BaseCurrent
@@ -80,6 +81,7 @@ class Loop(BaseCurrent):
 
     _field_func = staticmethod(current_loop_field)
     _field_func_kwargs_ndim = {"current": 1, "diameter": 1}
+    _field_func_gradient = staticmethod(current_loop_field_gradient)
     get_trace = make_Loop
 
     def __init__(
@@ -106,6 +108,7 @@ class Loop(BaseCurrent):
     @diameter.setter
     def diameter(self, dia):
         """Set Loop loop diameter, float, mm."""
+        self._bump_version()
         self._diameter = check_format_input_scalar(
             dia,
             sig_name="diameter",
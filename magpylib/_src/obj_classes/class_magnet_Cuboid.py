@@ -1,6 +1,9 @@
 """Magnet Cuboid class code"""
 from magpylib._src.display.traces_core import make_Cuboid
 from magpylib._src.fields.field_BH_cuboid import magnet_cuboid_field
+from magpylib._src.fields.field_BH_gradient import magnet_cuboid_field_gradient
+from magpylib._src.fields.field_BH_multipole import cuboid_moments
+from magpylib._src.fields.field_tree import cuboid_charges
 from magpylib._src.input_checks import check_format_input_vector
 from magpylib._src.obj_classes.class_BaseExcitations import BaseMagnet
 from magpylib._src.utility import unit_prefix
@@ -85,6 +88,9 @@ class Cuboid(BaseMagnet):
 
     _field_func = staticmethod(magnet_cuboid_field)
     _field_func_kwargs_ndim = {"magnetization": 2, "dimension": 2}
+    _field_func_gradient = staticmethod(magnet_cuboid_field_gradient)
+    _field_func_moments = staticmethod(cuboid_moments)
+    _field_func_tree = staticmethod(cuboid_charges)
     get_trace = make_Cuboid
 
     def __init__(
@@ -111,6 +117,7 @@ class Cuboid(BaseMagnet):
     @dimension.setter
     def dimension(self, dim):
         """Set Cuboid dimension (a,b,c), shape (3,), mm."""
+        self._bump_version()
         self._dimension = check_format_input_vector(
             dim,
             dims=(1,),
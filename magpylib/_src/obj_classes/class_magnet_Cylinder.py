@@ -1,6 +1,8 @@
 """Magnet Cylinder class code"""
 from magpylib._src.display.traces_core import make_Cylinder
 from magpylib._src.fields.field_BH_cylinder_segment import magnet_cylinder_field
+from magpylib._src.fields.field_BH_multipole import cylinder_moments
+from magpylib._src.fields.field_BH_symmetry import cylinder_symmetry
 from magpylib._src.input_checks import check_format_input_vector
 from magpylib._src.obj_classes.class_BaseExcitations import BaseMagnet
 from magpylib._src.utility import unit_prefix
@@ -81,6 +83,8 @@ class Cylinder(BaseMagnet):
 
     _field_func = staticmethod(magnet_cylinder_field)
     _field_func_kwargs_ndim = {"magnetization": 2, "dimension": 2}
+    _field_func_moments = staticmethod(cylinder_moments)
+    _field_func_symmetry = staticmethod(cylinder_symmetry)
     get_trace = make_Cylinder
 
     def __init__(
@@ -107,6 +111,7 @@ class Cylinder(BaseMagnet):
     @dimension.setter
     def dimension(self, dim):
         """Set Cylinder dimension (d,h) in units of mm."""
+        self._bump_version()
         self._dimension = check_format_input_vector(
             dim,
             dims=(1,),
@@ -5,6 +5,8 @@ from magpylib._src.display.traces_core import make_CylinderSegment
 from magpylib._src.fields.field_BH_cylinder_segment import (
     magnet_cylinder_segment_field_internal,
 )
+from magpylib._src.fields.field_BH_multipole import cylinder_segment_moments
+from magpylib._src.fields.field_BH_symmetry import cylinder_segment_symmetry
 from magpylib._src.input_checks import check_format_input_cylinder_segment
 from magpylib._src.obj_classes.class_BaseExcitations import BaseMagnet
 from magpylib._src.utility import unit_prefix
@@ -94,6 +96,8 @@ class CylinderSegment(BaseMagnet):
 
     _field_func = staticmethod(magnet_cylinder_segment_field_internal)
     _field_func_kwargs_ndim = {"magnetization": 2, "dimension": 2}
+    _field_func_moments = staticmethod(cylinder_segment_moments)
+    _field_func_symmetry = staticmethod(cylinder_segment_symmetry)
     get_trace = make_CylinderSegment
 
     def __init__(
@@ -125,6 +129,7 @@ class CylinderSegment(BaseMagnet):
     @dimension.setter
     def dimension(self, dim):
         """Set Cylinder dimension (r1,r2,h,phi1,phi2), shape (5,), (mm, deg)."""
+        self._bump_version()
         self._dimension = check_format_input_cylinder_segment(dim)
 
     @property
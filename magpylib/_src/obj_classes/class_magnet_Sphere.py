@@ -1,6 +1,8 @@
 """Magnet Sphere class code"""
 from magpylib._src.display.traces_core import make_Sphere
+from magpylib._src.fields.field_BH_gradient import magnet_sphere_field_gradient
 from magpylib._src.fields.field_BH_sphere import magnet_sphere_field
+from magpylib._src.fields.field_tree import sphere_charges
 from magpylib._src.input_checks import check_format_input_scalar
 from magpylib._src.obj_classes.class_BaseExcitations import BaseMagnet
 from magpylib._src.utility import unit_prefix
@@ -81,6 +83,9 @@ class Sphere(BaseMagnet):
 
     _field_func = staticmethod(magnet_sphere_field)
     _field_func_kwargs_ndim = {"magnetization": 2, "diameter": 1}
+    _field_func_gradient = staticmethod(magnet_sphere_field_gradient)
+    _field_func_float32 = True
+    _field_func_tree = staticmethod(sphere_charges)
     get_trace = make_Sphere
 
     def __init__(
@@ -107,6 +112,7 @@ class Sphere(BaseMagnet):
     @diameter.setter
     def diameter(self, dia):
         """Set Sphere diameter, float, mm."""
+        self._bump_version()
         self._diameter = check_format_input_scalar(
             dia,
             sig_name="diameter",
@@ -2,7 +2,9 @@
 import numpy as np
 
 from magpylib._src.display.traces_core import make_Tetrahedron
+from magpylib._src.fields.field_BH_multipole import tetrahedron_moments
 from magpylib._src.fields.field_BH_tetrahedron import magnet_tetrahedron_field
+from magpylib._src.fields.field_tree import tetrahedron_charges
 from magpylib._src.input_checks import check_format_input_vector
 from magpylib._src.obj_classes.class_BaseExcitations import BaseMagnet
 
@@ -91,6 +93,8 @@ class Tetrahedron(BaseMagnet):
 
     _field_func = staticmethod(magnet_tetrahedron_field)
     _field_func_kwargs_ndim = {"magnetization": 1, "vertices": 3}
+    _field_func_moments = staticmethod(tetrahedron_moments)
+    _field_func_tree = staticmethod(tetrahedron_charges)
     get_trace = make_Tetrahedron
 
     def __init__(
@@ -118,6 +122,7 @@ class Tetrahedron(BaseMagnet):
     @vertices.setter
     def vertices(self, dim):
         """Set Tetrahedron vertices (a,b,c), shape (3,), (mm)."""
+        self._bump_version()
         self._vertices = check_format_input_vector(
             dim,
             dims=(2,),
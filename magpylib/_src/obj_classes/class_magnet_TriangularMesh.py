@@ -6,14 +6,17 @@ from scipy.spatial import ConvexHull  # pylint: disable=no-name-in-module
 
 from magpylib._src.display.traces_core import make_TriangularMesh
 from magpylib._src.exceptions import MagpylibMissingInput
+from magpylib._src.fields.field_BH_multipole import trimesh_moments
 from magpylib._src.fields.field_BH_triangularmesh import calculate_centroid
 from magpylib._src.fields.field_BH_triangularmesh import fix_trimesh_orientation
 from magpylib._src.fields.field_BH_triangularmesh import (
     get_disconnected_faces_subsets,
 )
 from magpylib._src.fields.field_BH_triangularmesh import get_intersecting_triangles
+from magpylib._src.fields.field_BH_triangularmesh import get_mesh_id
 from magpylib._src.fields.field_BH_triangularmesh import get_open_edges
 from magpylib._src.fields.field_BH_triangularmesh import magnet_trimesh_field
+from magpylib._src.fields.field_tree import trimesh_charges
 from magpylib._src.input_checks import check_format_input_vector
 from magpylib._src.input_checks import check_format_input_vector2
 from magpylib._src.obj_classes.class_BaseExcitations import BaseMagnet
@@ -108,7 +111,9 @@ class TriangularMesh(BaseMagnet):
     """
 
     _field_func = staticmethod(magnet_trimesh_field)
-    _field_func_kwargs_ndim = {"magnetization": 2, "mesh": 3}
+    _field_func_kwargs_ndim = {"magnetization": 2, "mesh": 3, "mesh_id": 1}
+    _field_func_moments = staticmethod(trimesh_moments)
+    _field_func_tree = staticmethod(trimesh_charges)
     get_trace = make_TriangularMesh
     _style_class = TriangularMeshStyle
 
@@ -159,6 +164,12 @@ class TriangularMesh(BaseMagnet):
         """Mesh"""
         return self._vertices[self._faces]
 
+    @property
+    def _mesh_id(self):
+        """Content hash of the mesh geometry, computed on access so that in-place
+        modifications of vertices and faces are taken into account"""
+        return get_mesh_id(self._vertices, self._faces)
+
     @property
     def status_open(self):
         """Return open status"""
@@ -384,6 +395,7 @@ class TriangularMesh(BaseMagnet):
                     raise ValueError(msg)
 
             self._faces = fix_trimesh_orientation(self._vertices, self._faces)
+            self._bump_version()
             self._status_reoriented = True
 
     def get_faces_subsets(self):
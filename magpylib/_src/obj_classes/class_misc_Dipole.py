@@ -3,6 +3,8 @@ import numpy as np
 
 from magpylib._src.display.traces_core import make_Dipole
 from magpylib._src.fields.field_BH_dipole import dipole_field
+from magpylib._src.fields.field_BH_gradient import dipole_field_gradient
+from magpylib._src.fields.field_tree import dipole_charges
 from magpylib._src.input_checks import check_format_input_vector
 from magpylib._src.obj_classes.class_BaseExcitations import BaseSource
 from magpylib._src.style import DipoleStyle
@@ -81,6 +83,9 @@ class Dipole(BaseSource):
 
     _field_func = staticmethod(dipole_field)
     _field_func_kwargs_ndim = {"moment": 2}
+    _field_func_gradient = staticmethod(dipole_field_gradient)
+    _field_func_float32 = True
+    _field_func_tree = staticmethod(dipole_charges)
     _style_class = DipoleStyle
     get_trace = make_Dipole
     _autosize = True
@@ -108,6 +113,7 @@ class Dipole(BaseSource):
     @moment.setter
     def moment(self, mom):
         """Set dipole moment vector, shape (3,), unit mT*mm^3."""
+        self._bump_version()
         self._moment = check_format_input_vector(
             mom,
             dims=(1,),
@@ -4,6 +4,7 @@ import numpy as np
 
 from magpylib._src.display.traces_core import make_Triangle
 from magpylib._src.fields.field_BH_triangle import triangle_field
+from magpylib._src.fields.field_tree import triangle_charges
 from magpylib._src.input_checks import check_format_input_vector
 from magpylib._src.obj_classes.class_BaseExcitations import BaseMagnet
 from magpylib._src.style import TriangleStyle
@@ -93,6 +94,7 @@ class Triangle(BaseMagnet):
 
     _field_func = staticmethod(triangle_field)
     _field_func_kwargs_ndim = {"magnetization": 2, "vertices": 2}
+    _field_func_tree = staticmethod(triangle_charges)
     get_trace = make_Triangle
     _style_class = TriangleStyle
 
@@ -119,6 +121,7 @@ class Triangle(BaseMagnet):
     @vertices.setter
     def vertices(self, val):
         """Set face vertices (a,b,c), shape (3,3), mm."""
+        self._bump_version()
         self._vertices = check_format_input_vector(
             val,
             dims=(2,),
@@ -133,22 +133,6 @@ def format_src_inputs(sources) -> list:
     return list(sources), src_list
 
 
-def check_static_sensor_orient(sensors):
-    """test which sensors have a static orientation"""
-    # pylint: disable=protected-access
-    static_sensor_rot = []
-    for sens in sensors:
-        if len(sens._position) == 1:  # no sensor path (sensor is static)
-            static_sensor_rot += [True]
-        else:  # there is a sensor path
-            rot = sens.orientation.as_quat()
-            if np.all(rot == rot[0]):  # path with static orient (e.g. translation)
-                static_sensor_rot += [True]
-            else:  # sensor rotation changes along path
-                static_sensor_rot += [False]
-    return static_sensor_rot
-
-
 def check_duplicates(obj_list: Sequence) -> list:
     """checks for and eliminates source duplicates in a list of sources
     ### Args:
@@ -387,3 +371,52 @@ def open_animation(filepath, embed=True):
         import webbrowser
 
         webbrowser.open(filepath)
+
+
+def zeros_field_output(out, shape, dtype=float):
+    """return the preallocated array `out` filled with zeros, or a new array of zeros if
+    `out` is None"""
+    if out is None:
+        return np.zeros(shape, dtype=dtype)
+    out.fill(0)
+    return out
+
+
+def store_field_output(field, out):
+    """write `field` into the preallocated array `out` and return it, or return `field`
+    if `out` is None"""
+    if out is None or field is out:
+        return field
+    out[...] = field
+    return out
+
+
+# odd 64 bit multiplier of the row hash
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def hash_rows(bits: list) -> np.ndarray:
+    """return uint64 hashes of the rows of the columns `bits`, given as list of uint64
+    arrays"""
+    h = np.zeros(len(bits[0]), dtype=np.uint64)
+    for b in bits:
+        h ^= b
+        h *= HASH_MULTIPLIER
+        h ^= h >> np.uint64(29)
+    return h
+
+
+def unique_hashes(h: np.ndarray) -> tuple:
+    """
+    Return the sorted unique hashes, the index of one occurrence of each of them in
+    `h` and the indices that reconstruct `h` from the unique hashes (as `np.unique`,
+    but with a faster unstable sort).
+    """
+    order = np.argsort(h)
+    h_sorted = h[order]
+    flag = np.empty(len(h), dtype=bool)
+    flag[:1] = True
+    np.not_equal(h_sorted[1:], h_sorted[:-1], out=flag[1:])
+    inverse = np.empty(len(h), dtype=np.intp)
+    inverse[order] = np.cumsum(flag) - 1
+    return h_sorted[flag], order[flag], inverse
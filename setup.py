@@ -78,6 +78,8 @@ setuptools.setup(
             "jupyterlab_myst",
             "sphinx==5.3.0",
             "pandas",
+            "pyarrow",
+            "numba",
             "pyvista",
             "ipygany",
             "imageio[tifffile]",
@@ -20,3 +20,31 @@ def test_dataframe_output_missing_pandas():
     with patch.dict(sys.modules, {"pandas": None}):
         with pytest.raises(ModuleNotFoundError):
             src.getB((0, 0, 0), output="dataframe")
+
+
+def test_arrow_output_missing_pyarrow():
+    """test if pyarrow is installed when using arrow output in `getBH`"""
+    src = magpy.magnet.Cuboid((0, 0, 1000), (1, 1, 1))
+    with patch.dict(sys.modules, {"pyarrow": None}):
+        with pytest.raises(ModuleNotFoundError):
+            src.getB((0, 0, 0), output="arrow")
+
+
+def test_numba_backend_missing_numba():
+    """the numba backend must fall back to the NumPy kernels if numba is not installed"""
+    # pylint: disable=import-outside-toplevel
+    from magpylib._src.fields.field_BH_numba import NUMBA_KERNELS
+
+    src = magpy.magnet.Cuboid((0, 0, 1000), (1, 1, 1))
+    B = src.getB((1, 2, 3))
+    kernels = dict(NUMBA_KERNELS)
+    try:
+        NUMBA_KERNELS.clear()
+        magpy.defaults.compute.backend = "numba"
+        with patch.dict(sys.modules, {"numba": None}):
+            with pytest.warns(UserWarning, match="requires numba"):
+                B_fallback = src.getB((1, 2, 3))
+    finally:
+        NUMBA_KERNELS.update(kernels)
+        magpy.defaults.reset()
+    assert (B_fallback == B).all()
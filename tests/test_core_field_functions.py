@@ -3,6 +3,7 @@ import pytest
 from numpy.testing import assert_allclose
 
 import magpylib as magpy
+from magpylib._src.exceptions import MagpylibBadUserInput
 from magpylib._src.exceptions import MagpylibMissingInput
 from magpylib._src.fields.field_BH_cuboid import magnet_cuboid_field
 from magpylib._src.fields.field_BH_cylinder_segment import magnet_cylinder_segment_field
@@ -617,3 +618,101 @@ def test_getB_on_missing_excitations(module, class_, missing_arg, kwargs):
         match=rf"Parameter `{missing_arg}` of .* must be set.",
     ):
         getattr(getattr(magpy, module), class_)(**kwargs).getB([0, 0, 0])
+
+
+CORE_FIELD_INPUTS = [
+    (
+        magpy.core.dipole_field,
+        {"moment": np.array([(1, 2, 3), (0, 0, 1), (0, 0, 0)])},
+    ),
+    (
+        magpy.core.current_loop_field,
+        {"current": np.array([1, 2, 3]), "diameter": np.array([1, 2, 0])},
+    ),
+    (
+        magpy.core.current_line_field,
+        {
+            "current": np.array([1, 2, 3]),
+            "segment_start": np.array([(-1, 0, 0), (-1, 0, 0), (0, 0, 0)]),
+            "segment_end": np.array([(1, 0, 0), (2, 0, 0), (0, 0, 0)]),
+        },
+    ),
+    (
+        magpy.core.magnet_sphere_field,
+        {"magnetization": np.array([(1, 2, 3)] * 3), "diameter": np.array([1, 2, 3])},
+    ),
+    (
+        magpy.core.magnet_cuboid_field,
+        {
+            "magnetization": np.array([(1, 2, 3)] * 3),
+            "dimension": np.array([(1, 2, 3), (2, 2, 2), (0, 1, 1)]),
+        },
+    ),
+    (
+        magpy.core.magnet_cylinder_field,
+        {
+            "magnetization": np.array([(1, 2, 3)] * 3),
+            "dimension": np.array([(1, 2), (2, 2), (3, 1)]),
+        },
+    ),
+    (
+        magpy.core.magnet_cylinder_segment_field,
+        {
+            "magnetization": np.array([(1, 2, 3)] * 3),
+            "dimension": np.array([(0, 1, 2, 0, 90), (1, 2, 4, 35, 125)] * 2)[:3],
+        },
+    ),
+    (
+        magpy.core.triangle_field,
+        {
+            "magnetization": np.array([(1, 2, 3)] * 3),
+            "vertices": np.array([[(0, 0, 0), (1, 0, 0), (0, 1, 0)]] * 3),
+        },
+    ),
+    (
+        magpy.core.magnet_tetrahedron_field,
+        {
+            "magnetization": np.array([(1, 2, 3)] * 3),
+            "vertices": np.array([[(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1)]] * 3),
+        },
+    ),
+]
+
+
+@pytest.mark.parametrize("field", ["B", "H"])
+@pytest.mark.parametrize("func, kwargs", CORE_FIELD_INPUTS)
+def test_core_field_out(func, kwargs, field):
+    """results written into a preallocated output array must be returned in it and
+    match the results of a normal call, also when the array is reused"""
+    obs = np.array([(1, 2, 3), (0.1, 0.2, 0.3), (0.5, 0.5, 0.5)])
+    out = np.full((3, 3), 99.0)
+    for _ in range(2):
+        BH = func(field, obs, out=out, **kwargs)
+        assert BH is out
+        assert_allclose(out, func(field, obs, **kwargs))
+
+
+@pytest.mark.parametrize("func, kwargs", CORE_FIELD_INPUTS)
+def test_core_field_out_bad_inputs(func, kwargs):
+    """bad output arrays must be rejected"""
+    obs = np.array([(1, 2, 3), (0.1, 0.2, 0.3), (0.5, 0.5, 0.5)])
+    readonly = np.zeros((3, 3))
+    readonly.flags.writeable = False
+    for out in [np.zeros((2, 3)), np.zeros((3, 3), dtype=int), readonly, obs, [0] * 9]:
+        with pytest.raises(MagpylibBadUserInput):
+            func("B", obs, out=out, **kwargs)
+
+
+@pytest.mark.parametrize("func, kwargs", CORE_FIELD_INPUTS)
+def test_core_field_out_shared_memory(func, kwargs):
+    """output arrays that share memory with any array input must be rejected"""
+    obs = np.array([(1, 2, 3), (0.1, 0.2, 0.3), (0.5, 0.5, 0.5)])
+    for name, val in kwargs.items():
+        # input and output are views of the same buffer
+        val = np.asarray(val, dtype=float)
+        buffer = np.zeros(max(val.size, 9))
+        buffer[: val.size] = val.ravel()
+        kwargs_shared = {**kwargs, name: buffer[: val.size].reshape(val.shape)}
+        out = buffer[:9].reshape(3, 3)
+        with pytest.raises(MagpylibBadUserInput):
+            func("B", obs, out=out, **kwargs_shared)
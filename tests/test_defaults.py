@@ -70,6 +70,14 @@ bad_inputs = {
     "display_style_markers_marker_size": (-1,),  # float>=0
     "display_style_markers_marker_color": ("wrongcolor",),
     "display_style_markers_marker_symbol": ("wrongsymbol",),
+    "compute_workers": (0, -2, 1.5, "2"),  # int>0 or -1
+    "compute_dtype": ("float16", 32),  # float64, float32
+    "compute_approximation": ("dipole", 1),  # exact, multipole, tree
+    "compute_tolerance": (0, 1, -1e-3, True, "1e-3"),  # 0<float<1
+    "compute_symmetry": ("notbool", 1),  # bool
+    "compute_backend": ("jax", 1),  # numpy, numba
+    "compute_cache_enabled": ("notbool", 1),  # bool
+    "compute_cache_maxsize": (0, -1, "1"),  # float>0
 }
 
 
@@ -175,6 +183,14 @@ good_inputs = {
     "display_style_markers_marker_size": (0, 1),  # float>=0
     "display_style_markers_marker_color": ("blue", "#2E91E5"),
     "display_style_markers_marker_symbol": ALLOWED_SYMBOLS,
+    "compute_workers": (1, 4, -1),  # int>0 or -1
+    "compute_dtype": ("float64", "float32"),  # float64, float32
+    "compute_approximation": ("exact", "multipole", "tree"),  # exact, multipole, tree
+    "compute_tolerance": (1e-2, 1e-8),  # 0<float<1
+    "compute_symmetry": (True, False),  # bool
+    "compute_backend": ("numpy", "numba"),  # numpy, numba
+    "compute_cache_enabled": (True, False),  # bool
+    "compute_cache_maxsize": (0.5, 100),  # float>0
 }
 
 
@@ -4,11 +4,19 @@ import numpy as np
 
 from magpylib._src.fields.special_cel import cel
 from magpylib._src.fields.special_cel import cel0
+from magpylib._src.fields.special_cel import cel_iter
+from magpylib._src.fields.special_cel import cel_iter0
+from magpylib._src.fields.special_cel import cel_iter_count
+from magpylib._src.fields.special_cel import cel_iterv
 from magpylib._src.fields.special_cel import celv
 from magpylib._src.fields.special_el3 import el3
 from magpylib._src.fields.special_el3 import el30
 from magpylib._src.fields.special_el3 import el3_angle
 from magpylib._src.fields.special_el3 import el3v
+from magpylib._src.fields.special_elliptic import el3_angle as el3_angle_shared
+from magpylib._src.fields.special_elliptic import ellipeinc
+from magpylib._src.fields.special_elliptic import ellipkinc
+from magpylib._src.fields.special_elliptic import elliptic_integrals
 
 
 class TestEllExceptions(unittest.TestCase):
@@ -118,3 +126,70 @@ def test_cels():
 
     assert np.allclose(res0, res1)
     assert np.allclose(res1, res2)
+
+
+def test_cel_iters():
+    """
+    test vectorized cel_iterv with active set and with fixed iteration count vs
+    element-wise cel_iter0, for inputs with a wide spread of iteration counts
+    """
+    N = 999
+    q = np.logspace(-12, 0, N)
+    np.random.shuffle(q)
+    p = 1 + q
+    g = np.ones(N)
+    cc = (np.random.rand(N) - 0.5) * 10
+    ss = (np.random.rand(N) - 0.5) * 10
+
+    res0 = [cel_iter0(*args) for args in zip(q, p, g, cc, ss, p, q)]
+    res1 = cel_iterv(q, p, g, cc, ss, p, q)
+    n_iter = cel_iter_count(q.min(), 1.0, 1.0 + q.min(), q.min())
+    res2 = cel_iterv(q, p, g, cc, ss, p, q, n_iter=n_iter)
+    res3 = cel_iter(q[:10], p[:10], g[:10], cc[:10], ss[:10], p[:10], q[:10])
+
+    assert cel_iter_count(1e-12, 1.0, 1.0 + 1e-12, 1e-12) > cel_iter_count(
+        0.5, 1.0, 1.5, 0.5
+    )
+    # active set results are computed at the iteration of convergence
+    np.testing.assert_array_equal(res0, res1)
+    np.testing.assert_allclose(res0, res2, rtol=1e-12)
+    np.testing.assert_allclose(res0[:10], res3, rtol=1e-12)
+
+
+def test_elliptic_integrals_shared():
+    """shared elliptic integrals must equal the direct evaluation and compute each
+    distinct parameter set only once"""
+    rng = np.random.default_rng(0)
+    phi = rng.uniform(0, np.pi / 2, 20)
+    n = rng.uniform(-2.5, 2.5, 20)
+    m = rng.uniform(-9, 1, 20)
+    phi2 = np.tile(phi, (3, 1))
+    with elliptic_integrals() as evaluator:
+        E = ellipeinc(phi2, m)
+        F = ellipkinc(phi, m)
+        Pi = el3_angle_shared(phi2.ravel(), np.tile(n, 3), np.tile(m, 3))
+        Pi2 = el3_angle_shared(phi[:5], n[:5], m[:5])
+    assert E.shape == (3, 20)
+    np.testing.assert_array_equal(E, np.tile(ellipeinc(phi, m), (3, 1)))
+    np.testing.assert_array_equal(F, ellipkinc(phi, m))
+    np.testing.assert_array_equal(Pi, np.tile(el3_angle(phi, n, m), 3))
+    np.testing.assert_array_equal(Pi2, el3_angle(phi[:5], n[:5], m[:5]))
+    assert evaluator.stats == {"requested": 145, "computed": 40}
+
+
+def test_celv_convergence():
+    """
+    test that the active set of celv computes each result at the iteration of its
+    convergence, identical to element-wise cel0, for a wide spread of iteration counts
+    """
+    N = 999
+    kc = np.logspace(-9, 0, N)
+    np.random.shuffle(kc)
+    p = (np.random.rand(N) - 0.5) * 4
+    c = (np.random.rand(N) - 0.5) * 10
+    s = (np.random.rand(N) - 0.5) * 10
+
+    res0 = [cel0(*args) for args in zip(kc, p, c, s)]
+    res1 = celv(kc, p, c, s)
+    # further iterations after convergence would give differences of about 1e-10
+    np.testing.assert_allclose(res0, res1, rtol=1e-14, atol=1e-14)
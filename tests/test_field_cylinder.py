@@ -473,3 +473,26 @@ def test_cylinder_diametral_small_r():
     ddB = abs(ddB - np.mean(ddB, axis=0))
 
     assert np.all(ddB < 0.001)
+
+
+def test_cylinder_tile_mixed_cases():
+    """batches mixing many special cases must give the same result as the evaluation
+    of each instance on its own"""
+    rng = np.random.default_rng(0)
+    n = 200
+    dim = np.array([(0, 1, 0, np.pi / 2, -0.5, 0.5), (1, 2, -np.pi / 4, np.pi, -1, 1)])
+    dim = dim[rng.integers(0, 2, n)]
+    r = rng.choice([0, 1, 1.5, 2, 3], n)
+    phi = rng.choice([-np.pi / 4, 0, np.pi / 3, np.pi / 2, np.pi, 2], n)
+    z = rng.choice([-1, -0.5, 0, 0.5, 1, 2], n)
+    obs = np.c_[r, phi, z]
+    mag = np.c_[rng.uniform(0, 1, n), rng.uniform(-np.pi, np.pi, (n, 2))]
+    H = magnet_cylinder_segment_core(mag, dim, obs)
+    H_single = np.concatenate(
+        [
+            magnet_cylinder_segment_core(mag[i : i + 1], dim[i : i + 1], obs[i : i + 1])
+            for i in range(n)
+        ]
+    )
+    assert np.isnan(H).any() and np.isfinite(H).any()
+    np.testing.assert_allclose(H, H_single, rtol=1e-12, atol=1e-12)
@@ -0,0 +1,165 @@
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation as R
+
+import magpylib as magpy
+from magpylib._src.exceptions import MagpylibMissingInput
+from magpylib._src.fields.field_BH_cuboid import magnet_cuboid_field
+from magpylib._src.fields.field_BH_dipole import dipole_field
+from magpylib._src.fields.field_BH_gradient import current_line_field_gradient
+from magpylib._src.fields.field_BH_gradient import current_loop_field_gradient
+from magpylib._src.fields.field_BH_gradient import dipole_field_gradient
+from magpylib._src.fields.field_BH_gradient import magnet_cuboid_field_gradient
+from magpylib._src.fields.field_BH_gradient import magnet_sphere_field_gradient
+from magpylib._src.fields.field_BH_line import current_line_field
+from magpylib._src.fields.field_BH_loop import current_loop_field
+from magpylib._src.fields.field_BH_sphere import magnet_sphere_field
+
+
+def finite_differences(func, obs, h=1e-5):
+    """central differences of func(obs) with shape (n,3) -> (n,3,3)"""
+    grad = np.empty((len(obs), 3, 3))
+    for k in range(3):
+        shift = np.zeros(3)
+        shift[k] = h
+        grad[:, :, k] = (func(obs + shift) - func(obs - shift)) / 2 / h
+    return grad
+
+
+def get_kernel_inputs():
+    """random inputs and special cases of the analytical gradient kernels"""
+    rng = np.random.default_rng(0)
+    n = 500
+    obs = rng.normal(size=(n, 3)) * 2
+    mag = rng.normal(size=(n, 3)) * 1000
+    dim = rng.uniform(0.5, 3, (n, 3))
+    dia = rng.uniform(0.5, 3, n)
+    cur = rng.normal(size=n)
+    start, end = rng.normal(size=(n, 3)), rng.normal(size=(n, 3))
+
+    # loop: observers close to and on the axis
+    obs_loop = obs.copy()
+    obs_loop[:10, :2] *= 1e-4
+    obs_loop[10:20, :2] = 0
+    return [
+        (dipole_field_gradient, dipole_field, obs, (mag,)),
+        (magnet_sphere_field_gradient, magnet_sphere_field, obs, (mag, dia)),
+        (magnet_cuboid_field_gradient, magnet_cuboid_field, obs, (mag, dim)),
+        (current_line_field_gradient, current_line_field, obs, (cur, start, end)),
+        (current_loop_field_gradient, current_loop_field, obs_loop, (cur, dia)),
+    ]
+
+
+@pytest.mark.parametrize("field", ["B", "H"])
+def test_gradient_kernels(field):
+    """analytical gradients must agree with finite differences of the fields and be
+    curl- and divergence-free outside of the sources"""
+    for grad_func, field_func, obs, args in get_kernel_inputs():
+        grad = grad_func(field, obs, *args)
+        grad_fd = finite_differences(lambda o: field_func(field, o, *args), obs)
+        scale = np.abs(grad).max(axis=(1, 2), keepdims=True).clip(1e-30)
+        # accuracy limited by the finite differences of the cuboid field
+        np.testing.assert_allclose(grad / scale, grad_fd / scale, atol=1e-6)
+        if field == "B":
+            np.testing.assert_allclose(
+                grad_func("H", obs, *args), grad * 10 / 4 / np.pi, rtol=1e-14
+            )
+        # not curl-free: inside magnets, and fields of single line segments
+        if field_func not in (magnet_cuboid_field, current_line_field):
+            np.testing.assert_allclose(grad, np.swapaxes(grad, 1, 2), atol=1e-9)
+        np.testing.assert_allclose(np.trace(grad, axis1=1, axis2=2), 0, atol=1e-9)
+
+
+def test_gradient_kernels_special_cases():
+    """special cases of the gradient kernels"""
+    obs = np.array([(0, 0, 0), (0.1, 0.2, 0.3), (1, 1, 1)])
+    mag = np.array([(1, 2, 3)] * 3)
+    ones = np.ones(3)
+
+    # dipole at its position
+    assert np.all(np.isnan(dipole_field_gradient("B", obs, mag)[0]))
+
+    # inside a sphere
+    grad = magnet_sphere_field_gradient("B", obs, mag, ones)
+    np.testing.assert_array_equal(grad[:2], 0)
+
+    # cuboid with zero magnetization and dimension, observer on an edge
+    grad = magnet_cuboid_field_gradient(
+        "B",
+        np.array([(1, 1, 1), (1, 1, 1), (0.5, 0.5, 0)]),
+        np.array([(0, 0, 0), (1, 2, 3), (1, 2, 3)]),
+        np.array([(1, 1, 1), (0, 1, 1), (1, 1, 1)]),
+    )
+    np.testing.assert_array_equal(grad, 0)
+
+    # zero-length and discontinuous lines, observer on a line
+    start = np.array([(1, 1, 1), (np.nan,) * 3, (-1, -1, -1)])
+    end = np.array([(1, 1, 1), (0, 0, 1), (2, 2, 2)])
+    grad = current_line_field_gradient("B", obs + 0.5, ones, start, end)
+    np.testing.assert_array_equal(grad, 0)
+
+    # loop with zero diameter, observer on the loop, loop center
+    grad = current_loop_field_gradient(
+        "B", np.array([(1, 1, 1), (1, 0, 0), (0, 0, 0)]), ones, np.array([0, 2, 2])
+    )
+    np.testing.assert_array_equal(grad, 0)
+
+
+def test_getGradB_objects():
+    """object interface with paths, rotated sources and sensors, collections and
+    sources without analytical gradient (finite differences fallback)"""
+    rng = np.random.default_rng(1)
+    sources = [
+        magpy.misc.Dipole((10, 20, 30), (3, 0, 0)),
+        magpy.magnet.Sphere((100, 200, 300), 1, (0, 3, 0)),
+        magpy.magnet.Cuboid((100, 200, 300), (1, 2, 3), (-3, 0, 0)),
+        magpy.current.Loop(100, 2, (0, 0, -3)),
+        magpy.current.Line(1000, rng.normal(size=(5, 3)), (0, -3, 0)),
+        magpy.current.Line(1000, rng.normal(size=(3, 3)), (3, 3, 0)),
+        magpy.magnet.Cylinder((100, 200, 300), (1, 2), (0, 3, 3)),
+        magpy.misc.CustomSource(
+            lambda field, observers: dipole_field(
+                field, observers, np.array([(1, 2, 3.0)] * len(observers))
+            ),
+            position=(3, 0, 3),
+        ),
+    ]
+    for src in sources:
+        src.rotate(R.from_rotvec(rng.normal(size=3)))
+    coll = magpy.Collection(*sources[:2])
+    coll.rotate_from_angax(np.linspace(0, 90, 5), "z", start=0)
+    pixel = rng.normal(size=(2, 4, 3)) * 0.5
+    sens = magpy.Sensor(pixel=pixel, orientation=R.from_rotvec((0.1, 0.2, 0.3)))
+    sens.move(np.linspace((0, 0, 0), (0, 0, 1), 3), start=0)
+    srcs = [coll, *sources[2:]]
+
+    G = magpy.getGradB(srcs, sens)
+    assert G.shape == (7, 5, 2, 4, 3, 3)
+
+    # finite differences in the sensor coordinates
+    G_fd = np.empty_like(G)
+    for k in range(3):
+        shift = np.zeros(3)
+        shift[k] = 1e-6
+        sens_p = sens.copy(pixel=pixel + shift)
+        sens_m = sens.copy(pixel=pixel - shift)
+        B_p, B_m = magpy.getB(srcs, sens_p), magpy.getB(srcs, sens_m)
+        G_fd[..., k] = (B_p - B_m) / 2e-6
+    np.testing.assert_allclose(G, G_fd, rtol=1e-5, atol=1e-5 * np.abs(G).max())
+
+    G_sum = magpy.getGradB(srcs, sens, sumup=True, squeeze=False)
+    assert G_sum.shape == (1, 5, 1, 2, 4, 3, 3)
+    np.testing.assert_allclose(G_sum[0, :, 0], G.sum(axis=0), rtol=1e-12, atol=1e-12)
+
+    G_H = magpy.getGradH(srcs[:-1], sens)
+    np.testing.assert_allclose(G_H, G[:-1] * 10 / 4 / np.pi, rtol=1e-8, atol=1e-10)
+
+
+def test_getGradH_missing_field():
+    """field functions without H-field computation"""
+    src = magpy.misc.CustomSource(
+        lambda field, observers: None if field == "H" else observers
+    )
+    with pytest.raises(MagpylibMissingInput):
+        magpy.getGradH(src, (1, 2, 3))
+    np.testing.assert_allclose(magpy.getGradB(src, (1, 2, 3)), np.eye(3))
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+import magpylib as magpy
+from magpylib._src.exceptions import MagpylibBadUserInput
+
+
+def test_tabulate_interpolation_exact_for_polynomials():
+    """trilinear interpolation reproduces linear fields and tricubic interpolation
+    cubic fields, also on non-uniform grids"""
+    axes = (np.linspace(-1, 1, 5), np.geomspace(1, 3, 6) - 2, np.linspace(0, 2, 4))
+    grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1)
+
+    def func(pos, deg):
+        x, y, z = np.moveaxis(pos, -1, 0)
+        return np.stack([x**deg, 1 + y * z ** (deg - 1), x * y * z - 2], axis=-1)
+
+    rng = np.random.default_rng(0)
+    obs = rng.uniform((-1, -1, 0), (1, 1, 2), (100, 3))
+    for method, deg in (("linear", 1), ("cubic", 3)):
+        fmap = magpy.FieldMap(axes, B=func(grid, deg), method=method)
+        np.testing.assert_allclose(fmap("B", obs), func(obs, deg), atol=1e-12)
+        assert fmap("H", obs) is None
+
+    # observers outside of the grid return nan
+    B = fmap("B", [(0, 0, 1), (0, 0, 3), (2, 0, 1)])
+    assert np.all(np.isfinite(B[0])) and np.all(np.isnan(B[1:]))
+
+
+def test_tabulate_CustomSource():
+    """moved and rotated CustomSource instances of a tabulated source must reproduce
+    the field of the equally moved and rotated source"""
+    cube = magpy.magnet.Cuboid((100, 200, 1000), (1, 2, 1), (1, 2, 3))
+    cube.rotate_from_angax(20, "x")
+    axis = np.linspace(-4, 4, 81)
+    fmap = magpy.tabulate(cube, (axis, axis, axis + 5), method="cubic")
+    assert fmap.error["B"] < 1e-2 and fmap.error["H"] < 1e-2
+
+    src = magpy.misc.CustomSource(field_func=fmap)
+    cube_local = cube.copy(position=(0, 0, 0), orientation=None)
+    ref = cube_local.copy()
+    for obj in (src, ref):
+        obj.move(np.linspace((0, 0, 0), (1, 2, 3), 4), start=0)
+        obj.rotate_from_angax(np.linspace(0, 90, 4), "z", start=0)
+    sens = magpy.Sensor(position=(1, 2, 8), pixel=[(0, 0, 0), (0.5, -0.5, 0.2)])
+    for field in "BH":
+        BH = getattr(src, f"get{field}")(sens)
+        BH_ref = getattr(ref, f"get{field}")(sens)
+        np.testing.assert_allclose(BH, BH_ref, rtol=1e-3, atol=1e-3)
+
+    # error estimate
+    obs = np.random.default_rng(0).uniform(-3, 3, (100, 3)) + (0, 0, 5)
+    err_est = fmap.estimate_error("B", obs)
+    fmap.method = "linear"
+    err = np.linalg.norm(fmap("B", obs) - cube_local.getB(obs), axis=1)
+    assert err_est.shape == (100,)
+    assert np.all(err < 2 * err_est + 1e-6)
+
+
+def test_field_map_save_load(tmp_path):
+    """stored maps must be restored in memory and memory-mapped"""
+    sphere = magpy.magnet.Sphere((0, 0, 1000), 1)
+    axis = np.linspace(1, 3, 11)
+    fmap = magpy.tabulate(sphere, (axis, axis, axis), field="B", dtype="float32")
+    assert fmap.B.dtype == np.float32 and fmap.H is None
+    file = tmp_path / "field_map.npz"
+    fmap.save(file)
+    obs = np.random.default_rng(0).uniform(1, 3, (20, 3))
+    for mmap_mode in (None, "r"):
+        fmap2 = magpy.FieldMap.load(file, mmap_mode=mmap_mode)
+        assert isinstance(fmap2.B, np.memmap) == (mmap_mode is not None)
+        assert fmap2.error == fmap.error
+        assert repr(fmap2) == "FieldMap(grid=11x11x11, fields=B, method='linear')"
+        np.testing.assert_array_equal(fmap2("B", obs), fmap("B", obs))
+        del fmap2
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"grid": [(0, 1, 2)] * 2},
+        {"grid": [(0, 2, 1)] * 3},
+        {"grid": [(0, 1, 2)] * 3, "method": "cubic"},
+        {"grid": [(0, 1)] * 3, "method": "nearest"},
+        {"grid": [(0, 1)] * 3, "field": "J"},
+        {"grid": [(0, 1)] * 3, "dtype": "float16"},
+    ],
+)
+def test_tabulate_bad_inputs(kwargs):
+    """bad tabulate inputs must raise"""
+    sphere = magpy.magnet.Sphere((0, 0, 1000), 1)
+    with pytest.raises(MagpylibBadUserInput):
+        magpy.tabulate(sphere, **kwargs)
+    with pytest.raises(MagpylibBadUserInput):
+        magpy.FieldMap([(0, 1)] * 3, B=np.zeros((2, 2, 3, 3)))
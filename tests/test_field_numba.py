@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+
+import magpylib as magpy
+from magpylib._src.fields import field_BH_cuboid
+from magpylib._src.fields.field_BH_cuboid import magnet_cuboid_field
+from magpylib._src.fields.field_BH_line import current_line_field
+from magpylib._src.fields.field_BH_triangle import triangle_field
+
+pytest.importorskip("numba")
+
+
+def get_kernel_inputs():
+    """random inputs and special cases of the kernels with a numba version"""
+    rng = np.random.default_rng(0)
+    n = 1000
+    obs = rng.normal(size=(n, 3)) * 2
+    mag = rng.normal(size=(n, 3)) * 1000
+
+    # cuboid: zero magnetization, zero and negative dimensions, edges, corners,
+    # surfaces and inside observers
+    dim = rng.uniform(0.5, 3, (n, 3))
+    dim[:10] *= -1
+    dim[10:20, 1] = 0
+    obs_c = obs.copy()
+    mag_c = mag.copy()
+    mag_c[20:30] = 0
+    obs_c[30:40] = dim[30:40] / 2 * (1, -1, 0.3)  # edge
+    obs_c[40:50] = dim[40:50] / 2 * (-1, 1, 1)  # corner
+    obs_c[50:60] = dim[50:60] / 2 * (1, 0.2, -0.5)  # surface
+    obs_c[60:70] = dim[60:70] / 2 * 0.5  # inside
+    obs_c[70:80] = dim[70:80] / 2 * (3, 1, -1)  # edge extension
+
+    # line: zero-length, discontinuous, on-line, line extension
+    start, end = rng.normal(size=(n, 3)), rng.normal(size=(n, 3))
+    cur = rng.normal(size=n)
+    end[:10] = start[:10]
+    start[10:20] = np.nan
+    obs_l = obs.copy()
+    obs_l[20:30] = start[20:30] + 0.3 * (end[20:30] - start[20:30])
+    obs_l[30:40] = start[30:40] + 3 * (end[30:40] - start[30:40])
+    obs_l[40:50] = start[40:50] - 2 * (end[40:50] - start[40:50]) + 1e-6
+    obs_l[50:60] = start[50:60]
+
+    # triangle: corners, edge extensions, in-plane and on the triangle (the field
+    # on the edges is ill-conditioned and not compared)
+    vert = rng.normal(size=(n, 3, 3))
+    obs_t = obs.copy()
+    obs_t[:10] = vert[:10, 0]
+    obs_t[20:30] = 2 * vert[20:30, 1] - vert[20:30, 2]
+    obs_t[30:40] = vert[30:40].mean(axis=1)
+    obs_t[40:50] = vert[40:50].mean(axis=1) + 1e-3
+
+    return [
+        (magnet_cuboid_field, (obs_c, mag_c, dim)),
+        (current_line_field, (obs_l, cur, start, end)),
+        (triangle_field, (obs_t, mag, vert)),
+    ]
+
+
+@pytest.mark.parametrize("field", ["B", "H"])
+def test_numba_kernel_parity(field):
+    """the numba kernels must reproduce the NumPy kernels, including special cases"""
+    for func, args in get_kernel_inputs():
+        BH_numpy = func(field, *args)
+        try:
+            magpy.defaults.compute.backend = "numba"
+            BH_numba = func(field, *args)
+            out = np.empty_like(BH_numpy)
+            BH_out = func(field, *args, out=out)
+        finally:
+            magpy.defaults.reset()
+        assert BH_out is out
+        np.testing.assert_allclose(BH_numba, BH_numpy, rtol=1e-9, atol=1e-9)
+        np.testing.assert_array_equal(BH_out, BH_numba)
+
+
+def test_numba_backend_objects():
+    """the object interface must give the same fields with both backends, also in
+    single precision and with several workers"""
+    rng = np.random.default_rng(1)
+    sources = [
+        magpy.magnet.Cuboid((100, 200, 300), (1, 2, 3), (1, 0, 0)),
+        magpy.current.Line(1000, rng.normal(size=(10, 3)), (0, 1, 0)),
+        magpy.misc.Triangle((100, 200, 300), rng.normal(size=(3, 3)), (0, 0, 2)),
+    ]
+    coll = magpy.Collection(*sources)
+    coll.rotate_from_angax(np.linspace(0, 90, 50), "z", start=0)
+    sens = magpy.Sensor(pixel=rng.normal(size=(100, 3)) * 3)
+    B_numpy = magpy.getB(sources, sens)
+    B32_numpy = None
+    try:
+        magpy.defaults.compute.backend = "numba"
+        B_numba = magpy.getB(sources, sens, workers=2)
+        magpy.defaults.compute.dtype = "float32"
+        B32_numba = magpy.getB(sources[1], sens)
+        magpy.defaults.compute.backend = "numpy"
+        B32_numpy = magpy.getB(sources[1], sens)
+    finally:
+        magpy.defaults.reset()
+    np.testing.assert_allclose(B_numba, B_numpy, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(B32_numba, B32_numpy, rtol=1e-4, atol=1e-4)
+
+
+def test_numba_backend_result_cache():
+    """results computed with both backends must be cached separately"""
+    src = magpy.magnet.Cuboid((100, 200, 300), (1, 2, 3))
+    cache = magpy.defaults.compute.cache
+    try:
+        cache.enabled = True
+        cache.clear()
+        for backend in ["numpy", "numba", "numpy", "numba"]:
+            magpy.defaults.compute.backend = backend
+            magpy.getB(src, (1, 2, 3))
+        assert cache.info()[:2] == (2, 2)
+    finally:
+        magpy.defaults.reset()
+        cache.clear()
+
+
+def test_numba_backend_compiled(monkeypatch):
+    """a compiled evaluator must recompute the field when the backend changes between
+    two calls"""
+    kernels = []
+    get_kernel = field_BH_cuboid.get_numba_kernel
+    monkeypatch.setattr(
+        field_BH_cuboid,
+        "get_numba_kernel",
+        lambda name: kernels.append(get_kernel(name)) or kernels[-1],
+    )
+    src = magpy.magnet.Cuboid((100, 200, 300), (1, 2, 3))
+    sens = magpy.Sensor(position=(1, 2, 3))
+    fieldB = magpy.compile(src, sens)
+    try:
+        B_numpy = fieldB()
+        magpy.defaults.compute.backend = "numba"
+        B_numba = fieldB()
+    finally:
+        magpy.defaults.reset()
+    assert kernels[0] is None and kernels[-1] is not None
+    np.testing.assert_allclose(B_numba, B_numpy, rtol=1e-9)
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation as R
+
+import magpylib as magpy
+from magpylib._src.exceptions import MagpylibBadUserInput
+
+
+def test_getBH_batch_vs_copies():
+    """batched variants must give the same field as copies of the scene"""
+    n = 5
+    rng = np.random.default_rng(0)
+    cube = magpy.magnet.Cuboid((100, 200, 300), (1, 2, 3), (0, 0, -2))
+    cyl = magpy.magnet.Cylinder((0, 0, 1000), (1, 1), (2, 0, -1))
+    sphere = magpy.magnet.Sphere((500, 0, 0), 1, (0, 2, -1))
+    sphere.rotate_from_angax(30, "x")
+    coll = magpy.Collection(cube, magpy.Collection(cyl, sphere))
+    pixel = np.linspace((-1, 0, 0), (1, 0, 0), 6).reshape(2, 3, 3)
+    sens1 = magpy.Sensor(pixel=pixel, position=(0, 0, 1))
+    sens1.rotate_from_angax(40, "z")
+    sens2 = magpy.Sensor(pixel=pixel, position=(1, 1, 2))
+    variations = {
+        "magnetization": rng.uniform(-1000, 1000, (n, 3, 3)),
+        "position": rng.uniform(-3, -1, (n, 3, 3)),
+        "orientation": R.random(n, random_state=1),
+    }
+    for field in "BH":
+        B_ref = []
+        for i in range(n):
+            coll_i = coll.copy()
+            for j, src in enumerate(coll_i.sources_all):
+                src.magnetization = variations["magnetization"][i, j]
+                src.position = variations["position"][i, j]
+                src.orientation = variations["orientation"][i]
+            B_ref.append(getattr(coll_i, f"get{field}")(sens1, sens2))
+        func = getattr(magpy, f"get{field}_batch")
+        for chunksize in [None, 1, 20]:
+            B = func(coll, [sens1, sens2], variations, chunksize=chunksize)
+            assert B.shape == (n, 2, 2, 3, 3)
+            np.testing.assert_allclose(B, B_ref, rtol=1e-10, atol=1e-10)
+
+    # the scene itself is not modified
+    np.testing.assert_array_equal(cube.magnetization, (100, 200, 300))
+    np.testing.assert_array_equal(cube.position, (0, 0, -2))
+
+
+def test_getBH_batch_dimensions_currents():
+    """variations of dimensions and currents, same value for all sources"""
+    loops = [magpy.current.Loop(1, 2, (0, 0, z)) for z in (-1, 1)]
+    line = magpy.current.Line(1, [(0, 0, 0), (1, 0, 0)], position=(0, 1, 0))
+    currents = np.array([1, 2.5, -3])
+    diameters = np.array([1, 2, 3])
+    obs = [(0.5, 0.2, 0), (0, 0, 2)]
+    B = magpy.getB_batch(loops, obs, {"current": currents, "diameter": diameters})
+    B_ref = [
+        magpy.getB([lp.copy(current=c, diameter=d) for lp in loops], obs, sumup=True)
+        for c, d in zip(currents, diameters)
+    ]
+    np.testing.assert_allclose(B, B_ref, rtol=1e-10)
+
+    vertices = np.array([[(0, 0, 0), (1, 0, 0)], [(0, 0, 0), (0, 1, 1)]])
+    B = magpy.getH_batch(line, obs, {"vertices": vertices}, squeeze=False)
+    B_ref = [line.copy(vertices=v).getH(obs) for v in vertices]
+    assert B.shape == (2, 1, 2, 3)
+    np.testing.assert_allclose(B[:, 0], B_ref, rtol=1e-10)
+
+
+@pytest.mark.parametrize(
+    "variations",
+    [
+        None,
+        {},
+        {"moment": [(1, 2, 3)]},
+        {"mesh": [(1, 2, 3)]},
+        {"magnetization": [(1, 2)]},
+        {"magnetization": [[(1, 2, 3)] * 3]},
+        {"magnetization": [(1, 2, 3)], "dimension": [(1, 1, 1)] * 2},
+        {"orientation": [(0, 0, 0, 0)]},
+        {"dimension": "a"},
+    ],
+)
+def test_getBH_batch_bad_variations(variations):
+    """bad variations must raise"""
+    cubes = [magpy.magnet.Cuboid((0, 0, 1000), (1, 1, 1), (x, 0, 0)) for x in (0, 2)]
+    with pytest.raises(MagpylibBadUserInput):
+        magpy.getB_batch(cubes, (0, 0, 1), variations)
+
+
+def test_getBH_batch_path():
+    """scenes with paths are not supported"""
+    cube = magpy.magnet.Cuboid((0, 0, 1000), (1, 1, 1))
+    cube.move([(0, 0, 1), (0, 0, 2)])
+    with pytest.raises(MagpylibBadUserInput):
+        magpy.getB_batch(cube, (0, 0, 1), {"magnetization": [(0, 0, 1)]})
@@ -1,4 +1,5 @@
 import numpy as np
+import pandas as pd
 import pytest
 
 import magpylib as magpy
@@ -254,3 +255,43 @@ def test_getBH_bad_output_type():
     src = magpy.magnet.Cuboid((0, 0, 1000), (1, 1, 1))
     with pytest.raises(ValueError):
         src.getB((0, 0, 0), output="bad_output_type")
+
+
+def test_table_outputs():
+    """dataframe, multiindex dataframe and arrow outputs must hold the same rows as
+    the reference table built row by row"""
+    n = 4
+    sources = [
+        magpy.magnet.Cuboid((0, 0, 1000), (1, 1, 1), style_label="src"),
+        magpy.magnet.Sphere((0, 1000, 0), 1, style_label="src"),
+    ]
+    sources[0].move(np.linspace((-4, 0, 0), (4, 0, 0), n), start=0)
+    pixel = np.linspace((0, 0, 0), (0, 3, 0), 6).reshape(2, 3, 3)
+    sens1 = magpy.Sensor(position=(0, 0, 1), pixel=pixel, style_label="sens1")
+    sens2 = sens1.copy(position=(0, 0, 3), style_label="sens2")
+    BH = magpy.getH(sources, [sens1, sens2], squeeze=False)
+    rows = [
+        (src, m, sens, p)
+        for src in ("src", "src")
+        for m in range(n)
+        for sens in ("sens1", "sens2")
+        for p in range(6)
+    ]
+    df_ref = pd.DataFrame(rows, columns=["source", "path", "sensor", "pixel"])
+    df_ref[["Hx", "Hy", "Hz"]] = BH.reshape(-1, 3)
+
+    df = magpy.getH(sources, [sens1, sens2], output="dataframe")
+    assert not isinstance(df["source"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(df, df_ref)
+
+    df = magpy.getH(sources, [sens1, sens2], output="dataframe_multiindex")
+    assert df.index.names == ["source", "path", "sensor", "pixel"]
+    pd.testing.assert_frame_equal(
+        df, df_ref.set_index(["source", "path", "sensor", "pixel"])
+    )
+    assert df.loc[("src", 2, "sens2", 5)].shape == (2, 3)
+
+    pa = pytest.importorskip("pyarrow")
+    table = magpy.getH(sources, [sens1, sens2], output="arrow")
+    assert isinstance(table, pa.Table)
+    pd.testing.assert_frame_equal(table.to_pandas(), df_ref, check_dtype=False)
@@ -1,5 +1,7 @@
 import numpy as np
+import pandas as pd
 import pytest
+from scipy.spatial.transform import Rotation as R
 
 import magpylib as magpy
 from magpylib._src.exceptions import MagpylibBadUserInput
@@ -490,3 +492,794 @@ def test_pixel_agg3():
                     rtol=1e-5,
                     atol=1e-8,
                 )
+
+
+def test_compile_vs_getB():
+    """compiled evaluator must return the same as getB/getH after state changes"""
+    src1 = magpy.magnet.Cuboid((1, 2, 3), (1, 2, 3), position=(0, 0, -1))
+    src2 = magpy.current.Loop(current=1, diameter=2)
+    src3 = magpy.magnet.Cylinder((0, 0, 1), (1, 2), position=(1, 1, 1))
+    col = magpy.Collection(src2, src3)
+    sens1 = magpy.Sensor(position=(1, 2, 3), pixel=[(0, 0, 0), (0, 0, 1)])
+    sens2 = magpy.Sensor(pixel=[(1, 0, 0), (0, 1, 0)])
+    sens2.rotate_from_angax(30, "x")
+
+    for field, func in zip("BH", [magpy.getB, magpy.getH]):
+        for kwargs in [{}, {"sumup": True}, {"pixel_agg": "mean"}, {"squeeze": False}]:
+            fieldBH = magpy.compile([src1, col], [sens1, sens2], field=field, **kwargs)
+            np.testing.assert_allclose(
+                fieldBH(), func([src1, col], [sens1, sens2], **kwargs)
+            )
+
+    fieldB = magpy.compile([src1, col], [sens1, sens2])
+    for change in [
+        lambda: setattr(src1, "magnetization", (3, 2, 1)),
+        lambda: setattr(src3, "dimension", (2, 1)),
+        lambda: src2.move((0.1, 0.2, 0.3)),
+        lambda: src1.move([(0, 0, 0.1 * i) for i in range(5)]),
+        lambda: sens1.rotate_from_angax(np.linspace(0, 90, 7), "z", start=0),
+        lambda: setattr(sens2, "pixel", [(1, 1, 0), (0, 1, 1)]),
+        lambda: setattr(src2, "current", 2),
+        lambda: setattr(src1, "position", (0, 0, 0)),
+    ]:
+        change()
+        np.testing.assert_allclose(fieldB(), magpy.getB([src1, col], [sens1, sens2]))
+
+
+def test_compile_bad_inputs():
+    """compile is not available for the direct interface"""
+    with pytest.raises(MagpylibBadUserInput):
+        magpy.compile("Cuboid", (1, 2, 3))
+    with pytest.raises(MagpylibBadUserInput):
+        magpy.compile(magpy.misc.Dipole((1, 2, 3)), (1, 2, 3), field="X")
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 5, 7, 64, 10**6])
+def test_chunksize_vs_full(chunksize):
+    """chunked computation must give the same result as the full vectorized one"""
+    src1 = magpy.magnet.Cuboid((1, 2, 3), (1, 2, 3), position=(0, 0, -1))
+    src2 = magpy.current.Loop(current=1, diameter=2)
+    src3 = magpy.magnet.Cylinder((0, 0, 1), (1, 2), position=(1, 1, 1))
+    src4 = magpy.misc.Dipole((1, 2, 3), position=(-1, 0, 0))
+    src1.move([(0, 0, 0.1 * i) for i in range(5)])
+    col = magpy.Collection(src2, src3)
+    sens1 = magpy.Sensor(position=(1, 2, 3), pixel=[(0, 0, 0), (0, 0, 1)])
+    sens2 = magpy.Sensor(pixel=[(1, 0, 0), (0, 1, 0)])
+    sens2.rotate_from_angax(np.linspace(0, 90, 7), "x", start=0)
+    sens3 = magpy.Sensor(pixel=[(1, 0, 0), (0, 1, 0)], position=(0, 0, 2))
+
+    sources = [src1, col, src4]
+    sensors = [sens1, sens2, sens3]
+    for field, func in zip("BH", [magpy.getB, magpy.getH]):
+        for kwargs in [
+            {},
+            {"sumup": True},
+            {"pixel_agg": "max"},
+            {"pixel_agg": "max", "sumup": True},
+            {"squeeze": False},
+        ]:
+            np.testing.assert_allclose(
+                func(sources, sensors, chunksize=chunksize, **kwargs),
+                func(sources, sensors, **kwargs),
+            )
+
+    np.testing.assert_allclose(col.getB(sens2, chunksize=chunksize), col.getB(sens2))
+    np.testing.assert_allclose(
+        sens2.getH(sources, chunksize=chunksize), sens2.getH(sources)
+    )
+    np.testing.assert_allclose(
+        src1.getB([(1, 2, 3), (2, 3, 4)], chunksize=chunksize),
+        src1.getB([(1, 2, 3), (2, 3, 4)]),
+    )
+
+
+def test_chunksize_bad_inputs():
+    """chunksize must be None or a positive integer"""
+    src = magpy.misc.Dipole((1, 2, 3))
+    for chunksize in [0, -1, 1.5, "1", True]:
+        with pytest.raises(MagpylibBadUserInput):
+            src.getB((1, 2, 3), chunksize=chunksize)
+
+
+def test_workers_vs_single():
+    """computation split among several workers must give the same result"""
+    # pylint: disable=import-outside-toplevel
+    from magpylib._src.fields import field_level1
+
+    src1 = magpy.magnet.Cuboid((1, 2, 3), (1, 2, 3), position=(0, 0, -1))
+    src2 = magpy.current.Loop(current=1, diameter=2)
+    src3 = magpy.magnet.Cylinder((0, 0, 1), (1, 2), position=(1, 1, 1))
+    col = magpy.Collection(src2, src3)
+    sens = magpy.Sensor(pixel=np.linspace((-3, -3, -3), (3, 3, 3), 100))
+    sens.rotate_from_angax(np.linspace(0, 90, 7), "x", start=0)
+    obs = np.linspace((-3, -3, -3), (3, 3, 3), 1000)
+
+    B_ref = magpy.getB([src1, col], sens)
+    H_ref = magpy.getH("Cuboid", obs, magnetization=(1, 2, 3), dimension=(1, 1, 1))
+    min_inst = field_level1.MIN_INSTANCES_PER_WORKER
+    try:
+        field_level1.MIN_INSTANCES_PER_WORKER = 10
+        for workers in [1, 3, -1]:
+            np.testing.assert_allclose(
+                magpy.getB([src1, col], sens, workers=workers), B_ref
+            )
+            np.testing.assert_allclose(
+                magpy.getB([src1, col], sens, workers=workers, chunksize=300), B_ref
+            )
+            np.testing.assert_allclose(
+                magpy.getH(
+                    "Cuboid",
+                    obs,
+                    magnetization=(1, 2, 3),
+                    dimension=(1, 1, 1),
+                    workers=workers,
+                ),
+                H_ref,
+            )
+        magpy.defaults.compute.workers = 4
+        np.testing.assert_allclose(col.getB(sens), magpy.getB(col, sens))
+        np.testing.assert_allclose(magpy.compile([src1, col], sens)(), B_ref)
+    finally:
+        field_level1.MIN_INSTANCES_PER_WORKER = min_inst
+        magpy.defaults.reset()
+
+
+def test_workers_bad_inputs():
+    """workers must be None, a positive integer or -1"""
+    src = magpy.misc.Dipole((1, 2, 3))
+    for workers in [0, -2, 1.5, "1", True]:
+        with pytest.raises(MagpylibBadUserInput):
+            src.getB((1, 2, 3), workers=workers)
+
+
+@pytest.mark.parametrize("path_chunk", [1, 3, 7, 100])
+def test_iter_BH_vs_getBH(path_chunk):
+    """concatenated path windows of iter_B/iter_H must be equal to getB/getH"""
+    src1 = magpy.magnet.Cuboid((1, 2, 3), (1, 2, 3), position=(0, 0, -1))
+    src2 = magpy.current.Loop(current=1, diameter=2)
+    src3 = magpy.magnet.Cylinder((0, 0, 1), (1, 2), position=(1, 1, 1))
+    src1.move(np.linspace((0, 0, 0), (0, 0, 2), 11), start=0)
+    src3.rotate_from_angax(np.linspace(0, 45, 5), "y", start=0)
+    col = magpy.Collection(src2, src3)
+    sens1 = magpy.Sensor(position=(1, 2, 3), pixel=[(0, 0, 0), (0, 0, 1)])
+    sens2 = magpy.Sensor(pixel=[(1, 0, 0), (0, 1, 0)])
+    sens2.rotate_from_angax(np.linspace(0, 90, 7), "x", start=0)
+
+    sources = [src1, col]
+    sensors = [sens1, sens2]
+    for iter_func, func in zip([magpy.iter_B, magpy.iter_H], [magpy.getB, magpy.getH]):
+        for kwargs in [
+            {},
+            {"sumup": True},
+            {"pixel_agg": "mean"},
+            {"squeeze": False},
+            {"chunksize": 5},
+        ]:
+            B_windows = list(
+                iter_func(sources, sensors, path_chunk=path_chunk, **kwargs)
+            )
+            assert len(B_windows) == int(np.ceil(11 / path_chunk))
+            path_axis = 0 if kwargs.get("sumup") else 1  # source axis is squeezed
+            np.testing.assert_allclose(
+                np.concatenate(B_windows, axis=path_axis),
+                func(sources, sensors, **kwargs),
+            )
+
+    # path axis is kept with squeeze
+    for B in magpy.iter_B(src2, (0, 0, 1), path_chunk=1):
+        assert B.shape == (1, 3)
+
+    # dataframe output holds global path indices
+    index = ["source", "path", "sensor", "pixel"]
+    df = pd.concat(magpy.iter_B(sources, sensors, path_chunk=4, output="dataframe"))
+    df_ref = magpy.getB(sources, sensors, output="dataframe")
+    pd.testing.assert_frame_equal(
+        df.set_index(index).sort_index(), df_ref.set_index(index).sort_index()
+    )
+
+
+def test_iter_BH_bad_inputs():
+    """iter_B input checks are performed at the call"""
+    src = magpy.misc.Dipole((1, 2, 3))
+    for path_chunk in [0, -1, 1.5, None]:
+        with pytest.raises(MagpylibBadUserInput):
+            magpy.iter_B(src, (1, 2, 3), path_chunk=path_chunk)
+    with pytest.raises(MagpylibBadUserInput):
+        magpy.iter_H("Dipole", (1, 2, 3))
+
+
+def test_unrotated_source_groups():
+    """groups of unrotated or equally rotated sources skip the tiled rotation and
+    must give the same result as groups with individual rotations"""
+    obs = np.linspace((-2, -3, -1), (3, 2, 4), 20)
+    src0 = magpy.magnet.Cuboid((1, 2, 3), (1, 2, 3), position=(0, 0, -1))
+    src1 = src0.copy(position=(1, 0, 0)).rotate_from_angax(30, "z")
+    src2 = src0.copy(position=(0, 1, 0)).rotate_from_angax(30, "z")
+    src3 = src0.copy().rotate_from_angax(60, "x")
+
+    B_generic = magpy.getB([src0, src1, src2, src3], obs)  # individual rotations
+    np.testing.assert_allclose(magpy.getB(src0, obs), B_generic[0])
+    np.testing.assert_allclose(magpy.getB([src1, src2], obs), B_generic[1:3])
+
+    # unit rotation as part of a path
+    src0.rotate_from_angax([0, 10], "y", start=0)
+    B_path = magpy.getB(src0, obs)
+    np.testing.assert_allclose(B_path[0], B_generic[0])
+    src_end = magpy.magnet.Cuboid(
+        (1, 2, 3), (1, 2, 3), position=src0.position[1], orientation=src0.orientation[1]
+    )
+    np.testing.assert_allclose(B_path[1], src_end.getB(obs))
+
+
+def test_static_sources_static_observers():
+    """with static observers the field of static sources is computed only once and
+    broadcast along the path"""
+    n_obs = []
+
+    def field_func(field, observers):
+        n_obs.append(len(observers))
+        return np.ones_like(observers) * (1 if field == "B" else 2)
+
+    src1 = magpy.magnet.Cuboid((1, 2, 3), (1, 2, 3), position=(0, 0, -1))
+    src2 = magpy.magnet.Cuboid((3, 2, 1), (1, 1, 1), position=(2, 0, 0))
+    src2.move(np.linspace((0, 0, 0), (0, 0, 3), 6), start=0)
+    src3 = magpy.current.Loop(current=1, diameter=2)
+    src3.rotate_from_angax([0, 0, 0], "z", start=0)  # path with static values
+    src4 = magpy.misc.CustomSource(field_func=field_func)
+    col = magpy.Collection(src3, src4)
+    sens = magpy.Sensor(pixel=[(1, 0, 0), (0, 1, 0), (1, 1, 1)], position=(0, 0, 1))
+    sens.rotate_from_angax(20, "x")
+    sources = [src1, src2, col]
+
+    # reference: evaluate each path step with static copies of the objects
+    def static_copy(obj, i):
+        # pylint: disable=protected-access
+        ind = min(i, len(obj._position) - 1)
+        return obj.copy(position=obj._position[ind], orientation=obj._orientation[ind])
+
+    B_ref = np.stack(
+        [
+            magpy.getB(
+                [static_copy(src1, i), static_copy(src2, i)],
+                sens,
+            )
+            for i in range(6)
+        ],
+        axis=1,
+    )
+    for kwargs in [{}, {"chunksize": 4}]:
+        n_obs.clear()
+        B = magpy.getB(sources, sens, **kwargs)
+        np.testing.assert_allclose(B[:2], B_ref)
+        np.testing.assert_allclose(
+            B[2],
+            np.broadcast_to(
+                magpy.getB(static_copy(src3, 0), sens)
+                + sens.orientation.inv().apply([1, 1, 1]),
+                (6, 3, 3),
+            ),
+        )
+        assert sum(n_obs) == 3  # one evaluation per pixel
+
+
+def test_result_cache():
+    """cached results must be returned only for unchanged sources and observers"""
+    src1 = magpy.magnet.Cuboid((1, 2, 3), (1, 2, 3), position=(0, 0, -1))
+    src2 = magpy.current.Loop(current=1, diameter=2)
+    src3 = magpy.magnet.Cylinder((0, 0, 1), (1, 2), position=(1, 1, 1))
+    col = magpy.Collection(src2, src3)
+    sens = magpy.Sensor(position=(1, 2, 3), pixel=[(0, 0, 0), (0, 0, 1)])
+    obs = np.array([(1, 2, 3), (2, 3, 4)])
+    cache = magpy.defaults.compute.cache
+
+    def getB_ref(*args, **kwargs):
+        cache.enabled = False
+        B = magpy.getB(*args, **kwargs)
+        cache.enabled = True
+        return B
+
+    try:
+        cache.enabled = True
+        cache.clear()
+        B1 = magpy.getB([src1, col], sens)
+        B2 = magpy.getB([src1, col], sens)
+        np.testing.assert_allclose(B1, B2)
+        B2 += 1  # returned results are copies
+        np.testing.assert_allclose(magpy.getB([src1, col], sens), B1)
+        assert cache.info()[:2] == (2, 1)
+        H = magpy.getH([src1, col], sens)
+        np.testing.assert_allclose(H, magpy.getB([src1, col], sens) / (4 * np.pi / 10))
+
+        for change in [
+            lambda: setattr(src1, "magnetization", (3, 2, 1)),
+            lambda: setattr(src3, "dimension", (2, 1)),
+            lambda: src2.move((0.1, 0.2, 0.3)),
+            lambda: sens.rotate_from_angax(45, "z"),
+            lambda: setattr(sens, "pixel", [(1, 1, 0), (0, 1, 1)]),
+            lambda: setattr(src2, "current", 2),
+            lambda: col.add(src1.copy(position=(5, 5, 5))),
+            lambda: col.move([(0, 0, 0.1 * i) for i in range(5)]),
+            lambda: setattr(src1, "position", (0, 0, -2)),
+            lambda: setattr(src3, "orientation", R.from_rotvec((0.1, 0.2, 0.3))),
+        ]:
+            change()
+            for kwargs in [{}, {"sumup": True}, {"pixel_agg": "mean"}]:
+                np.testing.assert_allclose(
+                    magpy.getB([src1, col], sens, **kwargs),
+                    getB_ref([src1, col], sens, **kwargs),
+                )
+            np.testing.assert_allclose(magpy.getB(src1, obs), getB_ref(src1, obs))
+            obs = obs + 1  # observer arrays are compared by content
+            np.testing.assert_allclose(magpy.getB(src1, obs), getB_ref(src1, obs))
+
+        # in-place modifications are not tracked
+        B = magpy.getB(src1, obs)
+        src1.magnetization[0] = 100
+        np.testing.assert_allclose(magpy.getB(src1, obs), B)
+        cache.clear()
+        np.testing.assert_allclose(magpy.getB(src1, obs), getB_ref(src1, obs))
+
+        # style changes keep the object state
+        cache.clear()
+        magpy.getB(src1, obs)
+        src1.style.label = "new label"
+        magpy.getB(src1, obs)
+        assert cache.info()[:2] == (1, 1)
+
+        # memory limit
+        cache.clear()
+        cache.maxsize = 1e-4
+        magpy.getB(src1, np.zeros((100, 3)))
+        assert cache.info().currsize == 0
+        magpy.getB(src1, np.zeros((3, 3)))
+        assert 0 < cache.info().currsize <= 100
+    finally:
+        magpy.defaults.reset()
+        cache.clear()
+
+
+def test_compute_dtype_float32():
+    """single precision computation must be close to double precision for safe source
+    types, and must not affect all other source types"""
+    rng = np.random.default_rng(0)
+    obs = rng.uniform(-5, 5, (500, 3))
+    src_float32 = [
+        magpy.magnet.Sphere((100, 200, 300), 2, position=(0.1, 0.2, 0.3)),
+        magpy.misc.Dipole((1, 2, 3), position=(1, 1, 1)).rotate_from_angax(30, "x"),
+        magpy.current.Line(10, [(0, 0, 0), (1, 1, 0), (2, 0, 1)], position=(0, 1, 0)),
+    ]
+    src_float64 = [
+        magpy.magnet.Cuboid((100, 200, 300), (1, 2, 3)),
+        magpy.magnet.Cylinder((100, 200, 300), (1, 2)),
+        magpy.current.Loop(10, 2),
+    ]
+    src = src_float32 + src_float64
+    B64 = magpy.getB(src, obs)
+    H64 = magpy.getH(src, obs)
+    B64_direct = magpy.getB("Dipole", obs, moment=(1, 2, 3))
+    try:
+        magpy.defaults.compute.dtype = "float32"
+        cfield = magpy.compile(src, obs)
+        for B32, B in [
+            (magpy.getB(src, obs), B64),
+            (magpy.getH(src, obs), H64),
+            (magpy.getB("Dipole", obs, moment=(1, 2, 3)), B64_direct),
+            (cfield(), B64),
+        ]:
+            assert B32.dtype == np.float64
+            np.testing.assert_allclose(B32, B, rtol=1e-4, atol=1e-5 * np.abs(B).max())
+        n = len(src_float32)
+        assert np.any(magpy.getB(src, obs)[:n] != B64[:n])
+        np.testing.assert_array_equal(magpy.getB(src, obs)[n:], B64[n:])
+
+        # a change of precision invalidates compiled results
+        magpy.defaults.compute.dtype = "float64"
+        np.testing.assert_array_equal(cfield(), B64)
+    finally:
+        magpy.defaults.reset()
+
+
+@pytest.mark.parametrize("tolerance", [1e-2, 1e-3])
+def test_compute_approximation_multipole(tolerance):
+    """the multipole approximation must stay within the tolerance of the exact
+    solution, and observers close to the magnets must be computed exactly"""
+    rng = np.random.default_rng(0)
+    obs = rng.normal(size=(1000, 3))
+    obs *= (np.geomspace(0.1, 100, 1000) / np.linalg.norm(obs, axis=1))[:, np.newaxis]
+    cone = [(0, 0, 1), (1, 0, -1), (-0.5, 0.9, -1), (-0.5, -0.9, -1)]
+    src = [
+        magpy.magnet.Cuboid((100, 200, 300), (1, 2, 3)),
+        magpy.magnet.Cylinder((100, 200, 300), (2, 3)),
+        magpy.magnet.CylinderSegment((100, 200, 300), (1, 2, 1, 0, 90)),
+        magpy.magnet.CylinderSegment((100, 200, 300), (1, 2, 1, 0, 360)),
+        magpy.magnet.Tetrahedron(
+            (100, 200, 300), [(0, 0, 0), (1, 0, 0), (0, 1, 0)] + [(0, 0, 1)]
+        ),
+        magpy.magnet.TriangularMesh.from_ConvexHull((100, 200, 300), cone),
+    ]
+    for s in src:
+        s.move((0.1, 0.2, 0.3)).rotate_from_angax(30, (1, 1, 0))
+    B_exact = magpy.getB(src, obs)
+    H_exact = magpy.getH(src, obs)
+    try:
+        magpy.defaults.compute.approximation = "multipole"
+        magpy.defaults.compute.tolerance = tolerance
+        for BH, BH_exact in [
+            (magpy.getB(src, obs), B_exact),
+            (magpy.getH(src, obs), H_exact),
+            (magpy.getB(src, obs, chunksize=100), B_exact),
+            (magpy.compile(src, obs)(), B_exact),
+            (
+                magpy.getB(
+                    "Cuboid",
+                    obs,
+                    magnetization=(100, 200, 300),
+                    dimension=(1, 2, 3),
+                    position=src[0].position,
+                    orientation=src[0].orientation,
+                ),
+                B_exact[0],
+            ),
+        ]:
+            err = np.linalg.norm(BH - BH_exact, axis=-1)
+            err /= np.linalg.norm(BH_exact, axis=-1)
+            assert np.all(err < tolerance)
+            # close observers are computed exactly, far ones approximated
+            assert np.all(err[..., :300] < 1e-12)
+            assert np.all(np.any(err[..., -100:] > 1e-12, axis=-1))
+    finally:
+        magpy.defaults.reset()
+    np.testing.assert_array_equal(magpy.getB(src, obs), B_exact)
+
+    # open meshes are always computed exactly
+    open_mesh = magpy.magnet.TriangularMesh(
+        (100, 200, 300),
+        cone,
+        [(0, 1, 2), (0, 2, 3), (0, 3, 1)],
+        check_open="ignore",
+        reorient_faces="ignore",
+    )
+    with pytest.warns(UserWarning, match=r"Open mesh of .* detected"):
+        B_exact = open_mesh.getB(obs)
+    try:
+        magpy.defaults.compute.approximation = "multipole"
+        with pytest.warns(UserWarning, match=r"Open mesh of .* detected"):
+            np.testing.assert_array_equal(open_mesh.getB(obs), B_exact)
+    finally:
+        magpy.defaults.reset()
+
+
+@pytest.mark.parametrize("tolerance", [1e-2, 1e-4])
+def test_compute_approximation_tree(tolerance):
+    """the treecode field of summed sources must stay within the tolerance of the exact
+    solution for moving sources and sensors, all output modes and mixed source types"""
+    rng = np.random.default_rng(0)
+    grid = np.stack(np.meshgrid(*[np.arange(6) * 3.0] * 3), axis=-1).reshape(-1, 3)
+    coll = magpy.Collection()
+    for pos in grid:
+        coll.add(magpy.magnet.Cuboid((0, 0, 1000), (1, 2, 1), pos))
+    for pos in rng.uniform(0, 15, (20, 3)):
+        coll.add(
+            magpy.magnet.Sphere((0, 500, 500), 1, pos),
+            magpy.misc.Dipole((0, 0, 100), pos + 0.5),
+        )
+    tetra = [(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1)]
+    for pos in rng.uniform(0, 15, (10, 3)):
+        coll.add(
+            magpy.magnet.Tetrahedron((0, 0, 1000), tetra, pos),
+            magpy.misc.Triangle((0, 0, 1000), tetra[:3], pos - 0.5),
+        )
+    coll.add(
+        magpy.magnet.TriangularMesh.from_ConvexHull(
+            (100, 200, 1000), rng.normal(size=(30, 3)) + 7.5
+        ),
+        magpy.magnet.Cylinder((0, 0, 1000), (2, 1), (-5, -5, 0)),  # exact
+    )
+    coll.rotate_from_angax(np.linspace(0, 30, 3), "x", anchor=0, start=0)
+    sens = magpy.Sensor(pixel=rng.uniform(-10, 25, (50, 3)))
+    sens.rotate_from_angax(np.linspace(0, 90, 4), "z", anchor=(7.5, 7.5, 0), start=0)
+    sources = [coll, magpy.magnet.Cuboid((0, 0, 1000), (1, 1, 1), (-3, 0, 0))]
+
+    def get_fields():
+        return [
+            magpy.getB(sources, sens),
+            magpy.getH(sources, sens),
+            magpy.getB(coll.sources_all, sens, sumup=True),
+            magpy.getB(sources, sens, sumup=True, pixel_agg="mean"),
+            magpy.getB(sources, sens, pixel_agg="max", chunksize=1000),
+            magpy.getB(sources, sens, sumup=True, chunksize=1000),
+            magpy.compile(sources, sens)(),
+        ]
+
+    fields_exact = get_fields()
+    B_single = magpy.getB(coll.sources_all, sens)
+    try:
+        magpy.defaults.compute.approximation = "tree"
+        magpy.defaults.compute.tolerance = tolerance
+        for BH, BH_exact in zip(get_fields(), fields_exact):
+            assert BH.shape == BH_exact.shape
+            err = np.linalg.norm(BH - BH_exact, axis=-1)
+            err /= np.linalg.norm(BH_exact, axis=-1)
+            assert np.all(err < tolerance)
+            assert np.any(err > 1e-12)
+        # sources that are not summed or small sets of sources are computed exactly
+        B = magpy.getB(coll.sources_all[:100], sens, sumup=True)
+        np.testing.assert_allclose(
+            B, magpy.getB(coll.sources_all[:100], sens).sum(axis=0), rtol=1e-12
+        )
+        np.testing.assert_array_equal(magpy.getB(coll.sources_all, sens), B_single)
+    finally:
+        magpy.defaults.reset()
+
+
+def test_compute_symmetry():
+    """the field of rings of identical Cylinder and CylinderSegment magnets in a rotor
+    sweep must be computed once per canonical configuration and equal the exact
+    field"""
+    # pylint: disable=import-outside-toplevel
+    import magpylib._src.fields.field_level1 as field_level1
+
+    rotor = magpy.Collection()
+    for i in range(6):
+        seg = magpy.magnet.CylinderSegment((1000, 0, 200), (4, 5, 2, -30, 30))
+        seg.rotate_from_angax(60 * i, "z", anchor=0)
+        rotor.add(
+            seg,
+            magpy.magnet.CylinderSegment(
+                (0, 0, 1000), (2, 3, 1, 60 * i, 60 * i + 40), (0, 0, 3)
+            ),
+            magpy.magnet.Cylinder((0, 500, 0), (1, 1), (0, 0, -3)),
+        )
+    rotor.rotate_from_angax(np.arange(0, 360, 20), "z", anchor=0, start=0)
+    sens = magpy.Sensor(position=(5.5, 0, 0), pixel=[(0, 0, 0), (0, 0, 1), (-4, 1, 3)])
+    cyl = magpy.magnet.Cylinder((0, 500, 0), (1, 1), (1, 2, 3))  # not rotated
+
+    def get_fields():
+        return [
+            magpy.getB(rotor, sens),
+            magpy.getH(rotor, sens, sumup=True, chunksize=100),
+            magpy.getB(
+                "CylinderSegment",
+                (1, 2, 3),
+                magnetization=(100, 200, 300),
+                dimension=[
+                    (1, 2, 3, 10, 50),
+                    (1, 2, 3, 370, 410),
+                    (1, 2, 3, -350, -310),
+                ],
+            ),
+            cyl.getB((0, 0, 0)),
+        ]
+
+    fields_exact = get_fields()
+    n_instances = []
+
+    def get_symmetry_groups(keys):
+        first, inverse = get_symmetry_groups_orig(keys)
+        n_instances.append((len(inverse), len(first)))
+        return first, inverse
+
+    get_symmetry_groups_orig = field_level1.get_symmetry_groups
+    try:
+        field_level1.get_symmetry_groups = get_symmetry_groups
+        magpy.defaults.compute.symmetry = True
+        for BH, BH_exact in zip(get_fields(), fields_exact):
+            np.testing.assert_allclose(BH, BH_exact, rtol=1e-9, atol=1e-9)
+    finally:
+        field_level1.get_symmetry_groups = get_symmetry_groups_orig
+        magpy.defaults.reset()
+    # rotor: rings of 6 identical segments by orientation and by section angles, and
+    # 6 identical Cylinders on the axis, at 18 rotor angles and with 3 pixel
+    assert (2 * 6 * 18 * 3, 2 * 18 * 3) in n_instances
+    assert (6 * 18 * 3, 18 * 3) in n_instances
+    assert (3, 1) in n_instances
+
+
+def test_compute_symmetry_magnetization_magnitude():
+    """magnets that only differ by the magnetization magnitude must not share their
+    canonical configuration"""
+    sources = [
+        magpy.magnet.Cylinder((0, 0, 100), (1, 1)),
+        magpy.magnet.Cylinder((0, 0, 200), (1, 1)),
+        magpy.magnet.CylinderSegment((100, 0, 0), (1, 2, 1, 0, 90)),
+        magpy.magnet.CylinderSegment((200, 0, 0), (1, 2, 1, 0, 90)),
+    ]
+    obs = (1, 2, 3)
+    B_exact = magpy.getB(sources, obs)
+    kwargs = {"dimension": (1, 1), "observers": obs}
+    H_exact = magpy.getH("Cylinder", magnetization=[(0, 0, 100), (0, 0, 200)], **kwargs)
+    try:
+        magpy.defaults.compute.symmetry = True
+        B = magpy.getB(sources, obs)
+        H = magpy.getH("Cylinder", magnetization=[(0, 0, 100), (0, 0, 200)], **kwargs)
+    finally:
+        magpy.defaults.reset()
+    np.testing.assert_allclose(B, B_exact, rtol=1e-9)
+    np.testing.assert_allclose(B[1], 2 * B[0], rtol=1e-9)
+    np.testing.assert_allclose(H, H_exact, rtol=1e-9)
+
+
+def test_compute_symmetry_result_cache():
+    """results computed with and without symmetry must be cached separately"""
+    seg = magpy.magnet.CylinderSegment((1000, 0, 200), (4, 5, 2, -30, 30))
+    rotor = magpy.Collection(
+        *[seg.copy().rotate_from_angax(60 * i, "z", anchor=0) for i in range(6)]
+    )
+    cache = magpy.defaults.compute.cache
+    try:
+        cache.enabled = True
+        cache.clear()
+        for symmetry in [False, True, False, True]:
+            magpy.defaults.compute.symmetry = symmetry
+            magpy.getB(rotor, (5.5, 0, 0))
+        assert cache.info()[:2] == (2, 2)
+    finally:
+        magpy.defaults.reset()
+        cache.clear()
+
+
+def test_sensor_pixel_paths_vs_single_steps():
+    """vectorized pixel placement along translation, rotation and static sensor paths
+    must give the same field as computing each path step individually"""
+    n = 7
+    src = magpy.magnet.Cuboid((100, 200, 300), (1, 2, 3), position=(0, 0, -2))
+    src.move(np.linspace((0, 0, 0), (0, 0, -1), n), start=0)
+    pix1 = np.array([[(0, 0, 0), (0.1, 0.2, 0.3)], [(-0.1, 0, 0.2), (0, -0.3, 0)]])
+    pix2 = np.array([(0.2, 0.1, 0), (0, 0, 0.5), (-0.3, 0, 0), (0.1, 0.1, 0.1)])
+    sens = [
+        magpy.Sensor(pixel=pix1, position=np.linspace((0, 0, 0), (2, 1, 0), n)),
+        magpy.Sensor(pixel=pix1, position=(1, 1, 1)).rotate_from_angax(
+            np.linspace(10, 300, n), "z", start=0
+        ),
+        magpy.Sensor(pixel=pix2, position=(0.5, 0, 0)).rotate_from_angax(40, "x"),
+        magpy.Sensor(pixel=pix2, position=np.linspace((0, 1, 0), (1, 0, 0), n)),
+    ]
+    sens[3].rotate_from_angax(np.linspace(0, 90, n), (1, 2, 3), start=0)
+
+    def single_step(obj, i):
+        ind = min(i, len(obj._position) - 1)
+        return obj.copy(position=obj._position[ind], orientation=obj._orientation[ind])
+
+    B_ref = [
+        np.array([single_step(src, i).getB(single_step(s, i)) for i in range(n)])
+        for s in sens
+    ]
+    for s, B in zip(sens, B_ref):
+        np.testing.assert_allclose(src.getB(s), B, rtol=1e-12)
+
+    # mixed pixel shapes with pixel aggregation
+    B = src.getB(sens, pixel_agg="mean")
+    for i, Bi in enumerate(B_ref):
+        np.testing.assert_allclose(
+            B[:, i], np.mean(Bi.reshape(n, -1, 3), axis=1), rtol=1e-12
+        )
+
+
+@pytest.mark.parametrize("pixel_agg", ["mean", "sum", "min", "amax", "std"])
+def test_fused_pixel_agg(pixel_agg):
+    """pixel aggregation with chunksize is fused into the blockwise computation and must
+    give the same result as the aggregation of the full pixel field"""
+    n = 5
+    src1 = magpy.magnet.Cuboid((100, 200, 300), (1, 2, 3), position=(0, 0, -2))
+    src2 = magpy.current.Loop(10, 2, position=(1, 0, -1)).rotate_from_angax(20, "y")
+    src2.move(np.linspace((0, 0, 0), (0, 0, -1), n), start=0)
+    src3 = magpy.misc.Dipole((1, 2, 3), position=(0, 2, 0))
+    col = magpy.Collection(src2, src3)
+    xs = np.linspace(-0.5, 0.5, 7)
+    pix1 = np.array([[(x, y, 0) for x in xs] for y in xs])
+    sens1 = magpy.Sensor(pixel=pix1, position=(0.3, 0.1, 0.5))
+    sens1.rotate_from_angax(np.linspace(10, 300, n), "z", start=0)
+    sens2 = magpy.Sensor(pixel=pix1[0], position=(0, 0, 1))
+    for obs in [sens1, [sens1, sens2]]:
+        for sumup in [False, True]:
+            kwargs = {"sumup": sumup, "pixel_agg": pixel_agg}
+            B = magpy.getB([src1, col], obs, **kwargs)
+            for chunksize in [3, 100, 10**6]:
+                B_fused = magpy.getB([src1, col], obs, chunksize=chunksize, **kwargs)
+                np.testing.assert_allclose(B_fused, B, rtol=1e-10, atol=1e-12)
+
+
+def test_sensor_pixel_weights():
+    """weighted pixel aggregation, with and without fused aggregation"""
+    src = magpy.magnet.Cuboid((100, 200, 300), (1, 2, 3), position=(0, 0, -2))
+    pix = np.array([[(x, y, 0) for x in (-1, 0, 1)] for y in (-1, 1)])
+    weights = np.array([[1, 2, 0], [0.5, 3, 1]])
+    sens = magpy.Sensor(pixel=pix, pixel_weights=weights).rotate_from_angax(30, "x")
+    sens2 = magpy.Sensor(pixel=pix[0], position=(0, 0, 1))
+    B_pix = sens.getB(src)
+    B_ref = {
+        "mean": np.average(B_pix, axis=(0, 1), weights=np.stack([weights] * 3, -1)),
+        "sum": np.sum(B_pix * weights[..., np.newaxis], axis=(0, 1)),
+        "min": np.min(B_pix, axis=(0, 1)),
+    }
+    B_ref["std"] = np.sqrt(
+        np.sum((B_pix - B_ref["mean"]) ** 2 * weights[..., np.newaxis], axis=(0, 1))
+        / weights.sum()
+    )
+    B2_ref = np.mean(sens2.getB(src), axis=0)
+    for pixel_agg, B in B_ref.items():
+        for chunksize in [None, 2]:
+            B_agg = src.getB([sens, sens2], pixel_agg=pixel_agg, chunksize=chunksize)
+            np.testing.assert_allclose(B_agg[0], B, rtol=1e-12)
+            if pixel_agg == "mean":
+                np.testing.assert_allclose(B_agg[1], B2_ref, rtol=1e-12)
+
+    # weights are only used by weighted aggregations
+    B = src.getB(sens, pixel_agg="median")
+    np.testing.assert_allclose(B, np.median(B_pix, axis=(0, 1)), rtol=1e-12)
+
+    # flat weights and reset to equal weights
+    sens.pixel_weights = weights.flatten()
+    np.testing.assert_allclose(sens.getB(src, pixel_agg="mean"), B_ref["mean"])
+    sens.pixel_weights = None
+    np.testing.assert_allclose(
+        sens.getB(src, pixel_agg="mean"), np.mean(B_pix, axis=(0, 1))
+    )
+
+
+def test_sensor_pixel_weights_bad_inputs():
+    """bad pixel weights"""
+    pix = [(0, 0, 0), (1, 0, 0)]
+    for weights in ["a", [1, 2, 3], [[1, 2]], [-1, 2], [0, 0], [1, np.nan]]:
+        with pytest.raises(MagpylibBadUserInput):
+            magpy.Sensor(pixel=pix, pixel_weights=weights)
+
+    # pixel shape changed after setting weights
+    sens = magpy.Sensor(pixel=pix, pixel_weights=[1, 2])
+    sens.pixel = [(0, 0, 0), (1, 0, 0), (2, 0, 0)]
+    src = magpy.misc.Dipole((1, 2, 3), position=(0, 0, -1))
+    with pytest.raises(MagpylibBadUserInput):
+        src.getB(sens, pixel_agg="mean")
+
+
+def test_out_file_and_array(tmp_path):
+    """fields written block by block to a .npy file or a preallocated array must be
+    equal to the in-memory result"""
+    n = 7
+    src1 = magpy.magnet.Cuboid((100, 200, 300), (1, 2, 3), position=(0, 0, -2))
+    src2 = magpy.current.Loop(10, 2, position=(1, 0, -1))
+    src2.move(np.linspace((0, 0, 0), (0, 0, -1), n), start=0)
+    col = magpy.Collection(src2, magpy.misc.Dipole((1, 2, 3), position=(0, 2, 0)))
+    sens = magpy.Sensor(pixel=[[(0, 0, 0), (1, 0, 0)]] * 3, position=(0, 0, 1))
+    sens.rotate_from_angax(np.linspace(10, 300, n), "z", start=0)
+    sens2 = sens.copy(position=(1, 1, 1))
+    for kwargs in [
+        {},
+        {"sumup": True},
+        {"squeeze": False},
+        {"pixel_agg": "mean"},
+        {"chunksize": 5},
+        {"chunksize": 20, "pixel_agg": "max", "squeeze": False},
+    ]:
+        B = magpy.getB([src1, col], [sens, sens2], **kwargs)
+        file = tmp_path / "B.npy"
+        B_out = magpy.getB([src1, col], [sens, sens2], out=file, **kwargs)
+        assert isinstance(B_out, np.memmap)
+        np.testing.assert_allclose(B_out, B, rtol=1e-12)
+        del B_out
+        np.testing.assert_allclose(magpy.load_field(file), np.squeeze(B), rtol=1e-12)
+        arr = np.full(B.shape, np.nan)
+        assert magpy.getB([src1, col], [sens, sens2], out=arr, **kwargs) is arr
+        np.testing.assert_allclose(arr, B, rtol=1e-12)
+
+    # object oriented interfaces
+    H = np.zeros((n, 2, 3, 2, 3))
+    col.getH(sens, sens2, out=H)
+    np.testing.assert_allclose(H, col.getH(sens, sens2), rtol=1e-12)
+    sens.getB(src1, out=tmp_path / "B_sens.npy")
+    np.testing.assert_allclose(
+        magpy.load_field(tmp_path / "B_sens.npy"), sens.getB(src1), rtol=1e-12
+    )
+
+
+def test_out_bad_inputs():
+    """bad out inputs must raise"""
+    src = magpy.misc.Dipole((1, 2, 3), position=(0, 0, -1))
+    obs = [(0, 0, 0), (1, 0, 0)]
+    for out in [1, np.zeros((3, 3)), np.zeros((2, 3), dtype=np.float32)]:
+        with pytest.raises(MagpylibBadUserInput):
+            src.getB(obs, out=out)
+    with pytest.raises(MagpylibBadUserInput):
+        src.getB(obs, out=np.zeros((2, 3)), output="dataframe")
+    with pytest.raises(MagpylibBadUserInput):
+        magpy.getB("Dipole", obs, moment=(1, 2, 3), out=np.zeros((2, 3)))
@@ -1,3 +1,4 @@
+import pickle
 import re
 import sys
 import warnings
@@ -9,6 +10,7 @@ import pyvista as pv
 
 import magpylib as magpy
 from magpylib._src.exceptions import MagpylibBadUserInput
+from magpylib._src.fields import field_BH_triangularmesh as ftm
 from magpylib._src.fields.field_BH_triangularmesh import fix_trimesh_orientation
 from magpylib._src.fields.field_BH_triangularmesh import lines_end_in_trimesh
 from magpylib._src.fields.field_BH_triangularmesh import magnet_trimesh_field
@@ -148,6 +150,90 @@ def test_magnet_trimesh_func():
     np.testing.assert_allclose(B0, B2)
 
 
+def test_magnet_trimesh_func_mesh_groups(monkeypatch):
+    """inside-outside test with mesh identifiers, with interleaved and ragged meshes,
+    and reuse of the inside-outside masks"""
+    cube = magpy.magnet.TriangularMesh.from_pyvista((1, 2, 3), pv.Cube())
+    cube2 = magpy.magnet.TriangularMesh.from_pyvista((1, 2, 3), pv.Cube(x_length=3))
+    octa = magpy.magnet.TriangularMesh.from_pyvista((1, 2, 3), pv.Octahedron())
+    obs = np.array([(0, 0, 0), (0.4, 0, 0), (1.2, 0, 0), (0.8, 0, 0), (0, 0, 0.3)] * 2)
+    obs = np.concatenate([obs, [(0.6, 0, 0.6), (0.2, 0.2, 0.2)]])
+    mag = np.array([(111, 222, 333)] * len(obs))
+    meshes = [cube, cube2, cube2, cube, cube, cube2, cube2, cube2, cube, cube, octa]
+    meshes += [octa]
+    inside = [1, 1, 1, 0, 1, 1, 1, 1, 0, 1, 0, 1]
+
+    # reference: each instance separately
+    B_ref = np.array(
+        [
+            magnet_trimesh_field("B", o[np.newaxis], m[np.newaxis], t.mesh[np.newaxis])
+            for o, m, t in zip(obs, mag, meshes)
+        ]
+    )[:, 0]
+    meshes_regular = np.array([t.mesh for t in meshes[:10]])
+    B = magnet_trimesh_field("B", obs[:10], mag[:10], meshes_regular)
+    np.testing.assert_allclose(B, B_ref[:10])
+    ragged = np.empty(len(meshes), dtype=object)
+    ragged[:] = [t.mesh for t in meshes]
+    np.testing.assert_allclose(magnet_trimesh_field("B", obs, mag, ragged), B_ref)
+    B_out = magnet_trimesh_field("B", obs, mag, ragged, in_out="outside")
+    np.testing.assert_array_equal(np.any(B_ref != B_out, axis=1), inside)
+
+    ftm.TRIMESH_MASKS.clear()
+    calls = []
+    mask_func = ftm.mask_inside_trimesh
+    monkeypatch.setattr(
+        ftm, "mask_inside_trimesh", lambda *a: calls.append(1) or mask_func(*a)
+    )
+    mesh_id = np.array([t._mesh_id for t in meshes])
+    for _ in range(2):
+        B = magnet_trimesh_field("B", obs, mag, ragged, mesh_id=mesh_id)
+        np.testing.assert_allclose(B, B_ref)
+    assert len(calls) == 3  # one test per mesh, masks are reused in the second call
+
+    # the mesh id changes with the mesh geometry and is shared by copies
+    assert cube.copy(position=(1, 2, 3))._mesh_id == cube._mesh_id
+    faces = cube.faces.copy()
+    faces[0] = faces[0, ::-1]  # flipped face
+    tmesh = magpy.magnet.TriangularMesh(
+        (1, 2, 3), cube.vertices, faces, reorient_faces="skip"
+    )
+    mesh_id = tmesh._mesh_id
+    tmesh.reorient_faces()
+    assert tmesh._mesh_id != mesh_id
+
+
+def test_magnet_trimesh_mesh_id_inplace_modification():
+    """in-place modifications of the vertices change the mesh id, so that the
+    inside-outside masks of the previous geometry are not reused"""
+    cube = magpy.magnet.TriangularMesh.from_pyvista((0, 0, 1000), pv.Cube())
+    obs = [(0.4, 0, 0), (0.1, 0, 0)]
+    B1 = cube.getB(obs)
+    mesh_id = cube._mesh_id
+    cube.vertices[:] *= 0.5  # first observer is now outside
+    assert cube._mesh_id != mesh_id
+    B2 = cube.getB(obs)
+    cube_ref = magpy.magnet.TriangularMesh((0, 0, 1000), cube.vertices, cube.faces)
+    np.testing.assert_allclose(B2, cube_ref.getB(obs))
+    assert B1[0, 2] > 500 > B2[0, 2]
+
+
+def test_magnet_trimesh_mesh_id_pickle():
+    """unpickled meshes, e.g. in worker processes, keep a mesh id that is determined
+    by their geometry only"""
+    cube = magpy.magnet.TriangularMesh.from_pyvista((0, 0, 1000), pv.Cube())
+    octa = magpy.magnet.TriangularMesh.from_pyvista((0, 0, 1000), pv.Octahedron())
+    cube2 = pickle.loads(pickle.dumps(cube))
+    octa2 = magpy.magnet.TriangularMesh((0, 0, 1000), octa.vertices, octa.faces)
+    assert cube2._mesh_id == cube._mesh_id
+    assert octa2._mesh_id == octa._mesh_id != cube2._mesh_id
+    obs = [(0.45, 0.45, 0), (0.1, 0, 0)]  # inside the cube, outside the octahedron
+    np.testing.assert_allclose(cube.getB(obs), cube2.getB(obs))
+    np.testing.assert_allclose(
+        magpy.getB([cube2, octa2], obs), magpy.getB([cube, octa], obs)
+    )
+
+
 def test_bad_triangle_indices():
     "raise ValueError if faces index > len(vertices)"
     vertices = [[0, 0, 0], [0, 0, 1], [1, 0, 0]]
@@ -419,6 +505,81 @@ def test_lines_ends_in_trimesh():
     assert bool(lines_end_in_trimesh(lines, msh)[0]) is True
 
 
+def test_mask_inside_trimesh_grid(monkeypatch):
+    """the uniform grid acceleration must give the same inside-outside result as the
+    test against all facets, and must be built only once per mesh"""
+    torus = pv.ParametricTorus(ringradius=3, crosssectionradius=1, u_res=20, v_res=20)
+    torus = torus.triangulate()
+    faces = torus.points[torus.faces.reshape(-1, 4)[:, 1:]].astype(float)
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-4.2, 4.2, (3000, 3)) * (1, 1, 0.3)
+    points[:5] = [(3, 0, 0), (0, 0, 0), (10, 0, 0), (0, -3, 0.5), (0, 3, 1.2)]
+
+    monkeypatch.setattr(ftm, "TRIMESH_GRID_MIN_PAIRS", np.inf)
+    mask_brute = ftm.mask_inside_trimesh(points, faces)
+    monkeypatch.setattr(ftm, "TRIMESH_GRID_MIN_PAIRS", 0)
+    monkeypatch.setattr(ftm.TrimeshGrid, "max_pairs", 1000)  # several blocks
+    ftm.TRIMESH_GRIDS.clear()
+    mask_grid = ftm.mask_inside_trimesh(points, faces)
+    np.testing.assert_array_equal(mask_grid, mask_brute)
+    np.testing.assert_array_equal(mask_grid[:5], [True, False, False, True, False])
+
+    # the grid is reused for the same mesh, also with other points
+    grid = ftm.get_trimesh_grid(faces)
+    assert len(ftm.TRIMESH_GRIDS) == 1
+    assert ftm.get_trimesh_grid(faces.copy()) is grid
+    np.testing.assert_array_equal(grid.mask_inside(points[::-1]), mask_brute[::-1])
+
+    # field computation with the grid
+    src = magpy.magnet.TriangularMesh.from_pyvista((0, 0, 1000), torus)
+    B_grid = src.getB(points[:200])
+    assert src._mesh_id in ftm.TRIMESH_GRIDS  # keyed by the mesh content hash
+    monkeypatch.setattr(ftm, "TRIMESH_GRID_MIN_PAIRS", np.inf)
+    np.testing.assert_allclose(B_grid, src.getB(points[:200]))
+
+
+def test_trimesh_caches_threads(monkeypatch):
+    """the grid and mask caches must be safe to use from several threads, and the grid
+    of a mesh must be built only once"""
+    # pylint: disable=import-outside-toplevel
+    from concurrent.futures import ThreadPoolExecutor
+
+    meshes = [
+        pv.Sphere(radius=r, theta_resolution=12, phi_resolution=12) for r in (1, 2, 3)
+    ]
+    meshes = [magpy.magnet.TriangularMesh.from_pyvista((0, 0, 1), m) for m in meshes]
+    rng = np.random.default_rng(0)
+    obs = [rng.uniform(-3, 3, (200, 3)) for _ in range(24)]
+    jobs = [(o, meshes[i % 3]) for i, o in enumerate(obs)]
+
+    def inside(job):
+        o, tmesh = job
+        mesh = np.broadcast_to(tmesh.mesh, (len(o), *tmesh.mesh.shape))
+        mesh_id = np.full(len(o), tmesh._mesh_id, dtype=object)
+        return ftm.mask_inside_trimesh_groups(o, mesh, mesh_id)
+
+    ftm.TRIMESH_GRIDS.clear()
+    ftm.TRIMESH_MASKS.clear()
+    monkeypatch.setattr(ftm, "TRIMESH_GRID_MIN_PAIRS", 0)
+    monkeypatch.setattr(ftm, "TRIMESH_MASKS_MAXSIZE", 2)  # frequent evictions
+    builds = []
+    grid_init = ftm.TrimeshGrid.__init__
+
+    def counted_init(self, faces):
+        builds.append(1)
+        grid_init(self, faces)
+
+    monkeypatch.setattr(ftm.TrimeshGrid, "__init__", counted_init)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        masks = list(pool.map(inside, jobs * 4))
+    assert len(builds) == 3
+    for (o, tmesh), mask in zip(jobs * 4, masks):
+        r = np.linalg.norm(tmesh.vertices, axis=1).max()
+        outer = np.linalg.norm(o, axis=1)
+        assert not np.any(mask & (outer > r))
+        assert np.all(mask[outer < 0.9 * r])
+
+
 def test_reorient_on_closed_but_disconnected_mesh():
     """Reorient edge case"""
     N = 3